@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Analytics Cache - Cópia DuckDB embarcada para consultas de KPI locais
+Com ANALYTICS_CACHE=1 cada carga replica as mesmas linhas no cache (storage.after_commit).
+'sync' traz do banco principal os dias alterados desde a última sincronização (load_log).
+'watch' escuta os eventos de carga (load_events.py) e recopia só os dias da tabela de cada evento.
+Uso: python3 analytics_cache.py sync [full] | watch | status
+"""
+
+import os
+import json
+import time
+from datetime import datetime, date
+from typing import Dict, Any, Optional, List, Sequence
+import logging
+
+from storage import (
+    get_backend, changed_partitions, as_datetime, table_columns,
+    DuckDBBackend, TABLES, DEFAULTED_COLUMNS,
+)
+from settings import settings
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =====================================================
+# CONFIGURAÇÕES
+# =====================================================
+
+# Caminho do cache: settings.ANALYTICS_CACHE_PATH (com STORAGE_BACKEND=duckdb é o próprio banco)
+SYNC_OVERLAP_MINUTES = 10
+
+# DuckDB aceita um único processo escritor: espera o lock por até
+# settings.ANALYTICS_CACHE_LOCK_RETRIES * LOCK_WAIT s
+LOCK_WAIT = 0.2
+
+_cache: Optional[DuckDBBackend] = None
+
+
+# =====================================================
+# CONEXÃO
+# =====================================================
+
+def cache_backend() -> DuckDBBackend:
+    global _cache
+    if _cache is None:
+        _cache = DuckDBBackend(settings.ANALYTICS_CACHE_PATH)
+    return _cache
+
+
+def _retry_locked(fn):
+    """Repete fn enquanto outro processo segura o lock do arquivo"""
+    import duckdb
+
+    for attempt in range(settings.ANALYTICS_CACHE_LOCK_RETRIES):
+        try:
+            return fn()
+        except duckdb.IOException as e:
+            if "lock" not in str(e).lower() or attempt == settings.ANALYTICS_CACHE_LOCK_RETRIES - 1:
+                raise
+            time.sleep(LOCK_WAIT)
+
+
+def connect_readonly():
+    """Conexão somente leitura para consultas (não bloqueia outros leitores)"""
+    import duckdb
+
+    if not os.path.exists(settings.ANALYTICS_CACHE_PATH):
+        raise RuntimeError(f"Cache não encontrado em {settings.ANALYTICS_CACHE_PATH}. Execute: python3 analytics_cache.py sync")
+    return _retry_locked(lambda: duckdb.connect(settings.ANALYTICS_CACHE_PATH, read_only=True))
+
+
+# =====================================================
+# CARGA
+# =====================================================
+
+def ingest(table: str, rows: Sequence[tuple], mode: str = "upsert",
+           columns: Optional[Sequence[str]] = None, key: Optional[Sequence[str]] = None,
+           update: Sequence[str] = (), touch: Sequence[str] = ()) -> int:
+    """Replica no cache a mesma carga que acabou de ser gravada no banco principal"""
+    if table not in TABLES:
+        return 0
+    cache = cache_backend()
+    count = _retry_locked(lambda: cache.load(
+        table, rows, mode=mode, columns=columns, key=key, update=update, touch=touch,
+    ))
+    logger.info(f"📊 Cache analítico: {count} linhas em {table}")
+    return count
+
+
+def state_file() -> str:
+    return settings.ANALYTICS_CACHE_PATH + ".state.json"
+
+
+def load_state() -> Dict[str, Any]:
+    if not os.path.exists(state_file()):
+        return {}
+    with open(state_file(), "r") as f:
+        return json.load(f)
+
+
+def save_state(state: Dict[str, Any]):
+    tmp = state_file() + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, state_file())
+
+
+def _sync_columns(table: str) -> List[str]:
+    return table_columns(table) + [name for name, _ in DEFAULTED_COLUMNS.get(table, [])]
+
+
+def sync_table(source, source_conn, table: str, state: Dict[str, Any], full: bool = False,
+               only_days: Optional[List[date]] = None) -> int:
+    """
+    Copia do banco principal os dias alterados (history) ou a tabela inteira (today).
+    Cada dia é substituído no cache (DELETE do dia + INSERT) em uma transação.
+    only_days: dias explícitos (sem consultar/atualizar a marca d'água)
+    """
+    columns = _sync_columns(table)
+    cols = ", ".join(columns)
+    date_col = TABLES[table]["date"]
+    cursor = source.cursor(source_conn)
+
+    if not TABLES[table]["key"]:
+        days, new_watermark = None, None
+    elif only_days is not None:
+        days, new_watermark = list(only_days), None
+    else:
+        watermark = None if full else as_datetime(state.get(table))
+        days, new_watermark = changed_partitions(source, cursor, table, watermark, SYNC_OVERLAP_MINUTES)
+
+    if days is None:
+        cursor.execute(f"SELECT {cols} FROM {table}")
+        rows = cursor.fetchall()
+    else:
+        rows = []
+        for day in days:
+            cursor.execute(
+                f"SELECT {cols} FROM {table} WHERE {date_col} = {source.placeholder}",
+                source.adapt_row((day,)),
+            )
+            rows.extend(cursor.fetchall())
+
+    cache = cache_backend()
+
+    def write():
+        conn = cache.connect()
+        try:
+            cache.ensure_schema(conn)
+            cache_cursor = cache.cursor(conn)
+            if days is None:
+                cache.clear(cache_cursor, table)
+            else:
+                for day in days:
+                    cache_cursor.execute(f"DELETE FROM {table} WHERE {date_col} = ?", (day,))
+            if rows:
+                cache.write_rows(cache_cursor, table, columns, rows, (), (), ())
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cache.release(conn)
+
+    _retry_locked(write)
+
+    if new_watermark:
+        state[table] = new_watermark.isoformat(sep=" ")
+    logger.info(f"✅ {table}: {len(rows)} linhas sincronizadas"
+                + (f" ({len(days)} dias)" if days is not None else ""))
+    return len(rows)
+
+
+def refresh(table: str, days: List[date]) -> int:
+    """Recopia dias específicos de uma tabela (cargas feitas no SQL, ex.: modo ELT)"""
+    source = get_backend(settings.DB_CONFIG)
+    conn = source.connect()
+    try:
+        count = sync_table(source, conn, table, {}, only_days=days)
+        conn.commit()
+    finally:
+        source.release(conn)
+    return count
+
+
+def sync(full: bool = False) -> Dict[str, int]:
+    """Sincroniza o cache com o banco principal (incremental por padrão)"""
+    source = get_backend(settings.DB_CONFIG)
+    if source.name == "duckdb" and os.path.abspath(source.path) == os.path.abspath(settings.ANALYTICS_CACHE_PATH):
+        logger.info("ℹ️ STORAGE_BACKEND=duckdb: o banco principal já é o cache")
+        return {}
+
+    state = load_state()
+    result = {}
+    conn = source.connect()
+    try:
+        source.ensure_schema(conn)
+        for table in TABLES:
+            result[table] = sync_table(source, conn, table, state, full)
+            save_state(state)
+        conn.commit()
+    finally:
+        source.release(conn)
+    return result
+
+
+def watch():
+    """
+    Cache dirigido por eventos: sincroniza o pendente e depois recopia os dias de cada
+    carga concluída assim que o NOTIFY chega (cache em outro host ou ANALYTICS_CACHE=0). Exige Postgres.
+    """
+    from load_events import LoadListener, event_days
+
+    if get_backend(settings.DB_CONFIG).name != "postgres":
+        raise RuntimeError("watch usa LISTEN/NOTIFY e exige STORAGE_BACKEND=postgres (use sync)")
+    sync()
+
+    listener = LoadListener()
+
+    @listener.on(*TABLES)
+    def on_load(event: Dict[str, Any]):
+        count = refresh(event["table"], event_days(event))
+        logger.info(f"📣 {event['table']}: {count} linhas recopiadas (snapshot {event.get('snapshot_id')})")
+
+    listener.run()
+
+
+def print_status():
+    state = load_state()
+    print("=" * 50)
+    print(f"📊 CACHE ANALÍTICO - {settings.ANALYTICS_CACHE_PATH}")
+    print("=" * 50)
+    if not os.path.exists(settings.ANALYTICS_CACHE_PATH):
+        print("Cache ainda não criado")
+        print("=" * 50)
+        return
+    conn = connect_readonly()
+    try:
+        for table in TABLES:
+            try:
+                count, last_day = conn.execute(
+                    f"SELECT COUNT(*), MAX({TABLES[table]['date']}) FROM {table}"
+                ).fetchone()
+            except Exception:
+                count, last_day = 0, None
+            print(f"{table}: {count} linhas | último dia {last_day} | marca {state.get(table, '-')}")
+    finally:
+        conn.close()
+    print("=" * 50)
+
+
+# =====================================================
+# CONSULTAS
+# =====================================================
+
+# Consultas prontas; $days = janela em dias
+PRESETS: Dict[str, Dict[str, str]] = {
+    "kpis": {
+        "description": "KPIs diários consolidados (dashboard, todas as fontes)",
+        "sql": """
+            SELECT report_date AS dia, approved_orders AS pedidos, ads_spent AS gasto,
+                   gross_revenue AS faturamento, profit AS lucro,
+                   ROUND(gross_revenue / NULLIF(ads_spent, 0), 2) AS roas
+            FROM dashboard_history
+            WHERE traffic_source = 'all' AND report_date >= current_date - $days
+            ORDER BY dia DESC
+        """,
+    },
+    "sources": {
+        "description": "Gasto, faturamento e ROAS por fonte de tráfego",
+        "sql": """
+            SELECT traffic_source AS fonte, SUM(approved_orders) AS pedidos, SUM(ads_spent) AS gasto,
+                   SUM(gross_revenue) AS faturamento, SUM(profit) AS lucro,
+                   ROUND(SUM(gross_revenue) / NULLIF(SUM(ads_spent), 0), 2) AS roas
+            FROM dashboard_history
+            WHERE report_date >= current_date - $days
+            GROUP BY fonte ORDER BY gasto DESC
+        """,
+    },
+    "creatives": {
+        "description": "Top criativos por gasto",
+        "sql": """
+            SELECT ad_id, arg_max(name, report_date) AS nome, COUNT(*) AS dias,
+                   SUM(spend) AS gasto, SUM(revenue) AS faturamento, SUM(profit) AS lucro,
+                   SUM(approved_orders) AS pedidos,
+                   ROUND(SUM(revenue) / NULLIF(SUM(spend), 0), 2) AS roas
+            FROM ads_history
+            WHERE report_date >= current_date - $days
+            GROUP BY ad_id ORDER BY gasto DESC NULLS LAST LIMIT $limit
+        """,
+    },
+    "campaigns": {
+        "description": "Top campanhas por gasto",
+        "sql": """
+            SELECT campaign_id, arg_max(name, report_date) AS nome, COUNT(*) AS dias,
+                   SUM(spend) AS gasto, SUM(revenue) AS faturamento, SUM(profit) AS lucro,
+                   SUM(approved_orders) AS pedidos,
+                   ROUND(SUM(revenue) / NULLIF(SUM(spend), 0), 2) AS roas
+            FROM campaigns_history
+            WHERE report_date >= current_date - $days
+            GROUP BY campaign_id ORDER BY gasto DESC NULLS LAST LIMIT $limit
+        """,
+    },
+    "vturb": {
+        "description": "Players VTurb: views, plays e conversões",
+        "sql": """
+            SELECT player_id, SUM(total_views) AS views, SUM(total_plays) AS plays,
+                   SUM(total_conversions) AS conversoes,
+                   ROUND(100.0 * SUM(total_plays) / NULLIF(SUM(total_views), 0), 1) AS play_rate,
+                   ROUND(100.0 * SUM(total_conversions) / NULLIF(SUM(total_plays), 0), 2) AS conv_rate
+            FROM vturb_history
+            WHERE stats_date >= current_date - $days
+            GROUP BY player_id ORDER BY views DESC LIMIT $limit
+        """,
+    },
+    "today": {
+        "description": "Dia atual por fonte (dashboard_today)",
+        "sql": """
+            SELECT traffic_source AS fonte, approved_orders AS pedidos, ads_spent AS gasto,
+                   gross_revenue AS faturamento, profit AS lucro, roas
+            FROM dashboard_today ORDER BY gasto DESC
+        """,
+    },
+}
+
+
+def query(sql: str, params: Optional[Dict[str, Any]] = None):
+    """Executa SQL no cache; retorna (colunas, linhas, ms)"""
+    conn = connect_readonly()
+    try:
+        started = time.perf_counter()
+        result = conn.execute(sql, params or {}) if params else conn.execute(sql)
+        rows = result.fetchall()
+        columns = [d[0] for d in result.description]
+        elapsed = (time.perf_counter() - started) * 1000
+    finally:
+        conn.close()
+    return columns, rows, elapsed
+
+
+def run_preset(name: str, days: int = 30, limit: int = 20):
+    preset = PRESETS.get(name)
+    if preset is None:
+        raise ValueError(f"Consulta inválida: {name}. Use: {', '.join(PRESETS)} ou sql")
+    sql = preset["sql"]
+    params = {k: v for k, v in (("days", days), ("limit", limit)) if f"${k}" in sql}
+    return query(sql, params)
+
+
+def _format(value) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    if isinstance(value, int):
+        return f"{value:,}".replace(",", ".")
+    if isinstance(value, (date, datetime)):
+        return value.strftime("%d/%m/%Y")
+    return str(value)
+
+
+def print_table(columns: List[str], rows: List[tuple], elapsed_ms: float):
+    cells = [[_format(v) for v in row] for row in rows]
+    widths = [max([len(c)] + [len(r[i]) for r in cells]) for i, c in enumerate(columns)]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in cells:
+        print("  ".join(v.rjust(w) if i else v.ljust(w) for i, (v, w) in enumerate(zip(row, widths))))
+    print(f"\n{len(rows)} linhas em {elapsed_ms:,.1f} ms")
+
+
+# =====================================================
+# MAIN
+# =====================================================
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Uso: python3 analytics_cache.py [sync|status]")
+        print("")
+        print("Comandos:")
+        print("  sync          - Traz os dias alterados do banco principal")
+        print("  sync full     - Recria o cache a partir do banco principal")
+        print("  watch         - Recopia a cada evento de carga (LISTEN/NOTIFY, só Postgres)")
+        print("  status        - Linhas e último dia por tabela")
+        print("")
+        print("Consultas: python3 gritti.py query")
+        sys.exit(1)
+
+    comando = sys.argv[1].lower()
+
+    if comando == "sync":
+        result = sync(full=len(sys.argv) > 2 and sys.argv[2].lower() == "full")
+        print(f"✅ Cache sincronizado: {sum(result.values())} linhas")
+    elif comando == "watch":
+        try:
+            watch()
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        except KeyboardInterrupt:
+            print("\n⏹️ Cache finalizado.")
+    elif comando == "status":
+        print_status()
+    else:
+        print(f"❌ Comando inválido: {comando}")
+        sys.exit(1)
@@ -2,19 +2,22 @@
 """
 Auto Extractor - Automação com Playwright
 Faz login, captura token JWT, salva no .env e executa extrações
+Execuções manuais seguram o lock "run" (leader.py): não colidem com um ciclo do scheduler.
 """
 
 import os
-import subprocess
 import time
 import re
 import json
 import base64
-import requests
 from datetime import datetime
-from playwright.sync_api import sync_playwright
 import logging
 
+from orchestrator import Orchestrator, print_results, summary_lines
+import result_channel
+import leader
+from settings import settings, ENV_FILE
+
 try:
     import pyotp
 except ImportError:
@@ -27,32 +30,10 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-ENV_FILE = os.path.join(SCRIPT_DIR, ".env")
-
-
-def read_env_file() -> dict:
-    env_vars = {}
-    if not os.path.exists(ENV_FILE):
-        return env_vars
-    with open(ENV_FILE, "r") as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith("#") and "=" in line:
-                key, value = line.split("=", 1)
-                env_vars[key.strip()] = value.strip()
-    return env_vars
-
-
-ENV_VARS = read_env_file()
-
-
-def config_value(key: str, default: str = "") -> str:
-    value = os.getenv(key, ENV_VARS.get(key, default))
-    if value is None:
-        return default
-    value = value.strip()
-    return value if value else default
+def sync_playwright():
+    """Playwright só é importado quando um navegador é realmente necessário"""
+    from playwright.sync_api import sync_playwright as _sync_playwright
+    return _sync_playwright()
 
 
 def decode_jwt_payload(token: str) -> dict:
@@ -82,31 +63,30 @@ def extract_bearer_token(auth_header: str) -> str:
 # CONFIGURAÇÕES
 # =====================================================
 
-UTMIFY_URL = "https://app.utmify.com.br/dashboards/66668acc6670e6d0c7a17699/campanhas/"
+UTMIFY_APP_URL = "https://app.utmify.com.br"
 UTMIFY_LOGIN_URL = "https://app.utmify.com.br/login"
-UTMIFY_EMAIL = config_value("UTMIFY_EMAIL", "grupogritt@gmail.com")
-UTMIFY_PASSWORD = config_value("UTMIFY_PASSWORD", "Projeto8d@")
-UTMIFY_TOTP_SECRET = config_value("UTMIFY_TOTP_SECRET", "")
-UTMIFY_TOKEN = config_value("UTMIFY_TOKEN", "")
 
 VTURB_URL = "https://app.vturb.com/folders"
 VTURB_LOGIN_URL = "https://app.vturb.com/login"
-VTURB_EMAIL = config_value("VTURB_EMAIL", "anaclarabichuete@gmail.com")
-VTURB_PASSWORD = config_value("VTURB_PASSWORD", "Projeto8d@")
-VTURB_TARGET_ORG_EMAIL = config_value("VTURB_TARGET_ORG_EMAIL", "suportebumbashop@gmail.com")
-VTURB_TOKEN = config_value("VTURB_TOKEN", "")
-VTURB_HEALTHCHECK_PLAYER_ID = config_value("VTURB_HEALTHCHECK_PLAYER_ID", "693a3e45e891e679e7727765")
-UTMIFY_SCRIPT = os.path.join(SCRIPT_DIR, "utmify_extract.py")
-UTMIFY_DASHBOARD_SCRIPT = os.path.join(SCRIPT_DIR, "dashboard_extract.py")
-VTURB_SCRIPT = os.path.join(SCRIPT_DIR, "vturb_extract.py")
 
 # Timeouts aumentados
 PAGE_TIMEOUT = 120000  # 2 minutos
 WAIT_AFTER_LOGIN = 15  # segundos
-HEADLESS = config_value("PLAYWRIGHT_HEADLESS", "true").lower() in ("1", "true", "yes", "on")
 TOKEN_EXPIRY_MARGIN_SECONDS = 300
 
 
+# Sem dashboard não há URL de campanhas nem como testar o token (ex.: todos removidos pelo catálogo)
+NO_DASHBOARD_ERROR = ("Nenhum dashboard UTMify configurado (UTMIFY_DASHBOARD_IDS vazio); "
+                      "cadastre um com: python3 catalog.py add dashboard <id>")
+
+
+def utmify_url() -> str:
+    """Campanhas do primeiro dashboard da conta (tenant) configurada"""
+    if not settings.UTMIFY_DASHBOARD_IDS:
+        raise ValueError(NO_DASHBOARD_ERROR)
+    return f"{UTMIFY_APP_URL}/dashboards/{settings.UTMIFY_DASHBOARD_IDS[0]}/campanhas/"
+
+
 # =====================================================
 # FUNÇÕES DE TOKEN
 # =====================================================
@@ -132,7 +112,7 @@ def save_token_to_env(token_name: str, token_value: str):
     with open(ENV_FILE, 'w') as f:
         f.write(content)
     
-    logger.info(f"💾 Token {token_name} salvo no .env ({len(token_value)} chars)")
+    logger.info(f"💾 Token {token_name} salvo em {os.path.basename(ENV_FILE)} ({len(token_value)} chars)")
 
 
 def load_env():
@@ -169,10 +149,12 @@ def is_token_not_expired(token: str, margin_seconds: int = TOKEN_EXPIRY_MARGIN_S
 
 
 def is_utmify_token_active(token: str) -> bool:
-    if not token or not is_token_not_expired(token):
+    if not token or not is_token_not_expired(token) or not settings.UTMIFY_DASHBOARD_IDS:
         return False
     try:
-        dashboard_id = re.search(r"/dashboards/([^/]+)/", UTMIFY_URL).group(1)
+        import requests
+
+        dashboard_id = settings.UTMIFY_DASHBOARD_IDS[0]
         headers = {
             "accept": "application/json",
             "authorization": f"Bearer {token}",
@@ -206,6 +188,8 @@ def is_vturb_token_active(token: str) -> bool:
     if not token or not is_token_not_expired(token):
         return False
     try:
+        import requests
+
         headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
@@ -214,14 +198,14 @@ def is_vturb_token_active(token: str) -> bool:
         today_str = datetime.now().strftime("%Y-%m-%d")
         body = {
             "player_stats": {
-                "player_id": VTURB_HEALTHCHECK_PLAYER_ID,
+                "player_id": settings.VTURB_HEALTHCHECK_PLAYER_ID,
                 "start_date": f"{today_str} 00:00:00",
                 "end_date": f"{today_str} 23:59:59",
                 "timezone": "America/Sao_Paulo",
             }
         }
         response = requests.post(
-            f"https://api.vturb.com/vturb/v2/players/{VTURB_HEALTHCHECK_PLAYER_ID}/analytics_stream/player_stats",
+            f"https://api.vturb.com/vturb/v2/players/{settings.VTURB_HEALTHCHECK_PLAYER_ID}/analytics_stream/player_stats",
             headers=headers,
             json=body,
             timeout=12,
@@ -232,7 +216,10 @@ def is_vturb_token_active(token: str) -> bool:
 
 
 def ensure_utmify_token(playwright) -> str:
-    current_token = get_runtime_token("UTMIFY_TOKEN", UTMIFY_TOKEN)
+    if not settings.UTMIFY_DASHBOARD_IDS:
+        logger.error(f"❌ {NO_DASHBOARD_ERROR}")
+        return None
+    current_token = get_runtime_token("UTMIFY_TOKEN", settings.UTMIFY_TOKEN)
     if is_utmify_token_active(current_token):
         logger.info("✅ UTMIFY_TOKEN ativo. Pulando login.")
         return current_token
@@ -241,7 +228,7 @@ def ensure_utmify_token(playwright) -> str:
 
 
 def ensure_vturb_token(playwright) -> str:
-    current_token = get_runtime_token("VTURB_TOKEN", VTURB_TOKEN)
+    current_token = get_runtime_token("VTURB_TOKEN", settings.VTURB_TOKEN)
     if is_vturb_token_active(current_token):
         logger.info("✅ VTURB_TOKEN ativo. Pulando login.")
         return current_token
@@ -256,7 +243,7 @@ def ensure_vturb_token(playwright) -> str:
 def get_utmify_token(playwright) -> str:
     logger.info("🚀 Iniciando captura do token Utmify...")
     
-    browser = playwright.firefox.launch(headless=HEADLESS)
+    browser = playwright.firefox.launch(headless=settings.HEADLESS)
     context = browser.new_context()
     page = context.new_page()
     page.set_default_timeout(PAGE_TIMEOUT)
@@ -288,7 +275,7 @@ def get_utmify_token(playwright) -> str:
         if not is_2fa_screen:
             return True
 
-        if not UTMIFY_TOTP_SECRET:
+        if not settings.UTMIFY_TOTP_SECRET:
             logger.error("❌ UTMIFY_TOTP_SECRET não configurado no .env")
             return False
         if pyotp is None:
@@ -296,7 +283,7 @@ def get_utmify_token(playwright) -> str:
             return False
 
         try:
-            secret = UTMIFY_TOTP_SECRET.replace(" ", "")
+            secret = settings.UTMIFY_TOTP_SECRET.replace(" ", "")
             code = pyotp.TOTP(secret).now()
             logger.info("🔐 Preenchendo código 2FA da UTMify...")
 
@@ -331,12 +318,12 @@ def get_utmify_token(playwright) -> str:
             # Espera o campo de email aparecer
             email_selector = 'input[type="email"], input[name="email"], input[placeholder*="mail"], input[id*="email"]'
             page.wait_for_selector(email_selector, timeout=30000)
-            page.fill(email_selector, UTMIFY_EMAIL)
+            page.fill(email_selector, settings.UTMIFY_EMAIL)
             logger.info("✅ Email preenchido")
             
             # Preenche senha
             password_selector = 'input[type="password"]'
-            page.fill(password_selector, UTMIFY_PASSWORD)
+            page.fill(password_selector, settings.UTMIFY_PASSWORD)
             logger.info("✅ Senha preenchida")
             
             # Clica no botão de login
@@ -359,7 +346,7 @@ def get_utmify_token(playwright) -> str:
         token_capture_enabled = True
 
         logger.info("🔄 Navegando para campanhas para iniciar sessão autenticada...")
-        page.goto(UTMIFY_URL, wait_until="networkidle", timeout=PAGE_TIMEOUT)
+        page.goto(utmify_url(), wait_until="networkidle", timeout=PAGE_TIMEOUT)
         time.sleep(2)
 
         logger.info("🔄 Recarregando página (F5) para gerar request com Bearer...")
@@ -395,7 +382,7 @@ def get_utmify_token(playwright) -> str:
 def get_vturb_token(playwright) -> str:
     logger.info("🚀 Iniciando captura do token VTurb...")
     
-    browser = playwright.firefox.launch(headless=HEADLESS)
+    browser = playwright.firefox.launch(headless=settings.HEADLESS)
     context = browser.new_context()
     page = context.new_page()
     page.set_default_timeout(PAGE_TIMEOUT)
@@ -439,7 +426,7 @@ def get_vturb_token(playwright) -> str:
 
     def switch_vturb_organization():
         """Troca para a organização alvo no menu de perfil."""
-        target = VTURB_TARGET_ORG_EMAIL
+        target = settings.VTURB_TARGET_ORG_EMAIL
         if not target:
             return
 
@@ -613,12 +600,12 @@ def get_vturb_token(playwright) -> str:
             # Espera o campo de email
             email_selector = 'input[type="email"], input[name="email"], input[id="email"], input[placeholder*="mail"]'
             page.wait_for_selector(email_selector, timeout=30000)
-            page.fill(email_selector, VTURB_EMAIL)
+            page.fill(email_selector, settings.VTURB_EMAIL)
             logger.info("✅ Email preenchido")
             
             # Preenche senha
             password_selector = 'input[type="password"]'
-            page.fill(password_selector, VTURB_PASSWORD)
+            page.fill(password_selector, settings.VTURB_PASSWORD)
             logger.info("✅ Senha preenchida")
             
             # Clica no botão
@@ -666,97 +653,6 @@ def get_vturb_token(playwright) -> str:
     return captured_token
 
 
-# =====================================================
-# EXTRAÇÃO
-# =====================================================
-
-def run_extraction(script_path: str, command: str = "hoje", return_output: bool = False):
-    if not os.path.exists(script_path):
-        logger.error(f"❌ Script não encontrado: {script_path}")
-        if return_output:
-            return False, "", ""
-        return False
-    
-    logger.info(f"🔄 Executando: {os.path.basename(script_path)} {command}")
-    
-    env = os.environ.copy()
-    env.update(load_env())
-    
-    try:
-        result = subprocess.run(
-            ["python3", script_path, command],
-            env=env,
-            capture_output=True,
-            text=True,
-            timeout=600  # 10 minutos
-        )
-        
-        print(result.stdout)
-        if result.stderr:
-            print(result.stderr)
-        
-        if result.returncode == 0:
-            logger.info("✅ Extração concluída!")
-            if return_output:
-                return True, result.stdout, result.stderr
-            return True
-        else:
-            logger.error("❌ Erro na extração")
-            if return_output:
-                return False, result.stdout, result.stderr
-            return False
-            
-    except Exception as e:
-        logger.error(f"❌ Erro: {e}")
-        if return_output:
-            return False, "", str(e)
-        return False
-
-
-def extract_summary_block(output: str) -> str:
-    """Extrai o bloco de resumo (📈 RESUMO ... ✅ Extração concluída!) do stdout."""
-    if not output:
-        return ""
-    lines = output.splitlines()
-    start_idx = None
-    for i, line in enumerate(lines):
-        if "📈 RESUMO" in line or line.strip() == "RESUMO":
-            start_idx = i
-            break
-    if start_idx is None:
-        return ""
-
-    end_idx = None
-    for i in range(start_idx, len(lines)):
-        if "✅ Extração concluída!" in lines[i]:
-            end_idx = i
-            break
-    if end_idx is None:
-        end_idx = min(start_idx + 12, len(lines) - 1)
-
-    block = "\n".join(lines[start_idx:end_idx + 1]).strip()
-    return block
-
-
-def extract_dashboard_summary_block(output: str) -> str:
-    """Extrai o resumo textual do dashboard (fontes + métricas)."""
-    if not output:
-        return ""
-
-    lines = output.splitlines()
-    summary_lines = []
-
-    for line in lines:
-        striped = line.strip()
-        if striped.startswith("📊 Fonte:") or striped.startswith("Pedidos:"):
-            summary_lines.append(striped)
-
-    if not summary_lines:
-        return ""
-
-    return "\n".join(summary_lines)
-
-
 # =====================================================
 # MAIN
 # =====================================================
@@ -767,26 +663,23 @@ def extract_hoje():
     print(f"📅 {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
     print("=" * 60)
     
-    utmify_summary = ""
-    utmify_ok = False
-    dashboard_summary = ""
-    dashboard_ok = False
+    results = []
 
-    with sync_playwright() as playwright:
+    with sync_playwright() as playwright, Orchestrator() as orchestrator:
         
         print("\n" + "=" * 60)
         print("📊 UTMIFY")
         print("=" * 60)
         
-        if ensure_utmify_token(playwright):
-            utmify_ok, utmify_stdout, _ = run_extraction(UTMIFY_SCRIPT, "hoje", return_output=True)
-            utmify_summary = extract_summary_block(utmify_stdout)
+        utmify_token = ensure_utmify_token(playwright)
+        if utmify_token:
+            orchestrator.set_token("UTMIFY_TOKEN", utmify_token)
+            results.append(orchestrator.run_step("campaigns"))
 
             print("\n" + "=" * 60)
             print("📊 DASHBOARD UTMIFY")
             print("=" * 60)
-            dashboard_ok, dashboard_stdout, _ = run_extraction(UTMIFY_DASHBOARD_SCRIPT, "hoje", return_output=True)
-            dashboard_summary = extract_dashboard_summary_block(dashboard_stdout)
+            results.append(orchestrator.run_step("dashboard"))
         else:
             logger.error("❌ Falha ao capturar token Utmify")
         
@@ -794,31 +687,18 @@ def extract_hoje():
         print("📊 VTURB")
         print("=" * 60)
         
-        if ensure_vturb_token(playwright):
-            run_extraction(VTURB_SCRIPT, "hoje")
+        vturb_token = ensure_vturb_token(playwright)
+        if vturb_token:
+            orchestrator.set_token("VTURB_TOKEN", vturb_token)
+            results.append(orchestrator.run_step("vturb"))
         else:
             logger.error("❌ Falha ao capturar token VTurb")
     
     print("\n" + "=" * 60)
     print("✅ EXTRAÇÃO AUTOMÁTICA CONCLUÍDA!")
     print("=" * 60)
-    print("\n" + "=" * 60)
-    print("📋 RESUMO UTMIFY EXTRAÍDO")
-    print("=" * 60)
-    print(f"📤 Extração UTMIFY: {'✅ Sim' if utmify_ok else '❌ Não'}")
-    if utmify_summary:
-        print(utmify_summary)
-    else:
-        print("⚠️ Resumo de métricas da UTMify não encontrado na saída.")
-
-    print("\n" + "=" * 60)
-    print("📋 RESUMO DASHBOARD EXTRAÍDO")
-    print("=" * 60)
-    print(f"📤 Extração DASHBOARD: {'✅ Sim' if dashboard_ok else '❌ Não'}")
-    if dashboard_summary:
-        print(dashboard_summary)
-    else:
-        print("⚠️ Resumo de métricas do DASHBOARD não encontrado na saída.")
+    print_results(results)
+    return results
 
 
 def extract_utmify_hoje():
@@ -828,15 +708,12 @@ def extract_utmify_hoje():
     print("=" * 60)
 
     started_at = datetime.now()
-    token_ok = False
-    extraction_ok = False
     token_exp = None
-    extracted_summary = ""
+    result = None
 
-    with sync_playwright() as playwright:
+    with sync_playwright() as playwright, Orchestrator() as orchestrator:
         token = ensure_utmify_token(playwright)
-        token_ok = bool(token)
-        if token_ok:
+        if token:
             payload = decode_jwt_payload(token)
             exp_ts = payload.get("exp")
             if exp_ts:
@@ -844,8 +721,8 @@ def extract_utmify_hoje():
                     token_exp = datetime.fromtimestamp(exp_ts).strftime("%d/%m/%Y %H:%M:%S")
                 except Exception:
                     token_exp = None
-            extraction_ok, stdout, _ = run_extraction(UTMIFY_SCRIPT, "hoje", return_output=True)
-            extracted_summary = extract_summary_block(stdout)
+            orchestrator.set_token("UTMIFY_TOKEN", token)
+            result = orchestrator.run_step("campaigns")
         else:
             logger.error("❌ Falha ao capturar token Utmify")
 
@@ -853,16 +730,18 @@ def extract_utmify_hoje():
     print("\n" + "=" * 60)
     print("📋 RESUMO UTMIFY")
     print("=" * 60)
-    print(f"🔑 Token capturado: {'✅ Sim' if token_ok else '❌ Não'}")
+    print(f"🔑 Token capturado: {'✅ Sim' if token else '❌ Não'}")
     if token_exp:
         print(f"⏰ Expiração do token: {token_exp}")
-    print(f"📤 Extração executada: {'✅ Sim' if extraction_ok else '❌ Não'}")
+    print(f"📤 Extração executada: {'✅ Sim' if result and result.ok else '❌ Não'}")
     print(f"⏱️ Duração: {str(elapsed).split('.')[0]}")
     print("=" * 60)
-    if extracted_summary:
-        print(extracted_summary)
+    lines = summary_lines(result.step, result.summary) if result else []
+    if lines:
+        print("\n".join(lines))
     else:
-        print("⚠️ Resumo de métricas não encontrado na saída da extração.")
+        print("⚠️ Resumo de métricas não disponível.")
+    return result
 
 
 def extract_vturb_hoje():
@@ -870,25 +749,66 @@ def extract_vturb_hoje():
     print("🤖 AUTO EXTRACTOR - VTURB HOJE")
     print("=" * 60)
     
+    with sync_playwright() as playwright, Orchestrator() as orchestrator:
+        token = ensure_vturb_token(playwright)
+        if token:
+            orchestrator.set_token("VTURB_TOKEN", token)
+            return orchestrator.run_step("vturb")
+    return None
+
+
+def refresh_tokens(services: list = None) -> dict:
+    """
+    Só garante os tokens (login via Playwright se necessário), sem extrair.
+    Usado como primeira etapa do grafo de jobs do scheduler. Retorna {serviço: ok}.
+    """
+    services = services or ["utmify", "vturb"]
+    ensure = {"utmify": ensure_utmify_token, "vturb": ensure_vturb_token}
+    invalid = [s for s in services if s not in ensure]
+    if invalid:
+        logger.error(f"❌ Serviço inválido: {', '.join(invalid)}")
+        return {s: False for s in services}
+
+    status = {}
     with sync_playwright() as playwright:
-        if ensure_vturb_token(playwright):
-            run_extraction(VTURB_SCRIPT, "hoje")
+        for service in services:
+            token = ensure[service](playwright)
+            status[service] = bool(token)
+            if token:
+                logger.info(f"🔑 Token {service.upper()} pronto")
+            else:
+                logger.error(f"❌ Falha ao obter token {service.upper()}")
+    return status
 
 
 if __name__ == "__main__":
     import sys
     
     if len(sys.argv) < 2:
-        print("Uso: python3 auto_extract.py [hoje|utmify|vturb]")
+        print("Uso: python3 auto_extract.py [hoje|utmify|vturb|tokens [utmify|vturb]]")
         sys.exit(1)
     
     cmd = sys.argv[1].lower()
-    
-    if cmd == "hoje":
-        extract_hoje()
-    elif cmd == "utmify":
-        extract_utmify_hoje()
-    elif cmd == "vturb":
-        extract_vturb_hoje()
-    else:
+    if cmd not in ("hoje", "utmify", "vturb", "tokens"):
         print(f"❌ Comando inválido: {cmd}")
+        sys.exit(1)
+
+    with leader.run_lock(f"auto_extract {cmd}") as acquired, leader.in_flight("today"):
+        if not acquired:
+            steps = [{"step": cmd, "ok": False, "error": "outra extração em andamento (lock run)"}]
+        elif cmd == "hoje":
+            steps = [r.to_dict() for r in extract_hoje()]
+        elif cmd == "utmify":
+            result = extract_utmify_hoje()
+            steps = [result.to_dict()] if result else []
+        elif cmd == "vturb":
+            result = extract_vturb_hoje()
+            steps = [result.to_dict()] if result else []
+        else:
+            steps = [
+                {"step": f"token_{service}", "ok": ok, "error": None if ok else "token não obtido"}
+                for service, ok in refresh_tokens(sys.argv[2:]).items()
+            ]
+
+    record = result_channel.emit(cmd, steps)
+    sys.exit(result_channel.exit_code(record))
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Backfill - Carga paralela de intervalos de datas com checkpoint
+Quebra o intervalo em unidades (fonte, dia, dashboard/player/fonte de tráfego), as mesmas da fila de
+jobs, e roda várias ao mesmo tempo, no máximo BACKFILL_CONCURRENCY_<API> por API (Utmify, VTurb;
+em SQLite/DuckDB uma por API).
+Cada unidade concluída fica em backfill_checkpoints: um backfill interrompido (Ctrl+C, queda, token
+expirado) continua de onde parou ao rodar o mesmo comando; só as unidades pendentes ou com falha rodam.
+Funciona com qualquer backend (a fila de jobs, work_queue.py, exige Postgres e workers separados).
+Uso: python3 backfill.py --from DD/MM/YYYY --to DD/MM/YYYY [--sources FONTE,FONTE] [--force] | status
+"""
+
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+import logging
+
+import engine
+import leader
+import result_channel
+from settings import settings
+from storage import get_backend, as_date
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =====================================================
+# CONFIGURAÇÕES
+# =====================================================
+
+CHECKPOINT_TABLE = "backfill_checkpoints"
+CHECKPOINT_COLUMNS = [
+    ("source", "TEXT"), ("unit", "TEXT"), ("report_date", "DATE"), ("status", "TEXT"),
+    ("rows_loaded", "INT"), ("attempts", "INT"), ("last_error", "TEXT"), ("updated_at", "TIMESTAMP"),
+]
+CHECKPOINT_KEY = ("source", "unit", "report_date")
+DONE = "done"
+FAILED = "failed"
+
+DEFAULT_SOURCES = ["campaigns", "ads", "dashboard", "vturb"]
+_checkpoint_ready = False
+
+
+class Unit(NamedTuple):
+    source: str
+    unit: str           # chave do job (Source.job_units)
+    day: date
+
+
+def concurrency(api: str, backend: str = "postgres") -> int:
+    """
+    Unidades simultâneas na API (source.login: utmify | vturb).
+    Fora do Postgres, uma por vez: unidades do mesmo dia gravam a mesma linha de load_log
+    e o DuckDB aborta a transação concorrente (o SQLite só serializaria com lock)
+    """
+    if backend != "postgres":
+        return 1
+    return max(1, {"utmify": settings.BACKFILL_CONCURRENCY_UTMIFY,
+                   "vturb": settings.BACKFILL_CONCURRENCY_VTURB}.get(api, 1))
+
+
+# =====================================================
+# CHECKPOINT
+# =====================================================
+
+def _execute(sql: str, params: tuple = (), fetch: bool = False):
+    """Uma transação curta em backfill_checkpoints (criada no primeiro uso)"""
+    global _checkpoint_ready
+    backend = get_backend(settings.DB_CONFIG)
+    conn = backend.connect()
+    try:
+        cursor = backend.cursor(conn)
+        if not _checkpoint_ready:
+            cols = ", ".join(f"{n} {backend.types[t]}" for n, t in CHECKPOINT_COLUMNS)
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} "
+                           f"({cols}, PRIMARY KEY ({', '.join(CHECKPOINT_KEY)}))")
+        cursor.execute(sql.format(p=backend.placeholder), backend.adapt_row(params))
+        result = cursor.fetchall() if fetch else None
+        conn.commit()
+        _checkpoint_ready = True
+        return result
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        backend.release(conn)
+
+
+def load_checkpoints(name: str, start: date, end: date) -> Dict[Tuple[str, str, date], Tuple[str, int]]:
+    """(fonte, unidade, dia) -> (status, tentativas) já registrados no intervalo"""
+    rows = _execute(
+        f"SELECT unit, report_date, status, attempts FROM {CHECKPOINT_TABLE} "
+        "WHERE source = {p} AND report_date BETWEEN {p} AND {p}",
+        (name, start, end), fetch=True,
+    )
+    return {(name, unit, as_date(day)): (status, attempts or 0) for unit, day, status, attempts in rows}
+
+
+def save_checkpoint(unit: Unit, status: str, rows: int, attempts: int, error: Optional[str] = None):
+    cols = [n for n, _ in CHECKPOINT_COLUMNS]
+    conflict = get_backend(settings.DB_CONFIG).conflict_clause(CHECKPOINT_KEY, cols[3:])
+    _execute(
+        f"INSERT INTO {CHECKPOINT_TABLE} ({', '.join(cols)}) VALUES ({', '.join(['{p}'] * len(cols))})" + conflict,
+        (unit.source, unit.unit, unit.day, status, rows, attempts, (error or "")[:2000] or None,
+         datetime.now()),
+    )
+
+
+def counts() -> Dict[str, Dict[str, int]]:
+    """Fonte -> status -> unidades"""
+    result: Dict[str, Dict[str, int]] = {}
+    for source, status, total in _execute(
+        f"SELECT source, status, COUNT(*) FROM {CHECKPOINT_TABLE} GROUP BY source, status ORDER BY source",
+        fetch=True,
+    ):
+        result.setdefault(source, {})[status] = total
+    return result
+
+
+# =====================================================
+# EXECUÇÃO
+# =====================================================
+
+def plan(names: Sequence[str], start: date, end: date, force: bool = False,
+         only: Optional[Dict[str, Sequence[str]]] = None) -> Tuple[List[Unit], Set[Unit], Dict[Unit, int]]:
+    """
+    Unidades do intervalo (mais antigas primeiro), as já concluídas e as tentativas anteriores.
+    only: fonte -> chaves de job (ex.: só o player novo do catálogo); fonte ausente = todas
+    """
+    units: List[Unit] = []
+    done: Set[Unit] = set()
+    attempts: Dict[Unit, int] = {}
+    for name in names:
+        source = engine.get_source(name)
+        keys = [key for key in source.job_units() if not only or name not in only or key in only[name]]
+        checkpoints = {} if force else load_checkpoints(name, start, end)
+        day = start
+        while day <= end:
+            for key in keys:
+                unit = Unit(name, key, day)
+                status, tries = checkpoints.get(tuple(unit), (None, 0))
+                attempts[unit] = tries
+                units.append(unit)
+                if status == DONE:
+                    done.add(unit)
+            day += timedelta(days=1)
+    return units, done, attempts
+
+
+def backfill(names: Sequence[str], start: date, end: date, force: bool = False,
+             only: Optional[Dict[str, Sequence[str]]] = None) -> List[Dict[str, Any]]:
+    """
+    Roda as unidades pendentes, um pool de threads por API. Antes de cada unidade cede a vez a
+    ciclos today/yesterday. Ctrl+C: as unidades em andamento terminam, as demais ficam para o próximo run.
+    """
+    sources = {name: engine.get_source(name) for name in names}
+    units, done, attempts = plan(names, start, end, force, only)
+    stats = {name: {"units": 0, "skipped": 0, "done": 0, "failed": 0, "rows": 0} for name in names}
+    errors: Dict[str, List[str]] = {name: [] for name in names}
+    for unit in units:
+        stats[unit.source]["units"] += 1
+        if unit in done:
+            stats[unit.source]["skipped"] += 1
+
+    missing_token = {name for name, source in sources.items() if not getattr(settings, source.token)}
+    for name in missing_token:
+        errors[name].append(f"{sources[name].token} não definido")
+    pending = [u for u in units if u not in done and u.source not in missing_token]
+
+    total = len(pending)
+    progress = {"n": 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+    logger.info(f"🚚 Backfill {start.strftime('%d/%m/%Y')} a {end.strftime('%d/%m/%Y')}: {total} unidade(s) "
+                f"a rodar, {len(done)} já concluída(s)")
+
+    def run_unit(unit: Unit):
+        if stop.is_set():
+            return
+        label = f"{unit.source} {unit.unit} {unit.day.strftime('%d/%m/%Y')}"
+        leader.yield_to_higher("backfill", f"Backfill {label}")
+        try:
+            result = engine.extract_job(sources[unit.source], unit.unit, unit.day, title=f"BACKFILL | {unit.unit}")
+        except Exception as e:
+            result = {"ok": False, "rows": 0, "error": f"{type(e).__name__}: {e}"}
+        tries = attempts[unit] + 1
+        try:
+            save_checkpoint(unit, DONE if result["ok"] else FAILED, result.get("rows", 0), tries, result.get("error"))
+        except Exception as e:
+            logger.warning(f"⚠️ {label}: checkpoint não registrado ({e})")
+        with lock:
+            progress["n"] += 1
+            s = stats[unit.source]
+            if result["ok"]:
+                s["done"] += 1
+                s["rows"] += result.get("rows", 0)
+                logger.info(f"✅ [{progress['n']}/{total}] {label}: {result.get('rows', 0)} registros")
+            else:
+                s["failed"] += 1
+                errors[unit.source].append(f"{unit.unit} {unit.day.isoformat()}: {result.get('error')}")
+                logger.error(f"❌ [{progress['n']}/{total}] {label}: {result.get('error')}")
+
+    by_api: Dict[str, List[Unit]] = {}
+    for unit in pending:
+        by_api.setdefault(sources[unit.source].login, []).append(unit)
+    backend = get_backend(settings.DB_CONFIG).name
+    if backend != "postgres" and by_api:
+        logger.info(f"🐢 Backend {backend}: uma unidade por vez em cada API (escritas paralelas só no Postgres)")
+    pools = [ThreadPoolExecutor(max_workers=concurrency(api, backend), thread_name_prefix=f"backfill-{api}")
+             for api in by_api]
+    started = time.time()
+    try:
+        futures = [pool.submit(run_unit, unit) for pool, api_units in zip(pools, by_api.values())
+                   for unit in api_units]
+        for future in futures:
+            while not future.done():
+                time.sleep(0.2)
+            future.result()
+    except KeyboardInterrupt:
+        stop.set()
+        logger.warning("⏹️ Interrompido: aguardando as unidades em andamento (o resto fica para o próximo run)")
+        raise
+    finally:
+        for pool in pools:
+            pool.shutdown(wait=True)
+    logger.info(f"🏁 Backfill em {time.time() - started:.1f}s")
+
+    return [{
+        "source": f"backfill_{name}",
+        "ok": not errors[name],
+        "rows": s["rows"],
+        "summary": {k: v for k, v in s.items() if k != "rows"},
+        "error": "; ".join(errors[name][:5]) + (f" (+{len(errors[name]) - 5})" if len(errors[name]) > 5 else "")
+                 or None,
+    } for name, s in stats.items()]
+
+
+# =====================================================
+# MAIN
+# =====================================================
+
+def print_status():
+    table = counts()
+    if not table:
+        print("📭 Nenhum checkpoint de backfill")
+        return
+    columns = [DONE, FAILED]
+    print(f"{'fonte':<12}" + "".join(f"{c:>10}" for c in columns))
+    for source, by_status in table.items():
+        print(f"{source:<12}" + "".join(f"{by_status.get(c, 0):>10}" for c in columns))
+    for source, unit, day, error in _execute(
+        f"SELECT source, unit, report_date, last_error FROM {CHECKPOINT_TABLE} "
+        f"WHERE status = '{FAILED}' ORDER BY report_date LIMIT 10", fetch=True,
+    ):
+        print(f"❌ {source} {unit} {day}: {error}")
+
+
+def print_report(results: List[Dict[str, Any]]):
+    print("\n" + "=" * 60)
+    print("📋 BACKFILL")
+    print("=" * 60)
+    for r in results:
+        s = r["summary"]
+        print(f"{'✅' if r['ok'] else '❌'} {r['source']}: {s['done']} ok, {s['failed']} com falha, "
+              f"{s['skipped']} já concluídas de {s['units']} | {r['rows']} registros")
+        if r["error"]:
+            print(f"   {r['error']}")
+
+
+def print_usage():
+    print("Uso: python3 backfill.py --from DD/MM/YYYY --to DD/MM/YYYY [--sources FONTE,FONTE] [--force]")
+    print("     python3 backfill.py status")
+    print("")
+    print("  --from / --to  - Intervalo (inclusive); --to padrão = --from")
+    print(f"  --sources      - Fontes (padrão: {','.join(DEFAULT_SOURCES)})")
+    print("  --force        - Ignora os checkpoints e refaz tudo")
+    print("  status         - Unidades concluídas/com falha por fonte")
+
+
+if __name__ == "__main__":
+    from work_queue import pop_option
+
+    argv = sys.argv[1:]
+    if argv and argv[0] == "status":
+        print_status()
+        sys.exit(0)
+    try:
+        first = pop_option(argv, "--from")
+        last = pop_option(argv, "--to", first)
+        names = (pop_option(argv, "--sources") or ",".join(DEFAULT_SOURCES)).lower().split(",")
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if not first or any(a not in ("--force",) for a in argv):
+        print_usage()
+        sys.exit(1)
+
+    try:
+        start, end = engine.parse_date(first), engine.parse_date(last)
+        if end < start:
+            raise ValueError("A data final é anterior à inicial")
+        results = backfill(names, start, end, force="--force" in argv)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\n⏹️ Backfill interrompido. Rode o mesmo comando para continuar.")
+        sys.exit(130)
+
+    print_report(results)
+    record = result_channel.emit(f"backfill {first} {last}", results)
+    sys.exit(result_channel.exit_code(record))
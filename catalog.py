@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Catalog - Catálogo de dashboards, fontes de tráfego e players no banco
+Os ids ficam em catalog_entries (no schema do tenant), não no código nem no .env: os processos longos
+(scheduler, workers da fila, orchestrator) releem a tabela a cada CATALOG_POLL_SECONDS via
+engine.get_source, sem reiniciar. Na primeira vez a tabela é semeada com a configuração atual
+(UTMIFY_DASHBOARD_IDS, UTMIFY_TRAFFIC_SOURCES, VTURB_PLAYER_IDS).
+Entradas adicionadas ficam com backfill pendente: só as unidades novas são recarregadas nos últimos
+CATALOG_BACKFILL_DAYS dias (backfill.py), pelo scheduler ou por "catalog.py backfill".
+Players novos da conta VTurb entram sozinhos (sync-players, uma vez por dia pelo scheduler).
+Uso: python3 catalog.py list | add TIPO ID [ID...] | remove TIPO ID [ID...] | backfill [DIAS] | sync-players
+"""
+
+import sys
+import time
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+
+from settings import settings
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =====================================================
+# CONFIGURAÇÕES
+# =====================================================
+
+CATALOG_TABLE = "catalog_entries"
+CATALOG_COLUMNS = [
+    ("kind", "TEXT"), ("entry_id", "TEXT"), ("sort_order", "INT"), ("active", "INT"),
+    ("added_at", "TIMESTAMP"), ("backfilled_at", "TIMESTAMP"),
+]
+CATALOG_KEY = ("kind", "entry_id")
+
+# Tipo -> campo de settings que ele substitui
+KINDS = {
+    "dashboard": "UTMIFY_DASHBOARD_IDS",
+    "traffic_source": "UTMIFY_TRAFFIC_SOURCES",
+    "player": "VTURB_PLAYER_IDS",
+}
+
+_catalog_ready = False
+_apply_lock = threading.Lock()
+_applied_at: Optional[float] = None
+_failed = False
+
+
+def backfill_keys(kind: str, entry: str) -> Dict[str, Optional[List[str]]]:
+    """
+    Fonte -> chaves de job a recarregar quando a entrada é nova (None = todas).
+    Dashboard novo muda a consolidação de todas as fontes de tráfego do dashboard_history.
+    """
+    if kind == "dashboard":
+        return {"campaigns": [entry], "ads": [entry], "dashboard": None}
+    if kind == "traffic_source":
+        return {"dashboard": [entry]}
+    return {"vturb": [entry]}
+
+
+# =====================================================
+# BANCO
+# =====================================================
+
+def _execute(sql: str, params: tuple = (), fetch: bool = False, many: Optional[List[tuple]] = None):
+    """Uma transação curta em catalog_entries (criada no primeiro uso)"""
+    global _catalog_ready
+    from storage import get_backend
+
+    backend = get_backend(settings.DB_CONFIG)
+    conn = backend.connect()
+    try:
+        cursor = backend.cursor(conn)
+        if not _catalog_ready:
+            cols = ", ".join(f"{n} {backend.types[t]}" for n, t in CATALOG_COLUMNS)
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {CATALOG_TABLE} "
+                           f"({cols}, PRIMARY KEY ({', '.join(CATALOG_KEY)}))")
+        sql = sql.format(p=backend.placeholder)
+        if many is not None:
+            cursor.executemany(sql, [backend.adapt_row(row) for row in many])
+        else:
+            cursor.execute(sql, backend.adapt_row(params))
+        result = cursor.fetchall() if fetch else None
+        conn.commit()
+        _catalog_ready = True
+        return result
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        backend.release(conn)
+
+
+def _insert_sql() -> str:
+    cols = [n for n, _ in CATALOG_COLUMNS]
+    return f"INSERT INTO {CATALOG_TABLE} ({', '.join(cols)}) VALUES ({', '.join(['{p}'] * len(cols))})"
+
+
+def seed():
+    """Tabela vazia: copia a configuração atual (sem backfill pendente)"""
+    now = datetime.now()
+    rows = [(kind, str(entry), position, 1, now, now)
+            for kind, field in KINDS.items()
+            for position, entry in enumerate(getattr(settings, field))]
+    _execute(_insert_sql(), many=rows)
+    logger.info(f"🌱 Catálogo semeado com a configuração atual ({len(rows)} entradas)")
+
+
+def entries() -> List[Tuple[str, str, int, bool, Any, Any]]:
+    """(tipo, id, posição, ativo, adicionado, backfill) de todas as entradas, semeando na primeira vez"""
+    query = (f"SELECT {', '.join(n for n, _ in CATALOG_COLUMNS)} FROM {CATALOG_TABLE} "
+             "ORDER BY kind, sort_order, entry_id")
+    rows = _execute(query, fetch=True)
+    if not rows:
+        seed()
+        rows = _execute(query, fetch=True)
+    return [(kind, entry, position, bool(active), added, backfilled)
+            for kind, entry, position, active, added, backfilled in rows]
+
+
+def load() -> Dict[str, List[str]]:
+    """Tipo -> ids ativos, na ordem do catálogo"""
+    active: Dict[str, List[str]] = {kind: [] for kind in KINDS}
+    for kind, entry, _, is_active, _, _ in entries():
+        if kind in active and is_active:
+            active[kind].append(entry)
+    return active
+
+
+# =====================================================
+# RECARGA
+# =====================================================
+
+def apply(force: bool = False) -> Dict[str, Tuple[List[str], List[str]]]:
+    """
+    Relê o catálogo (no máximo a cada CATALOG_POLL_SECONDS) e aplica em settings o que mudou.
+    Devolve tipo -> (adicionados, removidos). Banco indisponível: mantém a configuração atual.
+    """
+    global _applied_at, _failed
+    if not settings.CATALOG:
+        return {}
+    with _apply_lock:
+        now = time.monotonic()
+        if not force and _applied_at is not None and now - _applied_at < settings.CATALOG_POLL_SECONDS:
+            return {}
+        first = _applied_at is None
+        _applied_at = now
+        try:
+            catalog = load()
+        except Exception as e:
+            if not _failed:
+                logger.warning(f"⚠️ Catálogo indisponível ({e}); usando a configuração do .env")
+            _failed = True
+            return {}
+        _failed = False
+
+        changes = {}
+        for kind, field in KINDS.items():
+            current = [str(entry) for entry in getattr(settings, field)]
+            new = catalog[kind]
+            if new == current:
+                continue
+            added = [entry for entry in new if entry not in current]
+            removed = [entry for entry in current if entry not in new]
+            settings.override(**{field: new})
+            changes[kind] = (added, removed)
+            if not first:
+                # Na primeira leitura do processo o catálogo só substitui o .env
+                logger.info(f"🔄 Catálogo {kind}: +{len(added)} -{len(removed)} ({len(new)} ativos)")
+        return changes
+
+
+# =====================================================
+# EDIÇÃO
+# =====================================================
+
+def add(kind: str, ids: Sequence[str]) -> int:
+    """Adiciona (ou reativa) entradas, com backfill pendente"""
+    check_kind(kind)
+    current = {entry: is_active for k, entry, _, is_active, _, _ in entries() if k == kind}
+    position = len(current)
+    now = datetime.now()
+    added = 0
+    for entry in ids:
+        if current.get(entry):
+            logger.info(f"⏭️ {kind} {entry}: já está no catálogo")
+            continue
+        if entry in current:
+            _execute(f"UPDATE {CATALOG_TABLE} SET active = 1, added_at = {{p}}, backfilled_at = NULL "
+                     "WHERE kind = {p} AND entry_id = {p}", (now, kind, entry))
+        else:
+            _execute(_insert_sql(), (kind, entry, position, 1, now, None))
+            position += 1
+        added += 1
+    return added
+
+
+def remove(kind: str, ids: Sequence[str]) -> int:
+    """Desativa entradas (o histórico já carregado fica)"""
+    check_kind(kind)
+    entries()
+    removed = 0
+    for entry in ids:
+        rows = _execute(f"SELECT active FROM {CATALOG_TABLE} WHERE kind = {{p}} AND entry_id = {{p}}",
+                        (kind, entry), fetch=True)
+        if rows and rows[0][0]:
+            _execute(f"UPDATE {CATALOG_TABLE} SET active = 0 WHERE kind = {{p}} AND entry_id = {{p}}",
+                     (kind, entry))
+            removed += 1
+    return removed
+
+
+def sync_players() -> Dict[str, List[str]]:
+    """
+    Players listados pela API VTurb x catálogo: os novos são adicionados (backfill pendente).
+    Os que sumiram da API e os removidos à mão ficam como estão (só os primeiros são reportados).
+    """
+    import vturb_extract
+
+    listed = vturb_extract.fetch_players()
+    if listed is None:
+        raise RuntimeError("A VTurb não listou os players (verifique VTURB_TOKEN e VTURB_PLAYERS_URL)")
+    known = {entry: is_active for kind, entry, _, is_active, _, _ in entries() if kind == "player"}
+    new = [player for player in listed if player not in known]
+    missing = [player for player, is_active in known.items() if is_active and player not in listed]
+    if new:
+        add("player", new)
+    logger.info(f"🎬 Players VTurb: {len(listed)} na conta | {len(new)} novo(s) | "
+                f"{len(missing)} ativo(s) no catálogo fora da listagem")
+    return {"added": new, "missing": missing}
+
+
+def check_kind(kind: str):
+    if kind not in KINDS:
+        raise ValueError(f"Tipo inválido: {kind} (use {', '.join(KINDS)})")
+
+
+# =====================================================
+# BACKFILL DAS ENTRADAS NOVAS
+# =====================================================
+
+def pending() -> List[Tuple[str, str]]:
+    """(tipo, id) ativos ainda sem backfill"""
+    return [(kind, entry) for kind, entry, _, is_active, _, backfilled in entries()
+            if is_active and backfilled is None]
+
+
+def backfill_pending(days: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Recarrega, de days dias atrás até ontem, só as unidades das entradas novas e marca as que
+    terminaram sem falha. Ignora os checkpoints: o dashboard consolidado já carregado muda.
+    """
+    import backfill
+
+    apply(force=True)
+    todo = pending()
+    if not todo:
+        logger.info("✅ Nenhuma entrada nova no catálogo")
+        return []
+    days = settings.CATALOG_BACKFILL_DAYS if days is None else days
+    end = date.today() - timedelta(days=1)
+    start = end - timedelta(days=days - 1)
+
+    # Fonte -> chaves novas; fonte com alguma entrada "todas" (None) roda inteira
+    names: List[str] = []
+    only: Dict[str, set] = {}
+    everything = set()
+    for kind, entry in todo:
+        for name, keys in backfill_keys(kind, entry).items():
+            if name not in names:
+                names.append(name)
+            if keys is None:
+                everything.add(name)
+            else:
+                only.setdefault(name, set()).update(keys)
+    logger.info(f"🆕 Catálogo: {', '.join(f'{k} {e}' for k, e in todo)} → backfill de "
+                f"{start.strftime('%d/%m/%Y')} a {end.strftime('%d/%m/%Y')}")
+    results = backfill.backfill(names, start, end, force=True,
+                                only={name: sorted(keys) for name, keys in only.items() if name not in everything})
+
+    failed = {r["source"][len("backfill_"):] for r in results if not r["ok"]}
+    now = datetime.now()
+    for kind, entry in todo:
+        if not set(backfill_keys(kind, entry)) & failed:
+            _execute(f"UPDATE {CATALOG_TABLE} SET backfilled_at = {{p}} WHERE kind = {{p}} AND entry_id = {{p}}",
+                     (now, kind, entry))
+    return results
+
+
+# =====================================================
+# MAIN
+# =====================================================
+
+def print_catalog():
+    rows = entries()
+    for kind in KINDS:
+        of_kind = [r for r in rows if r[0] == kind]
+        print(f"\n{kind} ({sum(1 for r in of_kind if r[3])} ativos)")
+        for _, entry, _, is_active, added, backfilled in of_kind:
+            state = "🔴 removido" if not is_active else ("🟡 backfill pendente" if backfilled is None else "🟢")
+            print(f"   {entry:<28} {state}")
+
+
+def print_usage():
+    print("Uso: python3 catalog.py [list|add|remove|backfill|sync-players]")
+    print("")
+    print("Comandos:")
+    print("  list                    - Entradas por tipo (ativas, removidas, backfill pendente)")
+    print("  add TIPO ID [ID...]     - Adiciona; o backfill só das unidades novas fica pendente")
+    print("  remove TIPO ID [ID...]  - Deixa de extrair (o histórico fica)")
+    print(f"  backfill [DIAS]         - Carrega as entradas novas (padrão: {settings.CATALOG_BACKFILL_DAYS} dias)")
+    print("  sync-players            - Adiciona os players novos da conta VTurb")
+    print("")
+    print(f"Tipos: {', '.join(KINDS)}")
+
+
+if __name__ == "__main__":
+    import result_channel
+
+    args = sys.argv[1:]
+    if not args or args[0] not in ("list", "add", "remove", "backfill", "sync-players"):
+        print_usage()
+        sys.exit(1)
+
+    try:
+        if args[0] == "list":
+            print_catalog()
+        elif args[0] in ("add", "remove"):
+            if len(args) < 3:
+                print_usage()
+                sys.exit(1)
+            if args[0] == "add":
+                print(f"✅ {add(args[1], args[2:])} entrada(s) adicionada(s) (backfill pendente)")
+            else:
+                print(f"✅ {remove(args[1], args[2:])} entrada(s) removida(s)")
+        elif args[0] == "sync-players":
+            synced = sync_players()
+            print(f"✅ {len(synced['added'])} player(s) novo(s)"
+                  + (f": {', '.join(synced['added'])} (backfill pendente)" if synced["added"] else ""))
+            if synced["missing"]:
+                print(f"⚠️ Fora da listagem da VTurb: {', '.join(synced['missing'])} "
+                      "(python3 catalog.py remove player ID para deixar de extrair)")
+        else:
+            results = backfill_pending(int(args[1]) if len(args) > 1 else None)
+            record = result_channel.emit("catalog backfill", results)
+            sys.exit(result_channel.exit_code(record))
+    except (ValueError, RuntimeError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
@@ -2,16 +2,19 @@
 """
 Utmify Dashboard Extractor
 Extrai dados consolidados do dashboard por fonte de tráfego
-Comandos: python3 dashboard_extract.py hoje | ontem
+Fonte "dashboard" do engine.py: um pedido por (fonte de tráfego, dashboard), consolidados por fonte.
+Comandos: python3 dashboard_extract.py hoje | ontem | DD/MM/YYYY | DD/MM/YYYY DD/MM/YYYY
 """
 
-import os
-import requests
-from datetime import datetime, timedelta, date
-from typing import Dict, Any, Optional, List
+import sys
+from datetime import date
+from typing import Dict, Any, Optional, List, Tuple
 import logging
 
-import psycopg2
+import engine
+from engine import Source, Batch
+from settings import settings
+from schema import DASHBOARD
 
 logging.basicConfig(
     level=logging.INFO,
@@ -20,59 +23,12 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-# =====================================================
-# CARREGAR .ENV
-# =====================================================
-
-def load_env():
-    """Carrega variáveis do arquivo .env"""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    env_file = os.path.join(script_dir, ".env")
-    
-    if os.path.exists(env_file):
-        with open(env_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    key, value = key.strip(), value.strip()
-                    if value:
-                        os.environ[key] = value
-
-load_env()
-
-
 # =====================================================
 # CONFIGURAÇÕES
 # =====================================================
 
-DB_CONFIG = {
-    "host": os.getenv("DB_HOST"),
-    "port": os.getenv("DB_PORT"),
-    "database": os.getenv("DB_NAME"),
-    "user": os.getenv("DB_USER"),
-    "password": os.getenv("DB_PASSWORD"),
-}
-
-UTMIFY_TOKEN = os.getenv("UTMIFY_TOKEN", "")
-
-# Dashboard IDs
-DEFAULT_DASHBOARD_IDS = [
-    os.getenv("UTMIFY_DASHBOARD_ID", "66668acc6670e6d0c7a17699"),
-    "697179f7cfa58e5d2a21afdf",
-    "6972dc7473de5f488a3aee2b",
-]
-UTMIFY_DASHBOARD_IDS = [
-    d.strip()
-    for d in os.getenv("UTMIFY_DASHBOARD_IDS", ",".join(DEFAULT_DASHBOARD_IDS)).split(",")
-    if d.strip()
-]
-
-# Fontes de tráfego para extrair
-TRAFFIC_SOURCES = [None, "Meta", "Google", "Kwai", "TikTok"]  # None = todas
-
-logger.info(f"🔑 Token: {'✅ Definido' if UTMIFY_TOKEN else '❌ Não definido'}")
-logger.info(f"🧩 Dashboards: {len(UTMIFY_DASHBOARD_IDS)}")
+# Resposta do dashboard-info é leve; não precisa do timeout longo da busca de campanhas
+TIMEOUT = 120
 
 
 # =====================================================
@@ -82,24 +38,12 @@ logger.info(f"🧩 Dashboards: {len(UTMIFY_DASHBOARD_IDS)}")
 def fetch_dashboard(target_date: date, dashboard_id: str, traffic_source: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """Busca dados do dashboard na API do Utmify"""
     
-    if not UTMIFY_TOKEN:
+    if not settings.UTMIFY_TOKEN:
         logger.error("❌ UTMIFY_TOKEN não definido!")
         return None
     
-    headers = {
-        "accept": "application/json",
-        "authorization": f"Bearer {UTMIFY_TOKEN}",
-        "content-type": "application/json; charset=UTF-8",
-        "origin": "https://app.utmify.com.br",
-        "referer": "https://app.utmify.com.br/",
-    }
-    
-    # Ajusta para timezone UTC-3
-    date_from = target_date.strftime("%Y-%m-%dT03:00:00.000Z")
-    date_to = (target_date + timedelta(days=1)).strftime("%Y-%m-%dT02:59:59.999Z")
-    
     payload = {
-        "dateRange": {"from": date_from, "to": date_to},
+        "dateRange": engine.utmify_range(target_date),
         "dashboardId": dashboard_id,
         "trafficSource": traffic_source,
         "metaAdAccountIds": None,
@@ -112,27 +56,8 @@ def fetch_dashboard(target_date: date, dashboard_id: str, traffic_source: Option
     
     source_name = traffic_source or "Todas"
     logger.info(f"🔄 Dashboard {dashboard_id[:8]}... | Fonte: {source_name}")
-    
-    try:
-        response = requests.post(
-            "https://server.utmify.com.br/orders/dashboard-info",
-            headers=headers,
-            json=payload,
-            timeout=120
-        )
-        
-        if response.status_code == 200:
-            return response.json()
-        elif response.status_code == 401:
-            logger.error("🔐 Token inválido ou expirado!")
-            return None
-        else:
-            logger.error(f"❌ Erro {response.status_code}: {response.text[:200]}")
-            return None
-            
-    except Exception as e:
-        logger.error(f"💥 Erro: {e}")
-        return None
+    return engine.utmify_post("/orders/dashboard-info", payload,
+                              f"dashboard {dashboard_id[:8]} ({source_name})", timeout=TIMEOUT)
 
 
 def cents_to_decimal(value):
@@ -231,247 +156,115 @@ def consolidate_dashboards(dashboards: List[Dict]) -> Dict[str, Any]:
 
 
 # =====================================================
-# DATABASE
+# EXTRAÇÃO
 # =====================================================
 
-def prepare_values(data: Dict, report_date: date, traffic_source: str) -> tuple:
-    """Prepara valores para inserção"""
-    
-    orders = data.get("ordersCount", {})
-    comissions = data.get("comissions", {})
-    ads = data.get("ads", {})
-    analytics = data.get("analytics", {})
-    statistics = data.get("statistics", {})
-    pix = statistics.get("pix", {})
-    card = statistics.get("card", {})
-    
-    return (
-        report_date,
-        traffic_source,
-        # Orders
-        orders.get("total", 0),
-        orders.get("approved", 0),
-        orders.get("pending", 0),
-        orders.get("refunded", 0),
-        orders.get("chargedback", 0),
-        # Credit Card
-        orders.get("totalCreditCard", 0),
-        orders.get("approvedCreditCard", 0),
-        orders.get("refusedCreditCard", 0),
-        # Faturamento
-        cents_to_decimal(comissions.get("gross", 0)),
-        cents_to_decimal(comissions.get("net", 0)),
-        cents_to_decimal(comissions.get("pendingGrossRevenue", 0)),
-        cents_to_decimal(comissions.get("refundedGrossRevenue", 0)),
-        cents_to_decimal(comissions.get("chargebackGrossRevenue", 0)),
-        # Ads
-        cents_to_decimal(ads.get("spent", 0)),
-        ads.get("clicks", 0),
-        ads.get("pageViews", 0),
-        ads.get("initiateCheckouts", 0),
-        ads.get("leads", 0),
-        # Métricas
-        cents_to_decimal(analytics.get("profit", 0)),
-        analytics.get("roi", 0),
-        analytics.get("roas", 0),
-        analytics.get("profitMargin", 0),
-        cents_to_decimal(analytics.get("cpa", 0)),
-        cents_to_decimal(analytics.get("avgTicket", 0)),
-        cents_to_decimal(analytics.get("costPerLead", 0)),
-        # Fees/Taxes
-        cents_to_decimal(analytics.get("fees", 0)),
-        cents_to_decimal(analytics.get("taxes", 0)),
-        # PIX
-        pix.get("approved", {}).get("ordersCount", 0),
-        cents_to_decimal(pix.get("approved", {}).get("comission", 0)),
-        pix.get("pending", {}).get("ordersCount", 0),
-        cents_to_decimal(pix.get("pending", {}).get("comission", 0)),
-        # Card
-        card.get("approved", {}).get("ordersCount", 0),
-        cents_to_decimal(card.get("approved", {}).get("comission", 0)),
-        card.get("refused", {}).get("ordersCount", 0),
-        cents_to_decimal(card.get("refused", {}).get("comission", 0)),
-    )
+def traffic_sources() -> List[Optional[str]]:
+    """Fontes de tráfego extraídas (None = todas; as demais vêm de settings/catálogo)"""
+    return [None] + list(settings.UTMIFY_TRAFFIC_SOURCES)
 
 
-def save_to_history(data: Dict, report_date: date, traffic_source: str):
-    """Salva em dashboard_history"""
-    
-    conn = psycopg2.connect(**DB_CONFIG)
-    cursor = conn.cursor()
-    
-    source_key = traffic_source or "all"
-    
-    query = """
-        INSERT INTO dashboard_history (
-            report_date, traffic_source,
-            total_orders, approved_orders, pending_orders, refunded_orders, chargedback_orders,
-            total_credit_card, approved_credit_card, refused_credit_card,
-            gross_revenue, net_revenue, pending_revenue, refunded_revenue, chargeback_revenue,
-            ads_spent, ads_clicks, ads_page_views, ads_initiate_checkouts, ads_leads,
-            profit, roi, roas, profit_margin, cpa, avg_ticket, cost_per_lead,
-            fees, taxes,
-            pix_approved_orders, pix_approved_revenue, pix_pending_orders, pix_pending_revenue,
-            card_approved_orders, card_approved_revenue, card_refused_orders, card_refused_revenue
-        ) VALUES (
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-            %s, %s, %s, %s, %s, %s, %s
-        )
-        ON CONFLICT (report_date, traffic_source) DO UPDATE SET
-            extraction_timestamp = NOW(),
-            total_orders = EXCLUDED.total_orders,
-            approved_orders = EXCLUDED.approved_orders,
-            pending_orders = EXCLUDED.pending_orders,
-            gross_revenue = EXCLUDED.gross_revenue,
-            net_revenue = EXCLUDED.net_revenue,
-            ads_spent = EXCLUDED.ads_spent,
-            profit = EXCLUDED.profit,
-            roi = EXCLUDED.roi,
-            roas = EXCLUDED.roas
-    """
-    
-    values = prepare_values(data, report_date, source_key)
-    cursor.execute(query, values)
-    
-    conn.commit()
-    cursor.close()
-    conn.close()
+def units() -> List[Tuple[Optional[str], str]]:
+    """(fonte de tráfego, dashboard): todos os dashboards de uma fonte antes da próxima"""
+    return [(t, d) for t in traffic_sources() for d in settings.UTMIFY_DASHBOARD_IDS]
 
 
-def save_to_today(data_list: List[tuple]):
-    """Salva em dashboard_today (truncate + insert)"""
-    
-    conn = psycopg2.connect(**DB_CONFIG)
-    cursor = conn.cursor()
-    
-    cursor.execute("TRUNCATE TABLE dashboard_today")
-    
-    query = """
-        INSERT INTO dashboard_today (
-            report_date, traffic_source,
-            total_orders, approved_orders, pending_orders, refunded_orders, chargedback_orders,
-            total_credit_card, approved_credit_card, refused_credit_card,
-            gross_revenue, net_revenue, pending_revenue, refunded_revenue, chargeback_revenue,
-            ads_spent, ads_clicks, ads_page_views, ads_initiate_checkouts, ads_leads,
-            profit, roi, roas, profit_margin, cpa, avg_ticket, cost_per_lead,
-            fees, taxes,
-            pix_approved_orders, pix_approved_revenue, pix_pending_orders, pix_pending_revenue,
-            card_approved_orders, card_approved_revenue, card_refused_orders, card_refused_revenue
-        ) VALUES (
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-            %s, %s, %s, %s, %s, %s, %s
-        )
-    """
-    
-    for values in data_list:
-        cursor.execute(query, values)
+def transform(state: Dict[str, Any], target_date: date, unit: Tuple[Optional[str], str],
+              data: Optional[Dict]) -> Optional[Batch]:
+    """Junta os dashboards de uma fonte; emite quando todos chegaram (ok ou não)"""
+    traffic_source, dashboard_id = unit
+    source_name = traffic_source or "all"
+    received = state.setdefault(source_name, [])
+    received.append((dashboard_id, data))
+    if len(received) < len(settings.UTMIFY_DASHBOARD_IDS):
+        return None
+    dashboards = [(d_id, d) for d_id, d in state.pop(source_name) if d]
+    if not dashboards:
+        logger.warning(f"⚠️ Nenhum dado para fonte {source_name}")
+        return None
     
-    conn.commit()
-    cursor.close()
-    conn.close()
+    consolidated = consolidate_dashboards([d for _, d in dashboards])
+    orders = consolidated.get("ordersCount", {})
+    comissions = consolidated.get("comissions", {})
+    ads = consolidated.get("ads", {})
+    analytics = consolidated.get("analytics", {})
+    summary = {
+        "orders": orders.get("approved", 0),
+        "gross": cents_to_decimal(comissions.get("gross", 0)),
+        "spent": cents_to_decimal(ads.get("spent", 0)),
+        "profit": cents_to_decimal(analytics.get("profit", 0)),
+    }
     
-    logger.info(f"✅ {len(data_list)} registros salvos em dashboard_today")
+    logger.info(f"\n📊 Fonte: {source_name}")
+    print(f"   Pedidos: {summary['orders']} | "
+          f"Faturamento: R$ {summary['gross']:,.2f} | "
+          f"Gasto: R$ {summary['spent']:,.2f} | "
+          f"Lucro: R$ {summary['profit']:,.2f}")
+    
+    # No modo ELT os payloads por dashboard são consolidados/projetados em SQL
+    return Batch(
+        [(source_name, summary)],
+        [DASHBOARD.row(consolidated, {"report_date": target_date, "traffic_source": source_name})],
+        [(source_name, d_id, d) for d_id, d in dashboards],
+    )
 
 
-# =====================================================
-# EXTRAÇÃO
-# =====================================================
+def settling(rows: List[Dict[str, Any]]) -> List[Tuple[Optional[str], str]]:
+    """Fontes de tráfego sem linha provisória ou com pedidos/gasto no dia (todos os dashboards de cada uma)"""
+    idle = {r["traffic_source"] for r in rows
+            if not engine.active(r, ("total_orders", "pending_orders", "pending_revenue", "ads_spent"))}
+    return [(t, d) for t, d in units() if (t or "all") not in idle]
 
-def extract_all_sources(target_date: date, to_history: bool = False):
-    """Extrai dados de todas as fontes de tráfego"""
-    
-    all_data = []
-    
-    for traffic_source in TRAFFIC_SOURCES:
-        source_name = traffic_source or "all"
-        logger.info(f"\n📊 Fonte: {source_name}")
-        
-        # Busca de todos os dashboards para esta fonte
-        dashboards = []
-        for dashboard_id in UTMIFY_DASHBOARD_IDS:
-            data = fetch_dashboard(target_date, dashboard_id, traffic_source)
-            if data:
-                dashboards.append(data)
-        
-        if not dashboards:
-            logger.warning(f"⚠️ Nenhum dado para fonte {source_name}")
-            continue
-        
-        # Consolida
-        consolidated = consolidate_dashboards(dashboards)
-        
-        if to_history:
-            save_to_history(consolidated, target_date, traffic_source)
-            logger.info(f"✅ {source_name} salvo em dashboard_history")
-        else:
-            values = prepare_values(consolidated, target_date, source_name)
-            all_data.append(values)
-        
-        # Print resumo desta fonte
-        orders = consolidated.get("ordersCount", {})
-        comissions = consolidated.get("comissions", {})
-        ads = consolidated.get("ads", {})
-        analytics = consolidated.get("analytics", {})
-        
-        print(f"   Pedidos: {orders.get('approved', 0)} | "
-              f"Faturamento: R$ {cents_to_decimal(comissions.get('gross', 0)):,.2f} | "
-              f"Gasto: R$ {cents_to_decimal(ads.get('spent', 0)):,.2f} | "
-              f"Lucro: R$ {cents_to_decimal(analytics.get('profit', 0)):,.2f}")
-    
-    if not to_history and all_data:
-        save_to_today(all_data)
-    
-    return all_data
 
+def summarize(sources: list) -> Dict[str, Any]:
+    """Resumo por fonte de tráfego"""
+    return dict(sources)
 
-def extract_today():
-    """Extrai dados de HOJE"""
-    
-    target_date = date.today()
-    
-    print("=" * 60)
-    print(f"📊 DASHBOARD EXTRACTOR - HOJE")
-    print(f"📅 Data: {target_date.strftime('%d/%m/%Y')}")
-    print(f"🔑 Token: {'✅ Definido' if UTMIFY_TOKEN else '❌ Não definido'}")
-    print(f"📡 Fontes: all, Meta, Google, Kwai, TikTok")
-    print("=" * 60)
-    
-    if not UTMIFY_TOKEN:
-        print("\n❌ Execute: python3 auto_extract.py utmify")
-        return
-    
-    extract_all_sources(target_date, to_history=False)
-    
+
+def print_summary(sources: list):
     print("\n" + "=" * 60)
     print("✅ Extração concluída!")
     print("=" * 60)
 
 
-def extract_yesterday():
+SOURCE = Source(
+    name="dashboard",
+    label="DASHBOARD",
+    token="UTMIFY_TOKEN",
+    login="utmify",
+    tables=("dashboard_today", "dashboard_history"),
+    units=units,
+    fetch=lambda target_date, unit: fetch_dashboard(target_date, unit[1], unit[0]),
+    transform=transform,
+    summarize=summarize,
+    print_summary=print_summary,
+    update=DASHBOARD.update,
+    touch=DASHBOARD.touch,
+    unit_key=lambda unit: unit[1],
+    job_key=lambda unit: unit[0] or "all",     # a fonte é consolidada entre todos os dashboards
+    coverage="traffic_source",
+    status_key="dashboards",
+    describe=lambda: [f"📡 Fontes: {', '.join(t or 'all' for t in traffic_sources())}",
+                      f"🧩 Dashboards: {len(settings.UTMIFY_DASHBOARD_IDS)}"],
+    empty_ok=False,
+    empty_message="Nenhuma fonte retornou dados",
+    settling=settling,
+)
+
+
+def extract_today() -> Dict[str, Any]:
+    """Extrai dados de HOJE"""
+    return engine.extract_today(SOURCE)
+
+
+def extract_yesterday() -> Dict[str, Any]:
     """Extrai dados de ONTEM"""
-    
-    target_date = date.today() - timedelta(days=1)
-    
-    print("=" * 60)
-    print(f"📊 DASHBOARD EXTRACTOR - ONTEM")
-    print(f"📅 Data: {target_date.strftime('%d/%m/%Y')}")
-    print(f"🔑 Token: {'✅ Definido' if UTMIFY_TOKEN else '❌ Não definido'}")
-    print(f"📡 Fontes: all, Meta, Google, Kwai, TikTok")
-    print("=" * 60)
-    
-    if not UTMIFY_TOKEN:
-        print("\n❌ Execute: python3 auto_extract.py utmify")
-        return
-    
-    extract_all_sources(target_date, to_history=True)
-    
-    print("\n" + "=" * 60)
-    print("✅ Extração concluída!")
-    print("=" * 60)
+    return engine.extract_yesterday(SOURCE)
+
+
+def extract_date(target_date: date, to_history: bool = True, title: Optional[str] = None) -> Dict[str, Any]:
+    """Extrai uma data e retorna o resultado estruturado (ok, rows, summary, error)"""
+    return engine.extract_date(SOURCE, target_date, to_history, title)
 
 
 # =====================================================
@@ -479,30 +272,4 @@ def extract_yesterday():
 # =====================================================
 
 if __name__ == "__main__":
-    import sys
-    
-    if len(sys.argv) < 2:
-        print("Uso: python3 dashboard_extract.py [hoje|ontem]")
-        print("")
-        print("Comandos:")
-        print("  hoje   - Extrai dados do dia atual")
-        print("  ontem  - Extrai dados do dia anterior")
-        print("")
-        print("Extrai dados para todas as fontes de tráfego:")
-        print("  - all (todas)")
-        print("  - Meta")
-        print("  - Google")
-        print("  - Kwai")
-        print("  - TikTok")
-        sys.exit(1)
-    
-    comando = sys.argv[1].lower()
-    
-    if comando == "hoje":
-        extract_today()
-    elif comando == "ontem":
-        extract_yesterday()
-    else:
-        print(f"❌ Comando inválido: {comando}")
-        print("   Use: hoje ou ontem")
-        sys.exit(1)
\ No newline at end of file
+    sys.exit(engine.main([SOURCE.name], sys.argv[1:]))
@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+ELT - Landing zone JSONB + projeção set-based em SQL
+Com GRITTI_LOAD_MODE=elt os payloads crus (search-objects, dashboard-info, player_stats)
+vão para raw_landing (uma linha por objeto) e um INSERT ... SELECT projeta as colunas
+tipadas de *_history / *_today. Re-derivar colunas vira só SQL (comando reproject).
+Uso: python3 elt.py init | reproject TABELA DD/MM/YYYY [DD/MM/YYYY] | purge [dias]
+"""
+
+import io
+import csv
+import json
+from datetime import datetime, timedelta, date
+from typing import Dict, Any, Optional, List, Sequence, Tuple
+import logging
+
+from storage import get_backend, table_columns
+from schema import Column, CAMPAIGNS, ADS, VTURB, CENTS, CENTS0, TS, INT, NUM
+from settings import settings
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =====================================================
+# CONFIGURAÇÕES
+# =====================================================
+
+# Modo de carga (etl | elt): settings.LOAD_MODE
+LANDING_TABLE = "raw_landing"
+# Retenção dos payloads crus: settings.ELT_RETENTION_DAYS
+
+LANDING_DDL = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {LANDING_TABLE} (
+        id BIGSERIAL PRIMARY KEY,
+        snapshot_id TEXT NOT NULL,
+        source TEXT NOT NULL,
+        endpoint TEXT NOT NULL,
+        report_date DATE NOT NULL,
+        unit TEXT,
+        object_id TEXT,
+        payload JSONB NOT NULL,
+        loaded_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        full_run BOOLEAN NOT NULL DEFAULT FALSE
+    )
+    """,
+    # full_run: o snapshot traz todas as unidades da fonte (não um job da fila/backfill)
+    f"ALTER TABLE {LANDING_TABLE} ADD COLUMN IF NOT EXISTS full_run BOOLEAN NOT NULL DEFAULT FALSE",
+    f"CREATE INDEX IF NOT EXISTS ix_{LANDING_TABLE}_snapshot ON {LANDING_TABLE} (snapshot_id)",
+    f"CREATE INDEX IF NOT EXISTS ix_{LANDING_TABLE}_source_date ON {LANDING_TABLE} (source, report_date)",
+]
+
+
+# =====================================================
+# EXPRESSÕES DE PROJEÇÃO
+# =====================================================
+
+def _json_text(path: Sequence[str], alias: str = "p") -> str:
+    """('a', 'b') -> p->'a'->>'b'"""
+    parts = [f"'{k}'" for k in path]
+    if len(parts) == 1:
+        return f"{alias}->>{parts[0]}"
+    return f"{alias}->" + "->".join(parts[:-1]) + f"->>{parts[-1]}"
+
+
+def _text(*path: str) -> str:
+    return _json_text(path)
+
+
+def _text_or(default: str, *path: str) -> str:
+    return f"COALESCE({_json_text(path)}, '{default}')"
+
+
+def _num(*path: str) -> str:
+    """Equivalente a .get(k, 0)"""
+    return f"COALESCE(({_json_text(path)})::numeric, 0)"
+
+
+def _cents(*path: str) -> str:
+    """Equivalente a schema.CENTS (0/None -> NULL)"""
+    return f"ROUND(NULLIF(({_json_text(path)})::numeric, 0) / 100, 2)"
+
+
+def _cents0(*path: str) -> str:
+    """Equivalente a schema.CENTS0 (None -> 0)"""
+    return f"ROUND(COALESCE(({_json_text(path)})::numeric, 0) / 100, 2)"
+
+
+def _timestamp(*path: str) -> str:
+    return f"NULLIF({_json_text(path)}, '')::timestamptz"
+
+
+# Colunas de contexto (schema.Column.ctx) -> expressão sobre a linha de raw_landing
+CONTEXT_SQL = {
+    "report_date": "r.report_date",
+    "player_id": "r.unit",
+    "stats_date": "r.report_date",
+    "extraction_timestamp": "r.loaded_at::timestamp",
+    "start_datetime": "r.report_date::timestamp",
+    "end_datetime": "r.report_date::timestamp + INTERVAL '23:59:59'",
+}
+
+
+def column_sql(col: Column) -> str:
+    """Equivalente SQL do conversor Python da coluna (schema.py)"""
+    if col.ctx:
+        return CONTEXT_SQL[col.ctx]
+    paths = [tuple(p.split(".")) for p in col.path.split("|")]
+    if len(paths) > 1:
+        first = [f"NULLIF({_json_text(p)}, '')" for p in paths[:-1]]
+        return f"COALESCE({', '.join(first + [_json_text(paths[-1])])})"
+    path = paths[0]
+    if col.conv == CENTS:
+        return _cents(*path)
+    if col.conv == CENTS0:
+        return _cents0(*path)
+    if col.conv == TS:
+        return _timestamp(*path)
+    if col.type in (INT, NUM):
+        return _num(*path)
+    if col.default is not None:
+        return _text_or(col.default, *path)
+    return _text(*path)
+
+
+CAMPAIGN_EXPRS = [column_sql(c) for c in CAMPAIGNS.columns]
+AD_EXPRS = [column_sql(c) for c in ADS.columns]
+VTURB_EXPRS = [column_sql(c) for c in VTURB.columns]
+
+
+# Dashboard: um payload por (fonte, dashboard); a consolidação entre dashboards
+# (soma + recálculo das métricas, como em consolidate_dashboards) é feita no SQL,
+# por isso esta projeção é escrita à mão e não sai de schema.DASHBOARD.
+DASHBOARD_SUMS = {
+    "total_orders": ("ordersCount", "total"),
+    "approved_orders": ("ordersCount", "approved"),
+    "pending_orders": ("ordersCount", "pending"),
+    "refunded_orders": ("ordersCount", "refunded"),
+    "chargedback_orders": ("ordersCount", "chargedback"),
+    "total_credit_card": ("ordersCount", "totalCreditCard"),
+    "approved_credit_card": ("ordersCount", "approvedCreditCard"),
+    "refused_credit_card": ("ordersCount", "refusedCreditCard"),
+    "gross": ("comissions", "gross"),
+    "net": ("comissions", "net"),
+    "pending_gross": ("comissions", "pendingGrossRevenue"),
+    "refunded_gross": ("comissions", "refundedGrossRevenue"),
+    "chargeback_gross": ("comissions", "chargebackGrossRevenue"),
+    "spent": ("ads", "spent"),
+    "ads_clicks": ("ads", "clicks"),
+    "ads_page_views": ("ads", "pageViews"),
+    "ads_initiate_checkouts": ("ads", "initiateCheckouts"),
+    "ads_leads": ("ads", "leads"),
+    "profit": ("analytics", "profit"),
+    "fees": ("analytics", "fees"),
+    "taxes": ("analytics", "taxes"),
+    "pix_approved_orders": ("statistics", "pix", "approved", "ordersCount"),
+    "pix_approved_comission": ("statistics", "pix", "approved", "comission"),
+    "pix_pending_orders": ("statistics", "pix", "pending", "ordersCount"),
+    "pix_pending_comission": ("statistics", "pix", "pending", "comission"),
+    "card_approved_orders": ("statistics", "card", "approved", "ordersCount"),
+    "card_approved_comission": ("statistics", "card", "approved", "comission"),
+    "card_refused_orders": ("statistics", "card", "refused", "ordersCount"),
+    "card_refused_comission": ("statistics", "card", "refused", "comission"),
+}
+
+DASHBOARD_FIRST = {
+    "roi": ("analytics", "roi"),
+    "roas": ("analytics", "roas"),
+    "profit_margin": ("analytics", "profitMargin"),
+    "cpa": ("analytics", "cpa"),
+    "avg_ticket": ("analytics", "avgTicket"),
+    "cost_per_lead": ("analytics", "costPerLead"),
+}
+
+
+def _recomputed(metric: str, condition: str, value: str) -> str:
+    """Com mais de um dashboard e condição verdadeira recalcula; senão mantém o valor do primeiro"""
+    return f"CASE WHEN a.n > 1 AND {condition} THEN {value} ELSE a.first_{metric} END"
+
+
+def _dashboard_select() -> str:
+    sums = ",\n            ".join(
+        f"SUM(COALESCE(({_json_text(path)})::numeric, 0)) AS {name}" for name, path in DASHBOARD_SUMS.items()
+    )
+    firsts = ",\n            ".join(
+        f"COALESCE((array_agg(({_json_text(path)})::numeric ORDER BY r.id))[1], 0) AS first_{name}"
+        for name, path in DASHBOARD_FIRST.items()
+    )
+    exprs = [
+        "a.report_date", "a.unit",
+        "a.total_orders", "a.approved_orders", "a.pending_orders", "a.refunded_orders", "a.chargedback_orders",
+        "a.total_credit_card", "a.approved_credit_card", "a.refused_credit_card",
+        "ROUND(a.gross / 100, 2)", "ROUND(a.net / 100, 2)", "ROUND(a.pending_gross / 100, 2)",
+        "ROUND(a.refunded_gross / 100, 2)", "ROUND(a.chargeback_gross / 100, 2)",
+        "ROUND(a.spent / 100, 2)", "a.ads_clicks", "a.ads_page_views", "a.ads_initiate_checkouts", "a.ads_leads",
+        "ROUND(a.profit / 100, 2)",
+        _recomputed("roi", "a.spent > 0", "a.profit / NULLIF(a.spent, 0)"),
+        _recomputed("roas", "a.spent > 0", "a.gross / NULLIF(a.spent, 0)"),
+        _recomputed("profit_margin", "a.gross > 0", "a.profit / NULLIF(a.gross, 0)"),
+        f"ROUND(({_recomputed('cpa', 'a.approved_orders > 0', 'a.spent / NULLIF(a.approved_orders, 0)')}) / 100, 2)",
+        f"ROUND(({_recomputed('avg_ticket', 'a.approved_orders > 0', 'a.gross / NULLIF(a.approved_orders, 0)')}) / 100, 2)",
+        f"ROUND(({_recomputed('cost_per_lead', 'a.ads_leads > 0', 'a.spent / NULLIF(a.ads_leads, 0)')}) / 100, 2)",
+        "ROUND(a.fees / 100, 2)", "ROUND(a.taxes / 100, 2)",
+        "a.pix_approved_orders", "ROUND(a.pix_approved_comission / 100, 2)",
+        "a.pix_pending_orders", "ROUND(a.pix_pending_comission / 100, 2)",
+        "a.card_approved_orders", "ROUND(a.card_approved_comission / 100, 2)",
+        "a.card_refused_orders", "ROUND(a.card_refused_comission / 100, 2)",
+    ]
+    return f"""
+        WITH a AS (
+            SELECT r.report_date, r.unit, COUNT(*) AS n,
+            {sums},
+            {firsts}
+            FROM {{rows}} r
+            CROSS JOIN LATERAL (SELECT r.payload AS p) x
+            GROUP BY r.report_date, r.unit
+        )
+        SELECT {", ".join(exprs)} FROM a
+    """
+
+
+def _object_select(exprs: List[str]) -> str:
+    return f"SELECT {', '.join(exprs)} FROM {{rows}} r CROSS JOIN LATERAL (SELECT r.payload AS p) x"
+
+
+# fonte -> (endpoint, SELECT com placeholder {rows})
+PROJECTIONS: Dict[str, Tuple[str, str]] = {
+    "campaigns": ("search-objects", _object_select(CAMPAIGN_EXPRS)),
+    "ads": ("search-objects", _object_select(AD_EXPRS)),
+    "dashboard": ("dashboard-info", _dashboard_select()),
+    "vturb": ("player_stats", _object_select(VTURB_EXPRS)),
+}
+
+# Identidade do objeto projetado: campanhas/anúncios podem vir em mais de um
+# dashboard (unit); dashboard é um payload por (fonte, dashboard); vturb, um por player
+IDENTITY = {
+    "campaigns": "l.object_id",
+    "ads": "l.object_id",
+    "dashboard": "l.unit, l.object_id",
+    "vturb": "l.unit",
+}
+
+
+def latest_rows_sql(source: str) -> str:
+    """
+    Linhas de raw_landing do último snapshot de cada (dia, unidade) da fonte.
+    Fila e backfill gravam um snapshot por unidade, então o último do dia cobre só uma delas.
+    Só entram unidades do conjunto atual (%(units)s) e snapshots a partir da última carga
+    completa do dia: objeto ou unidade que a API/catálogo deixou de trazer não volta.
+    Objeto repetido entre unidades fica com o payload mais recente.
+    """
+    identity = IDENTITY[source]
+    return f"""(
+        SELECT DISTINCT ON (l.report_date, {identity}) l.*
+        FROM {LANDING_TABLE} l
+        JOIN (
+            SELECT DISTINCT ON (c.report_date, c.unit) c.report_date, c.unit, c.snapshot_id
+            FROM {LANDING_TABLE} c
+            LEFT JOIN (
+                SELECT report_date, MAX(loaded_at) AS loaded_at
+                FROM {LANDING_TABLE}
+                WHERE source = %(source)s AND report_date BETWEEN %(date_from)s AND %(date_to)s AND full_run
+                GROUP BY report_date
+            ) f ON f.report_date = c.report_date
+            WHERE c.source = %(source)s AND c.report_date BETWEEN %(date_from)s AND %(date_to)s
+              AND (c.unit IS NULL OR c.unit = ANY(%(units)s))
+              AND (f.loaded_at IS NULL OR c.loaded_at >= f.loaded_at)
+            ORDER BY c.report_date, c.unit, c.loaded_at DESC
+        ) s ON s.snapshot_id = l.snapshot_id AND s.unit IS NOT DISTINCT FROM l.unit
+        ORDER BY l.report_date, {identity}, l.loaded_at DESC, l.id
+    )"""
+
+
+TARGET_SOURCES = {
+    "campaigns_history": "campaigns", "campaigns_today": "campaigns",
+    "ads_history": "ads", "ads_today": "ads",
+    "dashboard_history": "dashboard", "dashboard_today": "dashboard",
+    "vturb_history": "vturb", "vturb_today": "vturb",
+}
+
+
+# =====================================================
+# LANDING + PROJEÇÃO
+# =====================================================
+
+def enabled(backend=None) -> bool:
+    """ELT ativo? Exige backend Postgres (JSONB)"""
+    if settings.LOAD_MODE != "elt":
+        return False
+    backend = backend or get_backend()
+    if backend.name != "postgres":
+        logger.warning(f"⚠️ GRITTI_LOAD_MODE=elt requer Postgres (backend atual: {backend.name}). Usando ETL.")
+        return False
+    return True
+
+
+def ensure_landing(cursor):
+    for ddl in LANDING_DDL:
+        cursor.execute(ddl)
+
+
+def _copy_landing(cursor, snapshot_id: str, source: str, report_date: date,
+                  objects: Sequence[Tuple[Optional[str], Optional[str], Dict]], full_run: bool = False):
+    endpoint = PROJECTIONS[source][0]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for unit, object_id, payload in objects:
+        writer.writerow([
+            snapshot_id, source, endpoint, report_date.isoformat(),
+            "\\N" if unit is None else unit,
+            "\\N" if object_id is None else object_id,
+            json.dumps(payload, ensure_ascii=False),
+            "t" if full_run else "f",
+        ])
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {LANDING_TABLE} (snapshot_id, source, endpoint, report_date, unit, object_id, payload, full_run) "
+        "FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+        buffer,
+    )
+
+
+def project_sql(target: str, rows_sql: str, backend, mode: str,
+                update: Sequence[str] = (), touch: Sequence[str] = ()) -> str:
+    """INSERT ... SELECT da projeção da fonte da tabela alvo sobre o conjunto rows_sql"""
+    source = TARGET_SOURCES[target]
+    select_sql = PROJECTIONS[source][1].replace("{rows}", rows_sql)
+    cols = ", ".join(table_columns(target))
+    sql = f"INSERT INTO {target} ({cols}) {select_sql}"
+    if mode == "upsert":
+        from storage import TABLES
+        sql += backend.conflict_clause(TABLES[target]["key"], update, touch)
+    return sql
+
+
+def load_raw(source: str, target: str, report_date: date,
+             objects: Sequence[Tuple[Optional[str], Optional[str], Dict]],
+             mode: str = "upsert", update: Sequence[str] = (), touch: Sequence[str] = (),
+             full_run: bool = False, db_config: Optional[Dict] = None) -> int:
+    """
+    Grava os payloads crus em raw_landing e projeta em target na mesma transação.
+    objects: (unit, object_id, payload) — unit = dashboard/fonte/player
+    full_run: carga de todas as unidades da fonte (piso do reproject para o dia)
+    """
+    from load_events import new_snapshot_id, notify_load_complete
+
+    backend = get_backend(db_config)
+    snapshot_id = new_snapshot_id()
+    conn = backend.connect()
+    try:
+        cursor = conn.cursor()
+        ensure_landing(cursor)
+        _copy_landing(cursor, snapshot_id, source, report_date, objects, full_run)
+        if mode == "replace":
+            backend.clear(cursor, target)
+        rows_sql = f"(SELECT * FROM {LANDING_TABLE} WHERE snapshot_id = %(snapshot_id)s)"
+        cursor.execute(project_sql(target, rows_sql, backend, mode, update, touch), {"snapshot_id": snapshot_id})
+        count = cursor.rowcount
+        backend.log_load(cursor, target, {report_date: count})
+        notify_load_complete(cursor, target, count, report_date, snapshot_id=snapshot_id)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        backend.release(conn)
+
+    logger.info(f"📥 ELT {source}: {len(objects)} objetos em {LANDING_TABLE} → {count} linhas em {target}")
+
+    if settings.ANALYTICS_CACHE:
+        try:
+            from analytics_cache import refresh
+            refresh(target, [report_date])
+        except Exception as e:
+            logger.warning(f"⚠️ Cache analítico não atualizado ({target}): {e}")
+    return count
+
+
+def reproject(target: str, date_from: date, date_to: Optional[date] = None,
+              update: Optional[Sequence[str]] = None, units: Optional[Sequence[str]] = None,
+              db_config: Optional[Dict] = None) -> int:
+    """
+    Re-deriva target a partir do último snapshot de cada dia e unidade em raw_landing (só SQL).
+    Em *_history atualiza todas as colunas não-chave.
+    units: chaves de job atuais da fonte (padrão: as do catálogo, engine.get_source)
+    """
+    from storage import TABLES
+
+    backend = get_backend(db_config)
+    source = TARGET_SOURCES[target]
+    date_to = date_to or date_from
+    key = TABLES[target]["key"]
+    if update is None:
+        update = [c for c in table_columns(target) if c not in key]
+    if units is None:
+        from engine import get_source
+        units = list(get_source(source).job_units())
+
+    rows_sql = latest_rows_sql(source)
+    mode = "upsert" if key else "replace"
+    conn = backend.connect()
+    try:
+        cursor = conn.cursor()
+        if mode == "replace":
+            backend.clear(cursor, target)
+        cursor.execute(
+            project_sql(target, rows_sql, backend, mode, update),
+            {"source": source, "date_from": date_from, "date_to": date_to, "units": list(units)},
+        )
+        count = cursor.rowcount
+        days = [date_from + timedelta(days=i) for i in range((date_to - date_from).days + 1)]
+        backend.log_load(cursor, target, {day: None for day in days})
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        backend.release(conn)
+
+    logger.info(f"🔁 {target}: {count} linhas re-derivadas de {LANDING_TABLE} ({date_from} → {date_to})")
+    return count
+
+
+def purge(days: Optional[int] = None, db_config: Optional[Dict] = None) -> int:
+    """Remove payloads crus mais antigos que N dias (padrão: ELT_RETENTION_DAYS)"""
+    days = settings.ELT_RETENTION_DAYS if days is None else days
+    backend = get_backend(db_config)
+    conn = backend.connect()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"DELETE FROM {LANDING_TABLE} WHERE loaded_at < NOW() - (%s || ' days')::interval",
+            (str(days),),
+        )
+        count = cursor.rowcount
+        conn.commit()
+    finally:
+        backend.release(conn)
+    logger.info(f"🗑️ {count} payloads removidos de {LANDING_TABLE} (> {days} dias)")
+    return count
+
+
+# =====================================================
+# MAIN
+# =====================================================
+
+def parse_date(date_str: str) -> date:
+    """Converte string para date (DD/MM/YYYY, DD-MM-YYYY, YYYY-MM-DD)"""
+    formats = ["%d/%m/%Y", "%d-%m-%Y", "%Y-%m-%d"]
+    for fmt in formats:
+        try:
+            return datetime.strptime(date_str, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Formato de data inválido: {date_str}. Use DD/MM/YYYY")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Uso: python3 elt.py [init|reproject|purge]")
+        print("")
+        print("Comandos:")
+        print("  init                                  - Cria raw_landing")
+        print("  reproject TABELA DD/MM/YYYY [DD/MM/YYYY] - Re-deriva a tabela a partir dos payloads crus")
+        print("  purge [dias]                          - Remove payloads antigos (padrão ELT_RETENTION_DAYS)")
+        sys.exit(1)
+
+    comando = sys.argv[1].lower()
+
+    try:
+        if comando == "init":
+            backend = get_backend()
+            conn = backend.connect()
+            ensure_landing(conn.cursor())
+            conn.commit()
+            backend.release(conn)
+            print(f"✅ {LANDING_TABLE} pronta")
+        elif comando == "reproject" and len(sys.argv) >= 4:
+            target = sys.argv[2]
+            if target not in TARGET_SOURCES:
+                raise ValueError(f"Tabela inválida: {target}. Use: {', '.join(TARGET_SOURCES)}")
+            date_from = parse_date(sys.argv[3])
+            date_to = parse_date(sys.argv[4]) if len(sys.argv) > 4 else date_from
+            reproject(target, date_from, date_to)
+        elif comando == "purge":
+            purge(int(sys.argv[2]) if len(sys.argv) > 2 else None)
+        else:
+            print(f"❌ Comando inválido: {' '.join(sys.argv[1:])}")
+            sys.exit(1)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
@@ -0,0 +1,651 @@
+#!/usr/bin/env python3
+"""
+Engine - Motor único de extração
+Cuida de sessão HTTP (pool + retry), janela de datas, pipeline fetch -> transform -> load,
+carga ETL/ELT e resultado estruturado. Cada fonte (campaigns, ads, dashboard, vturb) é só
+um plugin Source declarado no próprio *_extract.py: unidades, busca, transformação e tabelas.
+Virada do dia: "finalizar" promove o último snapshot de *_today para o histórico (provisório);
+"ontem" pula dias já finais e, nos provisórios, só rebusca as unidades que ainda podem mudar.
+Uso: python3 engine.py FONTE[,FONTE] hoje | ontem | finalizar | DD/MM/YYYY | DD/MM/YYYY DD/MM/YYYY
+"""
+
+import sys
+import threading
+import importlib
+from datetime import datetime, timedelta, date
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from storage import get_backend, api_limit, table_columns, value_columns, TABLES, PROVISIONAL, FINAL
+import catalog
+import elt
+import leader
+import result_channel
+from settings import settings
+from pipeline import Pipeline, Stage
+
+logger = logging.getLogger(__name__)
+
+
+# =====================================================
+# CONFIGURAÇÕES
+# =====================================================
+
+# Fonte -> módulo que declara o plugin (SOURCE); importado só quando usado
+SOURCES: Dict[str, str] = {
+    "campaigns": "utmify_extract",
+    "ads": "utmify_ads_extract",
+    "dashboard": "dashboard_extract",
+    "vturb": "vturb_extract",
+}
+
+UTMIFY_API = "https://server.utmify.com.br"
+
+
+# =====================================================
+# PLUGIN
+# =====================================================
+
+class Batch(NamedTuple):
+    """Saída da transformação de uma unidade"""
+    objects: List[Any]          # o que entra no resumo (campanhas, PlayerStats, ...)
+    values: List[tuple]         # linhas prontas para o stream (modo ETL)
+    raw: List[tuple]            # (unit, object_id, payload) para raw_landing (modo ELT)
+
+
+@dataclass
+class Source:
+    """
+    Declaração de uma fonte. O motor chama, para cada unidade de units():
+        fetch(target_date, unit) -> payload ou None (None = falha da unidade; vazio não é falha)
+        transform(state, target_date, unit, payload) -> Batch ou None
+    state é um dict por execução (dedup entre dashboards, consolidação por fonte, ...).
+    """
+    name: str
+    label: str
+    token: str                                   # campo de settings (UTMIFY_TOKEN / VTURB_TOKEN)
+    login: str                                   # alvo do auto_extract.py para renovar o token
+    tables: Sequence[str]                        # (today, history)
+    units: Callable[[], List[Any]]
+    fetch: Callable[[date, Any], Any]
+    transform: Callable[[Dict[str, Any], date, Any, Any], Optional[Batch]]
+    summarize: Callable[[List[Any]], Dict[str, Any]]
+    print_summary: Callable[[List[Any]], None]
+    update: Sequence[str] = ()                   # colunas do UPSERT no histórico
+    touch: Sequence[str] = ()                    # colunas = NOW() no UPSERT
+    unit_key: Callable[[Any], str] = str         # chave do status por unidade
+    job_key: Optional[Callable[[Any], str]] = None   # unidades de um job da fila (padrão: unit_key)
+    status_key: str = "units"                    # nome do status no resultado (players, dashboards)
+    describe: Callable[[], List[str]] = lambda: []
+    empty_ok: bool = True                        # sem dados = sucesso (campanhas) ou erro (vturb)
+    empty_message: str = "Nenhum dado encontrado"
+    # Linhas provisórias do dia (dicts) -> unidades ainda mudando (padrão: todas)
+    settling: Optional[Callable[[List[Dict[str, Any]]], List[Any]]] = None
+    coverage: Optional[str] = None               # coluna do histórico com a chave do job (None = dia inteiro)
+    # Linhas atuais de *_today (dicts) -> unidades buscadas no ciclo de hoje (padrão: todas; exige coverage)
+    today_units: Optional[Callable[[List[Dict[str, Any]]], List[Any]]] = None
+
+    def table(self, to_history: bool) -> str:
+        return self.tables[1] if to_history else self.tables[0]
+
+    def job_units(self) -> Dict[str, List[Any]]:
+        """Chave do job (work_queue.py) -> unidades que ele busca"""
+        key = self.job_key or self.unit_key
+        jobs: Dict[str, List[Any]] = {}
+        for unit in self.units():
+            jobs.setdefault(key(unit), []).append(unit)
+        return jobs
+
+
+def get_source(name: str) -> Source:
+    if name not in SOURCES:
+        raise ValueError(f"Fonte inválida: {name} (use {', '.join(SOURCES)})")
+    # Dashboards/fontes/players editados no catálogo valem sem reiniciar (relido a cada CATALOG_POLL_SECONDS)
+    catalog.apply()
+    return importlib.import_module(SOURCES[name]).SOURCE
+
+
+# =====================================================
+# HTTP
+# =====================================================
+
+def build_session() -> requests.Session:
+    session = requests.Session()
+
+    retry = Retry(
+        total=settings.UTMIFY_RETRIES,
+        connect=settings.UTMIFY_RETRIES,
+        read=settings.UTMIFY_RETRIES,
+        status=settings.UTMIFY_RETRIES,
+        backoff_factor=settings.UTMIFY_BACKOFF,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["POST"]),
+        raise_on_status=False,
+        respect_retry_after_header=True,
+    )
+
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=10, pool_maxsize=10)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Uma sessão por processo, criada no primeiro uso; o orchestrator injeta a compartilhada
+SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    global SESSION
+    with _SESSION_LOCK:
+        if SESSION is None:
+            SESSION = build_session()
+        return SESSION
+
+
+def post_json(url: str, payload: Dict[str, Any], headers: Dict[str, str], timeout: float,
+              what: str) -> Optional[Any]:
+    """POST com retry; devolve o JSON ou None (erro HTTP/rede logado, nunca lança)"""
+    return request_json("POST", url, headers, timeout, what, payload)
+
+
+def get_json(url: str, headers: Dict[str, str], timeout: float, what: str) -> Optional[Any]:
+    """GET com retry; mesmo tratamento de erro do post_json"""
+    return request_json("GET", url, headers, timeout, what)
+
+
+def request_json(method: str, url: str, headers: Dict[str, str], timeout: float, what: str,
+                 payload: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+    try:
+        response = get_session().request(method, url, headers=headers, json=payload, timeout=timeout)
+
+        if response.status_code == 401:
+            logger.error(f"🔐 {what}: token inválido ou expirado!")
+            return None
+        if not (200 <= response.status_code < 300):
+            snippet = ""
+            try:
+                snippet = str(response.text)[:300]
+            except Exception:
+                pass
+            logger.warning(f"⚠️ {what}: HTTP {response.status_code} | {snippet}")
+            return None
+        return response.json()
+
+    except requests.exceptions.ReadTimeout:
+        logger.error(f"⏳ Timeout em {what} (>{timeout}s). Pulando para o próximo...")
+    except requests.exceptions.RequestException as e:
+        logger.error(f"🌐 Erro de rede em {what}: {e}. Pulando para o próximo...")
+    except Exception as e:
+        logger.error(f"❌ Erro inesperado em {what}: {e}. Pulando para o próximo...")
+    return None
+
+
+def utmify_headers() -> Dict[str, str]:
+    return {
+        "accept": "application/json",
+        "authorization": f"Bearer {settings.UTMIFY_TOKEN}",
+        "content-type": "application/json; charset=UTF-8",
+        "origin": "https://app.utmify.com.br",
+        "referer": "https://app.utmify.com.br/",
+    }
+
+
+def utmify_range(target_date: date) -> Dict[str, str]:
+    """Dia inteiro em UTC-3 (a Utmify recebe o intervalo em UTC)"""
+    return {
+        "from": target_date.strftime("%Y-%m-%dT03:00:00.000Z"),
+        "to": (target_date + timedelta(days=1)).strftime("%Y-%m-%dT02:59:59.999Z"),
+    }
+
+
+def utmify_describe() -> List[str]:
+    """Linhas do cabeçalho das fontes da Utmify"""
+    return [
+        f"🧩 Dashboards: {len(settings.UTMIFY_DASHBOARD_IDS)}",
+        f"⏱️ Timeout: {settings.UTMIFY_TIMEOUT}s | Retries: {settings.UTMIFY_RETRIES} | "
+        f"Backoff: {settings.UTMIFY_BACKOFF}",
+    ]
+
+
+def active(row: Dict[str, Any], columns: Sequence[str]) -> bool:
+    """Alguma das colunas com valor > 0 (linha com atividade no dia)"""
+    return any(float(row.get(c) or 0) > 0 for c in columns)
+
+
+def utmify_settling(rows: List[Dict[str, Any]]) -> List[str]:
+    """
+    Campanhas/anúncios não dizem de qual dashboard vieram: com qualquer atividade ou pedido
+    pendente no dia, todos os dashboards são verificados; dia parado já é final.
+    """
+    if any(active(r, ("spend", "revenue", "total_orders", "pending_orders")) for r in rows):
+        return list(settings.UTMIFY_DASHBOARD_IDS)
+    return []
+
+
+def utmify_post(path: str, payload: Dict[str, Any], what: str,
+                timeout: Optional[float] = None) -> Optional[Any]:
+    return post_json(f"{UTMIFY_API}{path}", payload, utmify_headers(),
+                     timeout or settings.UTMIFY_TIMEOUT, what)
+
+
+# =====================================================
+# EXECUÇÃO
+# =====================================================
+
+def history_update(source: Source, overwrite: bool = False) -> List[str]:
+    """Colunas regravadas no UPSERT do histórico: source.update, ou todas (busca do dia inteiro que fecha o dia)"""
+    return value_columns(source.table(True)) if overwrite else list(source.update)
+
+
+def open_stream(source: Source, to_history: bool, overwrite: bool = False):
+    """Carga em partes: histórico (UPSERT) ou today (limpa e insere na mesma transação)"""
+
+    backend = get_backend(settings.DB_CONFIG)
+    if to_history:
+        return backend.stream(source.table(True), update=history_update(source, overwrite), touch=source.touch)
+    return backend.stream(source.table(False), mode="replace")
+
+
+def save_raw(source: Source, raw: List[tuple], target_date: date, to_history: bool,
+             overwrite: bool = False, full_run: bool = False) -> int:
+    """Modo ELT: grava os payloads e projeta em SQL (full_run = todas as unidades da fonte)"""
+
+    if to_history:
+        return elt.load_raw(source.name, source.table(True), target_date, raw,
+                            update=history_update(source, overwrite), touch=source.touch,
+                            full_run=full_run, db_config=settings.DB_CONFIG)
+    return elt.load_raw(source.name, source.table(False), target_date, raw,
+                        mode="replace", full_run=full_run, db_config=settings.DB_CONFIG)
+
+
+def stages(source: Source, target_date: date, status: Dict[str, Dict[str, int]]) -> List[Stage]:
+    """fetch (PIPELINE_FETCH_WORKERS em paralelo, conta ok/falha por unidade em status) -> transform"""
+    state: Dict[str, Any] = {}
+    status_lock = threading.Lock()
+
+    def fetch(unit):
+        payload = source.fetch(target_date, unit)
+        with status_lock:
+            counts = status.setdefault(source.unit_key(unit), {"ok": 0, "failed": 0})
+            counts["failed" if payload is None else "ok"] += 1
+        return unit, payload
+
+    def transform(item):
+        unit, payload = item
+        return source.transform(state, target_date, unit, payload)
+
+    return [Stage("fetch", fetch, settings.PIPELINE_FETCH_WORKERS), Stage("transform", transform)]
+
+
+class ApiBudgetExceeded(RuntimeError):
+    """A carga passaria do limite diário de requisições da API (API_DAILY_LIMIT_<API>)"""
+
+
+def check_api_budget(source: Source, planned: int):
+    """Antes de qualquer busca: requisições já feitas hoje na API (todas as cargas) + as desta"""
+    cap = api_limit(source.login)
+    if not cap:
+        return
+    used = get_backend(settings.DB_CONFIG).api_calls(source.login, date.today())
+    if used + planned > cap:
+        raise ApiBudgetExceeded(f"limite diário da API {source.login} atingido ({used}/{cap} requisições; "
+                                f"esta carga faria {planned})")
+
+
+def record_api_calls(source: Source, status: Dict[str, Dict[str, int]]) -> int:
+    """Soma no contador diário da API as requisições feitas (uma por unidade, ok ou falha)"""
+    calls = sum(c["ok"] + c["failed"] for c in status.values())
+    if calls:
+        try:
+            get_backend(settings.DB_CONFIG).add_api_calls(source.login, date.today(), calls)
+        except Exception as e:
+            logger.warning(f"⚠️ {source.label}: requisições não contadas no limite diário ({e})")
+    return calls
+
+
+def fetch_rows(source: Source, target_date: date,
+               units: Optional[Sequence[Any]] = None) -> Tuple[List[tuple], Dict[str, Dict[str, int]]]:
+    """Busca e transforma um dia sem gravar: (linhas na ordem de table_columns, status por unidade)"""
+    units = list(source.units() if units is None else units)
+    check_api_budget(source, len(units))
+    status: Dict[str, Dict[str, int]] = {}
+    rows: List[tuple] = []
+    pipe = Pipeline(source.name, stages(source, target_date, status))
+    try:
+        for batch in pipe.run(units):
+            rows.extend(batch.values)
+    finally:
+        record_api_calls(source, status)
+    return rows, status
+
+
+def extract_date(source: Source, target_date: date, to_history: bool = True,
+                 title: Optional[str] = None, units: Optional[Sequence[Any]] = None,
+                 carry: Sequence[tuple] = (), overwrite: bool = False) -> Dict[str, Any]:
+    """
+    Extrai uma data de uma fonte e retorna o resultado estruturado (ok, rows, summary, error).
+    units: só estas unidades (um job da fila); padrão = source.units()
+    carry: linhas regravadas como estão antes das buscadas (unidades puladas no ciclo de hoje)
+    overwrite: o UPSERT no histórico regrava todas as colunas, não só source.update
+    """
+
+    table = source.table(to_history)
+    token = getattr(settings, source.token)
+    result = {"source": source.name, "date": target_date.isoformat(), "ok": False, "rows": 0,
+              "summary": {}, "error": None}
+
+    print("=" * 50)
+    print(f"📊 {source.label} EXTRACTOR - {title or target_date.strftime('%d/%m/%Y')}")
+    print(f"📅 Data: {target_date.strftime('%d/%m/%Y')}")
+    print(f"💾 Destino: {table}")
+    print(f"🔑 Token: {'✅ Definido' if token else '❌ Não definido'}")
+    for line in source.describe():
+        print(line)
+    print("=" * 50)
+
+    if not token:
+        print(f"\n❌ Execute: python3 auto_extract.py {source.login}")
+        result["error"] = f"{source.token} não definido"
+        return result
+
+    planned = list(source.units() if units is None else units)
+    try:
+        check_api_budget(source, len(planned))
+    except ApiBudgetExceeded as e:
+        print(f"\n🛑 {e}")
+        result["error"] = str(e)
+        return result
+
+    objects = []
+    raw = []
+    status: Dict[str, Dict[str, int]] = {}
+    use_elt = elt.enabled(get_backend(settings.DB_CONFIG))
+    result[source.status_key] = status
+
+    try:
+        # A unidade 1 é gravada enquanto a 2 ainda baixa
+        pipe = Pipeline(source.name, stages(source, target_date, status))
+        with open_stream(source, to_history, overwrite) as stream:
+            if carry:
+                stream.write(carry)
+            for batch in pipe.run(planned):
+                objects.extend(batch.objects)
+                if use_elt:
+                    raw.extend(batch.raw)
+                else:
+                    result["rows"] += stream.write(batch.values)
+        pipe.log_stats()
+        result["pipeline"] = pipe.stats()
+
+        if not objects:
+            print(f"\n⚠️ {source.empty_message}")
+            result["ok"] = source.empty_ok
+            if not source.empty_ok:
+                result["error"] = source.empty_message
+            return result
+
+        if use_elt:
+            result["rows"] = save_raw(source, raw, target_date, to_history, overwrite, full_run=units is None)
+        logger.info(f"✅ {result['rows']} registros salvos em {table}")
+        result["summary"] = source.summarize(objects)
+        result["ok"] = True
+        source.print_summary(objects)
+
+    except requests.exceptions.HTTPError as e:
+        if e.response is not None and e.response.status_code == 401:
+            print("\n❌ ERRO: Token expirado ou inválido!")
+            print(f"   Execute: python3 auto_extract.py {source.login}")
+        else:
+            print(f"\n❌ Erro HTTP: {e}")
+        result["error"] = str(e)
+    except Exception as e:
+        print(f"\n❌ Erro: {e}")
+        raise
+    finally:
+        # Uma requisição à API por unidade: contador diário compartilhado (api_usage)
+        result["api_calls"] = record_api_calls(source, status)
+
+    return result
+
+
+def extract_today(source: Source) -> Dict[str, Any]:
+    """
+    HOJE → tabela today. Com source.today_units só parte das unidades é buscada; as linhas
+    das demais são mantidas como estavam (em modo ELT busca sempre todas).
+    """
+    target_date = date.today()
+    if not (source.today_units and source.coverage) or elt.enabled(get_backend(settings.DB_CONFIG)):
+        return extract_date(source, target_date, to_history=False, title="HOJE")
+
+    table = source.table(False)
+    columns = table_columns(table)
+    current = read_day(table, target_date)
+    units = source.today_units(current)
+    key = source.job_key or source.unit_key
+    fetched = {key(unit) for unit in units}
+    kept = {key(unit) for unit in source.units()} - fetched
+    carry = [tuple(row[c] for c in columns) for row in current if str(row[source.coverage]) in kept]
+    logger.info(f"🎯 {source.label}: {len(units)} de {len(source.units())} unidades neste ciclo "
+                f"({len(carry)} linhas mantidas)")
+    if not units:
+        return {"source": source.name, "date": target_date.isoformat(), "ok": True, "rows": 0,
+                "summary": {}, "error": None, "api_calls": 0}
+    return extract_date(source, target_date, to_history=False, title="HOJE", units=units, carry=carry)
+
+
+def extract_yesterday(source: Source) -> Dict[str, Any]:
+    """
+    ONTEM → histórico. Dia final é pulado; dia provisório (virada) só rebusca source.settling;
+    sem virada, busca tudo. Sem falha de unidade, o dia passa a final.
+    A busca do dia inteiro regrava todas as colunas: as que não estão em source.update
+    (pendentes, reembolsos, únicos...) ficariam com o valor parcial do snapshot da virada.
+    """
+    target_date = date.today() - timedelta(days=1)
+    backend = get_backend(settings.DB_CONFIG)
+    status = backend.day_status(source.name, target_date)
+    if status == FINAL:
+        logger.info(f"⏭️ {source.label}: {target_date.strftime('%d/%m/%Y')} já finalizado")
+        return day_result(source, target_date, {"status": FINAL, "verified": 0})
+
+    units = None
+    title = "ONTEM"
+    if status == PROVISIONAL:
+        units = settling_units(source, target_date)
+        logger.info(f"🔎 {source.label}: {len(units)}/{len(source.units())} unidades ainda mudando")
+        if not units:
+            backend.mark_day(source.name, target_date, FINAL)
+            return day_result(source, target_date, {"status": FINAL, "verified": 0})
+        title = "ONTEM (verificação)"
+
+    result = extract_date(source, target_date, to_history=True, title=title, units=units, overwrite=True)
+    failed = [key for key, c in result.get(source.status_key, {}).items() if c.get("failed")]
+    if result["ok"] and not failed:
+        backend.mark_day(source.name, target_date, FINAL)
+    return result
+
+
+def extract_range(source: Source, start: date, end: date) -> List[Dict[str, Any]]:
+    """Cada dia de start a end (inclusive) → histórico; antes de cada dia cede a vez a ciclos today/yesterday"""
+    results = []
+    day = start
+    while day <= end:
+        leader.yield_to_higher("backfill", f"Backfill {source.name} {day.strftime('%d/%m/%Y')}")
+        results.append(extract_date(source, day, to_history=True))
+        day += timedelta(days=1)
+    return results
+
+
+def extract_job(source: Source, key: str, target_date: date, title: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Unidades de uma chave de job (source.job_units) em target_date → histórico.
+    Usado pela fila (work_queue.py) e pelo backfill paralelo (backfill.py): só é ok se todas responderam.
+    """
+    units = source.job_units().get(key)
+    if not units:
+        return {"source": source.name, "date": target_date.isoformat(), "ok": False, "rows": 0, "summary": {},
+                "error": f"unidade {key} não está mais configurada em {source.name}"}
+    result = extract_date(source, target_date, to_history=True, title=title or key, units=units)
+    failed = [unit for unit, c in result.get(source.status_key, {}).items() if c.get("failed")]
+    if result["ok"] and failed:
+        result["ok"] = False
+        result["error"] = f"falha ao buscar {', '.join(failed)}"
+    return result
+
+
+# =====================================================
+# VIRADA DO DIA
+# =====================================================
+
+def day_result(source: Source, target_date: date, summary: Dict[str, Any], rows: int = 0) -> Dict[str, Any]:
+    return {"source": source.name, "date": target_date.isoformat(), "ok": True, "rows": rows,
+            "summary": summary, "error": None}
+
+
+def read_day(table: str, target_date: date) -> List[Dict[str, Any]]:
+    """Linhas de um dia da tabela (dicts coluna -> valor)"""
+    backend = get_backend(settings.DB_CONFIG)
+    columns = table_columns(table)
+    conn = backend.connect()
+    try:
+        backend.ensure_schema(conn)
+        cursor = backend.cursor(conn)
+        cursor.execute(
+            f"SELECT {', '.join(columns)} FROM {table} WHERE {TABLES[table]['date']} = {backend.placeholder}",
+            backend.adapt_row((target_date,)),
+        )
+        rows = cursor.fetchall()
+        conn.commit()
+    finally:
+        backend.release(conn)
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def finalize_day(source: Source, target_date: date) -> Dict[str, Any]:
+    """
+    Virada do dia: copia o último snapshot de target_date em *_today para o histórico (UPSERT)
+    e marca o dia como provisório. Não chama a API.
+    """
+    backend = get_backend(settings.DB_CONFIG)
+    today_table, history_table = source.table(False), source.table(True)
+    status = backend.day_status(source.name, target_date)
+    if status == FINAL:
+        logger.info(f"⏭️ {source.label}: {target_date.strftime('%d/%m/%Y')} já finalizado")
+        return day_result(source, target_date, {"status": FINAL, "promoted": 0})
+
+    rows = read_day(today_table, target_date)
+    if not rows:
+        # *_today já é de outro dia (ou vazio): o "ontem" fará a carga completa
+        logger.warning(f"⚠️ {source.label}: nenhum snapshot de {target_date.strftime('%d/%m/%Y')} em {today_table}")
+        return day_result(source, target_date, {"status": status, "promoted": 0})
+
+    columns = table_columns(history_table)
+    update = history_update(source, overwrite=True)
+    with backend.stream(history_table, update=update, touch=source.touch) as stream:
+        stream.write([tuple(row[c] for c in columns) for row in rows])
+    backend.mark_day(source.name, target_date, PROVISIONAL)
+    logger.info(f"🌙 {source.label}: {stream.count} linhas de {today_table} → {history_table} (provisório)")
+    return day_result(source, target_date, {"status": PROVISIONAL, "promoted": stream.count}, stream.count)
+
+
+def settling_units(source: Source, target_date: date) -> List[Any]:
+    """Unidades do dia provisório que ainda podem mudar (verificadas na API)"""
+    if source.settling is None:
+        return source.units()
+    return source.settling(read_day(source.table(True), target_date))
+
+
+def priority_of(args: Sequence[str]) -> str:
+    """Classe de prioridade de uma execução da CLI: hoje > ontem/finalizar > datas avulsas/intervalos"""
+    mode = args[0].lower() if args else ""
+    return {"hoje": "today", "ontem": "yesterday", "finalizar": "yesterday"}.get(mode, "backfill")
+
+
+# =====================================================
+# CLI
+# =====================================================
+
+def parse_date(date_str: str) -> date:
+    """Converte string DD/MM/YYYY, DD-MM-YYYY ou YYYY-MM-DD em date"""
+    for fmt in ("%d/%m/%Y", "%d-%m-%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(date_str, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Data inválida: {date_str} (use DD/MM/YYYY)")
+
+
+def run(names: Sequence[str], args: Sequence[str]) -> List[Dict[str, Any]]:
+    """hoje | ontem | DATA | INÍCIO FIM para cada fonte, na ordem dada"""
+    if not args:
+        raise ValueError("Informe: hoje, ontem, DATA ou INÍCIO FIM")
+    sources = [get_source(name) for name in names]
+    mode = args[0].lower()
+
+    results = []
+    for source in sources:
+        if mode == "hoje":
+            results.append(extract_today(source))
+        elif mode == "ontem":
+            results.append(extract_yesterday(source))
+        elif mode == "finalizar":
+            target_date = parse_date(args[1]) if len(args) > 1 else date.today() - timedelta(days=1)
+            results.append(finalize_day(source, target_date))
+        elif len(args) == 1:
+            results.append(extract_date(source, parse_date(args[0]), to_history=True))
+        else:
+            start, end = parse_date(args[0]), parse_date(args[1])
+            if end < start:
+                raise ValueError("A data final é anterior à inicial")
+            results.extend(extract_range(source, start, end))
+    return results
+
+
+def print_usage(names: Optional[Sequence[str]] = None):
+    script = f"{SOURCES[names[0]]}.py" if names and len(names) == 1 else "engine.py FONTE[,FONTE]"
+    print(f"Uso: python3 {script} [hoje|ontem|finalizar|DD/MM/YYYY|DD/MM/YYYY DD/MM/YYYY]")
+    print("")
+    print("Comandos:")
+    print("  hoje                   - Extrai o dia atual (salva em *_today)")
+    print("  ontem                  - Extrai o dia anterior (pula se final; se provisório, só o que muda)")
+    print("  finalizar [DD/MM/YYYY] - Promove *_today do dia (padrão: ontem) ao histórico como provisório")
+    print("  DD/MM/YYYY             - Extrai uma data (salva em *_history)")
+    print("  DD/MM/YYYY DD/MM/YYYY  - Extrai cada dia do intervalo (salva em *_history)")
+    if not names:
+        print("")
+        print("Fontes: " + ", ".join(SOURCES))
+
+
+def main(names: Sequence[str], args: Sequence[str]) -> int:
+    """Ponto de entrada dos extratores: roda, grava o registro do result_channel e devolve o exit code"""
+    if not args:
+        print_usage(names)
+        return 1
+    try:
+        with leader.in_flight(priority_of(args)):
+            results = run(names, args)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    job = names[0] if len(names) == 1 else f"extract {' '.join(args)}"
+    record = result_channel.emit(job, results)
+    return result_channel.exit_code(record)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    if len(sys.argv) < 3:
+        print_usage()
+        sys.exit(1)
+
+    sys.exit(main(sys.argv[1].split(","), sys.argv[2:]))
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Gaps - Detector de buracos no histórico
+Compara a cobertura esperada (dia x unidade do job: dashboard, player ou fonte de tráfego) com o que
+está em campaigns_history, ads_history, dashboard_history e vturb_history, e põe na fila de jobs
+(work_queue.py) só as unidades que faltam, em lotes de até GAPS_BATCH_SIZE por execução.
+A janela vai de GAPS_LOOKBACK_DAYS dias atrás até ontem, a partir do primeiro dia já gravado da fonte
+(carga inicial é com intervalo/fila, não com o detector).
+Uso: python3 gaps.py [scan | enqueue] [DIAS | DD/MM/YYYY DD/MM/YYYY] [--sources FONTE,FONTE] [--limit N]
+"""
+
+import sys
+from datetime import date, timedelta
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+import logging
+
+import engine
+from engine import Source
+from settings import settings
+from storage import get_backend, as_date, TABLES, DAY_STATUS_TABLE, FINAL
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =====================================================
+# CONFIGURAÇÕES
+# =====================================================
+
+# A chave primária do histórico começa pelo id (campanha, anúncio, player): sem índice na data,
+# a busca por janela varreria a tabela inteira
+DATE_INDEXES = [
+    f"CREATE INDEX IF NOT EXISTS ix_{table}_{spec['date']} ON {table} ({spec['date']})"
+    for table, spec in TABLES.items()
+    if table.endswith("_history") and spec["key"] and spec["key"][0] != spec["date"]
+]
+
+WHOLE_DAY = "*"     # fontes sem coluna de cobertura: o dia inteiro conta como uma unidade
+
+
+class Gap(NamedTuple):
+    source: str
+    unit: str           # chave do job (work_queue.py)
+    day: date
+
+
+# =====================================================
+# COBERTURA
+# =====================================================
+
+def stored(source: Source, start: date, end: date) -> Tuple[Optional[date], Dict[date, Set[str]]]:
+    """
+    Primeiro dia gravado da fonte e, na janela, dia -> chaves presentes.
+    Só SELECTs agrupados pela data (índice) e, para fontes sem coluna de cobertura,
+    os dias já verificados em day_status (dia final sem linhas = dia sem dados, não buraco).
+    """
+    table = source.table(True)
+    date_col = TABLES[table]["date"]
+    backend = get_backend(settings.DB_CONFIG)
+    ph = backend.placeholder
+    conn = backend.connect()
+    try:
+        backend.ensure_schema(conn)
+        cursor = backend.cursor(conn)
+        for ddl in DATE_INDEXES:
+            cursor.execute(ddl)
+
+        cursor.execute(f"SELECT MIN({date_col}) FROM {table}")
+        first = cursor.fetchone()[0]
+
+        columns = date_col + (f", {source.coverage}" if source.coverage else "")
+        cursor.execute(
+            f"SELECT {columns} FROM {table} WHERE {date_col} BETWEEN {ph} AND {ph} GROUP BY {columns}",
+            backend.adapt_row((start, end)),
+        )
+        present: Dict[date, Set[str]] = {}
+        for row in cursor.fetchall():
+            present.setdefault(as_date(row[0]), set()).add(str(row[1]) if source.coverage else WHOLE_DAY)
+
+        if not source.coverage:
+            backend.ensure_day_status(cursor)
+            cursor.execute(
+                f"SELECT report_date FROM {DAY_STATUS_TABLE} "
+                f"WHERE source = {ph} AND status = {ph} AND report_date BETWEEN {ph} AND {ph}",
+                backend.adapt_row((source.name, FINAL, start, end)),
+            )
+            for (day,) in cursor.fetchall():
+                present.setdefault(as_date(day), set()).add(WHOLE_DAY)
+        conn.commit()
+    finally:
+        backend.release(conn)
+    return (as_date(first) if first is not None else None), present
+
+
+def find_gaps(source: Source, start: date, end: date) -> List[Gap]:
+    """Unidades esperadas e ausentes em cada dia da janela (mais recentes primeiro)"""
+    first, present = stored(source, start, end)
+    if first is None:
+        logger.info(f"⏭️ {source.label}: histórico vazio (use um intervalo ou a fila para a carga inicial)")
+        return []
+
+    keys = list(source.job_units())
+    gaps = []
+    day = end
+    while day >= max(start, first):
+        have = present.get(day, set())
+        if source.coverage:
+            gaps += [Gap(source.name, key, day) for key in keys if key not in have]
+        elif WHOLE_DAY not in have:
+            gaps += [Gap(source.name, key, day) for key in keys]
+        day -= timedelta(days=1)
+    return gaps
+
+
+def scan(names: Sequence[str], start: date, end: date) -> Dict[str, List[Gap]]:
+    return {name: find_gaps(engine.get_source(name), start, end) for name in names}
+
+
+def enqueue_gaps(found: Dict[str, List[Gap]], start: date, end: date,
+                 limit: Optional[int] = None) -> Dict[str, int]:
+    """
+    Põe na fila (prioridade backfill) até limit jobs, dias mais recentes primeiro.
+    Jobs que já estão na fila, em qualquer status, não contam nem voltam.
+    """
+    import work_queue
+
+    limit = settings.GAPS_BATCH_SIZE if limit is None else limit
+    known = work_queue.queued(list(found), start, end)
+    pending = sorted((gap for gaps in found.values() for gap in gaps if tuple(gap) not in known),
+                     key=lambda gap: (-gap.day.toordinal(), gap.source, gap.unit))
+    batch = pending[:limit]
+    added = work_queue.enqueue_units(batch) if batch else 0
+    stats = {"added": added, "queued": sum(len(g) for g in found.values()) - len(pending),
+             "deferred": len(pending) - len(batch)}
+    logger.info(f"📥 {added} job(s) enfileirados | {stats['queued']} já na fila | "
+                f"{stats['deferred']} para a próxima execução")
+    return stats
+
+
+# =====================================================
+# MAIN
+# =====================================================
+
+def print_report(found: Dict[str, List[Gap]], start: date, end: date):
+    print("\n" + "=" * 60)
+    print(f"🕳️ BURACOS NO HISTÓRICO ({start.strftime('%d/%m/%Y')} a {end.strftime('%d/%m/%Y')})")
+    print("=" * 60)
+    for name, gaps in found.items():
+        days = sorted({gap.day for gap in gaps})
+        print(f"{'✅' if not gaps else '⚠️'} {name}: {len(gaps)} unidade(s) faltando em {len(days)} dia(s)")
+        for day in days[-10:]:
+            units = [gap.unit for gap in gaps if gap.day == day]
+            print(f"   {day.strftime('%d/%m/%Y')}: {', '.join(units[:8])}{' ...' if len(units) > 8 else ''}")
+        if len(days) > 10:
+            print(f"   ... e mais {len(days) - 10} dia(s)")
+
+
+def print_usage():
+    print("Uso: python3 gaps.py [scan|enqueue] [DIAS|DD/MM/YYYY DD/MM/YYYY] [--sources FONTE,FONTE] [--limit N]")
+    print("")
+    print("Comandos:")
+    print("  scan     - Mostra os buracos da janela (padrão)")
+    print("  enqueue  - Põe as unidades que faltam na fila de jobs (work_queue.py, só Postgres)")
+    print("")
+    print(f"Janela padrão: últimos {settings.GAPS_LOOKBACK_DAYS} dias até ontem")
+
+
+def parse_window(args: Sequence[str]) -> Tuple[date, date]:
+    end = date.today() - timedelta(days=1)
+    if not args:
+        return end - timedelta(days=settings.GAPS_LOOKBACK_DAYS - 1), end
+    if args[0].isdigit():
+        return end - timedelta(days=int(args[0]) - 1), end
+    start = engine.parse_date(args[0])
+    end = engine.parse_date(args[1]) if len(args) > 1 else start
+    if end < start:
+        raise ValueError("A data final é anterior à inicial")
+    return start, end
+
+
+if __name__ == "__main__":
+    from work_queue import pop_option
+
+    argv = sys.argv[1:]
+    if argv and argv[0] in ("-h", "--help", "ajuda"):
+        print_usage()
+        sys.exit(1)
+    try:
+        names = (pop_option(argv, "--sources") or ",".join(settings.GAPS_SOURCES)).lower().split(",")
+        limit = pop_option(argv, "--limit")
+        command = argv.pop(0) if argv and argv[0] in ("scan", "enqueue") else "scan"
+        start, end = parse_window(argv)
+        found = scan(names, start, end)
+        print_report(found, start, end)
+        if command == "enqueue":
+            enqueue_gaps(found, start, end, int(limit) if limit else None)
+    except (ValueError, RuntimeError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Gritti - CLI de extração e consultas
+Extrai qualquer fonte em qualquer modo (engine.py) e responde perguntas agregadas sobre o
+histórico a partir do cache DuckDB local.
+Uso: python3 gritti.py extract FONTE[,FONTE] hoje|ontem|DATA|INÍCIO FIM | query CONSULTA [--days N] [--limit N]
+     | query sql "SELECT ..." | cache sync|watch|status
+"""
+
+import sys
+from typing import List, Tuple
+
+
+def pop_option(args: List[str], name: str, default: int) -> Tuple[List[str], int]:
+    """Remove '--name N' de args e retorna o valor (inteiro)"""
+    if name not in args:
+        return args, default
+    idx = args.index(name)
+    if idx + 1 >= len(args):
+        raise ValueError(f"{name} requer um valor")
+    value = int(args[idx + 1])
+    return args[:idx] + args[idx + 2:], value
+
+
+def print_usage():
+    from analytics_cache import PRESETS
+
+    print("Uso: python3 gritti.py [extract|query|cache] ...")
+    print("")
+    print("Comandos:")
+    print("  extract FONTE[,FONTE] hoje|ontem        - Extrai hoje (*_today) ou ontem (*_history)")
+    print("  extract FONTE[,FONTE] DATA [FIM]        - Extrai uma data ou cada dia do intervalo (*_history)")
+    print("  query CONSULTA [--days N] [--limit N]  - Consulta pronta (padrão: 30 dias, 20 linhas)")
+    print("  query sql \"SELECT ...\"                 - SQL livre no cache")
+    print("  cache sync [full]                       - Sincroniza o cache com o banco principal")
+    print("  cache watch                             - Recopia a cada evento de carga (só Postgres)")
+    print("  cache status                            - Situação do cache")
+    print("")
+    print("Consultas:")
+    for name, preset in PRESETS.items():
+        print(f"  {name:<10} - {preset['description']}")
+
+
+def cmd_extract(args: List[str]):
+    import logging
+    import engine
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if len(args) < 2:
+        raise ValueError(f"Informe a fonte ({', '.join(engine.SOURCES)}) e hoje, ontem, DATA ou INÍCIO FIM")
+    sys.exit(engine.main(args[0].lower().split(","), args[1:]))
+
+
+def cmd_query(args: List[str]):
+    import analytics_cache
+
+    args, days = pop_option(args, "--days", 30)
+    args, limit = pop_option(args, "--limit", 20)
+    if not args:
+        raise ValueError("Informe a consulta")
+
+    if args[0].lower() == "sql":
+        if len(args) < 2:
+            raise ValueError("Informe o SQL")
+        columns, rows, elapsed = analytics_cache.query(" ".join(args[1:]))
+    else:
+        columns, rows, elapsed = analytics_cache.run_preset(args[0].lower(), days=days, limit=limit)
+    analytics_cache.print_table(columns, rows, elapsed)
+
+
+def cmd_cache(args: List[str]):
+    import analytics_cache
+
+    sub = args[0].lower() if args else "status"
+    if sub == "sync":
+        result = analytics_cache.sync(full=len(args) > 1 and args[1].lower() == "full")
+        print(f"✅ Cache sincronizado: {sum(result.values())} linhas")
+    elif sub == "watch":
+        analytics_cache.watch()
+    elif sub == "status":
+        analytics_cache.print_status()
+    else:
+        raise ValueError(f"Comando inválido: cache {sub}")
+
+
+COMMANDS = {
+    "extract": cmd_extract,
+    "query": cmd_query,
+    "cache": cmd_cache,
+}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1].lower() not in COMMANDS:
+        print_usage()
+        sys.exit(1)
+
+    try:
+        COMMANDS[sys.argv[1].lower()](sys.argv[2:])
+    except (ValueError, RuntimeError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\n⏹️ Finalizado.")
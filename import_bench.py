@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Import Bench - Tempo de cold start de cada ponto de entrada (python -X importtime)
+Cada módulo é importado em um processo novo, N vezes; vale a mediana do tempo cumulativo.
+Falha (exit 1) se algum módulo passar do orçamento, importar uma dependência pesada
+(Playwright, psycopg2, duckdb) ou escrever qualquer coisa (log/print) só por ser importado.
+Uso: python3 import_bench.py [módulo ...] [--runs N]
+"""
+
+import os
+import sys
+import statistics
+import subprocess
+from typing import Dict, Any, List, Optional
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# =====================================================
+# CONFIGURAÇÕES
+# =====================================================
+
+# Ponto de entrada -> orçamento de import (ms, cumulativo)
+# Os extratores pagam requests/urllib3 (~80 ms); o resto deve ficar em milissegundos.
+BUDGETS_MS: Dict[str, int] = {
+    "settings": 15,
+    "result_channel": 20,
+    "pipeline": 40,
+    "schema": 40,
+    "storage": 40,
+    "orchestrator": 50,
+    "elt": 50,
+    "load_events": 50,
+    "leader": 30,
+    "catalog": 30,
+    "work_queue": 30,
+    "tenants": 40,
+    "scheduler": 150,
+    "engine": 250,
+    "revalidate": 250,
+    "gaps": 250,
+    "backfill": 250,
+    "auto_extract": 80,
+    "analytics_cache": 50,
+    "parquet_export": 250,
+    "utmify_extract": 250,
+    "utmify_ads_extract": 250,
+    "dashboard_extract": 250,
+    "vturb_extract": 250,
+}
+
+# Multiplica todos os orçamentos (máquinas mais lentas/CI)
+BUDGET_SCALE = float(os.getenv("IMPORT_BENCH_SCALE", "1.0"))
+
+# Só podem ser importados no primeiro uso, nunca no import do ponto de entrada
+HEAVY_MODULES = ["playwright", "psycopg2", "duckdb", "pyarrow"]
+
+# Exceções: o módulo existe para usar a dependência (import opcional no topo)
+ALLOWED_HEAVY: Dict[str, List[str]] = {"parquet_export": ["pyarrow"]}
+
+DEFAULT_RUNS = 5
+
+
+# =====================================================
+# MEDIÇÃO
+# =====================================================
+
+def parse_importtime(stderr: str, module: str) -> Dict[str, Any]:
+    """Extrai do stderr de -X importtime o cumulativo do módulo, os pacotes importados e o resto"""
+    cumulative_us = None
+    imported = set()
+    other = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            if line.strip():
+                other.append(line)
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # cabeçalho
+        name = parts[2].strip()
+        imported.add(name.split(".")[0])
+        if name == module:
+            cumulative_us = int(parts[1])
+    return {"cumulative_us": cumulative_us, "imported": imported, "other": other}
+
+
+def measure(module: str, runs: int = DEFAULT_RUNS) -> Dict[str, Any]:
+    """Importa o módulo em processos novos e devolve mediana (ms), pesados e saída indevida"""
+    samples: List[float] = []
+    heavy = set()
+    output: List[str] = []
+    error: Optional[str] = None
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=SCRIPT_DIR, env=env, capture_output=True, text=True,
+        )
+        parsed = parse_importtime(proc.stderr, module)
+        if proc.returncode != 0 or parsed["cumulative_us"] is None:
+            error = (parsed["other"] or [f"exit {proc.returncode}"])[-1]
+            break
+        samples.append(parsed["cumulative_us"] / 1000)
+        allowed = ALLOWED_HEAVY.get(module, [])
+        heavy |= {m for m in HEAVY_MODULES if m in parsed["imported"] and m not in allowed}
+        output = parsed["other"] + proc.stdout.splitlines()
+
+    budget = BUDGETS_MS.get(module)
+    median = round(statistics.median(samples), 1) if samples else None
+    return {
+        "module": module,
+        "median_ms": median,
+        "min_ms": round(min(samples), 1) if samples else None,
+        "budget_ms": round(budget * BUDGET_SCALE, 1) if budget else None,
+        "heavy": sorted(heavy),
+        "output": output,
+        "error": error,
+    }
+
+
+def check(result: Dict[str, Any]) -> List[str]:
+    """Problemas encontrados (lista vazia = ok)"""
+    if result["error"]:
+        return [f"falhou ao importar: {result['error']}"]
+    problems = []
+    if result["budget_ms"] and result["median_ms"] > result["budget_ms"]:
+        problems.append(f"{result['median_ms']} ms > orçamento {result['budget_ms']} ms")
+    if result["heavy"]:
+        problems.append(f"importa no carregamento: {', '.join(result['heavy'])}")
+    if result["output"]:
+        problems.append(f"escreve ao ser importado: {result['output'][0][:80]}")
+    return problems
+
+
+# =====================================================
+# MAIN
+# =====================================================
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    runs = DEFAULT_RUNS
+    if "--runs" in args:
+        idx = args.index("--runs")
+        runs = int(args[idx + 1])
+        del args[idx:idx + 2]
+
+    modules = args or list(BUDGETS_MS)
+    invalid = [m for m in modules if not os.path.exists(os.path.join(SCRIPT_DIR, f"{m}.py"))]
+    if invalid:
+        print(f"❌ Módulo inválido: {', '.join(invalid)}")
+        sys.exit(1)
+
+    print("=" * 60)
+    print(f"⏱️ IMPORT BENCH - mediana de {runs} imports a frio")
+    print("=" * 60)
+
+    failed = 0
+    for module in modules:
+        result = measure(module, runs)
+        problems = check(result)
+        failed += bool(problems)
+        status = "❌" if problems else "✅"
+        median = f"{result['median_ms']:.1f} ms" if result["median_ms"] is not None else "-"
+        budget = f"{result['budget_ms']:.0f} ms" if result["budget_ms"] else "-"
+        print(f"{status} {module:<20} {median:>10}  (orçamento {budget})")
+        for problem in problems:
+            print(f"   ⚠️ {problem}")
+
+    print("=" * 60)
+    if failed:
+        print(f"❌ {failed} ponto(s) de entrada fora do orçamento")
+        sys.exit(1)
+    print("✅ Todos os pontos de entrada dentro do orçamento")
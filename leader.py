@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Leader - Eleição de líder e exclusão de execuções (Postgres advisory locks)
+Várias réplicas do scheduler podem rodar ao mesmo tempo: só a que detém o lock "scheduler" agenda
+ciclos; as outras ficam em espera e assumem em segundos se a líder morrer (o Postgres solta o lock
+quando a conexão cai). Cada ciclo e cada execução manual do auto_extract.py seguram o lock "run",
+então nunca rodam juntos. Prioridades: ciclos "today" e "yesterday" seguram um lock compartilhado
+da sua classe enquanto rodam; o backfill (fila, intervalos) pausa enquanto houver classe mais alta em andamento.
+Os locks de prioridade valem mesmo com LEADER_ELECTION=false (só PRIORITY_PREEMPTION=false os desliga).
+Sem Postgres (sqlite/duckdb) o lock é um flock em arquivo local.
+Uso: python3 leader.py status
+"""
+
+import os
+import time
+import zlib
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+import logging
+
+from settings import settings, SCRIPT_DIR
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Marcado pelo scheduler nos filhos: o lock "run" já é do ciclo pai
+HELD_ENV = "GRITTI_RUN_LOCK_HELD"
+
+LEADER_LOCK = "scheduler"
+RUN_LOCK = "run"
+
+# Classe -> prioridade (menor = mais urgente): today > yesterday (finalização) > backfill histórico
+PRIORITIES = {"today": 0, "yesterday": 1, "backfill": 2}
+
+# Conexão do lock: o servidor derruba a sessão (e solta o lock) ~15s depois de perder o líder
+KEEPALIVES = {"keepalives": 1, "keepalives_idle": 5, "keepalives_interval": 2, "keepalives_count": 3}
+
+
+def lock_key(name: str) -> int:
+    """Chave bigint estável de um lock (namespace + nome)"""
+    return zlib.crc32(f"{settings.LEADER_NAMESPACE}:{name}".encode())
+
+
+# =====================================================
+# LOCKS
+# =====================================================
+
+class AdvisoryLock:
+    """
+    pg_try_advisory_lock em uma conexão própria (fora do pool), mantido até release() ou queda.
+    shared=True: vários donos ao mesmo tempo; só impede o lock exclusivo.
+    """
+
+    def __init__(self, name: str, db_config: Optional[Dict] = None, shared: bool = False):
+        self.name = name
+        self.key = lock_key(name)
+        self.db_config = db_config or settings.DB_CONFIG
+        self.suffix = "_shared" if shared else ""
+        self.conn = None
+
+    @property
+    def held(self) -> bool:
+        return self.conn is not None
+
+    def try_acquire(self) -> bool:
+        if self.conn is not None:
+            return True
+        import psycopg2
+
+        try:
+            conn = psycopg2.connect(**self.db_config, **KEEPALIVES, connect_timeout=10)
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"SELECT pg_try_advisory_lock{self.suffix}(%s)", (self.key,))
+                acquired = cursor.fetchone()[0]
+        except Exception as e:
+            logger.warning(f"⚠️ Lock {self.name}: banco indisponível ({e})")
+            return False
+        if acquired:
+            self.conn = conn
+        else:
+            conn.close()
+        return bool(acquired)
+
+    def alive(self) -> bool:
+        """O lock de sessão vale enquanto a conexão responder"""
+        if self.conn is None:
+            return False
+        try:
+            with self.conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Lock {self.name}: conexão perdida ({e})")
+            self._drop()
+            return False
+
+    def release(self):
+        if self.conn is None:
+            return
+        try:
+            with self.conn.cursor() as cursor:
+                cursor.execute(f"SELECT pg_advisory_unlock{self.suffix}(%s)", (self.key,))
+        except Exception:
+            pass
+        self._drop()
+
+    def _drop(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+        self.conn = None
+
+
+class FileLock:
+    """flock em um arquivo local (mesmo host; solto pelo kernel se o processo morrer)"""
+
+    def __init__(self, name: str, shared: bool = False):
+        self.name = name
+        self.path = os.path.join(settings.LEADER_LOCK_DIR, f".gritti-{settings.LEADER_NAMESPACE}-{name}.lock")
+        self.shared = shared
+        self.fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self.fd is not None
+
+    def try_acquire(self) -> bool:
+        if self.fd is not None:
+            return True
+        import fcntl
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, (fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX) | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        if not self.shared:
+            os.ftruncate(fd, 0)
+            os.write(fd, str(os.getpid()).encode())
+        self.fd = fd
+        return True
+
+    def alive(self) -> bool:
+        return self.fd is not None
+
+    def release(self):
+        if self.fd is None:
+            return
+        import fcntl
+
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+        self.fd = None
+
+
+class NullLock:
+    """LEADER_ELECTION=false: toda réplica é líder (comportamento antigo)"""
+
+    def __init__(self, name: str, shared: bool = False):
+        self.name = name
+        self.held = False
+
+    def try_acquire(self) -> bool:
+        self.held = True
+        return True
+
+    def alive(self) -> bool:
+        return self.held
+
+    def release(self):
+        self.held = False
+
+
+def signal_lock(name: str, shared: bool = False):
+    """Lock real (advisory ou flock) independente de LEADER_ELECTION: sinais de prioridade"""
+    if settings.LEADER_BACKEND == "postgres":
+        return AdvisoryLock(name, shared=shared)
+    return FileLock(name, shared=shared)
+
+
+def make_lock(name: str, shared: bool = False):
+    if not settings.LEADER_ELECTION:
+        return NullLock(name)
+    return signal_lock(name, shared)
+
+
+# Testes simultâneos do mesmo lock (threads do backfill.py) se veriam como "ocupado"
+_busy_lock = threading.Lock()
+
+
+def busy(name: str, factory=make_lock) -> bool:
+    """Alguém (exclusivo ou compartilhado) segura o lock? Testa pegando e soltando na hora"""
+    lock = factory(name)
+    with _busy_lock:
+        if lock.try_acquire():
+            lock.release()
+            return False
+    return True
+
+
+def acquire(lock, wait: float = 0, poll: Optional[float] = None) -> bool:
+    """Tenta o lock até wait segundos (0 = uma tentativa)"""
+    poll = poll or settings.LEADER_POLL_SECONDS
+    deadline = time.monotonic() + wait
+    while True:
+        if lock.try_acquire():
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(min(poll, max(0.0, deadline - time.monotonic())))
+
+
+# =====================================================
+# EXECUÇÕES
+# =====================================================
+
+@contextmanager
+def run_lock(owner: str, wait: Optional[float] = None):
+    """
+    Segura o lock "run" durante um ciclo do scheduler ou uma execução manual.
+    Rende True se pode rodar; False se outra execução não terminou dentro de wait segundos.
+    Filhos de um ciclo (HELD_ENV) rodam direto.
+    """
+    if os.getenv(HELD_ENV):
+        yield True
+        return
+
+    lock = make_lock(RUN_LOCK)
+    wait = settings.LEADER_RUN_WAIT_SECONDS if wait is None else wait
+    if not lock.try_acquire():
+        logger.info(f"⏳ {owner}: outra extração em andamento, aguardando até {wait:.0f}s...")
+        if not acquire(lock, wait):
+            logger.error(f"❌ {owner}: outra extração ainda em andamento após {wait:.0f}s")
+            yield False
+            return
+    try:
+        yield True
+    finally:
+        lock.release()
+
+
+# =====================================================
+# PRIORIDADES
+# =====================================================
+
+def priority_lock(priority: str) -> str:
+    return f"priority-{priority}"
+
+
+@contextmanager
+def in_flight(priority: str):
+    """Marca uma execução da classe (today/yesterday) em andamento: o backfill cede enquanto durar"""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Prioridade inválida: {priority} (use {', '.join(PRIORITIES)})")
+    if not settings.PRIORITY_PREEMPTION or PRIORITIES[priority] == max(PRIORITIES.values()):
+        yield
+        return
+    lock = signal_lock(priority_lock(priority), shared=True)
+    # Só falha no instante em que um backfill testa o lock (exclusivo); tenta de novo logo em seguida
+    if not acquire(lock, wait=5, poll=0.2):
+        logger.warning(f"⚠️ Prioridade {priority}: não foi possível sinalizar a execução ao backfill")
+    try:
+        yield
+    finally:
+        lock.release()
+
+
+def higher_in_flight(priority: str) -> List[str]:
+    """Classes mais urgentes que priority com execução em andamento (em qualquer host)"""
+    if not settings.PRIORITY_PREEMPTION:
+        return []
+    return [name for name, level in PRIORITIES.items()
+            if level < PRIORITIES[priority] and busy(priority_lock(name), signal_lock)]
+
+
+def priority_ceiling() -> int:
+    """Maior prioridade (número) que pode rodar agora: a da classe mais urgente em andamento"""
+    running = higher_in_flight("backfill")
+    return min(PRIORITIES[name] for name in running) if running else PRIORITIES["backfill"]
+
+
+def yield_to_higher(priority: str, owner: str) -> float:
+    """Espera enquanto houver classe mais urgente rodando; devolve os segundos pausados"""
+    started = time.monotonic()
+    running = higher_in_flight(priority)
+    if running:
+        logger.info(f"⏸️ {owner}: pausado enquanto {', '.join(running)} roda")
+        while running:
+            time.sleep(settings.LEADER_POLL_SECONDS)
+            running = higher_in_flight(priority)
+        logger.info(f"▶️ {owner}: retomado após {time.monotonic() - started:.0f}s")
+    return time.monotonic() - started
+
+
+def status() -> Dict[str, bool]:
+    """Lock -> ocupado (True) ou livre"""
+    locks = {name: busy(name) for name in (LEADER_LOCK, RUN_LOCK)}
+    locks.update({priority_lock(p): busy(priority_lock(p), signal_lock) for p in PRIORITIES if p != "backfill"})
+    return locks
+
+
+# =====================================================
+# MAIN
+# =====================================================
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2 or sys.argv[1].lower() != "status":
+        print("Uso: python3 leader.py status")
+        sys.exit(1)
+
+    if not settings.LEADER_ELECTION:
+        print("⚪ LEADER_ELECTION desativado: toda réplica do scheduler é líder")
+
+    print(f"🔐 Backend: {settings.LEADER_BACKEND} | namespace: {settings.LEADER_NAMESPACE}")
+    labels = {LEADER_LOCK: "Líder do scheduler", RUN_LOCK: "Extração em andamento",
+              priority_lock("today"): "Ciclo today em andamento",
+              priority_lock("yesterday"): "Finalização de ontem em andamento"}
+    for name, busy in status().items():
+        if not settings.LEADER_ELECTION and name in (LEADER_LOCK, RUN_LOCK):
+            continue
+        print(f"{'🔴 ocupado' if busy else '🟢 livre':<12} {labels[name]} (lock {name}, chave {lock_key(name)})")
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Load Events - Notificações de carga concluída (Postgres LISTEN/NOTIFY)
+Cada loader emite um NOTIFY com tabela, snapshot_id, linhas e intervalo de datas.
+O Postgres só entrega a notificação depois do COMMIT (rollback = nenhum evento).
+Assinantes: parquet_export.py watch e analytics_cache.py watch (só os dias de cada evento).
+Uso: python3 load_events.py listen [tabela ...]
+"""
+
+import json
+import uuid
+import select
+import threading
+from datetime import datetime, date, timedelta
+from typing import Callable, Dict, Any, Optional, Iterable, List
+import logging
+
+from settings import settings
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =====================================================
+# EMISSÃO
+# =====================================================
+
+def new_snapshot_id() -> str:
+    """Gera um identificador único para uma carga"""
+    return uuid.uuid4().hex
+
+
+def _iso(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def build_event(table: str, rows: int, date_from, date_to=None,
+                snapshot_id: Optional[str] = None) -> Dict[str, Any]:
+    """Monta o payload do evento de carga"""
+    return {
+        "table": table,
+        "snapshot_id": snapshot_id or new_snapshot_id(),
+        "rows": int(rows or 0),
+        "date_from": _iso(date_from),
+        "date_to": _iso(date_to if date_to is not None else date_from),
+        "emitted_at": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def notify_load_complete(cursor, table: str, rows: int, date_from, date_to=None,
+                         snapshot_id: Optional[str] = None) -> str:
+    """
+    Agenda o NOTIFY na transação corrente do cursor.
+    Deve ser chamado antes do commit: o evento sai junto com o COMMIT.
+    """
+    event = build_event(table, rows, date_from, date_to, snapshot_id)
+    cursor.execute("SELECT pg_notify(%s, %s)", (settings.LOAD_EVENTS_CHANNEL, json.dumps(event)))
+    return event["snapshot_id"]
+
+
+def parse_event(payload: str) -> Optional[Dict[str, Any]]:
+    """Converte o payload recebido em dict (ignora payloads inválidos)"""
+    try:
+        event = json.loads(payload)
+    except (TypeError, ValueError):
+        logger.warning(f"⚠️ Payload de evento inválido: {str(payload)[:200]}")
+        return None
+    return event if isinstance(event, dict) else None
+
+
+def event_days(event: Dict[str, Any]) -> List[date]:
+    """Dias cobertos pelo evento (date_from..date_to)"""
+    if not event.get("date_from"):
+        return []
+    first = date.fromisoformat(event["date_from"][:10])
+    last = date.fromisoformat((event.get("date_to") or event["date_from"])[:10])
+    return [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+
+# =====================================================
+# LISTENER
+# =====================================================
+
+class LoadListener:
+    """
+    Escuta eventos de carga e despacha para handlers registrados por tabela.
+
+        listener = LoadListener()
+
+        @listener.on("campaigns_today", "ads_today")
+        def refresh(event):
+            ...
+
+        listener.run()            # bloqueante
+        listener.start()          # ou em thread daemon
+    """
+
+    def __init__(self, channel: Optional[str] = None, db_config: Optional[Dict] = None):
+        self.channel = channel or settings.LOAD_EVENTS_CHANNEL
+        self.db_config = db_config or settings.DB_CONFIG
+        self._handlers: List[tuple] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def on(self, *tables: str, handler: Optional[Callable[[Dict], None]] = None):
+        """Registra handler para as tabelas informadas (nenhuma = todas). Pode ser usado como decorator."""
+        table_filter = frozenset(tables) if tables else None
+
+        def register(fn: Callable[[Dict], None]):
+            self._handlers.append((table_filter, fn))
+            return fn
+
+        if handler is not None:
+            return register(handler)
+        return register
+
+    def dispatch(self, event: Dict[str, Any]):
+        table = event.get("table")
+        for table_filter, fn in self._handlers:
+            if table_filter is not None and table not in table_filter:
+                continue
+            try:
+                fn(event)
+            except Exception as e:
+                logger.error(f"❌ Handler {getattr(fn, '__name__', fn)} falhou para {table}: {e}")
+
+    def run(self, poll_interval: float = 5.0):
+        """Loop bloqueante: acorda assim que o Postgres entrega uma notificação"""
+        import psycopg2
+        import psycopg2.extensions
+
+        conn = psycopg2.connect(**self.db_config)
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        cursor = conn.cursor()
+        cursor.execute(f'LISTEN "{self.channel}"')
+        logger.info(f"👂 Escutando canal {self.channel}")
+
+        try:
+            while not self._stop.is_set():
+                readable, _, _ = select.select([conn], [], [], poll_interval)
+                if not readable:
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    note = conn.notifies.pop(0)
+                    event = parse_event(note.payload)
+                    if event is not None:
+                        self.dispatch(event)
+        finally:
+            cursor.close()
+            conn.close()
+
+    def start(self, poll_interval: float = 1.0) -> threading.Thread:
+        """Roda o listener em uma thread daemon"""
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self.run, kwargs={"poll_interval": poll_interval},
+            name="load-listener", daemon=True,
+        )
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+
+def listen(handler: Callable[[Dict], None], tables: Optional[Iterable[str]] = None,
+           poll_interval: float = 5.0):
+    """Atalho: escuta (bloqueante) e chama handler para cada evento"""
+    listener = LoadListener()
+    listener.on(*(tables or ()), handler=handler)
+    listener.run(poll_interval=poll_interval)
+
+
+# =====================================================
+# MAIN
+# =====================================================
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2 or sys.argv[1].lower() != "listen":
+        print("Uso: python3 load_events.py listen [tabela ...]")
+        print("")
+        print("Exemplos:")
+        print("  python3 load_events.py listen")
+        print("  python3 load_events.py listen campaigns_today vturb_today")
+        sys.exit(1)
+
+    def print_event(event: Dict[str, Any]):
+        print(
+            f"📣 {event.get('table')} | snapshot={event.get('snapshot_id')} | "
+            f"linhas={event.get('rows')} | {event.get('date_from')} → {event.get('date_to')}"
+        )
+
+    try:
+        listen(print_event, tables=sys.argv[2:])
+    except KeyboardInterrupt:
+        print("\n⏹️ Listener finalizado.")
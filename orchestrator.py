@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Orchestrator - Extração no mesmo processo (sem subprocess)
+Importa os extratores como bibliotecas, injeta os tokens já validados, uma sessão HTTP
+compartilhada e o backend de armazenamento com pool, e devolve resultados estruturados.
+Uso: python3 orchestrator.py hoje | ontem   (tokens lidos do .env)
+"""
+
+import os
+import time
+import importlib
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, Optional, List, Sequence
+import logging
+
+from settings import settings
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =====================================================
+# CONFIGURAÇÕES
+# =====================================================
+
+# Etapa -> módulo extrator e token que ele usa
+STEPS: Dict[str, Dict[str, str]] = {
+    "campaigns": {"module": "utmify_extract", "token": "UTMIFY_TOKEN", "label": "UTMIFY"},
+    "dashboard": {"module": "dashboard_extract", "token": "UTMIFY_TOKEN", "label": "DASHBOARD UTMIFY"},
+    "vturb": {"module": "vturb_extract", "token": "VTURB_TOKEN", "label": "VTURB"},
+}
+
+TODAY_STEPS = ["campaigns", "dashboard", "vturb"]
+YESTERDAY_STEPS = ["campaigns", "vturb"]
+
+
+@dataclass
+class StepResult:
+    step: str
+    label: str
+    ok: bool = False
+    rows: int = 0
+    seconds: float = 0.0
+    summary: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# =====================================================
+# ORQUESTRADOR
+# =====================================================
+
+class Orchestrator:
+    """
+    Roda as etapas no processo atual.
+    Os módulos são importados uma vez; configuração, sessão HTTP e pool do banco são reaproveitados.
+    """
+
+    def __init__(self, tokens: Optional[Dict[str, str]] = None):
+        self.tokens: Dict[str, str] = {k: v for k, v in (tokens or {}).items() if v}
+        self.session = None
+        self._modules: Dict[str, Any] = {}
+
+    def set_token(self, name: str, value: str):
+        if value:
+            self.tokens[name] = value
+
+    def shared_session(self):
+        """Uma sessão (pool de conexões + retry) para Utmify e VTurb"""
+        if self.session is None:
+            import engine
+            self.session = engine.build_session()
+            engine.SESSION = self.session
+        return self.session
+
+    def module(self, step: str):
+        """Importa (uma vez) o extrator da etapa e injeta token e sessão (a do engine, usada por todas as fontes)"""
+        spec = STEPS[step]
+        mod = self._modules.get(spec["module"])
+        if mod is None:
+            mod = importlib.import_module(spec["module"])
+            self._modules[spec["module"]] = mod
+        token = self.tokens.get(spec["token"])
+        if token:
+            settings.override(**{spec["token"]: token})
+        self.shared_session()
+        return mod
+
+    def run_step(self, step: str, when: str = "hoje") -> StepResult:
+        spec = STEPS[step]
+        result = StepResult(step=step, label=spec["label"])
+        started = time.perf_counter()
+
+        try:
+            mod = self.module(step)
+            extract = mod.extract_today if when == "hoje" else mod.extract_yesterday
+            data = extract() or {}
+            result.ok = bool(data.get("ok"))
+            result.rows = data.get("rows", 0)
+            result.summary = data.get("summary", {})
+            result.error = data.get("error")
+        except Exception as e:
+            logger.error(f"❌ {spec['label']}: {e}")
+            result.error = str(e)
+
+        result.seconds = round(time.perf_counter() - started, 2)
+        status = "✅" if result.ok else "❌"
+        logger.info(f"{status} {spec['label']} ({when}): {result.rows} registros em {result.seconds:.1f}s")
+        return result
+
+    def run(self, steps: Sequence[str], when: str = "hoje") -> List[StepResult]:
+        return [self.run_step(step, when) for step in steps]
+
+    def close(self):
+        if self.session is not None:
+            import engine
+            if engine.SESSION is self.session:
+                engine.SESSION = None
+            self.session.close()
+            self.session = None
+        from storage import close_backends
+        close_backends()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# =====================================================
+# RESUMO
+# =====================================================
+
+def summary_lines(step: str, summary: Optional[Dict[str, Any]]) -> List[str]:
+    """Linhas de resumo legíveis de uma etapa (StepResult ou registro do result_channel)"""
+    s = summary or {}
+    if not s:
+        return []
+    if set(s) <= {"status", "promoted", "verified"}:
+        # Virada do dia (engine.finalize_day) ou dia já final
+        status = {"provisional": "provisório", "final": "final"}.get(s.get("status"), "sem virada")
+        return [f"Dia {status}" + (f" | Promovidas: {s['promoted']}" if s.get("promoted") else "")]
+    if step.startswith("revalidate_"):
+        # Revalidação (revalidate.py): dia -> alteradas, novas e variação das métricas
+        lines = []
+        for day, d in s.items():
+            if "checked" not in d:
+                lines.append(f"{day}: ⚠️ {d.get('error')}")
+                continue
+            moved = ", ".join(f"{c} {v:+,.2f}" for c, v in d.get("moved", {}).items()) or "sem variação"
+            lines.append(f"{day}: {d['changed']} alteradas, {d['new']} novas | {moved}")
+        return lines
+    if step in ("campaigns", "ads"):
+        if step == "ads":
+            lines = [f"Anúncios: {s.get('ads', 0)}", f"Criativos: {s.get('creatives', 0)}"]
+        else:
+            lines = [f"Campanhas: {s.get('campaigns', 0)}"]
+        lines += [
+            f"Spend: R$ {s.get('spend', 0):,.2f}",
+            f"Revenue: R$ {s.get('revenue', 0):,.2f}",
+            f"Profit: R$ {s.get('profit', 0):,.2f}",
+            f"Vendas: {s.get('orders', 0)}",
+        ]
+        if s.get("roas") is not None:
+            lines.append(f"ROAS: {s['roas']:.2f}x")
+        return lines
+    if step == "dashboard":
+        return [
+            f"📊 Fonte: {source} | Pedidos: {m['orders']} | Faturamento: R$ {m['gross']:,.2f} | "
+            f"Gasto: R$ {m['spent']:,.2f} | Lucro: R$ {m['profit']:,.2f}"
+            for source, m in s.items()
+        ]
+    if step == "vturb":
+        return [
+            f"Players: {s.get('players', 0)}",
+            f"Views: {s.get('views', 0):,}".replace(",", "."),
+            f"Plays: {s.get('plays', 0):,}".replace(",", "."),
+            f"Clicks: {s.get('clicks', 0):,}".replace(",", "."),
+            f"Conversões: {s.get('conversions', 0):,}".replace(",", "."),
+        ]
+    return [f"{k}: {v}" for k, v in s.items()]
+
+
+def print_results(results: List[StepResult]):
+    for result in results:
+        print("\n" + "=" * 60)
+        print(f"📋 RESUMO {result.label}")
+        print("=" * 60)
+        print(f"📤 Extração {result.label}: {'✅ Sim' if result.ok else '❌ Não'} "
+              f"({result.rows} registros, {result.seconds:.1f}s)")
+        lines = summary_lines(result.step, result.summary)
+        if lines:
+            print("\n".join(lines))
+        elif result.error:
+            print(f"⚠️ {result.error}")
+
+
+# =====================================================
+# MAIN
+# =====================================================
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2 or sys.argv[1].lower() not in ("hoje", "ontem"):
+        print("Uso: python3 orchestrator.py [hoje|ontem] [etapa ...]")
+        print("")
+        print("Etapas: " + ", ".join(STEPS))
+        print("Tokens: UTMIFY_TOKEN / VTURB_TOKEN do .env (para renovar: python3 auto_extract.py hoje)")
+        sys.exit(1)
+
+    when = sys.argv[1].lower()
+    steps = sys.argv[2:] or (TODAY_STEPS if when == "hoje" else YESTERDAY_STEPS)
+    invalid = [s for s in steps if s not in STEPS]
+    if invalid:
+        print(f"❌ Etapa inválida: {', '.join(invalid)}")
+        sys.exit(1)
+
+    with Orchestrator() as orchestrator:
+        results = orchestrator.run(steps, when)
+    print_results(results)
+
+    import result_channel
+    record = result_channel.emit(f"orchestrator {when}", [r.to_dict() for r in results])
+    sys.exit(result_channel.exit_code(record))
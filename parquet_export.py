@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Parquet Export - Cópia colunar e incremental do histórico
+Exporta campaigns_history, ads_history, dashboard_history e vturb_history em
+{PARQUET_EXPORT_DIR}/{tabela}/month=YYYY-MM/day=YYYY-MM-DD/part-0.parquet
+Só reexporta os dias carregados desde a última execução (via load_log).
+'watch' fica escutando os eventos de carga (load_events.py) e reexporta só os dias de cada evento.
+Uso: python3 parquet_export.py run [tabela ...] | full [tabela ...] | watch [tabela ...] | status
+"""
+
+import os
+import json
+from datetime import datetime, date
+from typing import Dict, Any, Optional, List, Sequence, Tuple
+import logging
+
+from storage import (
+    get_backend, changed_partitions, as_date, as_datetime, TABLES, DEFAULTED_COLUMNS,
+)
+from settings import settings
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =====================================================
+# CONFIGURAÇÕES
+# =====================================================
+
+# Diretório e recuo da marca d'água: settings.PARQUET_EXPORT_DIR / PARQUET_EXPORT_OVERLAP_MINUTES
+# (transações longas podem commitar com loaded_at anterior à marca)
+
+EXPORT_TABLES = ["campaigns_history", "ads_history", "dashboard_history", "vturb_history"]
+
+
+# =====================================================
+# ESTADO
+# =====================================================
+
+def state_file() -> str:
+    return os.path.join(settings.PARQUET_EXPORT_DIR, ".export_state.json")
+
+
+def load_state() -> Dict[str, Any]:
+    if not os.path.exists(state_file()):
+        return {}
+    with open(state_file(), "r") as f:
+        return json.load(f)
+
+
+def save_state(state: Dict[str, Any]):
+    os.makedirs(settings.PARQUET_EXPORT_DIR, exist_ok=True)
+    tmp = state_file() + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, state_file())
+
+
+# =====================================================
+# LEITURA
+# =====================================================
+
+def export_columns(table: str) -> List[Tuple[str, str]]:
+    """Colunas exportadas (inclui as preenchidas pelo banco, ex.: extraction_timestamp)"""
+    return list(TABLES[table]["columns"]) + DEFAULTED_COLUMNS.get(table, [])
+
+
+def _coerce(value, generic: str):
+    """Normaliza o valor vindo do driver para o tipo Arrow da coluna"""
+    if value is None:
+        return None
+    if generic == "NUM":
+        return float(value)
+    if generic == "INT":
+        return int(value)
+    if generic == "DATE":
+        return as_date(value)
+    if generic == "TIMESTAMP":
+        return as_datetime(value)
+    return str(value)
+
+
+def read_partition(backend, cursor, table: str, day: date):
+    """Linhas de um dia como pyarrow.Table"""
+    columns = export_columns(table)
+    date_col = TABLES[table]["date"]
+    cursor.execute(
+        f"SELECT {', '.join(n for n, _ in columns)} FROM {table} WHERE {date_col} = {backend.placeholder}",
+        backend.adapt_row((day,)),
+    )
+    rows = cursor.fetchall()
+
+    arrow_types = {
+        "TEXT": pa.string(), "INT": pa.int64(), "NUM": pa.float64(),
+        "DATE": pa.date32(), "TIMESTAMP": pa.timestamp("us"),
+    }
+    arrays = {}
+    for idx, (name, generic) in enumerate(columns):
+        arrays[name] = pa.array([_coerce(row[idx], generic) for row in rows], type=arrow_types[generic])
+    return pa.table(arrays)
+
+
+# =====================================================
+# ESCRITA
+# =====================================================
+
+def partition_path(table: str, day: date) -> str:
+    return os.path.join(
+        settings.PARQUET_EXPORT_DIR, table, f"month={day.strftime('%Y-%m')}", f"day={day.isoformat()}", "part-0.parquet"
+    )
+
+
+def write_partition(table: str, day: date, data) -> str:
+    """Grava (ou remove, se o dia ficou vazio) o arquivo do dia de forma atômica"""
+    path = partition_path(table, day)
+    if data.num_rows == 0:
+        if os.path.exists(path):
+            os.remove(path)
+        return path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    pq.write_table(data, tmp, compression="zstd")
+    os.replace(tmp, path)
+    return path
+
+
+def export_table(backend, conn, table: str, state: Dict[str, Any], full: bool = False) -> int:
+    """Exporta os dias alterados de uma tabela e atualiza o estado. Retorna dias exportados."""
+    entry = state.get(table, {})
+    watermark = None if full else as_datetime(entry.get("watermark"))
+
+    cursor = backend.cursor(conn)
+    days, new_watermark = changed_partitions(backend, cursor, table, watermark, settings.PARQUET_EXPORT_OVERLAP_MINUTES)
+
+    rows = 0
+    for day in days:
+        data = read_partition(backend, cursor, table, day)
+        write_partition(table, day, data)
+        rows += data.num_rows
+
+    state[table] = {
+        "watermark": new_watermark.isoformat(sep=" ") if new_watermark else None,
+        "exported_at": datetime.now().isoformat(sep=" ", timespec="seconds"),
+        "last_days": len(days),
+        "last_rows": rows,
+    }
+    logger.info(f"✅ {table}: {len(days)} dias / {rows} linhas exportados")
+    return len(days)
+
+
+def export_tables(tables: Optional[Sequence[str]]) -> List[str]:
+    if pa is None:
+        raise RuntimeError("pyarrow não instalado. Execute: pip install pyarrow")
+    tables = list(tables or EXPORT_TABLES)
+    for table in tables:
+        if table not in EXPORT_TABLES:
+            raise ValueError(f"Tabela inválida: {table}. Use: {', '.join(EXPORT_TABLES)}")
+    return tables
+
+
+def export(tables: Optional[Sequence[str]] = None, full: bool = False) -> Dict[str, int]:
+    """Exporta as tabelas de histórico (incremental por padrão)"""
+    tables = export_tables(tables)
+    backend = get_backend(settings.DB_CONFIG)
+    state = load_state()
+    result = {}
+
+    conn = backend.connect()
+    try:
+        backend.ensure_schema(conn)
+        for table in tables:
+            result[table] = export_table(backend, conn, table, state, full)
+            save_state(state)
+        conn.commit()
+    finally:
+        backend.release(conn)
+    return result
+
+
+def export_days(table: str, days: Sequence[date]) -> int:
+    """Reexporta dias específicos de uma tabela (sem mexer na marca d'água). Retorna linhas."""
+    backend = get_backend(settings.DB_CONFIG)
+    rows = 0
+    conn = backend.connect()
+    try:
+        cursor = backend.cursor(conn)
+        for day in days:
+            data = read_partition(backend, cursor, table, day)
+            write_partition(table, day, data)
+            rows += data.num_rows
+        conn.commit()
+    finally:
+        backend.release(conn)
+    logger.info(f"✅ {table}: {len(days)} dias / {rows} linhas exportados")
+    return rows
+
+
+def watch(tables: Optional[Sequence[str]] = None):
+    """
+    Export dirigido por eventos: alcança o que ficou pendente (run) e depois reexporta
+    os dias de cada carga concluída assim que o NOTIFY chega. Exige Postgres.
+    """
+    from load_events import LoadListener, event_days
+
+    tables = export_tables(tables)
+    if get_backend(settings.DB_CONFIG).name != "postgres":
+        raise RuntimeError("watch usa LISTEN/NOTIFY e exige STORAGE_BACKEND=postgres (use run)")
+    export(tables)
+
+    listener = LoadListener()
+
+    @listener.on(*tables)
+    def on_load(event: Dict[str, Any]):
+        export_days(event["table"], event_days(event))
+
+    listener.run()
+
+
+def print_status():
+    state = load_state()
+    print("=" * 50)
+    print(f"📦 PARQUET EXPORT - {settings.PARQUET_EXPORT_DIR}")
+    print("=" * 50)
+    for table in EXPORT_TABLES:
+        entry = state.get(table)
+        if not entry:
+            print(f"{table}: nunca exportada")
+            continue
+        print(f"{table}: marca {entry.get('watermark')} | último export {entry.get('exported_at')} "
+              f"({entry.get('last_days', 0)} dias, {entry.get('last_rows', 0)} linhas)")
+    print("=" * 50)
+
+
+# =====================================================
+# MAIN
+# =====================================================
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Uso: python3 parquet_export.py [run|full|status] [tabela ...]")
+        print("")
+        print("Comandos:")
+        print("  run [tabela ...]   - Exporta só os dias carregados desde a última execução")
+        print("  full [tabela ...]  - Reexporta todos os dias")
+        print("  watch [tabela ...] - Reexporta a cada evento de carga (LISTEN/NOTIFY, só Postgres)")
+        print("  status             - Mostra a marca d'água de cada tabela")
+        print("")
+        print(f"Tabelas: {', '.join(EXPORT_TABLES)}")
+        sys.exit(1)
+
+    comando = sys.argv[1].lower()
+
+    try:
+        if comando in ("run", "full"):
+            result = export(sys.argv[2:] or None, full=(comando == "full"))
+            print(f"✅ Export concluído: {sum(result.values())} dias em {settings.PARQUET_EXPORT_DIR}")
+        elif comando == "watch":
+            watch(sys.argv[2:] or None)
+        elif comando == "status":
+            print_status()
+        else:
+            print(f"❌ Comando inválido: {comando}")
+            sys.exit(1)
+    except (ValueError, RuntimeError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\n⏹️ Export finalizado.")
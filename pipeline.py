@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Pipeline - Estágios fetch -> transform -> load com filas limitadas
+Cada estágio roda em suas próprias threads; o último (load) é quem itera o pipeline.
+As filas entre estágios são limitadas: se o banco fica lento, a busca espera (backpressure).
+Ocupação das filas e tempos de espera por estágio ficam em stats() para ajuste fino.
+Uso: from pipeline import Pipeline, Stage
+"""
+
+import time
+import queue
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+import logging
+
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+# =====================================================
+# CONFIGURAÇÕES
+# =====================================================
+
+# Itens em espera entre dois estágios: settings.PIPELINE_QUEUE_SIZE
+# Threads de busca (requisições simultâneas à API por extrator): settings.PIPELINE_FETCH_WORKERS
+
+# Fim do fluxo (um por worker do estágio seguinte)
+_END = object()
+# Intervalo para checar cancelamento enquanto bloqueado em uma fila
+_POLL_SECONDS = 0.1
+
+
+@dataclass
+class Stage:
+    """fn(item) -> resultado; None descarta o item (ex.: busca sem dados)"""
+    name: str
+    fn: Callable[[Any], Any]
+    workers: int = 1
+
+    def __post_init__(self):
+        self.workers = max(1, self.workers)
+
+
+@dataclass
+class StageStats:
+    name: str
+    workers: int = 1
+    items: int = 0
+    dropped: int = 0
+    busy: float = 0.0       # tempo executando fn
+    wait_in: float = 0.0    # esperando item do estágio anterior (estágio ocioso)
+    wait_out: float = 0.0   # esperando vaga na fila seguinte (backpressure)
+    queue_max: int = 0      # maior ocupação da fila de entrada
+    queue_sum: int = 0
+    queue_samples: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, **deltas):
+        with self._lock:
+            for name, value in deltas.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def sample_queue(self, depth: int):
+        with self._lock:
+            self.queue_max = max(self.queue_max, depth)
+            self.queue_sum += depth
+            self.queue_samples += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "workers": self.workers,
+                "items": self.items,
+                "dropped": self.dropped,
+                "busy": round(self.busy, 3),
+                "wait_in": round(self.wait_in, 3),
+                "wait_out": round(self.wait_out, 3),
+                "queue_max": self.queue_max,
+                "queue_avg": round(self.queue_sum / self.queue_samples, 2) if self.queue_samples else 0.0,
+            }
+
+
+class Pipeline:
+    """
+    for result in Pipeline("vturb", [Stage("fetch", f), Stage("transform", t)]).run(items):
+        grava(result)   # estágio "load", na thread de quem chama
+    Uma exceção em qualquer estágio cancela os demais e é relançada por run().
+    """
+
+    def __init__(self, name: str, stages: List[Stage], queue_size: Optional[int] = None,
+                 sink: str = "load"):
+        self.name = name
+        self.stages = stages
+        self.queue_size = max(1, settings.PIPELINE_QUEUE_SIZE if queue_size is None else queue_size)
+        self.stats_by_stage = [StageStats(s.name, s.workers) for s in stages] + [StageStats(sink)]
+        self.seconds = 0.0
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._error_lock = threading.Lock()
+
+    # ---------- filas ----------
+
+    def _get(self, inbox: queue.Queue):
+        while not self._stop.is_set():
+            try:
+                return inbox.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _put(self, outbox: queue.Queue, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                outbox.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fail(self, error: BaseException):
+        with self._error_lock:
+            if self._error is None:
+                self._error = error
+        self._stop.set()
+
+    # ---------- workers ----------
+
+    def _work(self, idx: int, inbox: queue.Queue, outbox: queue.Queue, finished: List[int],
+              lock: threading.Lock, downstream_workers: int):
+        stage, stats = self.stages[idx], self.stats_by_stage[idx]
+        try:
+            while True:
+                stats.sample_queue(inbox.qsize())
+                started = time.perf_counter()
+                item = self._get(inbox)
+                stats.add(wait_in=time.perf_counter() - started)
+                if item is _END:
+                    break
+
+                started = time.perf_counter()
+                result = stage.fn(item)
+                stats.add(busy=time.perf_counter() - started, items=1)
+                if result is None:
+                    stats.add(dropped=1)
+                    continue
+
+                started = time.perf_counter()
+                if not self._put(outbox, result):
+                    break
+                stats.add(wait_out=time.perf_counter() - started)
+        except BaseException as e:
+            logger.error(f"❌ Pipeline {self.name}: estágio {stage.name} falhou: {e}")
+            self._fail(e)
+        finally:
+            with lock:
+                finished[idx] += 1
+                last = finished[idx] == stage.workers
+            if last:
+                for _ in range(downstream_workers):
+                    if not self._put(outbox, _END):
+                        break
+
+    def run(self, items: Iterable[Any]) -> Iterator[Any]:
+        """Gera os resultados do último estágio; o tempo gasto por quem consome conta como 'load'"""
+        items = list(items)
+        queues = [queue.Queue()] + [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        for item in items:
+            queues[0].put(item)
+        for _ in range(self.stages[0].workers if self.stages else 1):
+            queues[0].put(_END)
+
+        finished = [0] * len(self.stages)
+        lock = threading.Lock()
+        threads = []
+        for idx, stage in enumerate(self.stages):
+            downstream = self.stages[idx + 1].workers if idx + 1 < len(self.stages) else 1
+            for n in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._work,
+                    args=(idx, queues[idx], queues[idx + 1], finished, lock, downstream),
+                    name=f"{self.name}-{stage.name}-{n}",
+                    daemon=True,
+                )
+                threads.append(thread)
+
+        sink, outbox = self.stats_by_stage[-1], queues[-1]
+        started_run = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                sink.sample_queue(outbox.qsize())
+                started = time.perf_counter()
+                item = self._get(outbox)
+                sink.add(wait_in=time.perf_counter() - started)
+                if item is _END:
+                    break
+                started = time.perf_counter()
+                yield item
+                sink.add(busy=time.perf_counter() - started, items=1)
+        except BaseException as e:
+            self._fail(e)
+            raise
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            self.seconds = round(time.perf_counter() - started_run, 3)
+
+        if self._error is not None:
+            raise self._error
+
+    # ---------- métricas ----------
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "seconds": self.seconds,
+            "queue_size": self.queue_size,
+            "stages": [s.to_dict() for s in self.stats_by_stage],
+        }
+
+    def log_stats(self):
+        logger.info(f"⏱️ Pipeline {self.name}: {self.seconds:.2f}s (fila={self.queue_size})")
+        for s in self.stats_by_stage:
+            data = s.to_dict()
+            logger.info(
+                f"   {data['name']:<10} itens={data['items']:<4} ocupado={data['busy']:.2f}s "
+                f"ocioso={data['wait_in']:.2f}s bloqueado={data['wait_out']:.2f}s "
+                f"fila máx/méd={data['queue_max']}/{data['queue_avg']}"
+            )
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Result Channel - Resultado estruturado de cada execução
+Quem chama um extrator (ex.: scheduler) define GRITTI_RESULT_FILE; ao terminar, o extrator
+grava ali um único registro JSON (ok, linhas, totais, tempos, status por etapa).
+Sem a variável, emit() não faz nada e a execução manual segue igual.
+Uso: python3 result_channel.py ARQUIVO   (mostra um registro)
+"""
+
+import os
+import sys
+import json
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional, Sequence
+
+RESULT_FILE_ENV = "GRITTI_RESULT_FILE"
+
+# Início do processo (aproximado: primeiro import do módulo)
+STARTED_AT = time.perf_counter()
+STARTED_WALL = datetime.now()
+
+
+def step_record(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Normaliza o resultado de uma etapa (extract_date ou StepResult.to_dict)"""
+    step = dict(result)
+    step["step"] = step.pop("source", None) or step.get("step")
+    step.setdefault("ok", False)
+    step.setdefault("rows", 0)
+    step.setdefault("summary", {})
+    step.setdefault("error", None)
+    return step
+
+
+def build(job: str, steps: Sequence[Dict[str, Any]], ok: Optional[bool] = None) -> Dict[str, Any]:
+    """Registro de uma execução; ok padrão = todas as etapas ok (e pelo menos uma)"""
+    steps = [step_record(s) for s in steps if s]
+    if ok is None:
+        ok = bool(steps) and all(s["ok"] for s in steps)
+    return {
+        "job": job,
+        "ok": bool(ok),
+        "rows": sum(s["rows"] or 0 for s in steps),
+        "steps": steps,
+        "pid": os.getpid(),
+        "started_at": STARTED_WALL.isoformat(sep=" ", timespec="seconds"),
+        "finished_at": datetime.now().isoformat(sep=" ", timespec="seconds"),
+        "seconds": round(time.perf_counter() - STARTED_AT, 2),
+    }
+
+
+def emit(job: str, steps: Sequence[Dict[str, Any]], ok: Optional[bool] = None) -> Dict[str, Any]:
+    """Monta o registro e grava em GRITTI_RESULT_FILE (atômico), se definido"""
+    record = build(job, steps, ok)
+    path = os.getenv(RESULT_FILE_ENV)
+    if path:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(record, f, default=str)
+        os.replace(tmp, path)
+    return record
+
+
+def read(path: str) -> Optional[Dict[str, Any]]:
+    """Lê um registro; None se o filho não gravou nada (ex.: morreu antes)"""
+    try:
+        with open(path, "r") as f:
+            content = f.read()
+    except FileNotFoundError:
+        return None
+    if not content.strip():
+        return None
+    try:
+        return json.loads(content)
+    except ValueError:
+        return None
+
+
+def exit_code(record: Dict[str, Any]) -> int:
+    return 0 if record.get("ok") else 1
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: python3 result_channel.py ARQUIVO")
+        sys.exit(1)
+
+    record = read(sys.argv[1])
+    if record is None:
+        print(f"❌ Nenhum registro em {sys.argv[1]}")
+        sys.exit(1)
+    print(json.dumps(record, indent=2, ensure_ascii=False))
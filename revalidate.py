@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Revalidate - Revalidação dos dias recentes do histórico
+Receita, reembolsos e chargebacks da Utmify continuam mudando por dias (pedidos pendentes,
+estornos). Rebusca os últimos dias em agenda decrescente: diária nos REVALIDATE_DAILY_DAYS dias
+depois de ontem e semanal (D-7, D-14, ...) até REVALIDATE_MAX_DAYS. Compara com o *_history e
+grava só as linhas que mudaram; o resumo mostra quanto cada dia andou.
+Uso: python3 revalidate.py [agendado | DIAS | DD/MM/YYYY [DD/MM/YYYY] | plano] [--sources campaigns,ads]
+"""
+
+import sys
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence
+import logging
+
+import engine
+import leader
+import result_channel
+from engine import Source
+from settings import settings
+from storage import get_backend, table_columns, value_columns, TABLES
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =====================================================
+# AGENDA
+# =====================================================
+
+WEEKLY = 7
+
+
+def compared_columns(table: str) -> List[str]:
+    """
+    Colunas comparadas e regravadas: todas fora da chave, menos horários de extração.
+    Reembolsos, chargebacks e pendentes ficam fora de source.update e são justamente o que muda.
+    """
+    types = dict(TABLES[table]["columns"])
+    return [c for c in value_columns(table) if types[c] != "TIMESTAMP"]
+
+
+def due_ages() -> List[int]:
+    """Idades (dias atrás) revalidadas hoje: 2..1+DAILY todo dia, depois múltiplos de 7 até MAX"""
+    last_daily = settings.REVALIDATE_DAILY_DAYS + 1
+    daily = list(range(2, last_daily + 1))
+    weekly = [a for a in range(WEEKLY, settings.REVALIDATE_MAX_DAYS + 1, WEEKLY) if a > last_daily]
+    return [a for a in daily + weekly if a <= settings.REVALIDATE_MAX_DAYS]
+
+
+def due_dates(today: Optional[date] = None) -> List[date]:
+    today = today or date.today()
+    return [today - timedelta(days=age) for age in due_ages()]
+
+
+# =====================================================
+# COMPARAÇÃO
+# =====================================================
+
+def _norm(value) -> Any:
+    """Valor comparável entre drivers (SQLite devolve texto/float, Postgres Decimal/date)"""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float, Decimal)):
+        return round(float(value), 4)
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def diff_rows(source: Source, fetched: Sequence[tuple],
+              current: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Linhas buscadas x histórico em todas as colunas de compared_columns.
+    Devolve as linhas a gravar (novas ou alteradas), contagens e a variação das métricas.
+    """
+    table = source.table(True)
+    columns = table_columns(table)
+    key = TABLES[table]["key"]
+    compared = compared_columns(table)
+    numeric = [c for c in compared if dict(TABLES[table]["columns"]).get(c) in ("INT", "NUM")]
+    existing = {tuple(_norm(row[k]) for k in key): row for row in current}
+
+    changed: List[tuple] = []
+    new = 0
+    moved = {c: 0.0 for c in numeric}
+    seen = set()
+    for values in fetched:
+        row = dict(zip(columns, values))
+        row_key = tuple(_norm(row[k]) for k in key)
+        seen.add(row_key)
+        old = existing.get(row_key)
+        if old is None:
+            new += 1
+        elif all(_norm(row[c]) == _norm(old[c]) for c in compared):
+            continue
+        changed.append(values)
+        for c in numeric:
+            moved[c] += float(row[c] or 0) - float((old or {}).get(c) or 0)
+
+    return {
+        "rows": changed,
+        "checked": len(fetched),
+        "changed": len(changed) - new,
+        "new": new,
+        "missing": len([k for k in existing if k not in seen]),
+        "moved": {c: round(v, 2) for c, v in moved.items() if round(v, 2)},
+    }
+
+
+# =====================================================
+# EXECUÇÃO
+# =====================================================
+
+def revalidate_day(source: Source, target_date: date) -> Dict[str, Any]:
+    """Rebusca um dia, grava só o que mudou e devolve o resumo do dia"""
+    label = f"{source.label} {target_date.strftime('%d/%m/%Y')}"
+    fetched, status = engine.fetch_rows(source, target_date)
+    failed = [unit for unit, c in status.items() if c.get("failed")]
+    current = engine.read_day(source.table(True), target_date)
+    result = diff_rows(source, fetched, current)
+
+    rows = result.pop("rows")
+    if rows:
+        backend = get_backend(settings.DB_CONFIG)
+        table = source.table(True)
+        with backend.stream(table, update=value_columns(table), touch=source.touch) as stream:
+            stream.write(rows)
+    if failed:
+        # Unidade sem resposta: as linhas dela contariam como "sumidas"
+        result["missing"] = None
+        result["error"] = f"sem resposta de {', '.join(map(str, failed))}"
+
+    moved = ", ".join(f"{c} {v:+,.2f}" for c, v in result["moved"].items()) or "sem variação"
+    icon = "⚠️" if failed else ("✏️" if rows else "✅")
+    logger.info(f"{icon} {label}: {result['changed']} alteradas, {result['new']} novas "
+                f"de {result['checked']} | {moved}")
+    return result
+
+
+def revalidate(source: Source, dates: Sequence[date]) -> Dict[str, Any]:
+    """Resultado da fonte no formato do result_channel (summary = dia -> resumo)"""
+    days: Dict[str, Any] = {}
+    errors = []
+    for target_date in dates:
+        leader.yield_to_higher("backfill", f"Revalidação {source.name} {target_date.strftime('%d/%m/%Y')}")
+        try:
+            days[target_date.isoformat()] = revalidate_day(source, target_date)
+        except Exception as e:
+            logger.error(f"❌ {source.label} {target_date.strftime('%d/%m/%Y')}: {e}")
+            days[target_date.isoformat()] = {"error": str(e)}
+        if days[target_date.isoformat()].get("error"):
+            errors.append(f"{target_date.strftime('%d/%m/%Y')}: {days[target_date.isoformat()]['error']}")
+    return {
+        "source": f"revalidate_{source.name}",
+        "ok": not errors,
+        "rows": sum((d.get("changed") or 0) + (d.get("new") or 0) for d in days.values()),
+        "summary": days,
+        "error": "; ".join(errors) or None,
+    }
+
+
+def run(names: Sequence[str], dates: Sequence[date]) -> List[Dict[str, Any]]:
+    results = []
+    for name in names:
+        source = engine.get_source(name)
+        if not getattr(settings, source.token):
+            results.append({"source": f"revalidate_{name}", "ok": False, "rows": 0, "summary": {},
+                            "error": f"{source.token} não definido"})
+            continue
+        results.append(revalidate(source, dates))
+    return results
+
+
+# =====================================================
+# MAIN
+# =====================================================
+
+def print_report(results: List[Dict[str, Any]]):
+    print("\n" + "=" * 60)
+    print("📋 REVALIDAÇÃO")
+    print("=" * 60)
+    for r in results:
+        print(f"{'✅' if r['ok'] else '❌'} {r['source']}: {r['rows']} linhas gravadas")
+        for day, d in r["summary"].items():
+            if d.get("error") and "checked" not in d:
+                print(f"   {day}: ⚠️ {d['error']}")
+                continue
+            moved = ", ".join(f"{c} {v:+,.2f}" for c, v in d["moved"].items()) or "sem variação"
+            print(f"   {day}: {d['changed']} alteradas, {d['new']} novas | {moved}")
+
+
+def print_plan():
+    ages = due_ages()
+    print(f"🗓️ Hoje: D-{', D-'.join(map(str, ages))}" if ages else "🗓️ Nada a revalidar hoje")
+    for target_date in due_dates():
+        print(f"   {target_date.strftime('%d/%m/%Y')}")
+    print(f"Fontes: {', '.join(settings.REVALIDATE_SOURCES)}")
+
+
+def print_usage():
+    print("Uso: python3 revalidate.py [agendado|DIAS|DD/MM/YYYY [DD/MM/YYYY]|plano] [--sources FONTE,FONTE]")
+    print("")
+    print("Comandos:")
+    print("  agendado               - Dias da agenda de hoje (padrão; usado pelo scheduler)")
+    print("  DIAS                   - De ontem até DIAS dias atrás")
+    print("  DD/MM/YYYY [DD/MM/YYYY] - Uma data ou intervalo")
+    print("  plano                  - Mostra os dias da agenda de hoje")
+
+
+def parse_dates(args: Sequence[str]) -> List[date]:
+    if not args or args[0] == "agendado":
+        return due_dates()
+    if args[0].isdigit():
+        return [date.today() - timedelta(days=age) for age in range(1, int(args[0]) + 1)]
+    start = engine.parse_date(args[0])
+    end = engine.parse_date(args[1]) if len(args) > 1 else start
+    if end < start:
+        raise ValueError("A data final é anterior à inicial")
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+if __name__ == "__main__":
+    argv = sys.argv[1:]
+    names = settings.REVALIDATE_SOURCES
+    if "--sources" in argv:
+        i = argv.index("--sources")
+        names = argv[i + 1].split(",") if i + 1 < len(argv) else []
+        argv = argv[:i] + argv[i + 2:]
+
+    if argv and argv[0] in ("-h", "--help", "ajuda"):
+        print_usage()
+        sys.exit(1)
+    if argv and argv[0] == "plano":
+        print_plan()
+        sys.exit(0)
+
+    try:
+        dates = parse_dates(argv)
+        results = run(names, dates)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print_report(results)
+    record = result_channel.emit(f"revalidate {' '.join(argv) or 'agendado'}", results)
+    sys.exit(result_channel.exit_code(record))
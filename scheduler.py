@@ -2,19 +2,44 @@
 """
 Scheduler - Execução contínua ao longo do dia.
 Fluxo recomendado:
-1) Ao iniciar: valida tokens e roda extração de hoje.
-2) Ao iniciar: roda carga completa de ontem (Utmify + VTurb).
-3) Durante o dia: roda extração de hoje a cada hora.
+1) Durante a janela ativa: roda extração de hoje com frequência adaptativa por fonte (15 min com
+   spend/receita acelerando, até 2 h parado; SCHEDULER_ADAPTIVE=false volta ao de hora em hora).
+2) Virada do dia (00:05): promove o último snapshot de hoje ao histórico como provisório (sem API).
+3) Uma vez por dia: verifica ontem (campanhas, anúncios, dashboard e VTurb) só no que ainda muda;
+   dias já finais são pulados e, sem virada, a carga é completa.
+4) Depois: revalida os dias recentes (revalidate.py, D-2..D-4 e semanal até D-28) e grava só o que mudou.
+5) Por fim: procura buracos no histórico (gaps.py) e põe as unidades que faltam na fila de jobs.
+Dashboards, fontes de tráfego e players vêm do catálogo (catalog.py), relido sem reiniciar; entrada
+nova dispara o backfill só das suas unidades; players novos da conta VTurb entram uma vez por dia.
+A última execução de cada job fica no banco (scheduler_runs): ao reiniciar, só roda o que ficou
+pendente, e vários horários perdidos viram uma única execução de recuperação. Cada job tem um lock
+próprio (leader.py), então nunca roda duas vezes ao mesmo tempo.
+Cada ciclo é um grafo de jobs (tokens -> extratores): ramos independentes rodam em
+paralelo, limitados por fonte, e o ciclo dura o tempo do ramo mais longo.
+Várias réplicas podem rodar: só a líder (leader.py) agenda; as outras assumem se ela cair.
+Enquanto um ciclo roda, backfills (work_queue.py, intervalos de datas) ficam pausados. Revalidação e
+backfill do catálogo rodam em segundo plano, fora do lock "run", e também cedem a vez ao ciclo de hoje.
+Uso: python3 scheduler.py [run|test|status]
 """
 
-import schedule
 import time
-import subprocess
+import asyncio
 import os
 import sys
-from datetime import datetime
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from collections import deque
+from typing import Callable, Dict, Any, List, Optional, Tuple
+import math
+import tempfile
+import threading
 import logging
 
+import result_channel
+import leader
+from orchestrator import summary_lines
+from settings import settings
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
@@ -25,7 +50,13 @@ logger = logging.getLogger(__name__)
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 AUTO_EXTRACT = os.path.join(SCRIPT_DIR, "auto_extract.py")
 UTMIFY_EXTRACT = os.path.join(SCRIPT_DIR, "utmify_extract.py")
+UTMIFY_ADS_EXTRACT = os.path.join(SCRIPT_DIR, "utmify_ads_extract.py")
+DASHBOARD_EXTRACT = os.path.join(SCRIPT_DIR, "dashboard_extract.py")
 VTURB_EXTRACT = os.path.join(SCRIPT_DIR, "vturb_extract.py")
+ENGINE = os.path.join(SCRIPT_DIR, "engine.py")
+REVALIDATE = os.path.join(SCRIPT_DIR, "revalidate.py")
+GAPS = os.path.join(SCRIPT_DIR, "gaps.py")
+CATALOG = os.path.join(SCRIPT_DIR, "catalog.py")
 
 # Configuração de execução
 PYTHON_BIN = os.getenv("PYTHON_BIN", "python3")
@@ -34,126 +65,305 @@ RUN_STARTUP_YESTERDAY = os.getenv("SCHEDULER_RUN_STARTUP_YESTERDAY", "true").low
 ACTIVE_START_HOUR = int(os.getenv("SCHEDULER_ACTIVE_START_HOUR", "8"))
 ACTIVE_END_HOUR = int(os.getenv("SCHEDULER_ACTIVE_END_HOUR", "22"))
 TEST_INCLUDE_YESTERDAY = os.getenv("SCHEDULER_TEST_INCLUDE_YESTERDAY", "false").lower() in ("1", "true", "yes", "on")
-
-
-def extract_summary_blocks(output: str) -> list:
-    """Extrai blocos de resumo da saída dos scripts."""
-    if not output:
-        return []
-
-    lines = output.splitlines()
-    blocks = []
-    i = 0
-
-    while i < len(lines):
-        if "📈 RESUMO" in lines[i] or lines[i].strip() == "RESUMO":
-            start = i
-            end = None
-            for j in range(i, len(lines)):
-                if "✅ Extração concluída!" in lines[j]:
-                    end = j
-                    break
-
-            if end is None:
-                end = min(i + 14, len(lines) - 1)
-
-            block = "\n".join(lines[start:end + 1]).strip()
-            if block:
-                blocks.append(block)
-
-            i = end + 1
-            continue
-
-        i += 1
-
-    return blocks
-
-
-def classify_summary(block: str) -> str:
-    text = block.lower()
-    if "campanhas:" in text or "spend:" in text or "roas:" in text:
-        return "UTMIFY"
-    if "players:" in text or "views:" in text or "conversões:" in text:
-        return "VTURB"
-    return "GERAL"
-
-
-def run_command(label: str, args: list, timeout: int = 1200) -> tuple:
-    """Executa comando e retorna (ok, stdout, stderr, summaries)."""
+# Hora da carga diária de ontem e espera antes de repetir uma execução que falhou
+YESTERDAY_HOUR = int(os.getenv("SCHEDULER_YESTERDAY_HOUR", str(ACTIVE_START_HOUR)))
+# Minuto depois da meia-noite em que o snapshot de hoje vira histórico provisório
+ROLLOVER_MINUTE = int(os.getenv("SCHEDULER_ROLLOVER_MINUTE", "5"))
+# Hora da revalidação dos dias recentes (depois da carga de ontem)
+REVALIDATE_HOUR = int(os.getenv("SCHEDULER_REVALIDATE_HOUR", str((YESTERDAY_HOUR + 1) % 24)))
+# Hora do detector de buracos (gaps.py): enfileira as unidades que faltam no histórico
+GAPS_HOUR = int(os.getenv("SCHEDULER_GAPS_HOUR", str((REVALIDATE_HOUR + 1) % 24)))
+# Hora da sincronização dos players da conta VTurb com o catálogo (antes da janela ativa)
+PLAYERS_HOUR = int(os.getenv("SCHEDULER_PLAYERS_HOUR", str((ACTIVE_START_HOUR - 1) % 24)))
+RETRY_SECONDS = int(os.getenv("SCHEDULER_RETRY_SECONDS", "600"))
+
+# Frequência adaptativa do ciclo de hoje: intervalo de cada fonte entre o mínimo e o máximo (minutos),
+# conforme a velocidade de spend/receita (SCHEDULER_MIN_INTERVAL_<FONTE> ajusta uma fonte só)
+ADAPTIVE = os.getenv("SCHEDULER_ADAPTIVE", "true").lower() in ("1", "true", "yes", "on")
+MIN_INTERVAL = int(os.getenv("SCHEDULER_MIN_INTERVAL", "15"))
+MAX_INTERVAL = int(os.getenv("SCHEDULER_MAX_INTERVAL", "120"))
+# Limite diário de requisições por API: settings.API_DAILY_LIMIT_<API>, contado em api_usage por todas
+# as cargas (engine.check_api_budget recusa qualquer carga que passaria dele)
+APIS = ("utmify", "vturb")
+
+# Tamanho máximo de uma linha lida dos pipes dos filhos
+STREAM_LINE_LIMIT = 1024 * 1024
+# Linhas finais de stderr guardadas para diagnóstico quando o filho morre sem resultado
+STDERR_TAIL_LINES = 20
+
+# Jobs simultâneos por fonte. "browser" = login via Playwright; fica em 1 porque
+# os dois logins regravam o mesmo .env.
+SOURCE_CONCURRENCY = {
+    "browser": int(os.getenv("SCHEDULER_CONCURRENCY_BROWSER", "1")),
+    "utmify": int(os.getenv("SCHEDULER_CONCURRENCY_UTMIFY", "3")),
+    "vturb": int(os.getenv("SCHEDULER_CONCURRENCY_VTURB", "1")),
+}
+JOB_TIMEOUT = int(os.getenv("SCHEDULER_JOB_TIMEOUT", "1800"))
+
+
+async def _pump(stream: asyncio.StreamReader, prefix: str = "", tail: Optional[deque] = None):
+    """Lê um pipe linha a linha até EOF, ecoando no terminal (só guarda as últimas linhas em tail)."""
+    while True:
+        line = await stream.readline()
+        if not line:
+            break
+        text = line.decode("utf-8", errors="replace")
+        if tail is not None:
+            tail.append(text)
+        print(f"{prefix}{text}", end="", flush=True)
+
+
+def log_record(record: Dict[str, Any]):
+    """Mostra o registro de resultado do filho (linhas, tempos e totais por etapa)."""
+    logger.info(f"📋 Resultado: {record.get('rows', 0)} registros em {record.get('seconds', 0):.1f}s")
+    for step in record.get("steps", []):
+        status = "✅" if step.get("ok") else "❌"
+        logger.info(f"[{status} {step.get('step')}] {step.get('rows', 0)} registros")
+        for line in summary_lines(step.get("step"), step.get("summary")):
+            logger.info(f"   {line}")
+        if step.get("error"):
+            logger.info(f"   ⚠️ {step['error']}")
+
+
+async def run_command_async(label: str, args: list, timeout: int = 1200, prefix: str = "",
+                            env: Optional[Dict[str, str]] = None, run_lock_held: bool = True) -> tuple:
+    """
+    Executa comando e retorna (ok, record).
+    O filho grava o resultado em GRITTI_RESULT_FILE (result_channel); a saída só é ecoada.
+    ok = exit 0 e, se houver registro, record["ok"]. record é None se o filho não gravou nada.
+    prefix: prefixo das linhas ecoadas (útil quando vários jobs rodam ao mesmo tempo).
+    env: ambiente base do filho (padrão: o deste processo).
+    run_lock_held: o chamador já segura o lock "run" (ciclo do scheduler); o filho não espera por ele.
+    """
     logger.info("=" * 60)
     logger.info(f"🚀 {label} - {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
     logger.info(f"🧪 Comando: {PYTHON_BIN} {' '.join(args)}")
     logger.info("=" * 60)
 
     start_time = datetime.now()
+    stderr_tail = deque(maxlen=STDERR_TAIL_LINES)
+    fd, result_file = tempfile.mkstemp(prefix="gritti-result-", suffix=".json")
+    os.close(fd)
+    env = dict(os.environ if env is None else env, **{result_channel.RESULT_FILE_ENV: result_file})
+    if run_lock_held:
+        env[leader.HELD_ENV] = "1"
 
     try:
-        proc = subprocess.Popen(
-            [PYTHON_BIN] + args,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-        )
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                PYTHON_BIN, *args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=STREAM_LINE_LIMIT,
+                env=env,
+            )
+        except Exception as e:
+            logger.error(f"❌ Erro em {label}: {e}")
+            return False, None
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(
+                    _pump(proc.stdout, prefix),
+                    _pump(proc.stderr, prefix, stderr_tail),
+                    proc.wait(),
+                ),
+                timeout=timeout,
+            )
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            logger.error(f"❌ Timeout em {label} ({timeout}s)")
+            return False, result_channel.read(result_file)
+        except Exception as e:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            logger.error(f"❌ Erro em {label}: {e}")
+            return False, result_channel.read(result_file)
 
-        stdout_lines = []
-        stderr_lines = []
-        deadline = time.time() + timeout
+        record = result_channel.read(result_file)
+    finally:
+        if os.path.exists(result_file):
+            os.remove(result_file)
 
-        while True:
-            if proc.poll() is not None:
-                break
+    elapsed = str(datetime.now() - start_time).split('.')[0]
+    ok = proc.returncode == 0 and (record is None or bool(record.get("ok")))
 
-            if time.time() > deadline:
-                proc.kill()
-                logger.error(f"❌ Timeout em {label}")
-                return False, "", "", []
-
-            out_line = proc.stdout.readline() if proc.stdout else ""
-            if out_line:
-                stdout_lines.append(out_line)
-                print(out_line, end="")
-
-            err_line = proc.stderr.readline() if proc.stderr else ""
-            if err_line:
-                stderr_lines.append(err_line)
-                print(err_line, end="")
-
-            time.sleep(0.05)
-
-        remaining_out, remaining_err = proc.communicate(timeout=5)
-        if remaining_out:
-            stdout_lines.append(remaining_out)
-            print(remaining_out, end="")
-        if remaining_err:
-            stderr_lines.append(remaining_err)
-            print(remaining_err, end="")
-
-        stdout = "".join(stdout_lines)
-        stderr = "".join(stderr_lines)
-        summaries = extract_summary_blocks(stdout)
-        elapsed = datetime.now() - start_time
-
-        if proc.returncode == 0:
-            logger.info(f"✅ {label} concluído com sucesso em {str(elapsed).split('.')[0]}")
-        else:
-            logger.error(f"❌ {label} falhou (exit={proc.returncode}) em {str(elapsed).split('.')[0]}")
+    if ok:
+        logger.info(f"✅ {label} concluído com sucesso em {elapsed}")
+    else:
+        logger.error(f"❌ {label} falhou (exit={proc.returncode}) em {elapsed}")
+        if record is None and stderr_tail:
+            logger.error("Últimas linhas de stderr:")
+            for line in stderr_tail:
+                logger.error(line.rstrip())
+
+    if record is not None:
+        log_record(record)
+    else:
+        logger.warning(f"⚠️ {label}: nenhum resultado estruturado recebido")
 
-        if summaries:
-            logger.info("📋 Resumo(s) coletado(s):")
-            for block in summaries:
-                kind = classify_summary(block)
-                logger.info(f"[{kind}]")
-                for line in block.splitlines():
-                    logger.info(line)
+    return ok, record
 
-        return proc.returncode == 0, stdout, stderr, summaries
 
-    except subprocess.TimeoutExpired:
-        logger.error(f"❌ Timeout em {label}")
-        return False, "", "", []
-    except Exception as e:
-        logger.error(f"❌ Erro em {label}: {e}")
-        return False, "", "", []
+def run_command(label: str, args: list, timeout: int = 1200) -> tuple:
+    """Executa comando e retorna (ok, record)."""
+    return asyncio.run(run_command_async(label, args, timeout))
+
+
+def run_commands(jobs: list) -> list:
+    """
+    Executa vários comandos ao mesmo tempo em um único event loop.
+    jobs: [(label, args, timeout), ...] -> [(ok, record), ...] na mesma ordem.
+    """
+    async def run_all():
+        return await asyncio.gather(*[
+            run_command_async(label, args, timeout, prefix=f"[{label}] ")
+            for label, args, timeout in jobs
+        ])
+
+    return list(asyncio.run(run_all()))
+
+
+# =====================================================
+# GRAFO DE JOBS
+# =====================================================
+
+@dataclass
+class Job:
+    name: str
+    label: str
+    args: List[str]
+    source: str
+    deps: Tuple[str, ...] = ()
+    timeout: int = JOB_TIMEOUT
+
+
+@dataclass
+class JobRun:
+    name: str
+    label: str
+    ok: bool = False
+    skipped: bool = False
+    seconds: float = 0.0
+    record: Optional[Dict[str, Any]] = None
+
+
+def cycle_jobs(when: str, sources: Optional[List[str]] = None) -> List[Job]:
+    """
+    Grafo de um ciclo (when = "hoje" | "ontem"):
+    token Utmify -> campanhas, anúncios, dashboard
+    token VTurb  -> vturb
+    sources: só estes extratores (e os tokens de que dependem)
+    """
+    jobs = [
+        Job("token_utmify", "TOKEN UTMIFY", [AUTO_EXTRACT, "tokens", "utmify"], "browser", timeout=600),
+        Job("token_vturb", "TOKEN VTURB", [AUTO_EXTRACT, "tokens", "vturb"], "browser", timeout=600),
+        Job("campaigns", "UTMIFY", [UTMIFY_EXTRACT, when], "utmify", deps=("token_utmify",)),
+        Job("ads", "UTMIFY ADS", [UTMIFY_ADS_EXTRACT, when], "utmify", deps=("token_utmify",)),
+        Job("dashboard", "DASHBOARD UTMIFY", [DASHBOARD_EXTRACT, when], "utmify", deps=("token_utmify",)),
+        Job("vturb", "VTURB", [VTURB_EXTRACT, when], "vturb", deps=("token_vturb",)),
+    ]
+    if sources is None:
+        return jobs
+    wanted = [job for job in jobs if job.name in sources]
+    deps = {dep for job in wanted for dep in job.deps}
+    return [job for job in jobs if job.name in deps] + wanted
+
+
+def check_graph(jobs: List[Job]):
+    """Valida nomes, dependências e ausência de ciclos"""
+    by_name = {job.name: job for job in jobs}
+    if len(by_name) != len(jobs):
+        raise ValueError("Jobs com nome repetido")
+    for job in jobs:
+        missing = [d for d in job.deps if d not in by_name]
+        if missing:
+            raise ValueError(f"Job {job.name}: dependência desconhecida {', '.join(missing)}")
+
+    visiting, done = set(), set()
+
+    def visit(name: str):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Ciclo no grafo de jobs passando por {name}")
+        visiting.add(name)
+        for dep in by_name[name].deps:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for job in jobs:
+        visit(job.name)
+
+
+async def run_graph(jobs: List[Job], title: str = "") -> Dict[str, JobRun]:
+    """
+    Executa o grafo: cada job espera as dependências e o semáforo da sua fonte.
+    Se uma dependência falha, os dependentes são pulados (não executados).
+    """
+    check_graph(jobs)
+    semaphores = {
+        source: asyncio.Semaphore(max(1, SOURCE_CONCURRENCY.get(source, 1)))
+        for source in {job.source for job in jobs}
+    }
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def execute(job: Job) -> JobRun:
+        run = JobRun(name=job.name, label=job.label)
+        for dep in job.deps:
+            dep_run = await tasks[dep]
+            if not dep_run.ok:
+                logger.warning(f"⏭️ {job.label}: pulado ({dep_run.label} falhou)")
+                run.skipped = True
+                return run
+
+        async with semaphores[job.source]:
+            started = time.perf_counter()
+            label = f"{title} | {job.label}" if title else job.label
+            ok, record = await run_command_async(label, job.args, job.timeout, prefix=f"[{job.name}] ")
+            run.seconds = round(time.perf_counter() - started, 2)
+        run.ok = ok
+        run.record = record
+        return run
+
+    # Todas as tasks existem antes de qualquer uma rodar, então tasks[dep] sempre resolve
+    for job in jobs:
+        tasks[job.name] = asyncio.ensure_future(execute(job))
+    await asyncio.gather(*tasks.values())
+    return {name: task.result() for name, task in tasks.items()}
+
+
+def run_cycle(title: str, jobs: List[Job], priority: str = "today") -> bool:
+    """
+    Roda um grafo de jobs e registra o resumo. True se todos os jobs deram certo.
+    Segura o lock "run": espera uma execução manual do auto_extract.py terminar antes de começar.
+    priority: classe do ciclo (leader.PRIORITIES); o backfill pausa enquanto ele roda.
+    """
+    runs = run_cycle_runs(title, jobs, priority)
+    return bool(runs) and all(r.ok for r in runs.values())
+
+
+def run_cycle_runs(title: str, jobs: List[Job], priority: str = "today") -> Dict[str, JobRun]:
+    """run_cycle com o resultado de cada job ({} se o ciclo foi pulado)"""
+    with leader.run_lock(f"Ciclo {title}") as acquired:
+        if not acquired:
+            logger.warning(f"⏭️ Ciclo {title}: pulado (outra extração em andamento)")
+            return {}
+        with leader.in_flight(priority):
+            started = time.perf_counter()
+            runs = asyncio.run(run_graph(jobs, title))
+            elapsed = time.perf_counter() - started
+
+    log_cycle_summary(title, [
+        {"label": r.label, "ok": r.ok, "skipped": r.skipped, "seconds": r.seconds, "record": r.record}
+        for r in runs.values()
+    ])
+    busy = sum(r.seconds for r in runs.values())
+    logger.info(f"⏱️ Ciclo {title}: {elapsed:.1f}s (soma dos jobs: {busy:.1f}s)")
+    return runs
 
 
 def log_cycle_summary(cycle_name: str, runs: list):
@@ -165,80 +375,624 @@ def log_cycle_summary(cycle_name: str, runs: list):
     logger.info(f"Etapas com sucesso: {ok_count}/{total}")
 
     for r in runs:
+        if r.get("skipped"):
+            logger.info(f"⏭️ {r['label']} (pulado)")
+            continue
         status = "✅" if r["ok"] else "❌"
-        logger.info(f"{status} {r['label']}")
-        if r["summaries"]:
-            kinds = sorted({classify_summary(s) for s in r["summaries"]})
-            logger.info(f"   Resumos: {', '.join(kinds)}")
+        seconds = f" ({r['seconds']:.1f}s)" if r.get("seconds") else ""
+        rows = f" - {r['record'].get('rows', 0)} registros" if r.get("record") else ""
+        logger.info(f"{status} {r['label']}{seconds}{rows}")
 
     logger.info("=" * 60)
 
 
 def run_today_cycle(reason: str = "Execução agendada") -> bool:
-    """Roda ciclo de hoje (Utmify + VTurb) usando auto_extract."""
-    label = f"{reason} | AUTO_EXTRACT HOJE"
-    ok, _, _, summaries = run_command(label, [AUTO_EXTRACT, "hoje"], timeout=1800)
-    log_cycle_summary(reason, [{"label": label, "ok": ok, "summaries": summaries}])
-    return ok
+    """Roda ciclo de hoje (campanhas, anúncios, dashboard e VTurb) em paralelo."""
+    return run_cycle(reason, cycle_jobs("hoje"))
 
 
-def run_yesterday_backfill() -> bool:
-    """Roda carga completa de ontem (Utmify + VTurb)."""
-    runs = []
-
-    label_u = "Carga de ontem | UTMIFY"
-    ok_utmify, _, _, summaries_u = run_command(label_u, [UTMIFY_EXTRACT, "ontem"], timeout=1800)
-    runs.append({"label": label_u, "ok": ok_utmify, "summaries": summaries_u})
+def run_rollover() -> bool:
+    """Virada do dia: *_today de ontem → histórico provisório (só banco, sem login nem API)"""
+    sources = ",".join(job.name for job in cycle_jobs("hoje") if not job.name.startswith("token_"))
+    return run_cycle("VIRADA DO DIA", [
+        Job("finalize", "VIRADA DO DIA", [ENGINE, sources, "finalizar"], "db", timeout=600),
+    ], priority="yesterday")
 
-    label_v = "Carga de ontem | VTURB"
-    ok_vturb, _, _, summaries_v = run_command(label_v, [VTURB_EXTRACT, "ontem"], timeout=1800)
-    runs.append({"label": label_v, "ok": ok_vturb, "summaries": summaries_v})
 
-    log_cycle_summary("BACKFILL ONTEM", runs)
-    return ok_utmify and ok_vturb
+def run_yesterday_backfill() -> bool:
+    """Roda carga completa de ontem (campanhas, anúncios, dashboard e VTurb) em paralelo."""
+    return run_cycle("BACKFILL ONTEM", cycle_jobs("ontem"), priority="yesterday")
+
+
+def run_detached(title: str, tokens: List[Job], job: Job) -> bool:
+    """
+    Job da classe backfill: só a renovação dos tokens segura o lock "run"; o job em si roda fora
+    dele, então o ciclo de hoje começa enquanto ele anda e o filho cede a vez a cada unidade
+    (leader.yield_to_higher). Roda na thread do job agendado (ScheduledJob.background).
+    """
+    if tokens and not run_cycle(f"{title} | TOKENS", tokens, priority="backfill"):
+        return False
+    started = time.perf_counter()
+    run = asyncio.run(run_graph([job], title))[job.name]
+    log_cycle_summary(title, [{"label": run.label, "ok": run.ok, "skipped": run.skipped,
+                               "seconds": run.seconds, "record": run.record}])
+    logger.info(f"⏱️ Ciclo {title}: {time.perf_counter() - started:.1f}s (fora do lock run)")
+    return run.ok
+
+
+def run_revalidation() -> bool:
+    """Rebusca os dias da agenda de revalidação (revalidate.py) e grava só o que mudou"""
+    tokens = [job for job in cycle_jobs("ontem", settings.REVALIDATE_SOURCES) if job.name.startswith("token_")]
+    return run_detached("REVALIDAÇÃO", tokens,
+                        Job("revalidate", "REVALIDAÇÃO", [REVALIDATE, "agendado"], "utmify", timeout=1800))
+
+
+def run_gap_fill() -> bool:
+    """Buracos no histórico → fila de jobs (os workers do work_queue.py fazem a carga)"""
+    if settings.STORAGE_BACKEND != "postgres":
+        logger.info(f"⏭️ Detector de buracos: a fila exige Postgres (atual: {settings.STORAGE_BACKEND})")
+        return True
+    return run_cycle("BURACOS NO HISTÓRICO", [
+        Job("gaps", "BURACOS NO HISTÓRICO", [GAPS, "enqueue"], "db", timeout=600),
+    ], priority="backfill")
+
+
+def run_catalog_backfill() -> bool:
+    """Entradas novas do catálogo (catalog.py): backfill só das unidades novas"""
+    global _catalog_pending
+    _catalog_pending = False
+    tokens = [job for job in cycle_jobs("ontem") if job.name.startswith("token_")]
+    return run_detached("CATÁLOGO", tokens,
+                        Job("catalog", "BACKFILL DO CATÁLOGO", [CATALOG, "backfill"], "utmify",
+                            timeout=JOB_TIMEOUT * 2))
+
+
+def run_player_sync() -> bool:
+    """Players novos da conta VTurb → catálogo (o backfill deles roda no job "catalog")"""
+    if not settings.CATALOG:
+        logger.info("⏭️ Sincronização de players: catálogo desativado (CATALOG=false)")
+        return True
+    tokens = [job for job in cycle_jobs("hoje", ["vturb"]) if job.name.startswith("token_")]
+    return run_cycle("PLAYERS VTURB", tokens + [
+        Job("players", "PLAYERS VTURB", [CATALOG, "sync-players"], "vturb",
+            deps=tuple(job.name for job in tokens), timeout=300),
+    ], priority="backfill")
 
 
 def within_active_window(now: datetime) -> bool:
     return ACTIVE_START_HOUR <= now.hour <= ACTIVE_END_HOUR
 
 
-def hourly_job():
-    now = datetime.now()
+# =====================================================
+# AGENDA
+# =====================================================
+
+@dataclass
+class ScheduledJob:
+    name: str
+    label: str
+    run: Callable[[str], bool]                      # reason -> ok
+    slot: Callable[[datetime], Optional[datetime]]  # horário agendado mais recente <= now (None = nada pendente)
+    period: Optional[timedelta]                     # None = sem grade fixa (frequência adaptativa)
+    catch_up: bool = True                           # recupera ao iniciar um horário perdido
+    background: bool = False                        # roda numa thread: tick() segue (classe backfill)
+
+
+@dataclass
+class LastRun:
+    started: Optional[datetime] = None    # última tentativa
+    finished: Optional[datetime] = None
+    ok: Optional[bool] = None
+    success: Optional[datetime] = None    # início da última execução com sucesso
+
+
+def hourly_slot(now: datetime) -> Optional[datetime]:
     if not within_active_window(now):
-        logger.info(
-            f"⏭️ Fora da janela ativa ({ACTIVE_START_HOUR:02d}:00-{ACTIVE_END_HOUR:02d}:59). Pulando execução."
+        return None
+    return now.replace(minute=0, second=0, microsecond=0)
+
+
+def daily_at(hour: int, minute: int = 0) -> Callable[[datetime], Optional[datetime]]:
+    def daily_slot(now: datetime) -> Optional[datetime]:
+        slot = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        return slot if slot <= now else slot - timedelta(days=1)
+    return daily_slot
+
+
+# Entradas novas no catálogo (relido a cada CATALOG_POLL_SECONDS, não a cada tick)
+_catalog_checked: Optional[datetime] = None
+_catalog_pending = False
+
+
+def catalog_slot(now: datetime) -> Optional[datetime]:
+    """Vence assim que o catálogo tem entrada sem backfill (sem grade fixa)"""
+    global _catalog_checked, _catalog_pending
+    if _catalog_checked is None or (now - _catalog_checked).total_seconds() >= settings.CATALOG_POLL_SECONDS:
+        _catalog_checked = now
+        try:
+            import catalog
+            _catalog_pending = settings.CATALOG and bool(catalog.pending())
+        except Exception as e:
+            logger.warning(f"⚠️ Catálogo indisponível ({e})")
+            _catalog_pending = False
+    return now if _catalog_pending else None
+
+
+# Última execução de cada job (espelho de scheduler_runs; vale sozinho se o banco cair)
+_runs: Dict[str, LastRun] = {}
+# Startup sem recuperação (catch_up=False): job -> não roda antes de
+_hold_until: Dict[str, datetime] = {}
+
+SCHEDULE_TABLE = "scheduler_runs"
+SCHEDULE_COLUMNS = [
+    ("job", "TEXT"), ("last_started", "TIMESTAMP"), ("last_finished", "TIMESTAMP"),
+    ("last_ok", "INT"), ("last_success", "TIMESTAMP"),
+]
+# Totais do dia a cada ciclo de hoje (velocidade) e requisições feitas (limite diário)
+SNAPSHOT_TABLE = "scheduler_snapshots"
+SNAPSHOT_COLUMNS = [("source", "TEXT"), ("taken_at", "TIMESTAMP"), ("value", "NUM"), ("api_calls", "INT")]
+SCHEDULE_TABLES = {
+    SCHEDULE_TABLE: (SCHEDULE_COLUMNS, ("job",)),
+    SNAPSHOT_TABLE: (SNAPSHOT_COLUMNS, ("source", "taken_at")),
+}
+_schedule_ready = False
+
+
+def _schedule_execute(sql: str, params: tuple = (), fetch: bool = False):
+    """Uma transação curta nas tabelas do scheduler (criadas no primeiro uso)"""
+    global _schedule_ready
+    from storage import get_backend
+
+    backend = get_backend(settings.DB_CONFIG)
+    conn = backend.connect()
+    try:
+        cursor = backend.cursor(conn)
+        if not _schedule_ready:
+            for table, (columns, key) in SCHEDULE_TABLES.items():
+                cols = ", ".join(f"{n} {backend.types[t]}" for n, t in columns)
+                cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} ({cols}, PRIMARY KEY ({', '.join(key)}))")
+        cursor.execute(sql.format(p=backend.placeholder), backend.adapt_row(params))
+        result = cursor.fetchall() if fetch else None
+        conn.commit()
+        _schedule_ready = True
+        return result
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        backend.release(conn)
+
+
+def load_runs() -> Dict[str, LastRun]:
+    """Relê scheduler_runs (outra réplica/líder anterior pode ter rodado); mantém a memória se o banco falhar"""
+    from storage import as_datetime
+
+    try:
+        rows = _schedule_execute(
+            f"SELECT {', '.join(n for n, _ in SCHEDULE_COLUMNS)} FROM {SCHEDULE_TABLE}", fetch=True
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Histórico do scheduler indisponível ({e}); usando o estado em memória")
+        return _runs
+    for job, started, finished, ok, success in rows:
+        _runs[job] = LastRun(as_datetime(started), as_datetime(finished),
+                             None if ok is None else bool(ok), as_datetime(success))
+    return _runs
+
+
+def save_run(name: str, run: LastRun):
+    _runs[name] = run
+    cols = [n for n, _ in SCHEDULE_COLUMNS]
+    try:
+        from storage import get_backend
+        conflict = get_backend(settings.DB_CONFIG).conflict_clause(("job",), cols[1:])
+        _schedule_execute(
+            f"INSERT INTO {SCHEDULE_TABLE} ({', '.join(cols)}) VALUES ({', '.join(['{p}'] * len(cols))})" + conflict,
+            (name, run.started, run.finished, None if run.ok is None else int(run.ok), run.success),
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ {name}: execução não registrada no banco ({e})")
+
+
+# =====================================================
+# FREQUÊNCIA ADAPTATIVA
+# =====================================================
+
+TODAY_SOURCES = ["campaigns", "ads", "dashboard", "vturb"]
+# Campos do summary somados como medida de atividade; dashboard segue a velocidade das campanhas
+VELOCITY_METRICS = {"campaigns": ("spend", "revenue"), "ads": ("spend", "revenue"), "vturb": ("views", "plays")}
+VELOCITY_SOURCE = {"dashboard": "campaigns"}
+# Ritmo recente / ritmo médio do dia: até FLAT usa o intervalo máximo, a partir de FAST o mínimo
+VELOCITY_FLAT = 0.25
+VELOCITY_FAST = 4.0
+# Fontes que vencem logo em seguida entram no mesmo ciclo (um login para todas)
+BATCH_AHEAD = timedelta(minutes=5)
+
+
+@dataclass
+class Snapshot:
+    taken_at: datetime
+    value: Optional[float]
+    api_calls: int = 0
+
+
+# Snapshots de hoje por fonte (espelho de scheduler_snapshots)
+_snapshots: Dict[str, List[Snapshot]] = {}
+_cap_logged: set = set()
+
+
+def source_key(source: str) -> str:
+    return f"today:{source}"
+
+
+def source_api(source: str) -> str:
+    return next(job.source for job in cycle_jobs("hoje") if job.name == source)
+
+
+def interval_bounds(source: str) -> Tuple[int, int]:
+    low = int(os.getenv(f"SCHEDULER_MIN_INTERVAL_{source.upper()}", str(MIN_INTERVAL)))
+    high = int(os.getenv(f"SCHEDULER_MAX_INTERVAL_{source.upper()}", str(MAX_INTERVAL)))
+    return low, max(low, high)
+
+
+def load_snapshots(now: datetime) -> Dict[str, List[Snapshot]]:
+    from storage import as_datetime
+
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    try:
+        rows = _schedule_execute(
+            f"SELECT source, taken_at, value, api_calls FROM {SNAPSHOT_TABLE} "
+            f"WHERE taken_at >= {{p}} ORDER BY taken_at", (midnight,), fetch=True
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Snapshots do scheduler indisponíveis ({e}); usando o estado em memória")
+        return _snapshots
+    _snapshots.clear()
+    for source, taken_at, value, calls in rows:
+        _snapshots.setdefault(source, []).append(
+            Snapshot(as_datetime(taken_at), None if value is None else float(value), calls or 0)
         )
+    return _snapshots
+
+
+def save_snapshot(source: str, snapshot: Snapshot):
+    today = snapshot.taken_at.date()
+    kept = [s for s in _snapshots.get(source, []) if s.taken_at.date() == today]
+    _snapshots[source] = kept + [snapshot]
+    try:
+        cols = ", ".join(n for n, _ in SNAPSHOT_COLUMNS)
+        _schedule_execute(f"INSERT INTO {SNAPSHOT_TABLE} ({cols}) VALUES ({{p}}, {{p}}, {{p}}, {{p}})",
+                          (source, snapshot.taken_at, snapshot.value, snapshot.api_calls))
+        _schedule_execute(f"DELETE FROM {SNAPSHOT_TABLE} WHERE taken_at < {{p}}",
+                          (snapshot.taken_at - timedelta(days=7),))
+    except Exception as e:
+        logger.warning(f"⚠️ {source}: snapshot não registrado no banco ({e})")
+
+
+def take_snapshot(source: str, taken_at: datetime, record: Optional[Dict[str, Any]]) -> Snapshot:
+    """Totais do dia e requisições da etapa da fonte no registro do filho"""
+    step = next((s for s in (record or {}).get("steps", []) if s.get("step") == source), {})
+    summary = step.get("summary") or {}
+    metrics = VELOCITY_METRICS.get(source)
+    value = sum(float(summary.get(k) or 0) for k in metrics) if metrics else None
+    return Snapshot(taken_at, value, int(step.get("api_calls") or 0))
+
+
+def velocity_ratio(source: str, now: datetime) -> Optional[float]:
+    """Ritmo entre os dois últimos snapshots dividido pelo ritmo médio desde a meia-noite"""
+    snaps = [s for s in _snapshots.get(VELOCITY_SOURCE.get(source, source), [])
+             if s.value is not None and s.taken_at.date() == now.date()]
+    if len(snaps) < 2:
+        return None
+    previous, last = snaps[-2], snaps[-1]
+    hours = (last.taken_at - previous.taken_at).total_seconds() / 3600
+    midnight = last.taken_at.replace(hour=0, minute=0, second=0, microsecond=0)
+    day_hours = (last.taken_at - midnight).total_seconds() / 3600
+    if hours <= 0 or day_hours <= 0 or last.value <= 0:
+        return 0.0
+    return (max(0.0, last.value - previous.value) / hours) / (last.value / day_hours)
+
+
+def interval(source: str, now: datetime) -> timedelta:
+    """Intervalo até a próxima extração da fonte (interpolação geométrica entre máximo e mínimo)"""
+    low, high = interval_bounds(source)
+    ratio = velocity_ratio(source, now)
+    if ratio is None:
+        minutes = min(max(60, low), high)
+    elif ratio <= VELOCITY_FLAT:
+        minutes = high
+    elif ratio >= VELOCITY_FAST:
+        minutes = low
+    else:
+        position = math.log(ratio / VELOCITY_FLAT) / math.log(VELOCITY_FAST / VELOCITY_FLAT)
+        minutes = high * (low / high) ** position
+    return timedelta(minutes=minutes)
+
+
+def api_calls_today(api: str, now: datetime) -> int:
+    """Requisições do dia na API em todas as cargas (ontem, revalidação, backfill, fila, today)"""
+    from storage import get_backend
+
+    try:
+        return get_backend(settings.DB_CONFIG).api_calls(api, now.date())
+    except Exception as e:
+        logger.warning(f"⚠️ Contador de requisições da API {api} indisponível ({e})")
+        return 0
+
+
+def over_cap(source: str, now: datetime) -> bool:
+    """A próxima extração (estimada pela última) passaria do limite diário da API?"""
+    from storage import api_limit
+
+    api = source_api(source)
+    cap = api_limit(api)
+    if not cap:
+        return False
+    snaps = _snapshots.get(source, [])
+    estimate = snaps[-1].api_calls if snaps else 1
+    used = api_calls_today(api, now)
+    if used + estimate <= cap:
+        return False
+    if (source, now.date()) not in _cap_logged:
+        _cap_logged.add((source, now.date()))
+        logger.warning(f"🛑 {source}: limite diário da API {api} atingido ({used}/{cap} requisições); "
+                       f"sem novas extrações hoje")
+    return True
+
+
+def next_due(source: str, now: datetime) -> datetime:
+    last = _runs.get(source_key(source), LastRun())
+    if not last.success or last.success.date() != now.date():
+        return now.replace(hour=ACTIVE_START_HOUR, minute=0, second=0, microsecond=0)
+    return last.success + interval(source, now)
+
+
+def due_sources(now: datetime, ahead: timedelta = timedelta(0)) -> List[str]:
+    return [s for s in TODAY_SOURCES if next_due(s, now) <= now + ahead and not over_cap(s, now)]
+
+
+def adaptive_slot(now: datetime) -> Optional[datetime]:
+    """Vencimento mais antigo entre as fontes pendentes"""
+    if not within_active_window(now):
+        return None
+    due = [next_due(s, now) for s in due_sources(now)]
+    return min(due) if due else None
+
+
+def run_adaptive_today(reason: str) -> bool:
+    """Ciclo de hoje só com as fontes vencidas; registra cada fonte e o snapshot para o próximo intervalo"""
+    started = datetime.now()
+    sources = due_sources(started, BATCH_AHEAD)
+    if not sources:
+        return True
+    runs = run_cycle_runs(f"{reason} [{', '.join(sources)}]", cycle_jobs("hoje", sources))
+    if not runs:
+        return False
+    finished = datetime.now()
+    for source in sources:
+        run = runs[source]
+        last = _runs.get(source_key(source), LastRun())
+        save_run(source_key(source), LastRun(started, finished, run.ok, started if run.ok else last.success))
+        if run.ok:
+            save_snapshot(source, take_snapshot(source, started, run.record))
+            minutes = interval(source, finished).total_seconds() / 60
+            logger.info(f"⏱️ {source}: próxima extração em {minutes:.0f} min")
+    return all(runs[s].ok for s in sources)
+
+
+if ADAPTIVE:
+    TODAY_JOB = ScheduledJob("today", "Ciclo de hoje", run_adaptive_today, adaptive_slot, None, RUN_STARTUP_TODAY)
+else:
+    TODAY_JOB = ScheduledJob("today", "Ciclo de hoje", lambda reason: run_today_cycle(reason=reason),
+                             hourly_slot, timedelta(hours=1), RUN_STARTUP_TODAY)
+
+# Em ordem: a virada perdida roda antes de um novo ciclo de hoje sobrescrever *_today
+SCHEDULED_JOBS = [
+    ScheduledJob("rollover", "Virada do dia", lambda reason: run_rollover(),
+                 daily_at(0, ROLLOVER_MINUTE), timedelta(days=1)),
+    TODAY_JOB,
+    ScheduledJob("players", "Players VTurb", lambda reason: run_player_sync(),
+                 daily_at(PLAYERS_HOUR), timedelta(days=1)),
+    ScheduledJob("yesterday", "Carga de ontem", lambda reason: run_yesterday_backfill(),
+                 daily_at(YESTERDAY_HOUR), timedelta(days=1), RUN_STARTUP_YESTERDAY),
+    ScheduledJob("revalidate", "Revalidação", lambda reason: run_revalidation(),
+                 daily_at(REVALIDATE_HOUR), timedelta(days=1), background=True),
+    ScheduledJob("gaps", "Buracos no histórico", lambda reason: run_gap_fill(),
+                 daily_at(GAPS_HOUR), timedelta(days=1)),
+    ScheduledJob("catalog", "Catálogo novo", lambda reason: run_catalog_backfill(), catalog_slot, None,
+                 background=True),
+]
+
+
+def is_due(job: ScheduledJob, now: datetime) -> bool:
+    """Há um horário agendado ainda não coberto por uma execução com sucesso?"""
+    slot = job.slot(now)
+    if slot is None or now < _hold_until.get(job.name, datetime.min):
+        return False
+    last = _runs.get(job.name, LastRun())
+    if job.period is None:
+        # Sem grade fixa: slot só existe se há fonte vencida; falha recente espera RETRY_SECONDS
+        failed = last.started and last.ok is not True
+        return not failed or (now - (last.finished or last.started)).total_seconds() >= RETRY_SECONDS
+    if last.success and last.success >= slot:
+        return False
+    if last.started and last.started >= slot and last.ok is not True:
+        # Já tentou este horário e falhou (ou ainda roda): espera antes de repetir
+        return (now - (last.finished or last.started)).total_seconds() >= RETRY_SECONDS
+    return True
+
+
+def missed_slots(job: ScheduledJob, slot: datetime, since: Optional[datetime], limit: int = 1000) -> int:
+    """Horários agendados entre o último sucesso e slot (todos cobertos por uma única execução)"""
+    count, current = 0, slot
+    while job.period and since is not None and current > since and count < limit:
+        if job.slot(current) == current:
+            count += 1
+        current -= job.period
+    return count
+
+
+# Jobs em segundo plano (ScheduledJob.background) ainda rodando neste processo
+_background: Dict[str, threading.Thread] = {}
+
+
+def run_scheduled(job: ScheduledJob, now: datetime) -> Optional[bool]:
+    """
+    Roda o job uma vez para o horário atual e registra em scheduler_runs.
+    Single-flight: se o lock do job está com outro processo, não roda (None).
+    Jobs background rodam numa thread que registra o resultado e solta o lock no fim (None).
+    """
+    running = _background.get(job.name)
+    if running is not None and running.is_alive():
+        return None
+    lock = leader.make_lock(f"job-{job.name}")
+    if not lock.try_acquire():
+        logger.info(f"⏭️ {job.label}: já em andamento em outro processo")
+        return None
+    detached = False
+    try:
+        load_runs()
+        if not is_due(job, now):
+            return None
+        slot = job.slot(now)
+        last = _runs.get(job.name, LastRun())
+        missed = missed_slots(job, slot, last.success)
+        if last.success is None:
+            reason = f"{job.label} (primeira execução registrada)"
+        elif missed > 1:
+            reason = f"{job.label} (recuperação de {missed} horários desde {last.success:%d/%m %H:%M})"
+            logger.info(f"🔁 {job.label}: {missed} horários perdidos agrupados em uma execução")
+        else:
+            reason = f"{job.label} ({slot:%d/%m %H:%M})"
+
+        started = datetime.now()
+        save_run(job.name, replace(last, started=started, finished=None, ok=None))
+
+        def execute() -> bool:
+            ok = False
+            try:
+                ok = job.run(reason)
+            finally:
+                save_run(job.name, LastRun(started, datetime.now(), ok, started if ok else last.success))
+                if detached:
+                    lock.release()
+            return ok
+
+        if job.background:
+            detached = True
+            _background[job.name] = threading.Thread(target=execute, name=f"job-{job.name}", daemon=True)
+            _background[job.name].start()
+            logger.info(f"🧵 {job.label}: em segundo plano (os próximos jobs não esperam)")
+            return None
+        return execute()
+    finally:
+        if not detached:
+            lock.release()
+
+
+def tick():
+    """Roda, em ordem, os jobs com horário pendente"""
+    for job in SCHEDULED_JOBS:
+        if is_due(job, datetime.now()):
+            run_scheduled(job, datetime.now())
+
+
+def start_leading():
+    """Virou líder: retoma do histórico (o que a líder anterior deixou pendente roda no próximo tick)"""
+    load_runs()
+    load_snapshots(datetime.now())
+    _hold_until.clear()
+    now = datetime.now()
+    for job in SCHEDULED_JOBS:
+        if not job.catch_up and is_due(job, now):
+            slot = job.slot(now)
+            _hold_until[job.name] = slot + job.period if job.period else now + timedelta(minutes=MIN_INTERVAL)
+            logger.info(f"⏭️ {job.label}: horário {slot:%d/%m %H:%M} perdido ignorado no startup")
+    for job in SCHEDULED_JOBS:
+        last = _runs.get(job.name, LastRun())
+        when = f"{last.success:%d/%m/%Y %H:%M}" if last.success else "nunca"
+        logger.info(f"🗓️ {job.label}: último sucesso {when}; {'pendente' if is_due(job, now) else 'em dia'}")
+
+
+def print_status():
+    load_runs()
+    now = datetime.now()
+    load_snapshots(now)
+    for job in SCHEDULED_JOBS:
+        last = _runs.get(job.name, LastRun())
+        success = f"{last.success:%d/%m/%Y %H:%M}" if last.success else "nunca"
+        attempt = f"{last.started:%d/%m/%Y %H:%M}" if last.started else "nunca"
+        result = {True: "✅", False: "❌", None: "⏳"}[last.ok] if last.started else "—"
+        slot = job.slot(now)
+        if is_due(job, now):
+            state = "🟡 pendente"
+        elif slot and last.ok is False and not (last.success and last.success >= slot):
+            state = "🔴 falhou"   # repete após SCHEDULER_RETRY_SECONDS
+        else:
+            state = "🟢 em dia"
+        print(f"{state:<12} {job.label:<16} último sucesso: {success:<17} última tentativa: {attempt} {result}")
+    if not ADAPTIVE:
         return
-    run_today_cycle(reason="Execução horária")
+    print("")
+    for source in TODAY_SOURCES:
+        due = next_due(source, now)
+        ratio = velocity_ratio(source, now)
+        pace = f"ritmo {ratio:.2f}x" if ratio is not None else "sem histórico"
+        print(f"   {source:<10} intervalo {interval(source, now).total_seconds() / 60:>4.0f} min ({pace:<13}) "
+              f"próxima {'agora' if due <= now else f'{due:%H:%M}'}"
+              f"{' 🛑 limite atingido' if over_cap(source, now) else ''}")
+    from storage import api_limit
+
+    for api in APIS:
+        print(f"   API {api:<7} {api_calls_today(api, now)} requisições hoje (limite: {api_limit(api) or 'nenhum'})")
 
 
 def main():
-    """Configura e inicia o scheduler contínuo."""
+    """Configura e inicia o scheduler contínuo (em espera enquanto outra réplica for líder)."""
 
     print("=" * 60)
     print("🤖 SCHEDULER - EXTRAÇÃO CONTÍNUA")
     print("=" * 60)
     print(f"Janela ativa: {ACTIVE_START_HOUR:02d}:00 até {ACTIVE_END_HOUR:02d}:59")
-    print("Frequência: de hora em hora (minuto 00)")
-    print(f"Startup hoje: {'SIM' if RUN_STARTUP_TODAY else 'NAO'}")
-    print(f"Startup ontem: {'SIM' if RUN_STARTUP_YESTERDAY else 'NAO'}")
+    if ADAPTIVE:
+        print(f"Frequência: adaptativa, de {MIN_INTERVAL} a {MAX_INTERVAL} min por fonte")
+    else:
+        print("Frequência: de hora em hora (minuto 00)")
+    print(f"Virada do dia: 00:{ROLLOVER_MINUTE:02d} | Verificação de ontem: {YESTERDAY_HOUR:02d}:00"
+          f" | Revalidação: {REVALIDATE_HOUR:02d}:00 | Buracos: {GAPS_HOUR:02d}:00"
+          f" | Players VTurb: {PLAYERS_HOUR:02d}:00")
+    print(f"Recuperar hoje perdido ao iniciar: {'SIM' if RUN_STARTUP_TODAY else 'NAO'}")
+    print(f"Recuperar ontem perdido ao iniciar: {'SIM' if RUN_STARTUP_YESTERDAY else 'NAO'}")
+    print(f"Eleição de líder: {settings.LEADER_BACKEND if settings.LEADER_ELECTION else 'NAO'}")
     print("Pressione Ctrl+C para parar")
     print("=" * 60)
 
-    if RUN_STARTUP_TODAY:
-        run_today_cycle(reason="Startup")
-    if RUN_STARTUP_YESTERDAY:
-        run_yesterday_backfill()
-
-    # Agenda execução horária.
-    schedule.every().hour.at(":00").do(hourly_job)
+    leadership = leader.make_lock(leader.LEADER_LOCK)
+    poll = settings.LEADER_POLL_SECONDS
+    standby_logged = False
 
     try:
         while True:
-            schedule.run_pending()
-            time.sleep(20)
+            if not leadership.held:
+                if not leadership.try_acquire():
+                    if not standby_logged:
+                        logger.info(f"🕐 Outra réplica é líder; em espera (nova tentativa a cada {poll:.0f}s)")
+                        standby_logged = True
+                    time.sleep(poll)
+                    continue
+                standby_logged = False
+                logger.info(f"👑 Réplica líder (pid {os.getpid()})")
+                start_leading()
+            elif not leadership.alive():
+                logger.error("❌ Liderança perdida; parando o agendamento até recuperar o lock")
+                continue
+
+            tick()
+            time.sleep(min(20, poll))
     except KeyboardInterrupt:
         print("\n⏹️ Scheduler finalizado.")
+    finally:
+        leadership.release()
 
 
 if __name__ == "__main__":
@@ -253,8 +1007,10 @@ if __name__ == "__main__":
         if TEST_INCLUDE_YESTERDAY:
             ok_yesterday = run_yesterday_backfill()
         sys.exit(0 if (ok_today and ok_yesterday) else 1)
+    elif mode == "status":
+        print_status()
     elif mode == "run":
         main()
     else:
-        print("Uso: python3 scheduler.py [run|test]")
+        print("Uso: python3 scheduler.py [run|test|status]")
         sys.exit(1)
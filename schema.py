@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Schema - Mapeamento declarativo payload da API -> colunas do banco
+Cada tabela é uma lista de Column (coluna, tipo, caminho no JSON, conversor). A mesma declaração
+gera as colunas/tipos do CREATE TABLE e do INSERT (storage.py), a chave e o SET do UPSERT,
+a projeção SQL do modo ELT (elt.py) e, compilada uma vez, a função que monta as tuplas (extratores).
+Uso: from schema import CAMPAIGNS, ADS, DASHBOARD, VTURB   |   CAMPAIGNS.rows(objetos, {"report_date": dia})
+"""
+
+from datetime import datetime
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+# =====================================================
+# COLUNAS
+# =====================================================
+
+# Tipos genéricos (mapeados por backend em storage.py)
+TEXT, INT, NUM, DATE, TIMESTAMP = "TEXT", "INT", "NUM", "DATE", "TIMESTAMP"
+
+# Conversores
+GET = "get"              # .get(chave, default)
+OR = "or"                # .get(chave) or default   (null da API vira default)
+CENTS = "cents"          # centavos -> reais; 0/None -> None (campanhas/anúncios)
+CENTS0 = "cents0"        # centavos -> reais; None -> 0 (dashboard)
+TS = "timestamp"         # string ISO (com -0300 ou Z) -> datetime; inválida -> None
+
+
+@dataclass(frozen=True)
+class Column:
+    """
+    path: "views.totalEvents" (aninhado) ou "adId|id" (primeiro não vazio).
+    ctx:  a coluna não vem do payload e sim do contexto da linha (report_date, player_id, ...).
+    """
+    name: str
+    type: str
+    path: Optional[str] = None
+    conv: str = GET
+    default: Any = None
+    ctx: Optional[str] = None
+
+
+def parse_datetime(value):
+    """Datetime da API (createdTime vem com -0300 nas campanhas e Z nos anúncios)"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(
+            value.replace("Z", "+00:00").replace("-0300", "-03:00").replace("-0200", "-02:00")
+        )
+    except Exception:
+        return None
+
+
+# =====================================================
+# COMPILAÇÃO
+# =====================================================
+
+def _prefixes(columns: Sequence[Column]) -> Dict[str, str]:
+    """Caminho intermediário ('statistics.pix') -> variável local que guarda o dict"""
+    prefixes: Dict[str, str] = {}
+    for col in columns:
+        for path in (col.path or "").split("|"):
+            keys = path.split(".")
+            for depth in range(1, len(keys)):
+                prefix = ".".join(keys[:depth])
+                prefixes.setdefault(prefix, f"_p{len(prefixes)}")
+    return prefixes
+
+
+def _access(path: str, prefixes: Dict[str, str], default: Any = None) -> str:
+    """'a.b.c' -> _p1g('c', default), com _p1g = o['a']['b'].get resolvido uma vez por objeto"""
+    parent, _, key = path.rpartition(".")
+    getter = f"{prefixes[parent]}g" if parent else "_g"
+    if default is None:
+        return f"{getter}({key!r})"
+    return f"{getter}({key!r}, {default!r})"
+
+
+def _python(col: Column, prefixes: Dict[str, str], contexts: Dict[str, str]) -> str:
+    """Expressão Python que calcula a coluna a partir do objeto o e do contexto"""
+    if col.ctx:
+        return contexts[col.ctx]
+    alternatives = col.path.split("|")
+    if len(alternatives) > 1:
+        value = "(" + " or ".join(_access(p, prefixes) for p in alternatives) + ")"
+        return f"({value} or {col.default!r})" if col.default is not None else value
+    if col.conv == GET:
+        return _access(col.path, prefixes, col.default)
+    if col.conv == OR:
+        return f"({_access(col.path, prefixes)} or {col.default!r})"
+    # Centavos inteiros: _v / 100 já é o float mais próximo de N,NN (= round(_v / 100, 2), sem o custo do round)
+    if col.conv == CENTS:
+        return f"((_v / 100 if type(_v) is int else round(_v / 100, 2)) if (_v := {_access(col.path, prefixes)}) else None)"
+    if col.conv == CENTS0:
+        return (f"((_v / 100 if type(_v) is int else round(_v / 100, 2)) "
+                f"if (_v := {_access(col.path, prefixes, 0)}) is not None else 0)")
+    if col.conv == TS:
+        return f"_ts({_access(col.path, prefixes)})"
+    raise ValueError(f"Conversor desconhecido: {col.conv} ({col.name})")
+
+
+def compile_rows(name: str, columns: Sequence[Column]) -> Tuple[Callable, Callable]:
+    """
+    Gera (uma vez) row(o, c) -> tupla e rows(objetos, c) -> [tuplas] com os acessos desenrolados:
+    sem laço por coluna e sem chamada de função por campo. Cada dict intermediário
+    ('statistics.pix') é lido uma vez por objeto e o contexto uma vez por chamada.
+    """
+    prefixes = _prefixes(columns)
+    contexts = {col.ctx: f"_c{i}" for i, col in enumerate(c for c in columns if c.ctx)}
+    exprs = ",\n            ".join(_python(col, prefixes, contexts) for col in columns)
+
+    def assign_prefixes(indent: str) -> str:
+        lines = [f"{indent}_g = o.get\n"]
+        for prefix, var in prefixes.items():
+            parent, _, key = prefix.rpartition(".")
+            lines.append(f"{indent}{var}g = {f'{prefixes[parent]}g' if parent else '_g'}({key!r}, _E).get\n")
+        return "".join(lines)
+
+    assign_contexts = "".join(f"    {var} = c[{ctx!r}]\n" for ctx, var in contexts.items())
+    source = (
+        f"def row(o, c):\n{assign_contexts}{assign_prefixes('    ')}"
+        f"    return (\n            {exprs},\n    )\n\n"
+        f"def rows(objects, c):\n{assign_contexts}"
+        f"    out = []\n    append = out.append\n    for o in objects:\n{assign_prefixes('        ')}"
+        f"        append((\n            {exprs},\n        ))\n    return out\n"
+    )
+    namespace: Dict[str, Any] = {"_E": {}, "_ts": parse_datetime}
+    exec(compile(source, f"<schema {name}>", "exec"), namespace)
+    return namespace["row"], namespace["rows"]
+
+
+@dataclass
+class Schema:
+    """Colunas de uma família de tabelas (*_today / *_history) e como preenchê-las"""
+    name: str
+    columns: List[Column]
+    key: Tuple[str, ...]                         # chave do histórico (UPSERT)
+    date: str                                    # coluna de partição por dia
+    update: List[str] = field(default_factory=list)    # SET coluna = EXCLUDED.coluna
+    touch: List[str] = field(default_factory=list)     # SET coluna = NOW()
+    defaulted: List[Tuple[str, str]] = field(default_factory=list)  # preenchidas pelo banco (DEFAULT now)
+
+    def __post_init__(self):
+        names = set(self.names) | {n for n, _ in self.defaulted}
+        unknown = [c for c in list(self.key) + self.update + self.touch + [self.date] if c not in names]
+        if unknown:
+            raise ValueError(f"Schema {self.name}: colunas desconhecidas {unknown}")
+        self._compiled = None
+
+    def compiled(self) -> Tuple[Callable, Callable]:
+        """(row, rows) gerados no primeiro uso: storage/elt só precisam dos nomes e tipos"""
+        if self._compiled is None:
+            self._compiled = compile_rows(self.name, self.columns)
+        return self._compiled
+
+    def row(self, obj: Dict[str, Any], context: Optional[Dict[str, Any]] = None) -> tuple:
+        """Tupla (ordem de names) de um objeto do payload"""
+        return self.compiled()[0](obj, context or {})
+
+    def rows(self, objects: Sequence[Dict[str, Any]], context: Optional[Dict[str, Any]] = None) -> List[tuple]:
+        """Tuplas de vários objetos (mesmo contexto)"""
+        return self.compiled()[1](objects, context or {})
+
+    @property
+    def names(self) -> List[str]:
+        """Colunas do INSERT, na ordem das tuplas"""
+        return [c.name for c in self.columns]
+
+    @property
+    def types(self) -> List[Tuple[str, str]]:
+        return [(c.name, c.type) for c in self.columns]
+
+
+# =====================================================
+# TABELAS
+# =====================================================
+
+# Métricas comuns a campanhas e anúncios (search-objects)
+OBJECT_METRICS = [
+    Column("spend", NUM, "spend", CENTS),
+    Column("revenue", NUM, "revenue", CENTS),
+    Column("gross_revenue", NUM, "grossRevenue", CENTS),
+    Column("profit", NUM, "profit", CENTS),
+    Column("fees", NUM, "fees", CENTS),
+    Column("tax", NUM, "tax", CENTS),
+    Column("product_costs", NUM, "productCosts", CENTS),
+    Column("roas", NUM, "roas", default=0),
+    Column("roi", NUM, "roi", default=0),
+    Column("profit_margin", NUM, "profitMargin", default=0),
+    Column("cpa", NUM, "cpa", CENTS),
+    Column("cpm", NUM, "cpm", CENTS),
+    Column("cpc", NUM, "costPerInlineLinkClick", CENTS),
+    Column("ctr", NUM, "inlineLinkClickCtr", default=0),
+    Column("impressions", INT, "impressions", default=0),
+    Column("clicks", INT, "inlineLinkClicks", default=0),
+    Column("frequency", NUM, "frequency", default=0),
+    Column("total_orders", INT, "totalOrdersCount", default=0),
+    Column("approved_orders", INT, "approvedOrdersCount", default=0),
+    Column("pending_orders", INT, "pendingOrdersCount", default=0),
+    Column("refunded_orders", INT, "refundedOrdersCount", default=0),
+    Column("refused_orders", INT, "refusedOrdersCount", default=0),
+    Column("sales_from_facebook", INT, "salesFromFacebook", default=0),
+    Column("pending_revenue", NUM, "pendingRevenue", CENTS),
+    Column("refunded_revenue", NUM, "refundedRevenue", CENTS),
+    Column("initiate_checkout", INT, "initiateCheckout", default=0),
+    Column("cost_per_checkout", NUM, "costPerInitiateCheckout", CENTS),
+    Column("checkout_conversion", NUM, "checkoutConversion", default=0),
+    Column("click_conversion", NUM, "clickConversion", default=0),
+    Column("landing_page_views", INT, "landingPageViews", default=0),
+    Column("leads", INT, "leads", default=0),
+    Column("cost_per_lead", NUM, "costPerLead", CENTS),
+    Column("video_views", INT, "videoViews", default=0),
+    Column("video_75_watched", INT, "video75Watched", default=0),
+    Column("video_3s_views", INT, "videoViews3Seconds", default=0),
+    Column("hook_rate", NUM, "hook", default=0),
+    Column("retention", NUM, "retention", default=0),
+    Column("hook_play_rate", NUM, "hookPlayRate", default=0),
+    Column("conversations", INT, "conversations", default=0),
+    Column("cost_per_conversation", NUM, "costPerConversation", CENTS),
+    Column("created_time", TIMESTAMP, "createdTime", TS),
+]
+
+CAMPAIGNS = Schema(
+    name="campaigns",
+    columns=[
+        Column("campaign_id", TEXT, "id"),
+        Column("report_date", DATE, ctx="report_date"),
+        Column("name", TEXT, "name"),
+        Column("level", TEXT, "level", default="campaign"),
+        Column("status", TEXT, "status"),
+        Column("effective_status", TEXT, "effectiveStatus"),
+        Column("account_id", TEXT, "accountId"),
+        Column("ca", TEXT, "ca"),
+        Column("profile_id", TEXT, "profileId"),
+        Column("daily_budget", NUM, "dailyBudget", CENTS),
+        Column("lifetime_budget", NUM, "lifetimeBudget", CENTS),
+    ] + OBJECT_METRICS,
+    key=("campaign_id", "report_date"),
+    date="report_date",
+    update=[
+        "name", "status", "effective_status", "spend", "revenue", "gross_revenue",
+        "profit", "fees", "roas", "roi", "approved_orders",
+    ],
+)
+
+ADS = Schema(
+    name="ads",
+    columns=[
+        Column("ad_id", TEXT, "adId|id"),
+        Column("report_date", DATE, ctx="report_date"),
+        Column("campaign_id", TEXT, "campaignId"),
+        Column("adset_id", TEXT, "adsetId"),
+        Column("account_id", TEXT, "accountId"),
+        Column("profile_id", TEXT, "profileId"),
+        Column("ca", TEXT, "ca"),
+        Column("name", TEXT, "name"),
+        Column("level", TEXT, "level", default="ad"),
+        Column("status", TEXT, "status"),
+        Column("effective_status", TEXT, "effectiveStatus"),
+    ] + OBJECT_METRICS,
+    key=("ad_id", "report_date"),
+    date="report_date",
+    update=[
+        "name", "status", "effective_status", "spend", "revenue", "gross_revenue",
+        "profit", "fees", "roas", "roi", "profit_margin", "cpa", "impressions", "clicks",
+        "total_orders", "approved_orders", "pending_orders", "initiate_checkout",
+        "video_views", "hook_rate", "retention", "hook_play_rate",
+    ],
+)
+
+# Uma linha por fonte de tráfego, a partir do payload já consolidado entre dashboards
+DASHBOARD = Schema(
+    name="dashboard",
+    columns=[
+        Column("report_date", DATE, ctx="report_date"),
+        Column("traffic_source", TEXT, ctx="traffic_source"),
+        Column("total_orders", INT, "ordersCount.total", default=0),
+        Column("approved_orders", INT, "ordersCount.approved", default=0),
+        Column("pending_orders", INT, "ordersCount.pending", default=0),
+        Column("refunded_orders", INT, "ordersCount.refunded", default=0),
+        Column("chargedback_orders", INT, "ordersCount.chargedback", default=0),
+        Column("total_credit_card", INT, "ordersCount.totalCreditCard", default=0),
+        Column("approved_credit_card", INT, "ordersCount.approvedCreditCard", default=0),
+        Column("refused_credit_card", INT, "ordersCount.refusedCreditCard", default=0),
+        Column("gross_revenue", NUM, "comissions.gross", CENTS0),
+        Column("net_revenue", NUM, "comissions.net", CENTS0),
+        Column("pending_revenue", NUM, "comissions.pendingGrossRevenue", CENTS0),
+        Column("refunded_revenue", NUM, "comissions.refundedGrossRevenue", CENTS0),
+        Column("chargeback_revenue", NUM, "comissions.chargebackGrossRevenue", CENTS0),
+        Column("ads_spent", NUM, "ads.spent", CENTS0),
+        Column("ads_clicks", INT, "ads.clicks", default=0),
+        Column("ads_page_views", INT, "ads.pageViews", default=0),
+        Column("ads_initiate_checkouts", INT, "ads.initiateCheckouts", default=0),
+        Column("ads_leads", INT, "ads.leads", default=0),
+        Column("profit", NUM, "analytics.profit", CENTS0),
+        Column("roi", NUM, "analytics.roi", default=0),
+        Column("roas", NUM, "analytics.roas", default=0),
+        Column("profit_margin", NUM, "analytics.profitMargin", default=0),
+        Column("cpa", NUM, "analytics.cpa", CENTS0),
+        Column("avg_ticket", NUM, "analytics.avgTicket", CENTS0),
+        Column("cost_per_lead", NUM, "analytics.costPerLead", CENTS0),
+        Column("fees", NUM, "analytics.fees", CENTS0),
+        Column("taxes", NUM, "analytics.taxes", CENTS0),
+        Column("pix_approved_orders", INT, "statistics.pix.approved.ordersCount", default=0),
+        Column("pix_approved_revenue", NUM, "statistics.pix.approved.comission", CENTS0),
+        Column("pix_pending_orders", INT, "statistics.pix.pending.ordersCount", default=0),
+        Column("pix_pending_revenue", NUM, "statistics.pix.pending.comission", CENTS0),
+        Column("card_approved_orders", INT, "statistics.card.approved.ordersCount", default=0),
+        Column("card_approved_revenue", NUM, "statistics.card.approved.comission", CENTS0),
+        Column("card_refused_orders", INT, "statistics.card.refused.ordersCount", default=0),
+        Column("card_refused_revenue", NUM, "statistics.card.refused.comission", CENTS0),
+    ],
+    key=("report_date", "traffic_source"),
+    date="report_date",
+    update=[
+        "total_orders", "approved_orders", "pending_orders", "gross_revenue",
+        "net_revenue", "ads_spent", "profit", "roi", "roas",
+    ],
+    touch=["extraction_timestamp"],
+    defaulted=[("extraction_timestamp", TIMESTAMP)],
+)
+
+
+def _vturb_events() -> List[Column]:
+    columns = []
+    for event in ("views", "plays", "finishes", "clicks", "conversions"):
+        columns += [
+            Column(f"total_{event}", INT, f"{event}.totalEvents", default=0),
+            Column(f"total_unique_device_{event}", INT, f"{event}.totalUniqDeviceEvents", default=0),
+            Column(f"total_unique_session_{event}", INT, f"{event}.totalUniqSessionEvents", default=0),
+        ]
+    return columns
+
+
+# Mesma ordem dos campos de vturb_extract.PlayerStats
+VTURB = Schema(
+    name="vturb",
+    columns=[
+        Column("player_id", TEXT, ctx="player_id"),
+        Column("stats_date", DATE, ctx="stats_date"),
+        Column("extraction_timestamp", TIMESTAMP, ctx="extraction_timestamp"),
+        Column("start_datetime", TIMESTAMP, ctx="start_datetime"),
+        Column("end_datetime", TIMESTAMP, ctx="end_datetime"),
+    ] + _vturb_events() + [
+        Column("total_amount_brl", NUM, "conversions.totalAmountBrl", OR, 0),
+        Column("total_amount_usd", NUM, "conversions.totalAmountUsd", OR, 0),
+        Column("total_amount_eur", NUM, "conversions.totalAmountEur", OR, 0),
+        Column("overall_play_rate", NUM, "playRate.overallPlayRate", OR, 0),
+        Column("overall_conversion_rate", NUM, "conversionRate.overallConversionRate", OR, 0),
+        Column("average_watched_time", NUM, "engagement_stats.average_watched_time", OR, 0),
+        Column("engagement_rate", NUM, "engagement_stats.engagement_rate", OR, 0),
+        Column("pitch_time_retention_rate", NUM, "engagement_stats.pitch_time_retention_rate", OR, 0),
+    ],
+    key=("player_id", "stats_date"),
+    date="stats_date",
+    update=[
+        "extraction_timestamp", "total_views", "total_unique_device_views",
+        "total_plays", "total_unique_device_plays", "total_finishes", "total_clicks",
+        "total_conversions", "total_amount_brl", "overall_play_rate", "overall_conversion_rate",
+        "average_watched_time", "engagement_rate", "pitch_time_retention_rate",
+    ],
+)
+
+SCHEMAS: Dict[str, Schema] = {s.name: s for s in (CAMPAIGNS, ADS, DASHBOARD, VTURB)}
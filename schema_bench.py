@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+Schema Bench - Linhas compiladas (schema.py) x funções escritas à mão
+Gera payloads sintéticos no formato da API, monta as tuplas pelos dois caminhos, confere
+que são idênticas e mede o tempo de cada um (melhor de N rodadas).
+As funções de referência são as que os extratores usavam antes de schema.py.
+Uso: python3 schema_bench.py [objetos] [--runs N]
+"""
+
+import sys
+import time
+from datetime import datetime, date
+from dataclasses import astuple
+from typing import Any, Callable, Dict, List
+
+from schema import CAMPAIGNS, ADS, DASHBOARD, VTURB
+from vturb_extract import PlayerStats, row_context
+
+DEFAULT_OBJECTS = 20000
+DEFAULT_RUNS = 5
+
+
+# =====================================================
+# REFERÊNCIA (funções escritas à mão)
+# =====================================================
+
+def _cents(value):
+    """Converte centavos para decimal"""
+    return round(value / 100, 2) if value else None
+
+
+def _parse_datetime_campaign(value):
+    """Parse de datetime string"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("-0300", "-03:00").replace("-0200", "-02:00"))
+    except Exception:
+        return None
+
+
+def legacy_campaign_values(campaigns: list, report_date: date) -> list:
+    """Prepara valores das campanhas para inserção"""
+    values = []
+    for c in campaigns:
+        values.append((
+            c.get("id"),
+            report_date,
+            c.get("name"),
+            c.get("level", "campaign"),
+            c.get("status"),
+            c.get("effectiveStatus"),
+            c.get("accountId"),
+            c.get("ca"),
+            c.get("profileId"),
+            _cents(c.get("dailyBudget")),
+            _cents(c.get("lifetimeBudget")),
+            _cents(c.get("spend")),
+            _cents(c.get("revenue")),
+            _cents(c.get("grossRevenue")),
+            _cents(c.get("profit")),
+            _cents(c.get("fees")),
+            _cents(c.get("tax")),
+            _cents(c.get("productCosts")),
+            c.get("roas", 0),
+            c.get("roi", 0),
+            c.get("profitMargin", 0),
+            _cents(c.get("cpa")),
+            _cents(c.get("cpm")),
+            _cents(c.get("costPerInlineLinkClick")),
+            c.get("inlineLinkClickCtr", 0),
+            c.get("impressions", 0),
+            c.get("inlineLinkClicks", 0),
+            c.get("frequency", 0),
+            c.get("totalOrdersCount", 0),
+            c.get("approvedOrdersCount", 0),
+            c.get("pendingOrdersCount", 0),
+            c.get("refundedOrdersCount", 0),
+            c.get("refusedOrdersCount", 0),
+            c.get("salesFromFacebook", 0),
+            _cents(c.get("pendingRevenue")),
+            _cents(c.get("refundedRevenue")),
+            c.get("initiateCheckout", 0),
+            _cents(c.get("costPerInitiateCheckout")),
+            c.get("checkoutConversion", 0),
+            c.get("clickConversion", 0),
+            c.get("landingPageViews", 0),
+            c.get("leads", 0),
+            _cents(c.get("costPerLead")),
+            c.get("videoViews", 0),
+            c.get("video75Watched", 0),
+            c.get("videoViews3Seconds", 0),
+            c.get("hook", 0),
+            c.get("retention", 0),
+            c.get("hookPlayRate", 0),
+            c.get("conversations", 0),
+            _cents(c.get("costPerConversation")),
+            _parse_datetime_campaign(c.get("createdTime")),
+        ))
+    return values
+
+
+def _parse_datetime_ad(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except Exception:
+        return None
+
+
+def legacy_ad_values(ads: list, report_date: date) -> list:
+    """Prepara valores dos anúncios para inserção"""
+    values = []
+    for a in ads:
+        values.append((
+            a.get("adId") or a.get("id"),
+            report_date,
+            a.get("campaignId"),
+            a.get("adsetId"),
+            a.get("accountId"),
+            a.get("profileId"),
+            a.get("ca"),
+            a.get("name"),
+            a.get("level", "ad"),
+            a.get("status"),
+            a.get("effectiveStatus"),
+            _cents(a.get("spend")),
+            _cents(a.get("revenue")),
+            _cents(a.get("grossRevenue")),
+            _cents(a.get("profit")),
+            _cents(a.get("fees")),
+            _cents(a.get("tax")),
+            _cents(a.get("productCosts")),
+            a.get("roas", 0),
+            a.get("roi", 0),
+            a.get("profitMargin", 0),
+            _cents(a.get("cpa")),
+            _cents(a.get("cpm")),
+            _cents(a.get("costPerInlineLinkClick")),
+            a.get("inlineLinkClickCtr", 0),
+            a.get("impressions", 0),
+            a.get("inlineLinkClicks", 0),
+            a.get("frequency", 0),
+            a.get("totalOrdersCount", 0),
+            a.get("approvedOrdersCount", 0),
+            a.get("pendingOrdersCount", 0),
+            a.get("refundedOrdersCount", 0),
+            a.get("refusedOrdersCount", 0),
+            a.get("salesFromFacebook", 0),
+            _cents(a.get("pendingRevenue")),
+            _cents(a.get("refundedRevenue")),
+            a.get("initiateCheckout", 0),
+            _cents(a.get("costPerInitiateCheckout")),
+            a.get("checkoutConversion", 0),
+            a.get("clickConversion", 0),
+            a.get("landingPageViews", 0),
+            a.get("leads", 0),
+            _cents(a.get("costPerLead")),
+            a.get("videoViews", 0),
+            a.get("video75Watched", 0),
+            a.get("videoViews3Seconds", 0),
+            a.get("hook", 0),
+            a.get("retention", 0),
+            a.get("hookPlayRate", 0),
+            a.get("conversations", 0),
+            _cents(a.get("costPerConversation")),
+            _parse_datetime_ad(a.get("createdTime")),
+        ))
+    return values
+
+
+def _cents0(value):
+    """Converte centavos para decimal"""
+    if value is None:
+        return 0
+    return round(value / 100, 2)
+
+
+def legacy_dashboard_values(data: Dict, report_date: date, traffic_source: str) -> tuple:
+    """Prepara valores para inserção"""
+
+    orders = data.get("ordersCount", {})
+    comissions = data.get("comissions", {})
+    ads = data.get("ads", {})
+    analytics = data.get("analytics", {})
+    statistics = data.get("statistics", {})
+    pix = statistics.get("pix", {})
+    card = statistics.get("card", {})
+
+    return (
+        report_date,
+        traffic_source,
+        # Orders
+        orders.get("total", 0),
+        orders.get("approved", 0),
+        orders.get("pending", 0),
+        orders.get("refunded", 0),
+        orders.get("chargedback", 0),
+        # Credit Card
+        orders.get("totalCreditCard", 0),
+        orders.get("approvedCreditCard", 0),
+        orders.get("refusedCreditCard", 0),
+        # Faturamento
+        _cents0(comissions.get("gross", 0)),
+        _cents0(comissions.get("net", 0)),
+        _cents0(comissions.get("pendingGrossRevenue", 0)),
+        _cents0(comissions.get("refundedGrossRevenue", 0)),
+        _cents0(comissions.get("chargebackGrossRevenue", 0)),
+        # Ads
+        _cents0(ads.get("spent", 0)),
+        ads.get("clicks", 0),
+        ads.get("pageViews", 0),
+        ads.get("initiateCheckouts", 0),
+        ads.get("leads", 0),
+        # Métricas
+        _cents0(analytics.get("profit", 0)),
+        analytics.get("roi", 0),
+        analytics.get("roas", 0),
+        analytics.get("profitMargin", 0),
+        _cents0(analytics.get("cpa", 0)),
+        _cents0(analytics.get("avgTicket", 0)),
+        _cents0(analytics.get("costPerLead", 0)),
+        # Fees/Taxes
+        _cents0(analytics.get("fees", 0)),
+        _cents0(analytics.get("taxes", 0)),
+        # PIX
+        pix.get("approved", {}).get("ordersCount", 0),
+        _cents0(pix.get("approved", {}).get("comission", 0)),
+        pix.get("pending", {}).get("ordersCount", 0),
+        _cents0(pix.get("pending", {}).get("comission", 0)),
+        # Card
+        card.get("approved", {}).get("ordersCount", 0),
+        _cents0(card.get("approved", {}).get("comission", 0)),
+        card.get("refused", {}).get("ordersCount", 0),
+        _cents0(card.get("refused", {}).get("comission", 0)),
+    )
+
+
+def legacy_player_stats(raw_data: Dict, player_id: str, target_date: date) -> tuple:
+    """Converte dados da API para PlayerStats"""
+
+    views = raw_data.get('views', {})
+    plays = raw_data.get('plays', {})
+    finishes = raw_data.get('finishes', {})
+    clicks = raw_data.get('clicks', {})
+    conversions = raw_data.get('conversions', {})
+    play_rate = raw_data.get('playRate', {})
+    conversion_rate = raw_data.get('conversionRate', {})
+    engagement = raw_data.get('engagement_stats', {})
+
+    return astuple(PlayerStats(
+        player_id=player_id,
+        stats_date=target_date,
+        extraction_timestamp=datetime.now().isoformat(),
+        start_datetime=f"{target_date.strftime('%Y-%m-%d')} 00:00:00",
+        end_datetime=f"{target_date.strftime('%Y-%m-%d')} 23:59:59",
+
+        total_views=views.get('totalEvents', 0),
+        total_unique_device_views=views.get('totalUniqDeviceEvents', 0),
+        total_unique_session_views=views.get('totalUniqSessionEvents', 0),
+
+        total_plays=plays.get('totalEvents', 0),
+        total_unique_device_plays=plays.get('totalUniqDeviceEvents', 0),
+        total_unique_session_plays=plays.get('totalUniqSessionEvents', 0),
+
+        total_finishes=finishes.get('totalEvents', 0),
+        total_unique_device_finishes=finishes.get('totalUniqDeviceEvents', 0),
+        total_unique_session_finishes=finishes.get('totalUniqSessionEvents', 0),
+
+        total_clicks=clicks.get('totalEvents', 0),
+        total_unique_device_clicks=clicks.get('totalUniqDeviceEvents', 0),
+        total_unique_session_clicks=clicks.get('totalUniqSessionEvents', 0),
+
+        total_conversions=conversions.get('totalEvents', 0),
+        total_unique_device_conversions=conversions.get('totalUniqDeviceEvents', 0),
+        total_unique_session_conversions=conversions.get('totalUniqSessionEvents', 0),
+        total_amount_brl=conversions.get('totalAmountBrl', 0) or 0,
+        total_amount_usd=conversions.get('totalAmountUsd', 0) or 0,
+        total_amount_eur=conversions.get('totalAmountEur', 0) or 0,
+
+        overall_play_rate=play_rate.get('overallPlayRate', 0) or 0,
+        overall_conversion_rate=conversion_rate.get('overallConversionRate', 0) or 0,
+
+        average_watched_time=engagement.get('average_watched_time', 0) or 0,
+        engagement_rate=engagement.get('engagement_rate', 0) or 0,
+        pitch_time_retention_rate=engagement.get('pitch_time_retention_rate', 0) or 0
+    ))
+
+
+# =====================================================
+# PAYLOADS SINTÉTICOS
+# =====================================================
+
+def synthetic_object(i: int, created_suffix: str) -> Dict[str, Any]:
+    """Objeto de search-objects (campanha/anúncio); alguns campos ausentes ou zerados"""
+    obj = {
+        "id": f"obj-{i}", "adId": f"ad-{i}" if i % 3 else None, "campaignId": f"c-{i % 50}",
+        "adsetId": f"s-{i % 200}", "name": f"Objeto {i}", "status": "ACTIVE",
+        "effectiveStatus": "ACTIVE", "accountId": "acc", "ca": "ca", "profileId": "prof",
+        "dailyBudget": 10000 + i, "spend": i * 37, "revenue": i * 91, "grossRevenue": i * 95,
+        "profit": i * 54, "fees": i % 7, "tax": 0, "productCosts": i * 3 + (0.5 if i % 10 == 0 else 0),
+        "roas": 2.4, "roi": 1.4, "profitMargin": 0.59, "cpa": 1500, "cpm": 2300,
+        "costPerInlineLinkClick": 87, "inlineLinkClickCtr": 1.3, "impressions": i * 11,
+        "inlineLinkClicks": i % 101, "frequency": 1.1, "totalOrdersCount": i % 13,
+        "approvedOrdersCount": i % 11, "pendingOrdersCount": i % 3, "refundedOrdersCount": 0,
+        "salesFromFacebook": i % 5, "pendingRevenue": i * 2, "initiateCheckout": i % 17,
+        "costPerInitiateCheckout": 430, "checkoutConversion": 0.3, "clickConversion": 0.1,
+        "landingPageViews": i % 89, "leads": i % 4, "videoViews": i * 5, "video75Watched": i,
+        "videoViews3Seconds": i * 3, "hook": 0.42, "retention": 0.18, "hookPlayRate": 0.33,
+        "conversations": 0, "createdTime": f"2026-01-{1 + i % 28:02d}T10:15:00{created_suffix}",
+    }
+    if i % 4 == 0:
+        obj.pop("level", None)
+        obj.pop("lifetimeBudget", None)
+    return obj
+
+
+def synthetic_dashboard(i: int) -> Dict[str, Any]:
+    """Payload de dashboard-info consolidado"""
+    return {
+        "ordersCount": {"total": i, "approved": i // 2, "pending": i % 5, "refunded": 1,
+                        "totalCreditCard": i // 3, "approvedCreditCard": i // 4},
+        "comissions": {"gross": i * 1000, "net": i * 900, "pendingGrossRevenue": i * 10},
+        "ads": {"spent": i * 400, "clicks": i * 7, "pageViews": i * 5, "leads": i % 9},
+        "analytics": {"profit": i * 500, "roi": 1.2, "roas": 2.5, "cpa": 800.25 + i, "avgTicket": 9700},
+        "statistics": {"pix": {"approved": {"ordersCount": i // 5, "comission": i * 200}},
+                       "card": {"refused": {"ordersCount": 2, "comission": 1200}}},
+    }
+
+
+def synthetic_player(i: int) -> Dict[str, Any]:
+    """Payload de player_stats"""
+    events = {"totalEvents": i * 10, "totalUniqDeviceEvents": i * 8, "totalUniqSessionEvents": i * 9}
+    return {
+        "views": dict(events), "plays": dict(events), "finishes": {"totalEvents": i},
+        "clicks": dict(events), "conversions": dict(events, totalAmountBrl=i * 97.0, totalAmountUsd=None),
+        "playRate": {"overallPlayRate": 0.41}, "conversionRate": {"overallConversionRate": None},
+        "engagement_stats": {"average_watched_time": 61.5, "engagement_rate": 0.37},
+    }
+
+
+# =====================================================
+# BENCH
+# =====================================================
+
+def best_of(fn: Callable[[], List[tuple]], runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def cases(count: int) -> Dict[str, Dict[str, Callable[[], List[tuple]]]]:
+    """Schema -> (referência, compilado), ambos devolvendo a lista de tuplas"""
+    day = date(2026, 1, 15)
+    campaigns = [synthetic_object(i, "-0300") for i in range(count)]
+    ads = [synthetic_object(i, "Z") for i in range(count)]
+    dashboards = [synthetic_dashboard(i) for i in range(count)]
+    players = [synthetic_player(i) for i in range(count)]
+
+    # extraction_timestamp é datetime.now(): fixado para as duas versões serem comparáveis
+    fixed_now = datetime(2026, 1, 15, 12, 0, 0).isoformat()
+
+    def legacy_players():
+        rows = [legacy_player_stats(p, f"p{i}", day) for i, p in enumerate(players)]
+        return [r[:2] + (fixed_now,) + r[3:] for r in rows]
+
+    def compiled_players():
+        rows = []
+        for i, p in enumerate(players):
+            ctx = row_context(f"p{i}", day)
+            ctx["extraction_timestamp"] = fixed_now
+            rows.append(VTURB.row(p, ctx))
+        return rows
+
+    return {
+        CAMPAIGNS.name: {
+            "legacy": lambda: legacy_campaign_values(campaigns, day),
+            "compiled": lambda: CAMPAIGNS.rows(campaigns, {"report_date": day}),
+        },
+        ADS.name: {
+            "legacy": lambda: legacy_ad_values(ads, day),
+            "compiled": lambda: ADS.rows(ads, {"report_date": day}),
+        },
+        DASHBOARD.name: {
+            "legacy": lambda: [legacy_dashboard_values(d, day, "Meta") for d in dashboards],
+            "compiled": lambda: [DASHBOARD.row(d, {"report_date": day, "traffic_source": "Meta"}) for d in dashboards],
+        },
+        VTURB.name: {
+            "legacy": legacy_players,
+            "compiled": compiled_players,
+        },
+    }
+
+
+def benchmark(count: int, runs: int) -> bool:
+    """Imprime a tabela de tempos; False se alguma versão compilada divergir da referência"""
+    print("=" * 70)
+    print(f"⏱️ SCHEMA BENCH - {count} objetos por schema, melhor de {runs}")
+    print("=" * 70)
+    print(f"{'schema':<12}{'à mão':>12}{'compilado':>12}{'ganho':>9}   resultado")
+
+    ok = True
+    for name, fns in cases(count).items():
+        same = fns["legacy"]() == fns["compiled"]()
+        ok &= same
+        legacy = best_of(fns["legacy"], runs)
+        compiled = best_of(fns["compiled"], runs)
+        print(f"{name:<12}{legacy * 1000:>9.1f} ms{compiled * 1000:>9.1f} ms{legacy / compiled:>8.2f}x   "
+              f"{'✅ idêntico' if same else '❌ diverge'}")
+
+    print("=" * 70)
+    return ok
+
+
+# =====================================================
+# MAIN
+# =====================================================
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    runs = DEFAULT_RUNS
+    if "--runs" in args:
+        idx = args.index("--runs")
+        runs = int(args[idx + 1])
+        del args[idx:idx + 2]
+
+    count = int(args[0]) if args else DEFAULT_OBJECTS
+    sys.exit(0 if benchmark(count, runs) else 1)
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Settings - Configuração única e preguiçosa (.env + variáveis de ambiente)
+Importar um módulo não lê .env, não abre sessão/conexão e não loga nada: cada valor é
+calculado no primeiro acesso (settings.DB_CONFIG, settings.UTMIFY_TOKEN, ...) e guardado.
+O .env é lido uma vez por processo; valores não vazios dele prevalecem sobre o ambiente.
+Uso: from settings import settings  |  python3 settings.py   (mostra a configuração efetiva)
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, List
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# GRITTI_ENV_FILE: .env próprio (tokens isolados por tenant, ver tenants.py)
+ENV_FILE = os.getenv("GRITTI_ENV_FILE") or os.path.join(SCRIPT_DIR, ".env")
+# GRITTI_TENANT: processo de um tenant; os padrões da conta principal (login, organização,
+# dashboards, players) deixam de valer
+TENANT_VAR = "GRITTI_TENANT"
+
+
+# =====================================================
+# CARREGAR .ENV
+# =====================================================
+
+_env_loaded = False
+_env_lock = threading.Lock()
+
+
+def read_env_file(path: str = ENV_FILE) -> Dict[str, str]:
+    """Pares chave=valor do .env (sem aplicar no ambiente)"""
+    env_vars = {}
+    if not os.path.exists(path):
+        return env_vars
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#") and "=" in line:
+                key, value = line.split("=", 1)
+                env_vars[key.strip()] = value.strip()
+    return env_vars
+
+
+def load_env(force: bool = False):
+    """Aplica o .env em os.environ (uma vez por processo; force=True relê)"""
+    global _env_loaded
+    with _env_lock:
+        if _env_loaded and not force:
+            return
+        for key, value in read_env_file().items():
+            if value:
+                os.environ[key] = value
+        _env_loaded = True
+
+
+def env(key: str, default: str = "") -> str:
+    value = (os.getenv(key) or "").strip()
+    return value if value else default
+
+
+def env_int(key: str, default: int) -> int:
+    return int(env(key, str(default)))
+
+
+def env_float(key: str, default: float) -> float:
+    return float(env(key, str(default)))
+
+
+def env_bool(key: str, default: bool = False) -> bool:
+    return env(key, "true" if default else "false").lower() in ("1", "true", "yes", "on")
+
+
+def env_list(key: str, default: List[str]) -> List[str]:
+    return [v.strip() for v in env(key, ",".join(default)).split(",") if v.strip()]
+
+
+def account(default):
+    """Padrão da conta principal; vazio no processo de um tenant (nunca usa a conta de outro cliente)"""
+    if env(TENANT_VAR):
+        return [] if isinstance(default, list) else ""
+    return default
+
+
+# =====================================================
+# CAMPOS
+# =====================================================
+
+def _db_config() -> Dict[str, Any]:
+    config = {
+        "host": os.getenv("DB_HOST"),
+        "port": os.getenv("DB_PORT"),
+        "database": os.getenv("DB_NAME"),
+        "user": os.getenv("DB_USER"),
+        "password": os.getenv("DB_PASSWORD"),
+    }
+    # Tabelas de um tenant em schema próprio (Postgres)
+    if env("DB_SCHEMA"):
+        config["options"] = f"-c search_path={env('DB_SCHEMA')},public"
+    return config
+
+
+def _dashboard_ids() -> List[str]:
+    return env_list("UTMIFY_DASHBOARD_IDS", account([
+        env("UTMIFY_DASHBOARD_ID", "66668acc6670e6d0c7a17699"),
+        "697179f7cfa58e5d2a21afdf",
+        "6972dc7473de5f488a3aee2b",
+    ]))
+
+
+def _player_ids() -> List[str]:
+    return env_list("VTURB_PLAYER_IDS", account([
+        "693a3e45e891e679e7727765",
+        "691b21ad05cbd5105c709802",
+        "68d5efd4861b70626857ef1e",
+        "68d5f040861b70626857efc5",
+        "68d5f0d8b6d4ef5b76bf6e3b",
+        "68d5f1141f0c16bccf4f42e1",
+        "695bd291707d41fbaa79efa1",
+        "6985f7228fd75d51815b9eab",
+        "68d7340b232c1a965f3b8b29",
+        "68d7367752020545d65d1933",
+        "68d738dda4bea31e50e65a62",
+        "696efdd3e1aa589ccc4d9028",
+        "696efddaa4304f1d777b5f94",
+        "696efde0edc67029da1c04a6",
+        "696efde6521058214caadf91",
+        "696efdeea4304f1d777b5fee",
+        "69725ecbe6996b070b27bf65",
+        "69725f2ad310ef352e0255e2",
+        "6972e6ae938018005141d189",
+        "6972e6cdc8196f1982aab633",
+        "6972677e109c2c0df2550c91",
+        "697267844a89073d7e1f1901",
+        "6972678b9cf9fc801ee7b9c8",
+        "6938cff1e45bb9548f311ced",
+        "6939e2dfe891e679e77211e2",
+        "69409ba79ff1b4f2bbc57b76",
+        "694ab5f5a54e8f46c18817a3",
+        "694ab6cea54e8f46c18818d4",
+        "694ab7a171611df8184b1a76",
+        "694ab87ca54e8f46c1881b03",
+        "694acdb1ed1852c895dadb7d",
+        "694ace8390b70171e37c03c8",
+        "694acf5aa54e8f46c18834a3",
+        "694ad02f71611df8184b3543",
+        "694ad10963476f09ce028807",
+    ]))
+
+
+def _analytics_cache_path() -> str:
+    # Com STORAGE_BACKEND=duckdb o próprio banco já é o cache
+    if env("ANALYTICS_CACHE_PATH"):
+        return env("ANALYTICS_CACHE_PATH")
+    if settings.STORAGE_BACKEND == "duckdb":
+        return settings.DUCKDB_PATH
+    return os.path.join(SCRIPT_DIR, "gritti_cache.duckdb")
+
+
+def _leader_backend() -> str:
+    # Advisory lock só existe no Postgres; sqlite/duckdb rodam em um host só (flock em arquivo)
+    return env("LEADER_BACKEND", "postgres" if settings.STORAGE_BACKEND == "postgres" else "file").lower()
+
+
+# Nome -> função que calcula o valor (chamada só no primeiro acesso)
+FIELDS: Dict[str, Callable[[], Any]] = {
+    # Banco
+    "DB_CONFIG": _db_config,
+    "DB_SCHEMA": lambda: env("DB_SCHEMA"),
+    "STORAGE_BACKEND": lambda: env("STORAGE_BACKEND", "postgres").lower(),
+    "SQLITE_PATH": lambda: env("SQLITE_PATH", os.path.join(SCRIPT_DIR, "gritti.sqlite")),
+    "DUCKDB_PATH": lambda: env("DUCKDB_PATH", os.path.join(SCRIPT_DIR, "gritti.duckdb")),
+    # Abaixo disso o Postgres usa INSERT multi-VALUES; acima, COPY
+    "COPY_THRESHOLD": lambda: env_int("STORAGE_COPY_THRESHOLD", 500),
+    # Conexões mantidas abertas por processo (Postgres); 0 = conecta a cada carga
+    "POOL_SIZE": lambda: env_int("STORAGE_POOL_SIZE", 4),
+    # Replica cada carga no cache analítico DuckDB (analytics_cache.py)
+    "ANALYTICS_CACHE": lambda: env_bool("ANALYTICS_CACHE"),
+    "ANALYTICS_CACHE_PATH": _analytics_cache_path,
+    # DuckDB aceita um único processo escritor: espera o lock por até N tentativas
+    "ANALYTICS_CACHE_LOCK_RETRIES": lambda: env_int("ANALYTICS_CACHE_LOCK_RETRIES", 25),
+    # etl (padrão): transforma em Python | elt: landing JSONB + projeção SQL
+    "LOAD_MODE": lambda: env("GRITTI_LOAD_MODE", "etl").lower(),
+    # Payloads crus guardados em raw_landing (elt.py purge)
+    "ELT_RETENTION_DAYS": lambda: env_int("ELT_RETENTION_DAYS", 30),
+    # Pipeline busca -> transformação -> gravação (pipeline.py): itens em espera entre estágios
+    # e requisições simultâneas à API por extrator
+    "PIPELINE_QUEUE_SIZE": lambda: env_int("PIPELINE_QUEUE_SIZE", 4),
+    "PIPELINE_FETCH_WORKERS": lambda: env_int("PIPELINE_FETCH_WORKERS", 1),
+    # Canal único do NOTIFY de carga concluída (load_events.py)
+    "LOAD_EVENTS_CHANNEL": lambda: env("LOAD_EVENTS_CHANNEL", "gritti_load_complete"),
+    # Export Parquet (parquet_export.py)
+    "PARQUET_EXPORT_DIR": lambda: env("PARQUET_EXPORT_DIR", os.path.join(SCRIPT_DIR, "exports", "parquet")),
+    "PARQUET_EXPORT_OVERLAP_MINUTES": lambda: env_int("PARQUET_EXPORT_OVERLAP_MINUTES", 10),
+    # Eleição de líder entre réplicas do scheduler + exclusão com execuções manuais (leader.py)
+    "LEADER_ELECTION": lambda: env_bool("LEADER_ELECTION", True),
+    "LEADER_BACKEND": _leader_backend,
+    "LEADER_NAMESPACE": lambda: env("LEADER_NAMESPACE", "gritti"),
+    "LEADER_POLL_SECONDS": lambda: env_float("LEADER_POLL_SECONDS", 5.0),
+    "LEADER_RUN_WAIT_SECONDS": lambda: env_float("LEADER_RUN_WAIT_SECONDS", 1800.0),
+    "LEADER_LOCK_DIR": lambda: env("LEADER_LOCK_DIR", SCRIPT_DIR),
+    # Backfill (fila, intervalos) pausa enquanto um ciclo today/yesterday roda
+    "PRIORITY_PREEMPTION": lambda: env_bool("PRIORITY_PREEMPTION", True),
+    # Fila de jobs no Postgres (work_queue.py)
+    "QUEUE_VISIBILITY_SECONDS": lambda: env_int("QUEUE_VISIBILITY_SECONDS", 600),
+    "QUEUE_MAX_ATTEMPTS": lambda: env_int("QUEUE_MAX_ATTEMPTS", 5),
+    "QUEUE_RETRY_SECONDS": lambda: env_int("QUEUE_RETRY_SECONDS", 60),
+    "QUEUE_POLL_SECONDS": lambda: env_float("QUEUE_POLL_SECONDS", 5.0),
+    # Revalidação dos dias recentes (revalidate.py): diária por N dias depois de ontem, semanal até MAX
+    "REVALIDATE_SOURCES": lambda: env_list("REVALIDATE_SOURCES", ["campaigns", "ads", "dashboard"]),
+    "REVALIDATE_DAILY_DAYS": lambda: env_int("REVALIDATE_DAILY_DAYS", 3),
+    "REVALIDATE_MAX_DAYS": lambda: env_int("REVALIDATE_MAX_DAYS", 30),
+    # Backfill paralelo de intervalos (backfill.py): unidades simultâneas por API
+    "BACKFILL_CONCURRENCY_UTMIFY": lambda: env_int("BACKFILL_CONCURRENCY_UTMIFY", 3),
+    "BACKFILL_CONCURRENCY_VTURB": lambda: env_int("BACKFILL_CONCURRENCY_VTURB", 2),
+    # Detector de buracos no histórico (gaps.py): janela, jobs por execução e fontes
+    "GAPS_LOOKBACK_DAYS": lambda: env_int("GAPS_LOOKBACK_DAYS", 90),
+    "GAPS_BATCH_SIZE": lambda: env_int("GAPS_BATCH_SIZE", 200),
+    "GAPS_SOURCES": lambda: env_list("GAPS_SOURCES", ["campaigns", "ads", "dashboard", "vturb"]),
+    # Requisições por API e por dia em todas as cargas (today, ontem, revalidação, backfill, fila);
+    # 0 = sem limite. Os nomes SCHEDULER_MAX_API_CALLS_<API> continuam valendo
+    "API_DAILY_LIMIT_UTMIFY": lambda: env_int("API_DAILY_LIMIT_UTMIFY",
+                                              env_int("SCHEDULER_MAX_API_CALLS_UTMIFY", 20000)),
+    "API_DAILY_LIMIT_VTURB": lambda: env_int("API_DAILY_LIMIT_VTURB",
+                                             env_int("SCHEDULER_MAX_API_CALLS_VTURB", 10000)),
+    # Catálogo de dashboards, fontes de tráfego e players no banco (catalog.py), relido sem reiniciar
+    "CATALOG": lambda: env_bool("CATALOG", True),
+    "CATALOG_POLL_SECONDS": lambda: env_float("CATALOG_POLL_SECONDS", 60.0),
+    "CATALOG_BACKFILL_DAYS": lambda: env_int("CATALOG_BACKFILL_DAYS", 30),
+    # Utmify
+    "UTMIFY_TOKEN": lambda: env("UTMIFY_TOKEN"),
+    "UTMIFY_TIMEOUT": lambda: env_int("UTMIFY_TIMEOUT", 180),
+    "UTMIFY_RETRIES": lambda: env_int("UTMIFY_RETRIES", 3),
+    "UTMIFY_BACKOFF": lambda: env_float("UTMIFY_BACKOFF", 1.0),
+    "UTMIFY_DASHBOARD_IDS": _dashboard_ids,
+    # Fontes de tráfego do dashboard, além de "all" (todas)
+    "UTMIFY_TRAFFIC_SOURCES": lambda: env_list("UTMIFY_TRAFFIC_SOURCES", ["Meta", "Google", "Kwai", "TikTok"]),
+    # VTurb
+    "VTURB_TOKEN": lambda: env("VTURB_TOKEN"),
+    "VTURB_PLAYER_IDS": _player_ids,
+    "VTURB_PLAYERS_URL": lambda: env("VTURB_PLAYERS_URL", "https://api.vturb.com/vturb/v2/players"),
+    "VTURB_ACTIVE_DAYS": lambda: env_int("VTURB_ACTIVE_DAYS", 14),
+    "VTURB_DORMANT_SWEEP_HOURS": lambda: env_float("VTURB_DORMANT_SWEEP_HOURS", 6.0),
+    # Vários tenants/contas (tenants.py)
+    "TENANTS_FILE": lambda: env("TENANTS_FILE", os.path.join(SCRIPT_DIR, "tenants.json")),
+    "TENANTS_DIR": lambda: env("TENANTS_DIR", os.path.join(SCRIPT_DIR, "tenants")),
+    "TENANT_WORKERS": lambda: env_int("TENANT_WORKERS", 4),
+    # Conexões ao banco por host, divididas entre os processos de tenant
+    "TENANT_DB_CONNECTIONS": lambda: env_int("TENANT_DB_CONNECTIONS", 8),
+    # Login automático (auto_extract.py)
+    "UTMIFY_EMAIL": lambda: env("UTMIFY_EMAIL", account("grupogritt@gmail.com")),
+    "UTMIFY_PASSWORD": lambda: env("UTMIFY_PASSWORD", account("Projeto8d@")),
+    "UTMIFY_TOTP_SECRET": lambda: env("UTMIFY_TOTP_SECRET"),
+    "VTURB_EMAIL": lambda: env("VTURB_EMAIL", account("anaclarabichuete@gmail.com")),
+    "VTURB_PASSWORD": lambda: env("VTURB_PASSWORD", account("Projeto8d@")),
+    "VTURB_TARGET_ORG_EMAIL": lambda: env("VTURB_TARGET_ORG_EMAIL", account("suportebumbashop@gmail.com")),
+    "VTURB_HEALTHCHECK_PLAYER_ID": lambda: env("VTURB_HEALTHCHECK_PLAYER_ID", account("693a3e45e891e679e7727765")),
+    "HEADLESS": lambda: env_bool("PLAYWRIGHT_HEADLESS", True),
+}
+
+# Nunca exibidos por describe()
+SECRETS = {"UTMIFY_TOKEN", "VTURB_TOKEN", "UTMIFY_PASSWORD", "UTMIFY_TOTP_SECRET", "VTURB_PASSWORD"}
+
+
+# =====================================================
+# SETTINGS
+# =====================================================
+
+class Settings:
+    """
+    settings.UTMIFY_TOKEN   -> lê .env (1ª vez), calcula e guarda
+    settings.override(UTMIFY_TOKEN=novo)   -> injeta valor (ex.: token renovado pelo auto_extract)
+    settings.reset()        -> descarta valores calculados (próximo acesso relê o ambiente)
+    settings.reload(*nomes) -> relê o .env e descarta os valores (ex.: tokens regravados pelo auto_extract)
+    """
+
+    def __init__(self):
+        self._values: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_") or name not in FIELDS:
+            raise AttributeError(f"Configuração desconhecida: {name}")
+        with self._lock:
+            if name not in self._values:
+                load_env()
+                self._values[name] = FIELDS[name]()
+            return self._values[name]
+
+    def override(self, **values):
+        unknown = [name for name in values if name not in FIELDS]
+        if unknown:
+            raise AttributeError(f"Configuração desconhecida: {', '.join(unknown)}")
+        with self._lock:
+            self._values.update(values)
+
+    def reset(self, *names: str):
+        with self._lock:
+            if names:
+                for name in names:
+                    self._values.pop(name, None)
+            else:
+                self._values.clear()
+
+    def reload(self, *names: str):
+        load_env(force=True)
+        self.reset(*names)
+
+    def describe(self) -> Dict[str, Any]:
+        """Configuração efetiva, com tokens/senhas mascarados"""
+        shown = {}
+        for name in FIELDS:
+            value = getattr(self, name)
+            if name in SECRETS:
+                value = "✅ Definido" if value else "❌ Não definido"
+            elif name == "DB_CONFIG":
+                value = {k: ("***" if k == "password" and v else v) for k, v in value.items()}
+            shown[name] = value
+        return shown
+
+
+settings = Settings()
+
+
+# =====================================================
+# MAIN
+# =====================================================
+
+if __name__ == "__main__":
+    for name, value in settings.describe().items():
+        print(f"{name:<28} {value}")
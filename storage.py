@@ -0,0 +1,798 @@
+#!/usr/bin/env python3
+"""
+Storage - Camada de persistência plugável
+Backends: postgres (produção), sqlite (edge/testes) e duckdb (análise local)
+Escolha via STORAGE_BACKEND=postgres|sqlite|duckdb
+Uso: python3 storage.py init | bench [linhas]
+"""
+
+import os
+import io
+import csv
+import time
+import threading
+from datetime import datetime, timedelta, date
+from decimal import Decimal
+from typing import Dict, Any, Optional, List, Sequence, Tuple
+import logging
+
+from settings import settings
+from schema import SCHEMAS, CAMPAIGNS, ADS, DASHBOARD, VTURB, OBJECT_METRICS
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =====================================================
+# CONFIGURAÇÕES
+# =====================================================
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# STORAGE_BACKEND, SQLITE_PATH, DUCKDB_PATH, COPY_THRESHOLD, POOL_SIZE e ANALYTICS_CACHE:
+# ver settings.py (lidos no primeiro uso, com o .env já aplicado)
+
+
+# =====================================================
+# SCHEMA
+# =====================================================
+
+# Colunas, tipos (TEXT, INT, NUM, DATE, TIMESTAMP), chave e UPSERT vêm de schema.py:
+# a ordem das colunas é a mesma das tuplas montadas por Schema.rows().
+ADS_OBJECT_METRICS = [(c.name, c.type) for c in OBJECT_METRICS]
+CAMPAIGN_COLUMNS = CAMPAIGNS.types
+AD_COLUMNS = ADS.types
+DASHBOARD_COLUMNS = DASHBOARD.types
+VTURB_COLUMNS = VTURB.types
+
+# Colunas preenchidas pelo banco (DEFAULT now), fora das tuplas de insert
+DEFAULTED_COLUMNS = {
+    f"{schema.name}_{kind}": schema.defaulted
+    for schema in SCHEMAS.values() if schema.defaulted for kind in ("history", "today")
+}
+
+# *_history tem chave (UPSERT); *_today é sempre substituída por inteiro
+TABLES: Dict[str, Dict[str, Any]] = {}
+for _schema in SCHEMAS.values():
+    TABLES[f"{_schema.name}_history"] = {"columns": _schema.types, "key": _schema.key, "date": _schema.date}
+    TABLES[f"{_schema.name}_today"] = {"columns": _schema.types, "key": (), "date": _schema.date}
+
+# Último carregamento de cada (tabela, dia) — base do export incremental (parquet_export.py)
+LOAD_LOG_TABLE = "load_log"
+LOAD_LOG_COLUMNS = [
+    ("table_name", "TEXT"), ("partition_date", "DATE"), ("row_count", "INT"), ("loaded_at", "TIMESTAMP"),
+]
+
+
+# Situação de cada (fonte, dia) no histórico: provisional (virada do dia, snapshot de *_today)
+# ou final (verificado na API na manhã seguinte)
+DAY_STATUS_TABLE = "day_status"
+DAY_STATUS_COLUMNS = [
+    ("source", "TEXT"), ("report_date", "DATE"), ("status", "TEXT"), ("updated_at", "TIMESTAMP"),
+]
+PROVISIONAL = "provisional"
+FINAL = "final"
+
+# Requisições feitas por API e dia, somadas por todas as cargas (limite diário: api_limit)
+API_USAGE_TABLE = "api_usage"
+API_USAGE_COLUMNS = [("api", "TEXT"), ("usage_date", "DATE"), ("calls", "INT"), ("updated_at", "TIMESTAMP")]
+
+
+def table_columns(table: str) -> List[str]:
+    """Colunas de insert da tabela, na ordem das tuplas"""
+    return [name for name, _ in TABLES[table]["columns"]]
+
+
+def api_limit(api: str) -> int:
+    """Requisições por dia permitidas na API (utmify | vturb); 0 = sem limite"""
+    return {"utmify": settings.API_DAILY_LIMIT_UTMIFY, "vturb": settings.API_DAILY_LIMIT_VTURB}.get(api, 0)
+
+
+def value_columns(table: str) -> List[str]:
+    """Colunas fora da chave: UPSERT com elas como update regrava a linha inteira"""
+    return [c for c in table_columns(table) if c not in TABLES[table]["key"]]
+
+
+def date_range(table: str, columns: Sequence[str], rows: Sequence[tuple]) -> Tuple[Any, Any]:
+    """Menor e maior data das linhas (coluna de data da tabela)"""
+    date_col = TABLES.get(table, {}).get("date")
+    if not rows or date_col not in columns:
+        return None, None
+    idx = list(columns).index(date_col)
+    dates = [row[idx] for row in rows if row[idx] is not None]
+    if not dates:
+        return None, None
+    return min(dates), max(dates)
+
+
+def partition_counts(table: str, columns: Sequence[str], rows: Sequence[tuple]) -> Dict[Any, int]:
+    """Linhas por dia (coluna de data da tabela)"""
+    date_col = TABLES.get(table, {}).get("date")
+    if not rows or date_col not in columns:
+        return {}
+    idx = list(columns).index(date_col)
+    counts: Dict[Any, int] = {}
+    for row in rows:
+        if row[idx] is not None:
+            counts[row[idx]] = counts.get(row[idx], 0) + 1
+    return counts
+
+
+def as_date(value) -> date:
+    """date a partir do valor do driver (SQLite devolve texto)"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def as_datetime(value) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def changed_partitions(backend, cursor, table: str, watermark: Optional[datetime],
+                       overlap_minutes: int = 0) -> Tuple[List[date], Optional[datetime]]:
+    """
+    Dias de table carregados depois de watermark (via load_log) e a nova marca d'água.
+    Sem marca: todos os dias presentes na tabela.
+    overlap_minutes recua a marca (transações longas commitam com loaded_at anterior).
+    """
+    backend.ensure_load_log(cursor)
+    ph = backend.placeholder
+
+    cursor.execute(f"SELECT MAX(loaded_at) FROM {LOAD_LOG_TABLE} WHERE table_name = {ph}", (table,))
+    new_watermark = as_datetime(cursor.fetchone()[0])
+
+    if watermark is None:
+        cursor.execute(f"SELECT DISTINCT {TABLES[table]['date']} FROM {table}")
+    else:
+        since = watermark - timedelta(minutes=overlap_minutes)
+        cursor.execute(
+            f"SELECT partition_date FROM {LOAD_LOG_TABLE} WHERE table_name = {ph} AND loaded_at > {ph}",
+            backend.adapt_row((table, since)),
+        )
+    days = sorted({as_date(row[0]) for row in cursor.fetchall() if row[0] is not None})
+    return days, new_watermark or watermark
+
+
+# =====================================================
+# CARGA EM PARTES
+# =====================================================
+
+class LoadStream:
+    """
+    Transação aberta na primeira escrita. Em replace as linhas ficam em memória e a tabela
+    só é limpa e regravada no commit: o TRUNCATE (lock exclusivo) não segura as leituras
+    de *_today enquanto as demais unidades ainda baixam.
+    Sem nenhuma escrita, nada é feito no banco. Use na mesma thread do começo ao fim.
+    """
+
+    def __init__(self, backend, table, mode, columns, key, update, touch):
+        self.backend = backend
+        self.table = table
+        self.mode = mode
+        self.columns = columns
+        self.key = key
+        self.update = update
+        self.touch = touch
+        self.rows: List[tuple] = []
+        self.count = 0
+        self.conn = None
+        self.cursor = None
+
+    def open(self):
+        if self.conn is not None:
+            return
+        self.conn = self.backend.connect()
+        try:
+            self.backend.ensure_schema(self.conn)
+            self.cursor = self.backend.cursor(self.conn)
+        except Exception:
+            self.rollback()
+            raise
+
+    def write(self, rows: Sequence[tuple]) -> int:
+        if not rows:
+            return 0
+        rows = list(rows)
+        if self.mode == "replace":
+            self.rows.extend(rows)
+            self.count += len(rows)
+            return len(rows)
+        self.open()
+        count = self.backend.write_rows(
+            self.cursor, self.table, self.columns, rows, self.key, self.update, self.touch
+        )
+        self.rows.extend(rows)
+        self.count += count
+        return count
+
+    def commit(self) -> int:
+        if self.mode == "replace" and self.rows:
+            self.open()
+            try:
+                self.backend.clear(self.cursor, self.table)
+                self.count = self.backend.write_rows(
+                    self.cursor, self.table, self.columns, self.rows, self.key, self.update, self.touch
+                )
+            except Exception:
+                self.rollback()
+                raise
+        if self.conn is None:
+            return 0
+        backend = self.backend
+        try:
+            backend.log_load(self.cursor, self.table, partition_counts(self.table, self.columns, self.rows))
+            backend.before_commit(self.cursor, self.table, self.columns, self.rows, self.count)
+            self.conn.commit()
+        except Exception:
+            self.rollback()
+            raise
+        backend.release(self.conn)
+        self.conn = None
+        backend.after_commit(self.table, self.rows, self.mode, self.columns, self.key, self.update, self.touch)
+        return self.count
+
+    def rollback(self):
+        if self.conn is None:
+            return
+        try:
+            self.conn.rollback()
+        finally:
+            self.backend._load_log_ready = False  # o CREATE pode ter sido desfeito junto
+            self.backend.release(self.conn)
+            self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+
+# =====================================================
+# BACKEND BASE
+# =====================================================
+
+class StorageBackend:
+    """Interface comum: load() grava linhas em uma transação (replace, upsert ou insert)"""
+
+    name = "base"
+    placeholder = "?"
+    auto_schema = True
+    feeds_cache = True
+    now_sql = "CURRENT_TIMESTAMP"
+    types = {"TEXT": "TEXT", "INT": "BIGINT", "NUM": "NUMERIC", "DATE": "DATE", "TIMESTAMP": "TIMESTAMP"}
+
+    def __init__(self):
+        self._schema_ready = False
+        self._load_log_ready = False
+
+    # ---------- conexão ----------
+
+    def connect(self):
+        raise NotImplementedError
+
+    def release(self, conn):
+        conn.close()
+
+    def close(self):
+        pass
+
+    # ---------- schema ----------
+
+    def create_table_sql(self, table: str) -> str:
+        spec = TABLES[table]
+        cols = [(n, t) for n, t in spec["columns"]] + DEFAULTED_COLUMNS.get(table, [])
+        lines = []
+        for name, generic in cols:
+            line = f"{name} {self.types[generic]}"
+            if any(name == n for n, _ in DEFAULTED_COLUMNS.get(table, [])):
+                line += f" DEFAULT {self.now_sql}"
+            lines.append(line)
+        if spec["key"]:
+            lines.append(f"PRIMARY KEY ({', '.join(spec['key'])})")
+        return f"CREATE TABLE IF NOT EXISTS {table} (\n    " + ",\n    ".join(lines) + "\n)"
+
+    def cursor(self, conn):
+        return conn.cursor()
+
+    def init_schema(self, conn=None):
+        """Cria as tabelas (CREATE TABLE IF NOT EXISTS)"""
+        own = conn is None
+        conn = conn or self.connect()
+        try:
+            cursor = self.cursor(conn)
+            if self.name == "postgres" and settings.DB_SCHEMA:
+                # search_path do tenant (DB_CONFIG) aponta para cá
+                cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {settings.DB_SCHEMA}")
+            for table in TABLES:
+                cursor.execute(self.create_table_sql(table))
+            if own:
+                conn.commit()
+            self._schema_ready = True
+        finally:
+            if own:
+                self.release(conn)
+
+    def ensure_load_log(self, cursor):
+        """Cria load_log uma vez por processo (também no Postgres)"""
+        if self._load_log_ready:
+            return
+        cols = ", ".join(f"{n} {self.types[t]}" for n, t in LOAD_LOG_COLUMNS)
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {LOAD_LOG_TABLE} ({cols}, PRIMARY KEY (table_name, partition_date))"
+        )
+        self._load_log_ready = True
+
+    def ensure_day_status(self, cursor):
+        cols = ", ".join(f"{n} {self.types[t]}" for n, t in DAY_STATUS_COLUMNS)
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {DAY_STATUS_TABLE} ({cols}, PRIMARY KEY (source, report_date))"
+        )
+
+    def mark_day(self, source: str, day: date, status: str):
+        """Registra a situação do dia da fonte (provisional | final)"""
+        conn = self.connect()
+        try:
+            cursor = self.cursor(conn)
+            self.ensure_day_status(cursor)
+            marks = ", ".join([self.placeholder] * 3)
+            cursor.execute(
+                f"INSERT INTO {DAY_STATUS_TABLE} (source, report_date, status, updated_at) "
+                f"VALUES ({marks}, {self.now_sql})"
+                + self.conflict_clause(("source", "report_date"), ["status"], ["updated_at"]),
+                self.adapt_row((source, day, status)),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.release(conn)
+
+    def day_status(self, source: str, day: date) -> Optional[str]:
+        """provisional, final ou None (nunca promovido/verificado)"""
+        conn = self.connect()
+        try:
+            cursor = self.cursor(conn)
+            self.ensure_day_status(cursor)
+            cursor.execute(
+                f"SELECT status FROM {DAY_STATUS_TABLE} "
+                f"WHERE source = {self.placeholder} AND report_date = {self.placeholder}",
+                self.adapt_row((source, day)),
+            )
+            row = cursor.fetchone()
+            conn.commit()
+            return row[0] if row else None
+        finally:
+            self.release(conn)
+
+    def ensure_api_usage(self, cursor):
+        cols = ", ".join(f"{n} {self.types[t]}" for n, t in API_USAGE_COLUMNS)
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {API_USAGE_TABLE} ({cols}, PRIMARY KEY (api, usage_date))")
+
+    def add_api_calls(self, api: str, day: date, calls: int):
+        """Soma calls às requisições do dia na API (todas as cargas, em qualquer processo)"""
+        conn = self.connect()
+        try:
+            cursor = self.cursor(conn)
+            self.ensure_api_usage(cursor)
+            marks = ", ".join([self.placeholder] * 3)
+            cursor.execute(
+                f"INSERT INTO {API_USAGE_TABLE} (api, usage_date, calls, updated_at) "
+                f"VALUES ({marks}, {self.now_sql}) ON CONFLICT (api, usage_date) DO UPDATE SET "
+                f"calls = {API_USAGE_TABLE}.calls + EXCLUDED.calls, updated_at = EXCLUDED.updated_at",
+                self.adapt_row((api, day, calls)),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.release(conn)
+
+    def api_calls(self, api: str, day: date) -> int:
+        """Requisições já feitas na API no dia"""
+        conn = self.connect()
+        try:
+            cursor = self.cursor(conn)
+            self.ensure_api_usage(cursor)
+            cursor.execute(
+                f"SELECT calls FROM {API_USAGE_TABLE} WHERE api = {self.placeholder} AND usage_date = {self.placeholder}",
+                self.adapt_row((api, day)),
+            )
+            row = cursor.fetchone()
+            conn.commit()
+            return int(row[0]) if row else 0
+        finally:
+            self.release(conn)
+
+    def ensure_schema(self, conn=None):
+        """Cria as tabelas uma vez por processo (backends locais)"""
+        if self.auto_schema and not self._schema_ready:
+            self.init_schema(conn)
+
+    # ---------- SQL ----------
+
+    def upsert_sql(self, table: str, columns: Sequence[str], key: Sequence[str],
+                   update: Sequence[str], touch: Sequence[str] = ()) -> str:
+        cols = ", ".join(columns)
+        marks = ", ".join([self.placeholder] * len(columns))
+        sql = f"INSERT INTO {table} ({cols}) VALUES ({marks})"
+        return sql + self.conflict_clause(key, update, touch)
+
+    def conflict_clause(self, key: Sequence[str], update: Sequence[str], touch: Sequence[str] = ()) -> str:
+        if not key:
+            return ""
+        sets = [f"{c} = {self.now_sql}" for c in touch] + [f"{c} = EXCLUDED.{c}" for c in update]
+        if not sets:
+            return f" ON CONFLICT ({', '.join(key)}) DO NOTHING"
+        return f" ON CONFLICT ({', '.join(key)}) DO UPDATE SET " + ", ".join(sets)
+
+    # ---------- carga ----------
+
+    def load(self, table: str, rows: Sequence[tuple], mode: str = "upsert",
+             columns: Optional[Sequence[str]] = None, key: Optional[Sequence[str]] = None,
+             update: Sequence[str] = (), touch: Sequence[str] = ()) -> int:
+        """
+        Grava linhas em uma única transação.
+          mode="replace": limpa a tabela e insere (tabelas *_today)
+          mode="upsert":  INSERT ... ON CONFLICT (key) DO UPDATE SET update/touch
+          mode="insert":  INSERT simples
+        """
+        with self.stream(table, mode, columns, key, update, touch) as stream:
+            stream.open()
+            stream.write(rows)
+        return stream.count
+
+    def stream(self, table: str, mode: str = "upsert", columns: Optional[Sequence[str]] = None,
+               key: Optional[Sequence[str]] = None, update: Sequence[str] = (),
+               touch: Sequence[str] = ()) -> "LoadStream":
+        """Carga em partes (pipeline): várias chamadas write(), uma transação, commit ao sair do with"""
+        columns = list(columns or table_columns(table))
+        key = tuple(key if key is not None else TABLES.get(table, {}).get("key", ()))
+        if mode != "upsert":
+            key = ()
+        return LoadStream(self, table, mode, columns, key, update, touch)
+
+    def upsert(self, table: str, rows: Sequence[tuple], update: Sequence[str] = (),
+               touch: Sequence[str] = (), **kwargs) -> int:
+        return self.load(table, rows, mode="upsert", update=update, touch=touch, **kwargs)
+
+    def replace(self, table: str, rows: Sequence[tuple], **kwargs) -> int:
+        return self.load(table, rows, mode="replace", **kwargs)
+
+    def clear(self, cursor, table: str):
+        cursor.execute(f"DELETE FROM {table}")
+
+    def write_rows(self, cursor, table, columns, rows, key, update, touch) -> int:
+        cursor.executemany(self.upsert_sql(table, columns, key, update, touch), [self.adapt_row(r) for r in rows])
+        return len(rows)
+
+    def adapt_row(self, row: tuple) -> tuple:
+        return row
+
+    def log_load(self, cursor, table: str, counts: Dict[Any, int]):
+        """Registra em load_log os dias tocados pela carga (mesma transação)"""
+        if not counts:
+            return
+        self.ensure_load_log(cursor)
+        marks = ", ".join([self.placeholder] * 3)
+        sql = (
+            f"INSERT INTO {LOAD_LOG_TABLE} (table_name, partition_date, row_count, loaded_at) "
+            f"VALUES ({marks}, {self.now_sql})"
+            + self.conflict_clause(("table_name", "partition_date"), ["row_count"], ["loaded_at"])
+        )
+        cursor.executemany(sql, [self.adapt_row((table, day, n)) for day, n in counts.items()])
+
+    def before_commit(self, cursor, table, columns, rows, count):
+        """Gancho executado dentro da transação, antes do commit"""
+        pass
+
+    def after_commit(self, table, rows, mode, columns, key, update, touch):
+        """Replica as mesmas linhas no cache analítico (falha aqui não derruba a carga)"""
+        if not (settings.ANALYTICS_CACHE and self.feeds_cache):
+            return
+        try:
+            from analytics_cache import ingest
+            ingest(table, rows, mode=mode, columns=columns, key=key, update=update, touch=touch)
+        except Exception as e:
+            logger.warning(f"⚠️ Cache analítico não atualizado ({table}): {e}")
+
+
+# =====================================================
+# POSTGRES
+# =====================================================
+
+class PostgresBackend(StorageBackend):
+    """Produção: INSERT multi-VALUES para cargas pequenas, COPY (via staging) para grandes"""
+
+    name = "postgres"
+    placeholder = "%s"
+    auto_schema = False  # schema de produção é gerenciado fora do pipeline
+    now_sql = "NOW()"
+    types = {"TEXT": "TEXT", "INT": "BIGINT", "NUM": "NUMERIC", "DATE": "DATE", "TIMESTAMP": "TIMESTAMP"}
+
+    def __init__(self, db_config: Optional[Dict] = None):
+        super().__init__()
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self.db_config = db_config or settings.DB_CONFIG
+
+    def connect(self):
+        import psycopg2
+        if settings.POOL_SIZE <= 0:
+            return psycopg2.connect(**self.db_config)
+        with self._pool_lock:
+            if self._pool is None:
+                from psycopg2.pool import ThreadedConnectionPool
+                self._pool = ThreadedConnectionPool(1, settings.POOL_SIZE, **self.db_config)
+        return self._pool.getconn()
+
+    def release(self, conn):
+        if self._pool is None:
+            conn.close()
+            return
+        from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+        # Conexão quebrada ou com transação pendente não volta para o pool
+        broken = conn.closed or conn.get_transaction_status() != TRANSACTION_STATUS_IDLE
+        self._pool.putconn(conn, close=bool(broken))
+
+    def close(self):
+        """Fecha as conexões do pool (fim do processo / orquestrador)"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+
+
+    def clear(self, cursor, table: str):
+        cursor.execute(f"TRUNCATE TABLE {table}")
+        logger.info(f"🗑️ Tabela {table} limpa")
+
+    def write_rows(self, cursor, table, columns, rows, key, update, touch) -> int:
+        if len(rows) < settings.COPY_THRESHOLD:
+            from psycopg2.extras import execute_values
+            cols = ", ".join(columns)
+            sql = f"INSERT INTO {table} ({cols}) VALUES %s" + self.conflict_clause(key, update, touch)
+            execute_values(cursor, sql, rows, page_size=max(len(rows), 1))
+            return cursor.rowcount if key else len(rows)
+
+        if not key:
+            self.copy_rows(cursor, table, columns, rows)
+            return len(rows)
+
+        # Upsert em massa: COPY para staging temporária + INSERT ... SELECT ... ON CONFLICT.
+        # A staging sai logo após o merge: um stream chama write_rows várias vezes na mesma transação
+        stage = f"_stage_{table}"
+        cursor.execute(f"CREATE TEMP TABLE {stage} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP")
+        self.copy_rows(cursor, stage, columns, rows)
+        cols = ", ".join(columns)
+        cursor.execute(
+            f"INSERT INTO {table} ({cols}) SELECT {cols} FROM {stage}"
+            + self.conflict_clause(key, update, touch)
+        )
+        count = cursor.rowcount
+        cursor.execute(f"DROP TABLE {stage}")
+        return count
+
+    def copy_rows(self, cursor, table: str, columns: Sequence[str], rows: Sequence[tuple]):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(["\\N" if v is None else v for v in row])
+        buffer.seek(0)
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            buffer,
+        )
+
+    def before_commit(self, cursor, table, columns, rows, count):
+        # NOTIFY sai junto com o COMMIT (ver load_events.py)
+        from load_events import notify_load_complete
+        date_from, date_to = date_range(table, columns, rows)
+        notify_load_complete(cursor, table, count, date_from, date_to)
+
+
+# =====================================================
+# SQLITE
+# =====================================================
+
+class SQLiteBackend(StorageBackend):
+    """Edge/testes: arquivo local, executemany em uma transação"""
+
+    name = "sqlite"
+    placeholder = "?"
+    types = {"TEXT": "TEXT", "INT": "INTEGER", "NUM": "REAL", "DATE": "TEXT", "TIMESTAMP": "TEXT"}
+
+    def __init__(self, path: Optional[str] = None):
+        super().__init__()
+        self.path = path or settings.SQLITE_PATH
+
+    def connect(self):
+        import sqlite3
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def adapt_row(self, row: tuple) -> tuple:
+        return tuple(_to_plain(v) for v in row)
+
+
+# =====================================================
+# DUCKDB
+# =====================================================
+
+class DuckDBBackend(StorageBackend):
+    """Análise local: carga colunar via Arrow (quando pyarrow existe) ou executemany"""
+
+    name = "duckdb"
+    placeholder = "?"
+    feeds_cache = False  # já é o banco analítico
+    now_sql = "now()"
+    types = {"TEXT": "VARCHAR", "INT": "BIGINT", "NUM": "DOUBLE", "DATE": "DATE", "TIMESTAMP": "TIMESTAMP"}
+
+    def __init__(self, path: Optional[str] = None):
+        super().__init__()
+        self.path = path or settings.DUCKDB_PATH
+
+    def connect(self):
+        import duckdb
+        conn = duckdb.connect(self.path)
+        conn.begin()
+        return conn
+
+    def cursor(self, conn):
+        # conn.cursor() no DuckDB abre outra conexão (outra transação)
+        return conn
+
+    def write_rows(self, cursor, table, columns, rows, key, update, touch) -> int:
+        try:
+            import pyarrow as pa
+        except ImportError:
+            pa = None
+
+        if pa is None:
+            return super().write_rows(cursor, table, columns, rows, key, update, touch)
+
+        data = {col: [_to_plain(row[i], keep_dates=True) for row in rows] for i, col in enumerate(columns)}
+        stage = pa.table(data)
+        cursor.register("_stage_rows", stage)
+        try:
+            cols = ", ".join(columns)
+            cursor.execute(
+                f"INSERT INTO {table} ({cols}) SELECT {cols} FROM _stage_rows"
+                + self.conflict_clause(key, update, touch)
+            )
+        finally:
+            cursor.unregister("_stage_rows")
+        return len(rows)
+
+    def adapt_row(self, row: tuple) -> tuple:
+        return tuple(_to_plain(v, keep_dates=True) for v in row)
+
+
+# =====================================================
+# FÁBRICA
+# =====================================================
+
+def _to_plain(value, keep_dates: bool = False):
+    """Converte valores Python para tipos aceitos pelos drivers locais"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if keep_dates:
+        return value
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+_BACKENDS: Dict[tuple, StorageBackend] = {}
+_BACKENDS_LOCK = threading.Lock()
+
+
+def get_backend(db_config: Optional[Dict] = None, name: Optional[str] = None) -> StorageBackend:
+    """Retorna o backend configurado (um por processo e configuração)"""
+    name = (name or settings.STORAGE_BACKEND).lower()
+    cache_key = (name, tuple(sorted((db_config or {}).items())) if name == "postgres" else None)
+
+    with _BACKENDS_LOCK:
+        backend = _BACKENDS.get(cache_key)
+        if backend is None:
+            if name == "postgres":
+                backend = PostgresBackend(db_config)
+            elif name == "sqlite":
+                backend = SQLiteBackend()
+            elif name == "duckdb":
+                backend = DuckDBBackend()
+            else:
+                raise ValueError(f"STORAGE_BACKEND inválido: {name}. Use postgres, sqlite ou duckdb")
+            _BACKENDS[cache_key] = backend
+    return backend
+
+
+def close_backends():
+    """Fecha pools/conexões de todos os backends criados no processo"""
+    with _BACKENDS_LOCK:
+        for backend in _BACKENDS.values():
+            backend.close()
+
+
+# =====================================================
+# MAIN
+# =====================================================
+
+def _synthetic_rows(count: int) -> List[tuple]:
+    """Linhas sintéticas de campaigns_history para benchmark"""
+    report_date = date.today()
+    rows = []
+    for i in range(count):
+        row = [f"bench-{i}", report_date, f"Campanha {i}", "campaign", "ACTIVE", "ACTIVE",
+               "acc", "ca", "profile", 100.0, None]
+        for _, generic in ADS_OBJECT_METRICS:
+            if generic == "INT":
+                row.append(i % 97)
+            elif generic == "NUM":
+                row.append(round(i * 1.37, 2))
+            else:
+                row.append(datetime(2026, 1, 1, 12, 0, 0))
+        rows.append(tuple(row))
+    return rows
+
+
+def benchmark(count: int):
+    """Mede replace e upsert no backend configurado"""
+    backend = get_backend()
+    rows = _synthetic_rows(count)
+    print("=" * 50)
+    print(f"⏱️ STORAGE BENCH - {backend.name} - {count} linhas")
+    print("=" * 50)
+    for label, fn in (
+        ("replace campaigns_today", lambda: backend.replace("campaigns_today", rows)),
+        ("upsert campaigns_history", lambda: backend.upsert("campaigns_history", rows, update=["spend", "revenue"])),
+        ("upsert campaigns_history (2x)", lambda: backend.upsert("campaigns_history", rows, update=["spend", "revenue"])),
+    ):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        print(f"{label}: {elapsed * 1000:,.1f} ms ({count / elapsed:,.0f} linhas/s)")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Uso: python3 storage.py [init|bench] [linhas]")
+        print("")
+        print("Comandos:")
+        print("  init          - Cria as tabelas no backend configurado (IF NOT EXISTS)")
+        print("  bench [n]     - Benchmark de carga com n linhas sintéticas (padrão 5000)")
+        print("")
+        print("Backend atual: STORAGE_BACKEND=" + settings.STORAGE_BACKEND)
+        sys.exit(1)
+
+    comando = sys.argv[1].lower()
+
+    if comando == "init":
+        backend = get_backend()
+        backend.init_schema()
+        print(f"✅ Schema pronto no backend {backend.name}")
+    elif comando == "bench":
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 5000)
+    else:
+        print(f"❌ Comando inválido: {comando}")
+        sys.exit(1)
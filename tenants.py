@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Tenants - Várias contas (clientes) no mesmo repositório
+Cadastro em tenants.json (credenciais Utmify/VTurb, dashboards, players e schema de destino).
+Cada tenant roda em um processo próprio, em paralelo (TENANT_WORKERS), com .env de tokens
+isolado (tenants/<nome>.env), sessão HTTP e limites próprios e tabelas no seu schema.
+As conexões do host (TENANT_DB_CONNECTIONS) são divididas entre os processos.
+Uso: python3 tenants.py list | init | run [hoje|utmify|vturb|tokens|extract FONTE ARGS...] [--tenant a,b]
+"""
+
+import os
+import re
+import sys
+import json
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Optional, Sequence
+import logging
+
+import result_channel
+from settings import settings, load_env, SCRIPT_DIR, TENANT_VAR
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =====================================================
+# CADASTRO
+# =====================================================
+
+@dataclass
+class Tenant:
+    name: str
+    utmify_email: str = ""
+    utmify_password: str = ""
+    utmify_totp_secret: str = ""
+    dashboard_ids: List[str] = field(default_factory=list)
+    vturb_email: str = ""
+    vturb_password: str = ""
+    vturb_target_org_email: str = ""
+    vturb_healthcheck_player_id: str = ""
+    player_ids: List[str] = field(default_factory=list)
+    schema: str = ""                  # schema Postgres (padrão: o nome)
+    fetch_workers: int = 0            # requisições simultâneas à API (0 = PIPELINE_FETCH_WORKERS)
+    timeout: int = 1800
+
+    @property
+    def db_schema(self) -> str:
+        return self.schema or self.name
+
+    @property
+    def env_file(self) -> str:
+        return os.path.join(settings.TENANTS_DIR, f"{self.name}.env")
+
+
+# Campo do tenant -> variável lida pelo settings.py no processo filho
+TENANT_ENV = {
+    "utmify_email": "UTMIFY_EMAIL",
+    "utmify_password": "UTMIFY_PASSWORD",
+    "utmify_totp_secret": "UTMIFY_TOTP_SECRET",
+    "dashboard_ids": "UTMIFY_DASHBOARD_IDS",
+    "vturb_email": "VTURB_EMAIL",
+    "vturb_password": "VTURB_PASSWORD",
+    "vturb_target_org_email": "VTURB_TARGET_ORG_EMAIL",
+    "vturb_healthcheck_player_id": "VTURB_HEALTHCHECK_PLAYER_ID",
+    "player_ids": "VTURB_PLAYER_IDS",
+    "fetch_workers": "PIPELINE_FETCH_WORKERS",
+}
+
+REQUIRED = ["utmify_email", "utmify_password", "dashboard_ids", "vturb_email", "vturb_password", "player_ids"]
+# Precisam estar no cadastro mesmo vazios ("" = sem troca de organização): ausente não cai no .env principal
+EXPLICIT = ["vturb_target_org_email"]
+
+# Nunca herdados do processo pai (seriam os da conta principal)
+ISOLATED = set(TENANT_ENV.values()) | {
+    "UTMIFY_TOKEN", "VTURB_TOKEN", "UTMIFY_DASHBOARD_ID", "GRITTI_ENV_FILE", TENANT_VAR, "DB_SCHEMA",
+    "SQLITE_PATH", "DUCKDB_PATH", "ANALYTICS_CACHE_PATH", "PARQUET_EXPORT_DIR",
+}
+
+NAME_PATTERN = re.compile(r"^[a-z][a-z0-9_]{0,40}$")
+
+SCRIPTS = {
+    "auto_extract": os.path.join(SCRIPT_DIR, "auto_extract.py"),
+    "engine": os.path.join(SCRIPT_DIR, "engine.py"),
+    "storage": os.path.join(SCRIPT_DIR, "storage.py"),
+}
+
+
+def parse_tenant(data: Dict[str, Any]) -> Tenant:
+    known = {f.name for f in fields(Tenant)}
+    unknown = [k for k in data if k not in known]
+    if unknown:
+        raise ValueError(f"Tenant {data.get('name', '?')}: campos desconhecidos {', '.join(unknown)}")
+    tenant = Tenant(**data)
+    if not NAME_PATTERN.match(tenant.name or ""):
+        raise ValueError(f"Tenant {tenant.name!r}: nome inválido (minúsculas, dígitos e _)")
+    if not NAME_PATTERN.match(tenant.db_schema):
+        raise ValueError(f"Tenant {tenant.name}: schema inválido {tenant.db_schema!r}")
+    missing = [f for f in REQUIRED if not getattr(tenant, f)] + [f for f in EXPLICIT if f not in data]
+    if missing:
+        raise ValueError(f"Tenant {tenant.name}: faltam {', '.join(missing)}")
+    return tenant
+
+
+def load_tenants(path: Optional[str] = None) -> List[Tenant]:
+    path = path or settings.TENANTS_FILE
+    if not os.path.exists(path):
+        raise ValueError(f"Cadastro de tenants não encontrado: {path} (veja tenants.example.json)")
+    with open(path, "r") as f:
+        data = json.load(f)
+    tenants = [parse_tenant(t) for t in data.get("tenants", [])]
+    names = [t.name for t in tenants]
+    repeated = sorted({n for n in names if names.count(n) > 1})
+    if repeated:
+        raise ValueError(f"Tenants repetidos: {', '.join(repeated)}")
+    return tenants
+
+
+def select(tenants: List[Tenant], names: Optional[Sequence[str]]) -> List[Tenant]:
+    if not names:
+        return tenants
+    by_name = {t.name: t for t in tenants}
+    invalid = [n for n in names if n not in by_name]
+    if invalid:
+        raise ValueError(f"Tenant inválido: {', '.join(invalid)} (use {', '.join(by_name)})")
+    return [by_name[n] for n in names]
+
+
+# =====================================================
+# AMBIENTE DO FILHO
+# =====================================================
+
+def tenant_env(tenant: Tenant, workers: int) -> Dict[str, str]:
+    """
+    Ambiente do processo do tenant: banco e ajustes gerais herdados; credenciais, tokens,
+    dashboards, players e destino só do tenant.
+    """
+    load_env()  # .env principal (credenciais do banco) entra no ambiente copiado
+    env = {k: v for k, v in os.environ.items() if k not in ISOLATED}
+
+    for attr, var in TENANT_ENV.items():
+        value = getattr(tenant, attr)
+        if isinstance(value, list):
+            value = ",".join(value)
+        if value:
+            env[var] = str(value)
+    env.setdefault("VTURB_HEALTHCHECK_PLAYER_ID", tenant.player_ids[0])
+
+    env["GRITTI_ENV_FILE"] = tenant.env_file
+    env[TENANT_VAR] = tenant.name
+    env["LEADER_NAMESPACE"] = f"{settings.LEADER_NAMESPACE}-{tenant.name}"
+    env["STORAGE_POOL_SIZE"] = str(max(1, settings.TENANT_DB_CONNECTIONS // max(1, workers)))
+    if settings.STORAGE_BACKEND == "postgres":
+        env["DB_SCHEMA"] = tenant.db_schema
+    else:
+        env["SQLITE_PATH"] = os.path.join(settings.TENANTS_DIR, f"{tenant.name}.sqlite")
+        env["DUCKDB_PATH"] = os.path.join(settings.TENANTS_DIR, f"{tenant.name}.duckdb")
+    env["ANALYTICS_CACHE_PATH"] = os.path.join(settings.TENANTS_DIR, f"{tenant.name}_cache.duckdb")
+    env["PARQUET_EXPORT_DIR"] = os.path.join(settings.TENANTS_DIR, tenant.name, "parquet")
+    return env
+
+
+def command_args(args: Sequence[str]) -> List[str]:
+    """hoje|utmify|vturb|tokens -> auto_extract.py; extract FONTE ARGS -> engine.py; init -> storage.py"""
+    if not args:
+        return [SCRIPTS["auto_extract"], "hoje"]
+    if args[0] == "extract":
+        if len(args) < 3:
+            raise ValueError("Use: run extract FONTE[,FONTE] hoje|ontem|DATA|INÍCIO FIM")
+        return [SCRIPTS["engine"], *args[1:]]
+    if args[0] == "init":
+        return [SCRIPTS["storage"], "init"]
+    if args[0] not in ("hoje", "utmify", "vturb", "tokens"):
+        raise ValueError(f"Comando inválido: {args[0]}")
+    return [SCRIPTS["auto_extract"], *args]
+
+
+# =====================================================
+# EXECUÇÃO
+# =====================================================
+
+async def run_tenants_async(tenants: List[Tenant], args: Sequence[str], workers: int) -> List[Dict[str, Any]]:
+    """Um processo por tenant, no máximo workers ao mesmo tempo"""
+    import asyncio
+    from scheduler import run_command_async
+
+    command = command_args(args)
+    limit = asyncio.Semaphore(workers)
+    os.makedirs(settings.TENANTS_DIR, mode=0o700, exist_ok=True)
+
+    async def run_one(tenant: Tenant) -> Dict[str, Any]:
+        async with limit:
+            ok, record = await run_command_async(
+                f"TENANT {tenant.name}", command, tenant.timeout, prefix=f"[{tenant.name}] ",
+                env=tenant_env(tenant, workers), run_lock_held=False,
+            )
+        record = record or {}
+        return {
+            "step": tenant.name,
+            "ok": ok,
+            "rows": record.get("rows", 0),
+            "seconds": record.get("seconds", 0),
+            "summary": {s.get("step"): s.get("rows", 0) for s in record.get("steps", [])},
+            "error": None if ok else next((s.get("error") for s in record.get("steps", []) if s.get("error")),
+                                          "falhou sem registro"),
+        }
+
+    return list(await asyncio.gather(*[run_one(t) for t in tenants]))
+
+
+def run_tenants(tenants: List[Tenant], args: Sequence[str], workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    workers = max(1, min(workers or settings.TENANT_WORKERS, len(tenants)))
+    logger.info(f"🏢 {len(tenants)} tenant(s), {workers} em paralelo: {' '.join(command_args(args)[1:])}")
+    import asyncio
+    return asyncio.run(run_tenants_async(tenants, args, workers))
+
+
+def print_tenants(tenants: List[Tenant]):
+    for t in tenants:
+        token_file = "✅" if os.path.exists(t.env_file) else "—"
+        print(f"🏢 {t.name:<16} schema={t.db_schema:<16} dashboards={len(t.dashboard_ids):<3} "
+              f"players={len(t.player_ids):<4} tokens={token_file}")
+
+
+def print_results(results: List[Dict[str, Any]]):
+    print("\n" + "=" * 60)
+    print("📋 RESUMO TENANTS")
+    print("=" * 60)
+    for r in results:
+        status = "✅" if r["ok"] else "❌"
+        steps = ", ".join(f"{k}: {v}" for k, v in r["summary"].items())
+        print(f"{status} {r['step']:<16} {r['rows']} registros ({r['seconds']:.1f}s) {steps}")
+        if r["error"]:
+            print(f"   ⚠️ {r['error']}")
+
+
+# =====================================================
+# MAIN
+# =====================================================
+
+def print_usage():
+    print("Uso: python3 tenants.py [list|init|run] [--tenant a,b]")
+    print("")
+    print("Comandos:")
+    print("  list                                  - Tenants cadastrados em tenants.json")
+    print("  init                                  - Cria schema e tabelas de cada tenant")
+    print("  run [hoje|utmify|vturb|tokens]        - auto_extract.py em cada tenant (padrão: hoje)")
+    print("  run extract FONTE[,FONTE] ARGS...     - engine.py em cada tenant (ex.: extract vturb ontem)")
+
+
+if __name__ == "__main__":
+    argv = sys.argv[1:]
+    names = None
+    if "--tenant" in argv:
+        i = argv.index("--tenant")
+        names = argv[i + 1].split(",") if i + 1 < len(argv) else []
+        argv = argv[:i] + argv[i + 2:]
+
+    if not argv or argv[0] not in ("list", "init", "run"):
+        print_usage()
+        sys.exit(1)
+
+    try:
+        tenants = select(load_tenants(), names)
+        if argv[0] == "list":
+            print_tenants(tenants)
+            sys.exit(0)
+        args = ["init"] if argv[0] == "init" else argv[1:]
+        results = run_tenants(tenants, args)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print_results(results)
+    record = result_channel.emit(f"tenants {' '.join(argv)}", results)
+    sys.exit(result_channel.exit_code(record))
@@ -0,0 +1,40 @@
+"""
+Fixtures comuns: cada teste roda num SQLite próprio (tmp_path), sem .env de produção,
+sem cache analítico e sem catálogo.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage  # noqa: E402
+from settings import settings, load_env  # noqa: E402
+
+# .env aplicado já no início: os testes que mexem no ambiente não dependem da ordem
+load_env()
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Backend SQLite limpo em tmp_path"""
+    settings.override(
+        STORAGE_BACKEND="sqlite",
+        SQLITE_PATH=str(tmp_path / "test.sqlite"),
+        LEADER_LOCK_DIR=str(tmp_path),
+        LEADER_ELECTION=False,
+        ANALYTICS_CACHE=False,
+        LOAD_MODE="etl",
+        CATALOG=False,
+        UTMIFY_TOKEN="token",
+        VTURB_TOKEN="token",
+    )
+    monkeypatch.setattr(storage, "_BACKENDS", {})
+    for module, flag in (("backfill", "_checkpoint_ready"), ("catalog", "_catalog_ready")):
+        if module in sys.modules:
+            monkeypatch.setattr(sys.modules[module], flag, False)
+    yield storage.get_backend()
+    storage.close_backends()
+    settings.reset()
@@ -0,0 +1,75 @@
+"""Backfill: checkpoint retoma só as unidades pendentes; fora do Postgres, uma unidade por vez"""
+
+import threading
+import time
+from datetime import date
+from types import SimpleNamespace
+
+import backfill
+import engine
+import leader
+from settings import settings
+
+START, END = date(2026, 1, 1), date(2026, 1, 2)
+
+
+def fake_sources(monkeypatch, units=("p1", "p2")):
+    source = SimpleNamespace(name="vturb", token="VTURB_TOKEN", login="vturb", job_units=lambda: list(units))
+    monkeypatch.setattr(engine, "get_source", lambda name: source)
+    monkeypatch.setattr(leader, "yield_to_higher", lambda priority, owner: 0.0)
+
+
+def test_resume_reruns_only_failed_units(db, monkeypatch):
+    fake_sources(monkeypatch)
+    calls, expired = [], [True]
+
+    def extract_job(source, key, target_date, title=None):
+        calls.append((key, target_date))
+        if key == "p2" and target_date == END and expired[0]:
+            return {"ok": False, "rows": 0, "error": "token expirado"}
+        return {"ok": True, "rows": 1}
+
+    monkeypatch.setattr(engine, "extract_job", extract_job)
+
+    first = backfill.backfill(["vturb"], START, END)[0]
+    assert not first["ok"]
+    assert first["summary"] == {"units": 4, "skipped": 0, "done": 3, "failed": 1}
+    assert backfill.counts() == {"vturb": {backfill.DONE: 3, backfill.FAILED: 1}}
+
+    calls.clear()
+    expired[0] = False
+    second = backfill.backfill(["vturb"], START, END)[0]
+    assert second["ok"]
+    assert second["summary"] == {"units": 4, "skipped": 3, "done": 1, "failed": 0}
+    assert calls == [("p2", END)]
+    assert backfill.counts() == {"vturb": {backfill.DONE: 4}}
+
+
+def test_one_unit_at_a_time_outside_postgres(db, monkeypatch):
+    fake_sources(monkeypatch, units=("p1", "p2", "p3"))
+    settings.override(BACKFILL_CONCURRENCY_VTURB=3)
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def extract_job(source, key, target_date, title=None):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return {"ok": True, "rows": 1}
+
+    monkeypatch.setattr(engine, "extract_job", extract_job)
+    backfill.backfill(["vturb"], START, END)
+
+    assert peak[0] == 1
+    assert backfill.concurrency("vturb", "postgres") == 3
+
+
+def test_backfill_yields_to_today_without_leader_election(db):
+    assert not settings.LEADER_ELECTION and settings.PRIORITY_PREEMPTION
+    assert leader.higher_in_flight("backfill") == []
+    with leader.in_flight("today"):
+        assert leader.higher_in_flight("backfill") == ["today"]
+    assert leader.higher_in_flight("backfill") == []
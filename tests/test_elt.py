@@ -0,0 +1,94 @@
+"""ELT: reproject usa o último snapshot de cada dia e unidade"""
+
+import json
+from datetime import date, datetime
+
+import pytest
+
+import elt
+import utmify_extract
+
+duckdb = pytest.importorskip("duckdb")
+
+DAY = date(2026, 1, 10)
+
+
+def landing(rows):
+    """raw_landing em DuckDB (DISTINCT ON / IS NOT DISTINCT FROM como no Postgres)"""
+    conn = duckdb.connect()
+    conn.execute(f"""
+        CREATE TABLE {elt.LANDING_TABLE} (
+            id INTEGER, snapshot_id TEXT, source TEXT, endpoint TEXT, report_date DATE,
+            unit TEXT, object_id TEXT, payload TEXT, loaded_at TIMESTAMP, full_run BOOLEAN
+        )
+    """)
+    for i, (snapshot_id, source, unit, object_id, hour, *full) in enumerate(rows, 1):
+        conn.execute(
+            f"INSERT INTO {elt.LANDING_TABLE} VALUES (?, ?, ?, '', ?, ?, ?, ?, ?, ?)",
+            [i, snapshot_id, source, DAY, unit, object_id, json.dumps({"snapshot": snapshot_id}),
+             datetime(2026, 1, 10, hour), bool(full and full[0])],
+        )
+    return conn
+
+
+def selected(conn, source, units=("p1", "p2", "d1", "d2", "Facebook", "Google")):
+    sql = elt.latest_rows_sql(source).replace("%(", "$").replace(")s", "")
+    conn.execute(f"SELECT unit, object_id, snapshot_id FROM {sql} r ORDER BY unit, object_id",
+                 {"source": source, "date_from": DAY, "date_to": DAY, "units": list(units)})
+    return conn.fetchall()
+
+
+def test_vturb_keeps_every_player_of_the_day():
+    conn = landing([
+        ("s1", "vturb", "p1", "p1", 8),
+        ("s2", "vturb", "p1", "p1", 9),
+        ("s3", "vturb", "p2", "p2", 10),
+        ("s4", "campaigns", "d1", "c1", 11),
+    ])
+    assert selected(conn, "vturb") == [("p1", "p1", "s2"), ("p2", "p2", "s3")]
+
+
+def test_campaigns_seen_in_two_dashboards_projected_once():
+    conn = landing([
+        ("s1", "campaigns", "d1", "c1", 8),
+        ("s1", "campaigns", "d1", "c2", 8),
+        ("s2", "campaigns", "d2", "c2", 9),
+        ("s2", "campaigns", "d2", "c3", 9),
+        ("s3", "campaigns", "d1", "c1", 7),
+    ])
+    assert selected(conn, "campaigns") == [("d1", "c1", "s1"), ("d2", "c2", "s2"), ("d2", "c3", "s2")]
+
+
+def test_dashboard_keeps_every_dashboard_of_each_traffic_source():
+    conn = landing([
+        ("s1", "dashboard", "Facebook", "d1", 8),
+        ("s1", "dashboard", "Facebook", "d2", 8),
+        ("s2", "dashboard", "Google", "d1", 9),
+    ])
+    assert selected(conn, "dashboard") == [
+        ("Facebook", "d1", "s1"), ("Facebook", "d2", "s1"), ("Google", "d1", "s2"),
+    ]
+
+
+def test_object_dropped_by_newer_full_run_does_not_come_back():
+    conn = landing([
+        ("s1", "campaigns", "d2", "c9", 8),              # job da fila, antes da carga completa
+        ("s2", "campaigns", "d1", "c1", 9, True),
+        ("s2", "campaigns", "d1", "c2", 9, True),
+        ("s3", "campaigns", "d1", "c1", 10, True),       # c2 sumiu da API
+        ("s4", "campaigns", "d2", "c3", 11),             # job da fila depois: entra
+    ])
+    assert selected(conn, "campaigns") == [("d1", "c1", "s3"), ("d2", "c3", "s4")]
+
+
+def test_units_outside_current_set_are_dropped():
+    conn = landing([
+        ("s1", "vturb", "p1", "p1", 8),
+        ("s2", "vturb", "p2", "p2", 9),
+    ])
+    assert selected(conn, "vturb", units=["p1"]) == [("p1", "p1", "s1")]
+
+
+def test_campaigns_land_with_their_dashboard():
+    batch = utmify_extract.transform({}, DAY, "d1", [{"id": "c1"}])
+    assert batch.raw == [("d1", "c1", {"id": "c1"})]
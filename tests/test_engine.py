@@ -0,0 +1,92 @@
+"""Virada do dia e verificação de ontem (engine.finalize_day / extract_yesterday)"""
+
+import dataclasses
+from datetime import date, timedelta
+
+import pytest
+
+import engine
+import vturb_extract
+from settings import settings
+from storage import FINAL, PROVISIONAL
+
+
+def vturb_source(payloads):
+    """Fonte vturb com a API trocada por payloads[player] (None = sem resposta)"""
+    return dataclasses.replace(vturb_extract.SOURCE, fetch=lambda target_date, player: payloads.get(player))
+
+
+def stats(views, session_views):
+    return {"views": {"totalEvents": views, "totalUniqSessionEvents": session_views}}
+
+
+def history(target_date):
+    return {r["player_id"]: r for r in engine.read_day("vturb_history", target_date)}
+
+
+def test_verification_overwrites_columns_outside_update(db):
+    settings.override(VTURB_PLAYER_IDS=["p1", "p2"])
+    yesterday = date.today() - timedelta(days=1)
+    assert "total_unique_session_views" not in vturb_extract.SOURCE.update
+
+    # Snapshot das 22h em vturb_today, promovido na virada
+    snapshot = vturb_source({"p1": stats(10, 4), "p2": stats(0, 0)})
+    assert engine.extract_date(snapshot, yesterday, to_history=False)["ok"]
+    finalized = engine.finalize_day(snapshot, yesterday)
+    assert finalized["summary"] == {"status": PROVISIONAL, "promoted": 2}
+    assert history(yesterday)["p1"]["total_unique_session_views"] == 4
+
+    # Dia inteiro: p1 ainda mudava; p2 parado já é final e não é rebuscado
+    full_day = vturb_source({"p1": stats(25, 11)})
+    result = engine.extract_yesterday(full_day)
+
+    assert result["ok"]
+    rows = history(yesterday)
+    assert rows["p1"]["total_views"] == 25
+    assert rows["p1"]["total_unique_session_views"] == 11
+    assert rows["p2"]["total_views"] == 0
+    assert db.day_status("vturb", yesterday) == FINAL
+
+
+def test_finalize_overwrites_existing_history_row(db):
+    settings.override(VTURB_PLAYER_IDS=["p1"])
+    day = date.today() - timedelta(days=1)
+    assert engine.extract_date(vturb_source({"p1": stats(3, 1)}), day)["ok"]
+    assert engine.extract_date(vturb_source({"p1": stats(8, 6)}), day, to_history=False)["ok"]
+
+    engine.finalize_day(vturb_source({}), day)
+
+    assert history(day)["p1"]["total_unique_session_views"] == 6
+
+
+def test_final_day_is_skipped(db):
+    settings.override(VTURB_PLAYER_IDS=["p1"])
+    yesterday = date.today() - timedelta(days=1)
+    db.mark_day("vturb", yesterday, FINAL)
+    called = []
+    source = dataclasses.replace(vturb_extract.SOURCE, fetch=lambda d, p: called.append(p))
+
+    assert engine.extract_yesterday(source)["summary"] == {"status": FINAL, "verified": 0}
+    assert called == []
+
+
+def test_api_calls_counted_across_loads(db):
+    settings.override(VTURB_PLAYER_IDS=["p1", "p2"])
+    source = vturb_source({"p1": stats(1, 1), "p2": stats(2, 1)})
+    engine.extract_date(source, date.today())
+    engine.fetch_rows(source, date.today() - timedelta(days=1), units=["p1"])
+    assert db.api_calls("vturb", date.today()) == 3
+
+
+def test_load_refused_over_daily_api_limit(db):
+    settings.override(VTURB_PLAYER_IDS=["p1", "p2"], API_DAILY_LIMIT_VTURB=3)
+    db.add_api_calls("vturb", date.today(), 2)
+    fetched = []
+    source = dataclasses.replace(vturb_extract.SOURCE, fetch=lambda d, player: fetched.append(player))
+
+    result = engine.extract_date(source, date.today())
+    assert not result["ok"] and "limite diário" in result["error"]
+    assert fetched == []
+    with pytest.raises(engine.ApiBudgetExceeded):
+        engine.fetch_rows(source, date.today())
+    assert db.api_calls("vturb", date.today()) == 2
@@ -0,0 +1,53 @@
+"""Detector de buracos: cobertura por unidade (vturb) e por dia inteiro (campanhas)"""
+
+import dataclasses
+from datetime import date, timedelta
+
+import engine
+import gaps
+import utmify_extract
+import vturb_extract
+from gaps import Gap
+from settings import settings
+from storage import FINAL
+
+DAY = date(2026, 1, 10)
+
+
+def day(n):
+    return DAY + timedelta(days=n)
+
+
+def load_vturb(target_date, players):
+    stats = {"views": {"totalEvents": 5, "totalUniqSessionEvents": 2}}
+    source = dataclasses.replace(vturb_extract.SOURCE, fetch=lambda d, player: stats if player in players else None)
+    engine.extract_date(source, target_date)
+
+
+def test_empty_history_has_no_gaps(db):
+    settings.override(VTURB_PLAYER_IDS=["p1"])
+    assert gaps.find_gaps(vturb_extract.SOURCE, day(0), day(3)) == []
+
+
+def test_missing_players_per_day(db):
+    settings.override(VTURB_PLAYER_IDS=["p1", "p2"])
+    load_vturb(day(1), {"p1", "p2"})
+    load_vturb(day(2), {"p1"})
+
+    # day(0) é anterior ao primeiro dia gravado: carga inicial não é buraco
+    assert gaps.find_gaps(vturb_extract.SOURCE, day(0), day(3)) == [
+        Gap("vturb", "p1", day(3)), Gap("vturb", "p2", day(3)), Gap("vturb", "p2", day(2)),
+    ]
+
+
+def test_whole_day_source_trusts_final_days_without_rows(db):
+    settings.override(UTMIFY_DASHBOARD_IDS=["d1", "d2"])
+    campaign = {"id": "c1", "name": "Campanha", "spend": 100, "revenue": 300,
+                "refundedRevenue": 0, "refundedOrdersCount": 0}
+    source = dataclasses.replace(utmify_extract.SOURCE, fetch=lambda d, dashboard: [campaign])
+    engine.extract_date(source, day(0))
+    db.mark_day("campaigns", day(1), FINAL)
+
+    assert gaps.find_gaps(utmify_extract.SOURCE, day(0), day(2)) == [
+        Gap("campaigns", "d1", day(2)), Gap("campaigns", "d2", day(2)),
+    ]
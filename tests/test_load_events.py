@@ -0,0 +1,53 @@
+"""Eventos de carga: dias do evento e assinantes (parquet_export.py watch)"""
+
+from datetime import date
+from types import SimpleNamespace
+
+import load_events
+import parquet_export
+from load_events import build_event, event_days
+
+
+def test_event_days_cover_the_range():
+    event = build_event("campaigns_history", 10, date(2026, 1, 30), date(2026, 2, 1))
+    assert event_days(event) == [date(2026, 1, 30), date(2026, 1, 31), date(2026, 2, 1)]
+    assert event_days(build_event("vturb_today", 1, date(2026, 1, 5))) == [date(2026, 1, 5)]
+
+
+def test_parquet_watch_exports_only_event_days(monkeypatch):
+    exported = []
+    events = [
+        build_event("campaigns_history", 3, date(2026, 1, 9), date(2026, 1, 10)),
+        build_event("campaigns_today", 2, date(2026, 1, 11)),
+        build_event("vturb_history", 1, date(2026, 1, 8)),
+    ]
+
+    def run(listener, poll_interval=5.0):
+        for event in events:
+            listener.dispatch(event)
+
+    monkeypatch.setattr(parquet_export, "get_backend", lambda config=None: SimpleNamespace(name="postgres"))
+    monkeypatch.setattr(parquet_export, "export", lambda tables: exported.append(("pendente", tables)))
+    monkeypatch.setattr(parquet_export, "export_days", lambda table, days: exported.append((table, days)))
+    monkeypatch.setattr(load_events.LoadListener, "run", run)
+
+    parquet_export.watch(["campaigns_history"])
+
+    assert exported == [
+        ("pendente", ["campaigns_history"]),
+        ("campaigns_history", [date(2026, 1, 9), date(2026, 1, 10)]),
+    ]
+
+
+def test_export_days_writes_event_partitions(db, tmp_path):
+    from settings import settings
+    from schema import CAMPAIGNS
+    from storage import _synthetic_rows
+
+    settings.override(PARQUET_EXPORT_DIR=str(tmp_path / "parquet"))
+    rows = _synthetic_rows(3)
+    db.load("campaigns_history", rows, update=CAMPAIGNS.update)
+    day = rows[0][1]
+
+    assert parquet_export.export_days("campaigns_history", [day]) == 3
+    assert (tmp_path / "parquet" / "campaigns_history" / f"month={day:%Y-%m}" / f"day={day}" / "part-0.parquet").exists()
@@ -0,0 +1,79 @@
+"""Revalidação: reembolsos, chargebacks e pendentes tardios são detectados e gravados"""
+
+import dataclasses
+from datetime import date, timedelta
+
+import dashboard_extract
+import engine
+import revalidate
+import utmify_extract
+from schema import DASHBOARD
+from settings import settings
+from storage import table_columns
+
+DAY = date.today() - timedelta(days=3)
+
+
+def campaign(revenue, refunded=0, refunded_orders=0):
+    return {"id": "c1", "name": "Campanha", "spend": 5000, "revenue": revenue,
+            "refundedRevenue": refunded, "refundedOrdersCount": refunded_orders}
+
+
+def campaigns_source(payload):
+    return dataclasses.replace(utmify_extract.SOURCE, fetch=lambda target_date, dashboard: payload)
+
+
+def dashboard_row(**values):
+    row = dict.fromkeys(table_columns("dashboard_history"), 0)
+    row.update({"report_date": DAY, "traffic_source": "all", **values})
+    return row
+
+
+def test_compared_columns_cover_late_changes():
+    for table in ("campaigns_history", "dashboard_history"):
+        compared = revalidate.compared_columns(table)
+        assert {"refunded_orders", "refunded_revenue", "pending_revenue"} <= set(compared)
+    assert "chargeback_revenue" in revalidate.compared_columns("dashboard_history")
+    assert "chargeback_revenue" not in DASHBOARD.update
+    assert "report_date" not in revalidate.compared_columns("dashboard_history")
+
+
+def test_diff_rows_detects_chargeback_outside_update():
+    source = dashboard_extract.SOURCE
+    columns = table_columns("dashboard_history")
+    current = [dashboard_row(gross_revenue=100.0)]
+    fetched = dashboard_row(gross_revenue=100.0, chargedback_orders=1, chargeback_revenue=40.0)
+
+    result = revalidate.diff_rows(source, [tuple(fetched[c] for c in columns)], current)
+
+    assert result["changed"] == 1 and result["new"] == 0
+    assert result["moved"] == {"chargedback_orders": 1.0, "chargeback_revenue": 40.0}
+
+
+def test_diff_rows_unchanged_and_new():
+    source = dashboard_extract.SOURCE
+    columns = table_columns("dashboard_history")
+    current = [dashboard_row(gross_revenue=100.0)]
+    same = dashboard_row(gross_revenue=100.0)
+    other = dashboard_row(traffic_source="Meta", gross_revenue=5.0)
+
+    result = revalidate.diff_rows(source, [tuple(r[c] for c in columns) for r in (same, other)], current)
+
+    assert (result["changed"], result["new"], result["checked"]) == (0, 1, 2)
+    assert len(result["rows"]) == 1
+
+
+def test_revalidate_day_writes_refund(db):
+    settings.override(UTMIFY_DASHBOARD_IDS=["d1"])
+    assert engine.extract_date(campaigns_source([campaign(10000)]), DAY)["ok"]
+
+    result = revalidate.revalidate_day(campaigns_source([campaign(10000, refunded=4000, refunded_orders=1)]), DAY)
+
+    assert result["changed"] == 1
+    assert result["moved"] == {"refunded_revenue": 40.0, "refunded_orders": 1.0}
+    row = engine.read_day("campaigns_history", DAY)[0]
+    assert float(row["refunded_revenue"]) == 40.0
+    assert row["refunded_orders"] == 1
+
+    again = revalidate.revalidate_day(campaigns_source([campaign(10000, refunded=4000, refunded_orders=1)]), DAY)
+    assert (again["changed"], again["new"]) == (0, 0)
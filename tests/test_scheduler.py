@@ -0,0 +1,30 @@
+"""Scheduler: jobs da classe backfill rodam em segundo plano sem segurar o tick()"""
+
+import threading
+from datetime import datetime, timedelta
+
+import scheduler
+
+
+def test_background_job_does_not_block_tick(db, monkeypatch):
+    monkeypatch.setattr(scheduler, "_runs", {})
+    monkeypatch.setattr(scheduler, "_background", {})
+    release, calls = threading.Event(), []
+
+    def run(reason):
+        calls.append(reason)
+        return release.wait(10)
+
+    job = scheduler.ScheduledJob("revalidate", "Revalidação", run, lambda now: now.replace(hour=0),
+                                 timedelta(days=1), background=True)
+    now = datetime.now()
+
+    assert scheduler.run_scheduled(job, now) is None
+    assert scheduler.run_scheduled(job, now) is None  # ainda rodando: não dispara de novo
+    assert scheduler._runs["revalidate"].ok is None
+
+    release.set()
+    scheduler._background["revalidate"].join(10)
+    assert len(calls) == 1
+    assert scheduler._runs["revalidate"].ok is True
+    assert not scheduler.is_due(job, datetime.now())
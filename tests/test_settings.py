@@ -0,0 +1,19 @@
+"""Configuração preguiçosa: os ajustes valem no uso, não no import"""
+
+import engine
+from pipeline import Pipeline
+from settings import settings
+
+
+def test_pipeline_knobs_follow_override(db):
+    settings.override(PIPELINE_QUEUE_SIZE=9, PIPELINE_FETCH_WORKERS=3)
+    assert Pipeline("teste", []).queue_size == 9
+    fetch, _ = engine.stages(engine.get_source("vturb"), None, {})
+    assert fetch.workers == 3
+
+
+def test_env_read_at_access(monkeypatch):
+    monkeypatch.setenv("ELT_RETENTION_DAYS", "7")
+    settings.reset("ELT_RETENTION_DAYS")
+    assert settings.ELT_RETENTION_DAYS == 7
+    settings.reset("ELT_RETENTION_DAYS")
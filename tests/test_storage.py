@@ -0,0 +1,118 @@
+"""Carga em partes (LoadStream) nos backends"""
+
+import pytest
+
+import storage
+from schema import CAMPAIGNS
+from settings import settings
+
+
+class FakePostgresCursor:
+    """Cursor que imita as tabelas temporárias do Postgres (CREATE repetido falha)"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = 0
+        self.copied = 0
+
+    def execute(self, sql, params=None):
+        self.conn.statements.append(sql)
+        words = sql.split()
+        if sql.startswith("CREATE TEMP TABLE"):
+            if words[3] in self.conn.temp:
+                raise RuntimeError(f'relation "{words[3]}" already exists')
+            self.conn.temp.add(words[3])
+        elif sql.startswith("DROP TABLE"):
+            self.conn.temp.remove(words[2])
+        elif sql.startswith("INSERT INTO") and " SELECT " in sql:
+            self.rowcount = self.copied
+
+    def executemany(self, sql, rows):
+        self.conn.statements.append(sql)
+
+    def copy_expert(self, sql, buffer):
+        self.conn.statements.append(sql)
+        self.copied = len(buffer.getvalue().splitlines())
+
+
+class FakePostgresConnection:
+    def __init__(self):
+        self.temp = set()
+        self.statements = []
+        self.committed = False
+
+    def cursor(self):
+        return FakePostgresCursor(self)
+
+    def commit(self):
+        self.temp.clear()  # ON COMMIT DROP
+        self.committed = True
+
+    def rollback(self):
+        self.temp.clear()
+
+
+def test_postgres_copy_threshold_twice_in_one_stream(monkeypatch):
+    settings.override(COPY_THRESHOLD=2, ANALYTICS_CACHE=False)
+    try:
+        backend = storage.PostgresBackend({})
+        conn = FakePostgresConnection()
+        monkeypatch.setattr(backend, "connect", lambda: conn)
+        monkeypatch.setattr(backend, "release", lambda c: None)
+
+        rows = storage._synthetic_rows(6)
+        with backend.stream("campaigns_history", update=CAMPAIGNS.update) as stream:
+            assert stream.write(rows[:3]) == 3
+            assert stream.write(rows[3:]) == 3
+
+        assert conn.committed
+        assert stream.count == 6
+        assert sum(1 for s in conn.statements if s.startswith("CREATE TEMP TABLE")) == 2
+        assert not conn.temp
+    finally:
+        settings.reset()
+
+
+def test_sqlite_stream_upserts_across_writes(db):
+    rows = storage._synthetic_rows(4)
+    with db.stream("campaigns_history", update=CAMPAIGNS.update) as stream:
+        stream.write(rows[:2])
+        stream.write(rows[2:])
+        stream.write([rows[0][:2] + ("Renomeada",) + rows[0][3:]])
+
+    conn = db.connect()
+    try:
+        cursor = db.cursor(conn)
+        cursor.execute("SELECT COUNT(*) FROM campaigns_history")
+        assert cursor.fetchone()[0] == 4
+        cursor.execute("SELECT name FROM campaigns_history WHERE campaign_id = 'bench-0'")
+        assert cursor.fetchone()[0] == "Renomeada"
+    finally:
+        db.release(conn)
+
+
+@pytest.mark.parametrize("mode", ["replace", "insert"])
+def test_stream_without_writes_touches_nothing(db, mode):
+    with db.stream("campaigns_today", mode=mode) as stream:
+        pass
+    assert stream.count == 0
+    assert stream.conn is None
+
+
+def test_replace_clears_only_at_commit(db, monkeypatch):
+    settings.override(COPY_THRESHOLD=2)
+    backend = storage.PostgresBackend({})
+    conn = FakePostgresConnection()
+    monkeypatch.setattr(backend, "connect", lambda: conn)
+    monkeypatch.setattr(backend, "release", lambda c: None)
+    monkeypatch.setattr(backend, "after_commit", lambda *args: None)
+
+    rows = storage._synthetic_rows(4)
+    with backend.stream("campaigns_today", mode="replace") as stream:
+        assert stream.write(rows[:2]) == 2
+        assert stream.write(rows[2:]) == 2
+        assert not conn.statements  # nada no banco enquanto as unidades ainda baixam
+
+    assert conn.statements[0] == "TRUNCATE TABLE campaigns_today"
+    assert conn.committed
+    assert stream.count == 4
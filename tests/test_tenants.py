@@ -0,0 +1,70 @@
+"""Tenants: cadastro validado e nenhum padrão da conta principal no processo do tenant"""
+
+import pytest
+
+import tenants
+from settings import settings, TENANT_VAR
+
+TENANT = {
+    "name": "cliente_a",
+    "utmify_email": "a@cliente-a.com",
+    "utmify_password": "x",
+    "dashboard_ids": ["d1"],
+    "vturb_email": "a@cliente-a.com",
+    "vturb_password": "x",
+    "vturb_target_org_email": "",
+    "player_ids": ["p1"],
+}
+
+
+def test_target_org_must_be_explicit():
+    data = {k: v for k, v in TENANT.items() if k != "vturb_target_org_email"}
+    with pytest.raises(ValueError, match="vturb_target_org_email"):
+        tenants.parse_tenant(data)
+    assert tenants.parse_tenant(TENANT).vturb_target_org_email == ""
+
+
+def test_tenant_env_isolated_from_main_account(monkeypatch):
+    monkeypatch.setenv("VTURB_TARGET_ORG_EMAIL", "principal@conta.com")
+    monkeypatch.setenv("VTURB_HEALTHCHECK_PLAYER_ID", "player-principal")
+    env = tenants.tenant_env(tenants.parse_tenant(TENANT), workers=1)
+
+    assert env[TENANT_VAR] == "cliente_a"
+    assert "VTURB_TARGET_ORG_EMAIL" not in env
+    assert env["VTURB_HEALTHCHECK_PLAYER_ID"] == "p1"
+
+
+@pytest.mark.parametrize("name", ["VTURB_TARGET_ORG_EMAIL", "VTURB_EMAIL", "UTMIFY_PASSWORD"])
+def test_main_account_defaults_blank_in_tenant_process(monkeypatch, name):
+    monkeypatch.delenv(name, raising=False)
+    settings.reset(name)
+    assert getattr(settings, name)
+    monkeypatch.setenv(TENANT_VAR, "cliente_a")
+    settings.reset(name)
+    try:
+        assert getattr(settings, name) == ""
+    finally:
+        settings.reset(name)
+
+
+def test_main_account_lists_blank_in_tenant_process(monkeypatch):
+    monkeypatch.delenv("VTURB_PLAYER_IDS", raising=False)
+    monkeypatch.setenv(TENANT_VAR, "cliente_a")
+    settings.reset("VTURB_PLAYER_IDS")
+    try:
+        assert settings.VTURB_PLAYER_IDS == []
+    finally:
+        settings.reset("VTURB_PLAYER_IDS")
+
+
+def test_no_dashboard_skips_utmify_login():
+    import auto_extract
+
+    settings.override(UTMIFY_DASHBOARD_IDS=[])
+    try:
+        with pytest.raises(ValueError, match="UTMIFY_DASHBOARD_IDS vazio"):
+            auto_extract.utmify_url()
+        assert not auto_extract.is_utmify_token_active("token")
+        assert auto_extract.ensure_utmify_token(playwright=None) is None
+    finally:
+        settings.reset("UTMIFY_DASHBOARD_IDS")
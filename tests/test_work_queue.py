@@ -0,0 +1,37 @@
+"""Worker da fila: tokens renovados no .env valem a partir do próximo job"""
+
+from datetime import date
+
+import engine
+import leader
+import settings as settings_module
+import work_queue
+from settings import settings
+
+
+def test_worker_rereads_tokens_before_each_job(db, tmp_path, monkeypatch):
+    env_file = tmp_path / ".env"
+    env_file.write_text("UTMIFY_TOKEN=antigo\n")
+    read_env_file = settings_module.read_env_file
+    monkeypatch.setattr(settings_module, "read_env_file", lambda path=None: read_env_file(str(env_file)))
+    monkeypatch.setenv("UTMIFY_TOKEN", "")
+
+    jobs = [work_queue.Job(i, "campaigns", "d1", date(2026, 1, i), 1, 3) for i in (1, 2)]
+    seen = []
+
+    def extract_job(source, key, target_date, title=None):
+        seen.append(settings.UTMIFY_TOKEN)
+        env_file.write_text("UTMIFY_TOKEN=novo\n")  # auto_extract renovou durante o job
+        return {"ok": True, "rows": 1}
+
+    monkeypatch.setattr(engine, "extract_job", extract_job)
+    monkeypatch.setattr(engine, "get_source", lambda name: name)
+    monkeypatch.setattr(work_queue, "ensure_queue", lambda: None)
+    monkeypatch.setattr(work_queue, "claim", lambda worker, ceiling: jobs.pop(0) if jobs else None)
+    monkeypatch.setattr(work_queue, "complete", lambda job, worker, rows: True)
+    monkeypatch.setattr(leader, "priority_ceiling", lambda: leader.PRIORITIES["backfill"])
+
+    stats = work_queue.work(max_jobs=2)
+
+    assert stats == {"done": 2, "failed": 0}
+    assert seen == ["antigo", "novo"]
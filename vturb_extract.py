@@ -1,18 +1,23 @@
 #!/usr/bin/env python3
 """
 VTurb Data Extractor
-Comandos: python vturb_extract.py hoje | ontem
+Fonte "vturb" do engine.py: um pedido por player.
+No ciclo de hoje só os players com views/plays nos últimos VTURB_ACTIVE_DAYS dias são buscados; os
+parados entram numa varredura a cada VTURB_DORMANT_SWEEP_HOURS horas (a linha deles em vturb_today fica).
+Os players da conta são listados na API (fetch_players) e sincronizados com o catálogo (catalog.py).
+Comandos: python vturb_extract.py hoje | ontem | DD/MM/YYYY | DD/MM/YYYY DD/MM/YYYY
 """
 
-import os
-import requests
-import json
-from datetime import datetime, timedelta, date
-from typing import Dict, Optional
+import sys
+from datetime import datetime, date, timedelta
+from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 import logging
 
-import psycopg2
+import engine
+from engine import Source, Batch
+from settings import settings
+from schema import VTURB
 
 logging.basicConfig(
     level=logging.INFO,
@@ -21,83 +26,15 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-# =====================================================
-# CARREGAR .ENV
-# =====================================================
-
-def load_env():
-    """Carrega variáveis do arquivo .env"""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    env_file = os.path.join(script_dir, ".env")
-    
-    if os.path.exists(env_file):
-        with open(env_file, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    key, value = key.strip(), value.strip()
-                    if value:
-                        os.environ[key] = value
-
-load_env()
-
-
 # =====================================================
 # CONFIGURAÇÕES
 # =====================================================
 
-DB_CONFIG = {
-    "host": os.getenv("DB_HOST"),
-    "port": os.getenv("DB_PORT"),
-    "database": os.getenv("DB_NAME"),
-    "user": os.getenv("DB_USER"),
-    "password": os.getenv("DB_PASSWORD"),
-}
-
-VTURB_TOKEN = os.getenv("VTURB_TOKEN", "")
-
-PLAYER_IDS = [
-    '693a3e45e891e679e7727765',
-    '691b21ad05cbd5105c709802',
-    '68d5efd4861b70626857ef1e',
-    '68d5f040861b70626857efc5',
-    '68d5f0d8b6d4ef5b76bf6e3b',
-    '68d5f1141f0c16bccf4f42e1',
-    '695bd291707d41fbaa79efa1',
-    '6985f7228fd75d51815b9eab',
-    '68d7340b232c1a965f3b8b29',
-    '68d7367752020545d65d1933',
-    '68d738dda4bea31e50e65a62',
-    '696efdd3e1aa589ccc4d9028',
-    '696efddaa4304f1d777b5f94',
-    '696efde0edc67029da1c04a6',
-    '696efde6521058214caadf91',
-    '696efdeea4304f1d777b5fee',
-    '69725ecbe6996b070b27bf65',
-    '69725f2ad310ef352e0255e2',
-    '6972e6ae938018005141d189',
-    '6972e6cdc8196f1982aab633',
-    '6972677e109c2c0df2550c91',
-    '697267844a89073d7e1f1901',
-    '6972678b9cf9fc801ee7b9c8',
-    '6938cff1e45bb9548f311ced',
-    '6939e2dfe891e679e77211e2',
-    '69409ba79ff1b4f2bbc57b76',
-    '694ab5f5a54e8f46c18817a3',
-    '694ab6cea54e8f46c18818d4',
-    '694ab7a171611df8184b1a76',
-    '694ab87ca54e8f46c1881b03',
-    '694acdb1ed1852c895dadb7d',
-    '694ace8390b70171e37c03c8',
-    '694acf5aa54e8f46c18834a3',
-    '694ad02f71611df8184b3543',
-    '694ad10963476f09ce028807'
-]
-
 TIMEZONE = 'America/Sao_Paulo'
+TIMEOUT = 30
 
-logger.info(f"🔑 Token: {'✅ Definido' if VTURB_TOKEN else '❌ Não definido'}")
+# Colunas que contam como atividade do player no dia
+ACTIVITY_COLUMNS = ("total_views", "total_plays")
 
 
 # =====================================================
@@ -106,6 +43,7 @@ logger.info(f"🔑 Token: {'✅ Definido' if VTURB_TOKEN else '❌ Não definido
 
 @dataclass
 class PlayerStats:
+    """Linha de vturb_history com nomes (mesma ordem de schema.VTURB: PlayerStats(*row))"""
     player_id: str
     stats_date: date
     extraction_timestamp: str
@@ -147,10 +85,9 @@ class PlayerStats:
 # API
 # =====================================================
 
-def fetch_player_stats(player_id: str, target_date: date) -> Optional[Dict]:
-    """Busca estatísticas do player na API VTurb"""
-    
-    token = VTURB_TOKEN.strip()
+def vturb_headers() -> Optional[Dict[str, str]]:
+    """Headers com o VTURB_TOKEN (None se não definido)"""
+    token = settings.VTURB_TOKEN.strip()
     if not token:
         logger.error("❌ VTURB_TOKEN não definido!")
         return None
@@ -158,300 +95,223 @@ def fetch_player_stats(player_id: str, target_date: date) -> Optional[Dict]:
     if token.lower().startswith("bearer "):
         token = token[7:].strip()
     
-    url = f"https://api.vturb.com/vturb/v2/players/{player_id}/analytics_stream/player_stats"
-    
-    headers = {
+    return {
         'Authorization': f'Bearer {token}',
         'Content-Type': 'application/json',
         'Accept': 'application/json'
     }
+
+
+def fetch_player_stats(player_id: str, target_date: date) -> Optional[Dict]:
+    """Busca estatísticas do player na API VTurb"""
     
-    start_date = f"{target_date.strftime('%Y-%m-%d')} 00:00:00"
-    end_date = f"{target_date.strftime('%Y-%m-%d')} 23:59:59"
+    headers = vturb_headers()
+    if headers is None:
+        return None
+    
+    url = f"https://api.vturb.com/vturb/v2/players/{player_id}/analytics_stream/player_stats"
     
     body = {
         'player_stats': {
             'player_id': player_id,
-            'start_date': start_date,
-            'end_date': end_date,
+            'start_date': f"{target_date.strftime('%Y-%m-%d')} 00:00:00",
+            'end_date': f"{target_date.strftime('%Y-%m-%d')} 23:59:59",
             'timezone': TIMEZONE
         }
     }
     
     logger.info(f"🔄 Buscando player {player_id} - {target_date.strftime('%d/%m/%Y')}")
-    
-    try:
-        response = requests.post(url, headers=headers, json=body, timeout=30)
-        
-        if response.status_code == 200:
-            data = response.json()
-            logger.info(f"✅ Dados recebidos para player {player_id}")
-            return data.get('stats', data)
-        elif response.status_code == 401:
-            logger.error("🔐 Token inválido ou expirado!")
-            return None
-        else:
-            logger.error(f"❌ Erro {response.status_code}: {response.text[:200]}")
-            return None
-            
-    except Exception as e:
-        logger.error(f"💥 Erro: {e}")
+    data = engine.post_json(url, body, headers, TIMEOUT, f"player {player_id}")
+    if data is None:
         return None
+    
+    logger.info(f"✅ Dados recebidos para player {player_id}")
+    return data.get('stats', data)
 
 
-def parse_stats(raw_data: Dict, player_id: str, target_date: date) -> PlayerStats:
-    """Converte dados da API para PlayerStats"""
+def fetch_players() -> Optional[List[str]]:
+    """Ids dos players da conta (VTURB_PLAYERS_URL), na ordem da API; None se a listagem falhar"""
+    headers = vturb_headers()
+    if headers is None:
+        return None
     
-    views = raw_data.get('views', {})
-    plays = raw_data.get('plays', {})
-    finishes = raw_data.get('finishes', {})
-    clicks = raw_data.get('clicks', {})
-    conversions = raw_data.get('conversions', {})
-    play_rate = raw_data.get('playRate', {})
-    conversion_rate = raw_data.get('conversionRate', {})
-    engagement = raw_data.get('engagement_stats', {})
+    data = engine.get_json(settings.VTURB_PLAYERS_URL, headers, TIMEOUT, "lista de players")
+    if data is None:
+        return None
+    
+    # Lista direta ou envelopada ({"players": [...]}, {"data": [...]})
+    items = data
+    if isinstance(data, dict):
+        items = next((data[k] for k in ("players", "data", "items") if isinstance(data.get(k), list)), [])
     
-    return PlayerStats(
-        player_id=player_id,
-        stats_date=target_date,
-        extraction_timestamp=datetime.now().isoformat(),
-        start_datetime=f"{target_date.strftime('%Y-%m-%d')} 00:00:00",
-        end_datetime=f"{target_date.strftime('%Y-%m-%d')} 23:59:59",
-        
-        total_views=views.get('totalEvents', 0),
-        total_unique_device_views=views.get('totalUniqDeviceEvents', 0),
-        total_unique_session_views=views.get('totalUniqSessionEvents', 0),
-        
-        total_plays=plays.get('totalEvents', 0),
-        total_unique_device_plays=plays.get('totalUniqDeviceEvents', 0),
-        total_unique_session_plays=plays.get('totalUniqSessionEvents', 0),
-        
-        total_finishes=finishes.get('totalEvents', 0),
-        total_unique_device_finishes=finishes.get('totalUniqDeviceEvents', 0),
-        total_unique_session_finishes=finishes.get('totalUniqSessionEvents', 0),
-        
-        total_clicks=clicks.get('totalEvents', 0),
-        total_unique_device_clicks=clicks.get('totalUniqDeviceEvents', 0),
-        total_unique_session_clicks=clicks.get('totalUniqSessionEvents', 0),
-        
-        total_conversions=conversions.get('totalEvents', 0),
-        total_unique_device_conversions=conversions.get('totalUniqDeviceEvents', 0),
-        total_unique_session_conversions=conversions.get('totalUniqSessionEvents', 0),
-        total_amount_brl=conversions.get('totalAmountBrl', 0) or 0,
-        total_amount_usd=conversions.get('totalAmountUsd', 0) or 0,
-        total_amount_eur=conversions.get('totalAmountEur', 0) or 0,
-        
-        overall_play_rate=play_rate.get('overallPlayRate', 0) or 0,
-        overall_conversion_rate=conversion_rate.get('overallConversionRate', 0) or 0,
-        
-        average_watched_time=engagement.get('average_watched_time', 0) or 0,
-        engagement_rate=engagement.get('engagement_rate', 0) or 0,
-        pitch_time_retention_rate=engagement.get('pitch_time_retention_rate', 0) or 0
-    )
+    players: List[str] = []
+    for item in items:
+        player_id = (item.get('id') or item.get('_id') or item.get('player_id')) if isinstance(item, dict) else item
+        if player_id and str(player_id) not in players:
+            players.append(str(player_id))
+    logger.info(f"🎬 {len(players)} players na conta VTurb")
+    return players
 
 
 # =====================================================
-# DATABASE
+# TRANSFORMAÇÃO
 # =====================================================
 
-def save_to_history(stats: PlayerStats) -> bool:
-    """Salva em vturb_history (UPSERT)"""
-    
-    conn = psycopg2.connect(**DB_CONFIG)
-    cursor = conn.cursor()
-    
-    query = """
-        INSERT INTO vturb_history (
-            player_id, stats_date, extraction_timestamp, start_datetime, end_datetime,
-            total_views, total_unique_device_views, total_unique_session_views,
-            total_plays, total_unique_device_plays, total_unique_session_plays,
-            total_finishes, total_unique_device_finishes, total_unique_session_finishes,
-            total_clicks, total_unique_device_clicks, total_unique_session_clicks,
-            total_conversions, total_unique_device_conversions, total_unique_session_conversions,
-            total_amount_brl, total_amount_usd, total_amount_eur,
-            overall_play_rate, overall_conversion_rate,
-            average_watched_time, engagement_rate, pitch_time_retention_rate
-        ) VALUES (
-            %s, %s, %s, %s, %s,
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-        )
-        ON CONFLICT (player_id, stats_date) DO UPDATE SET
-            extraction_timestamp = EXCLUDED.extraction_timestamp,
-            total_views = EXCLUDED.total_views,
-            total_unique_device_views = EXCLUDED.total_unique_device_views,
-            total_plays = EXCLUDED.total_plays,
-            total_unique_device_plays = EXCLUDED.total_unique_device_plays,
-            total_finishes = EXCLUDED.total_finishes,
-            total_clicks = EXCLUDED.total_clicks,
-            total_conversions = EXCLUDED.total_conversions,
-            total_amount_brl = EXCLUDED.total_amount_brl,
-            overall_play_rate = EXCLUDED.overall_play_rate,
-            overall_conversion_rate = EXCLUDED.overall_conversion_rate,
-            average_watched_time = EXCLUDED.average_watched_time,
-            engagement_rate = EXCLUDED.engagement_rate,
-            pitch_time_retention_rate = EXCLUDED.pitch_time_retention_rate
-    """
-    
-    values = (
-        stats.player_id, stats.stats_date, stats.extraction_timestamp,
-        stats.start_datetime, stats.end_datetime,
-        stats.total_views, stats.total_unique_device_views, stats.total_unique_session_views,
-        stats.total_plays, stats.total_unique_device_plays, stats.total_unique_session_plays,
-        stats.total_finishes, stats.total_unique_device_finishes, stats.total_unique_session_finishes,
-        stats.total_clicks, stats.total_unique_device_clicks, stats.total_unique_session_clicks,
-        stats.total_conversions, stats.total_unique_device_conversions, stats.total_unique_session_conversions,
-        stats.total_amount_brl, stats.total_amount_usd, stats.total_amount_eur,
-        stats.overall_play_rate, stats.overall_conversion_rate,
-        stats.average_watched_time, stats.engagement_rate, stats.pitch_time_retention_rate
-    )
-    
-    cursor.execute(query, values)
-    conn.commit()
-    cursor.close()
-    conn.close()
-    
-    logger.info(f"✅ Salvo em vturb_history: {stats.player_id} - {stats.stats_date}")
-    return True
+def row_context(player_id: str, target_date: date) -> Dict[str, Any]:
+    """Colunas de vturb_history/vturb_today que não vêm do payload"""
+    day = target_date.strftime('%Y-%m-%d')
+    return {
+        "player_id": player_id,
+        "stats_date": target_date,
+        "extraction_timestamp": datetime.now().isoformat(),
+        "start_datetime": f"{day} 00:00:00",
+        "end_datetime": f"{day} 23:59:59",
+    }
 
 
-def save_to_today(stats_list: list) -> bool:
-    """Salva em vturb_today (TRUNCATE + INSERT)"""
-    
-    if not stats_list:
-        return False
-    
-    conn = psycopg2.connect(**DB_CONFIG)
-    cursor = conn.cursor()
-    
-    # Limpa tabela
-    cursor.execute("TRUNCATE TABLE vturb_today")
-    logger.info("🗑️ Tabela vturb_today limpa")
-    
-    query = """
-        INSERT INTO vturb_today (
-            player_id, stats_date, extraction_timestamp, start_datetime, end_datetime,
-            total_views, total_unique_device_views, total_unique_session_views,
-            total_plays, total_unique_device_plays, total_unique_session_plays,
-            total_finishes, total_unique_device_finishes, total_unique_session_finishes,
-            total_clicks, total_unique_device_clicks, total_unique_session_clicks,
-            total_conversions, total_unique_device_conversions, total_unique_session_conversions,
-            total_amount_brl, total_amount_usd, total_amount_eur,
-            overall_play_rate, overall_conversion_rate,
-            average_watched_time, engagement_rate, pitch_time_retention_rate
-        ) VALUES (
-            %s, %s, %s, %s, %s,
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-        )
-    """
-    
-    for stats in stats_list:
-        values = (
-            stats.player_id, stats.stats_date, stats.extraction_timestamp,
-            stats.start_datetime, stats.end_datetime,
-            stats.total_views, stats.total_unique_device_views, stats.total_unique_session_views,
-            stats.total_plays, stats.total_unique_device_plays, stats.total_unique_session_plays,
-            stats.total_finishes, stats.total_unique_device_finishes, stats.total_unique_session_finishes,
-            stats.total_clicks, stats.total_unique_device_clicks, stats.total_unique_session_clicks,
-            stats.total_conversions, stats.total_unique_device_conversions, stats.total_unique_session_conversions,
-            stats.total_amount_brl, stats.total_amount_usd, stats.total_amount_eur,
-            stats.overall_play_rate, stats.overall_conversion_rate,
-            stats.average_watched_time, stats.engagement_rate, stats.pitch_time_retention_rate
-        )
-        cursor.execute(query, values)
-    
-    conn.commit()
-    cursor.close()
-    conn.close()
-    
-    logger.info(f"✅ {len(stats_list)} players salvos em vturb_today")
-    return True
+def transform(state: Dict[str, Any], target_date: date, player_id: str, raw_data: Optional[Dict]) -> Optional[Batch]:
+    """Um player por vez: PlayerStats (resumo), a linha para o stream e o payload para o ELT"""
+    if not raw_data:
+        return None
+    row = VTURB.row(raw_data, row_context(player_id, target_date))
+    return Batch([PlayerStats(*row)], [row], [(player_id, player_id, raw_data)])
 
 
 # =====================================================
 # EXTRAÇÃO
 # =====================================================
 
+def summarize(stats_list: list) -> Dict[str, Any]:
+    """Totais dos players"""
+    return {
+        "players": len(stats_list),
+        "views": sum(s.total_views for s in stats_list),
+        "plays": sum(s.total_plays for s in stats_list),
+        "clicks": sum(s.total_clicks for s in stats_list),
+        "conversions": sum(s.total_conversions for s in stats_list),
+    }
+
+
 def print_summary(stats_list: list):
     """Imprime resumo"""
-    total_views = sum(s.total_views for s in stats_list)
-    total_plays = sum(s.total_plays for s in stats_list)
-    total_clicks = sum(s.total_clicks for s in stats_list)
-    total_conversions = sum(s.total_conversions for s in stats_list)
+    summary = summarize(stats_list)
     
     print("\n" + "=" * 50)
     print("📈 RESUMO")
     print("=" * 50)
-    print(f"Players: {len(stats_list)}")
-    print(f"Views: {total_views:,}".replace(',', '.'))
-    print(f"Plays: {total_plays:,}".replace(',', '.'))
-    print(f"Clicks: {total_clicks:,}".replace(',', '.'))
-    print(f"Conversões: {total_conversions:,}".replace(',', '.'))
+    print(f"Players: {summary['players']}")
+    print(f"Views: {summary['views']:,}".replace(',', '.'))
+    print(f"Plays: {summary['plays']:,}".replace(',', '.'))
+    print(f"Clicks: {summary['clicks']:,}".replace(',', '.'))
+    print(f"Conversões: {summary['conversions']:,}".replace(',', '.'))
     print("=" * 50)
     print("✅ Extração concluída!")
 
 
-def extract_today():
+def settling(rows: List[Dict[str, Any]]) -> List[str]:
+    """Players sem linha provisória ou com views/plays no dia (os parados já são finais)"""
+    idle = {r["player_id"] for r in rows if not engine.active(r, ACTIVITY_COLUMNS)}
+    return [p for p in settings.VTURB_PLAYER_IDS if p not in idle]
+
+
+# =====================================================
+# ATIVIDADE
+# =====================================================
+
+def last_activity(since: date) -> Dict[str, Optional[date]]:
+    """
+    Player -> último dia com views/plays em vturb_history desde since (None = só dias parados).
+    Player ausente = sem linha na janela (novo ou sem carga): é buscado.
+    """
+    from storage import get_backend, as_date
+
+    backend = get_backend(settings.DB_CONFIG)
+    conn = backend.connect()
+    try:
+        backend.ensure_schema(conn)
+        cursor = backend.cursor(conn)
+        active = " OR ".join(f"{c} > 0" for c in ACTIVITY_COLUMNS)
+        cursor.execute(
+            f"SELECT player_id, MAX(CASE WHEN {active} THEN stats_date END) FROM vturb_history "
+            f"WHERE stats_date >= {backend.placeholder} GROUP BY player_id",
+            backend.adapt_row((since,)),
+        )
+        rows = cursor.fetchall()
+        conn.commit()
+    finally:
+        backend.release(conn)
+    return {str(player): (as_date(day) if day is not None else None) for player, day in rows}
+
+
+def today_units(rows: List[Dict[str, Any]]) -> List[str]:
+    """
+    Players do ciclo de hoje (rows = linhas atuais de vturb_today): ativos na janela ou hoje,
+    sem histórico na janela e parados cuja última busca passou de VTURB_DORMANT_SWEEP_HOURS.
+    """
+    from storage import as_datetime
+
+    players = settings.VTURB_PLAYER_IDS
+    if settings.VTURB_ACTIVE_DAYS <= 0:
+        return players
+    try:
+        history = last_activity(date.today() - timedelta(days=settings.VTURB_ACTIVE_DAYS))
+    except Exception as e:
+        logger.warning(f"⚠️ Atividade dos players indisponível ({e}); buscando todos")
+        return players
+
+    today = {str(r["player_id"]): r for r in rows}
+    sweep_before = datetime.now() - timedelta(hours=settings.VTURB_DORMANT_SWEEP_HOURS)
+    units, swept, sleeping = [], 0, 0
+    for player in players:
+        row = today.get(player)
+        if player not in history or history[player] is not None or (row and engine.active(row, ACTIVITY_COLUMNS)):
+            units.append(player)
+        elif row is None or as_datetime(row["extraction_timestamp"]) < sweep_before:
+            units.append(player)
+            swept += 1
+        else:
+            sleeping += 1
+    if swept or sleeping:
+        logger.info(f"💤 Players sem views/plays em {settings.VTURB_ACTIVE_DAYS} dias: {swept} na varredura, "
+                    f"{sleeping} pulados (varredura a cada {settings.VTURB_DORMANT_SWEEP_HOURS:g}h)")
+    return units
+
+
+SOURCE = Source(
+    name="vturb",
+    label="VTURB",
+    token="VTURB_TOKEN",
+    login="vturb",
+    tables=("vturb_today", "vturb_history"),
+    units=lambda: settings.VTURB_PLAYER_IDS,
+    fetch=lambda target_date, player_id: fetch_player_stats(player_id, target_date),
+    transform=transform,
+    summarize=summarize,
+    print_summary=print_summary,
+    update=VTURB.update,
+    status_key="players",
+    describe=lambda: [f"🎬 Players: {len(settings.VTURB_PLAYER_IDS)}"],
+    empty_ok=False,
+    empty_message="Nenhum player retornou dados",
+    settling=settling,
+    coverage="player_id",
+    today_units=today_units,
+)
+
+
+def extract_today() -> Dict[str, Any]:
     """Extrai dados de HOJE → vturb_today"""
-    
-    target_date = date.today()
-    
-    print("=" * 50)
-    print(f"📊 VTURB EXTRACTOR - HOJE")
-    print(f"📅 Data: {target_date.strftime('%d/%m/%Y')}")
-    print(f"💾 Destino: vturb_today")
-    print(f"🔑 Token: {'✅ Definido' if VTURB_TOKEN else '❌ Não definido'}")
-    print("=" * 50)
-    
-    if not VTURB_TOKEN:
-        print("\n❌ Execute: python3 auto_extract.py vturb")
-        return
-    
-    stats_list = []
-    
-    for player_id in PLAYER_IDS:
-        raw_data = fetch_player_stats(player_id, target_date)
-        if raw_data:
-            stats = parse_stats(raw_data, player_id, target_date)
-            stats_list.append(stats)
-    
-    if stats_list:
-        save_to_today(stats_list)
-        print_summary(stats_list)
-    else:
-        print("\n⚠️ Nenhum dado extraído")
+    return engine.extract_today(SOURCE)
 
 
-def extract_yesterday():
+def extract_yesterday() -> Dict[str, Any]:
     """Extrai dados de ONTEM → vturb_history"""
-    
-    target_date = date.today() - timedelta(days=1)
-    
-    print("=" * 50)
-    print(f"📊 VTURB EXTRACTOR - ONTEM")
-    print(f"📅 Data: {target_date.strftime('%d/%m/%Y')}")
-    print(f"💾 Destino: vturb_history")
-    print(f"🔑 Token: {'✅ Definido' if VTURB_TOKEN else '❌ Não definido'}")
-    print("=" * 50)
-    
-    if not VTURB_TOKEN:
-        print("\n❌ Execute: python3 auto_extract.py vturb")
-        return
-    
-    stats_list = []
-    
-    for player_id in PLAYER_IDS:
-        raw_data = fetch_player_stats(player_id, target_date)
-        if raw_data:
-            stats = parse_stats(raw_data, player_id, target_date)
-            save_to_history(stats)
-            stats_list.append(stats)
-    
-    if stats_list:
-        print_summary(stats_list)
-    else:
-        print("\n⚠️ Nenhum dado extraído")
+    return engine.extract_yesterday(SOURCE)
+
+
+def extract_date(target_date: date, to_history: bool = True, title: Optional[str] = None) -> Dict[str, Any]:
+    """Extrai uma data e retorna o resultado estruturado (ok, rows, summary, error)"""
+    return engine.extract_date(SOURCE, target_date, to_history, title)
 
 
 # =====================================================
@@ -459,23 +319,4 @@ def extract_yesterday():
 # =====================================================
 
 if __name__ == "__main__":
-    import sys
-    
-    if len(sys.argv) < 2:
-        print("Uso: python vturb_extract.py [hoje|ontem]")
-        print("")
-        print("Comandos:")
-        print("  hoje   - Extrai dados de hoje (salva em vturb_today)")
-        print("  ontem  - Extrai dados de ontem (salva em vturb_history)")
-        sys.exit(1)
-    
-    comando = sys.argv[1].lower()
-    
-    if comando == "hoje":
-        extract_today()
-    elif comando == "ontem":
-        extract_yesterday()
-    else:
-        print(f"❌ Comando inválido: {comando}")
-        print("   Use: hoje ou ontem")
-        sys.exit(1)
\ No newline at end of file
+    sys.exit(engine.main([SOURCE.name], sys.argv[1:]))
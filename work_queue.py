@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Work Queue - Fila de jobs de extração no Postgres (SELECT ... FOR UPDATE SKIP LOCKED)
+Cada job é (fonte, unidade, data): um dashboard, um player ou uma fonte de tráfego em um dia.
+Jobs saem por prioridade (today > yesterday > backfill); enquanto um ciclo today/yesterday
+do scheduler roda, os workers só pegam jobs da mesma classe ou mais urgentes.
+Qualquer número de workers, em qualquer host, consome a mesma fila: cada um reserva jobs por
+um prazo (visibilidade) que renova enquanto roda; se o worker morre, o prazo vence e outro
+worker pega o job. Falhas voltam para a fila com espera crescente até QUEUE_MAX_ATTEMPTS.
+A carga é UPSERT no *_history, então rodar um job duas vezes não duplica nada.
+Uso: python3 work_queue.py enqueue FONTE[,FONTE] INÍCIO [FIM] | work [--workers N] [--drain] | status | retry
+"""
+
+import os
+import sys
+import time
+import socket
+import threading
+from datetime import date, timedelta
+from typing import Any, Dict, NamedTuple, Optional, Sequence, Set, Tuple
+import logging
+
+from settings import settings
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# =====================================================
+# CONFIGURAÇÕES
+# =====================================================
+
+QUEUE_TABLE = "extract_jobs"
+# Relidos do .env antes de cada job (o auto_extract regrava quando renova)
+TOKENS = ("UTMIFY_TOKEN", "VTURB_TOKEN")
+
+QUEUE_DDL = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {QUEUE_TABLE} (
+        id BIGSERIAL PRIMARY KEY,
+        source TEXT NOT NULL,
+        unit TEXT NOT NULL,
+        report_date DATE NOT NULL,
+        priority SMALLINT NOT NULL DEFAULT 2,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        run_after TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        locked_until TIMESTAMPTZ,
+        worker TEXT,
+        rows_loaded INTEGER,
+        last_error TEXT,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        UNIQUE (source, unit, report_date)
+    )
+    """,
+    # Filas criadas antes das classes de prioridade
+    f"ALTER TABLE {QUEUE_TABLE} ADD COLUMN IF NOT EXISTS priority SMALLINT NOT NULL DEFAULT 2",
+    f"CREATE INDEX IF NOT EXISTS ix_{QUEUE_TABLE}_ready ON {QUEUE_TABLE} (status, priority, run_after)",
+]
+
+# pending -> running -> done | pending (nova tentativa) | failed (tentativas esgotadas)
+# running com locked_until vencido = worker morreu: volta a ser reservável
+CLAIM_SQL = f"""
+    UPDATE {QUEUE_TABLE} j
+    SET status = 'running', attempts = j.attempts + 1, worker = %(worker)s,
+        locked_until = NOW() + make_interval(secs => %(visibility)s), updated_at = NOW()
+    FROM (
+        SELECT id FROM {QUEUE_TABLE}
+        WHERE attempts < %(max_attempts)s AND priority <= %(max_priority)s
+          AND ((status = 'pending' AND run_after <= NOW())
+               OR (status = 'running' AND locked_until < NOW()))
+        ORDER BY priority, report_date, source, unit
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    ) next_job
+    WHERE j.id = next_job.id
+    RETURNING j.id, j.source, j.unit, j.report_date, j.attempts, j.priority
+"""
+
+# Reservas vencidas sem tentativas restantes (o worker morreu na última)
+EXPIRE_SQL = f"""
+    UPDATE {QUEUE_TABLE}
+    SET status = 'failed', locked_until = NULL, updated_at = NOW(),
+        last_error = COALESCE(last_error, 'reserva expirou (worker parou)')
+    WHERE status = 'running' AND locked_until < NOW() AND attempts >= %(max_attempts)s
+"""
+
+
+class Job(NamedTuple):
+    id: int
+    source: str
+    unit: str
+    report_date: date
+    attempts: int
+    priority: int
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# =====================================================
+# BANCO
+# =====================================================
+
+def get_queue_backend():
+    """A fila depende de SKIP LOCKED: só Postgres"""
+    from storage import get_backend, PostgresBackend
+
+    backend = get_backend(settings.DB_CONFIG)
+    if not isinstance(backend, PostgresBackend):
+        raise RuntimeError(f"A fila de jobs exige STORAGE_BACKEND=postgres (atual: {settings.STORAGE_BACKEND})")
+    return backend
+
+
+def execute(sql: str, params: Optional[Dict[str, Any]] = None, fetch: bool = False):
+    """Uma transação curta por comando (nenhum lock de linha fica aberto enquanto o job roda)"""
+    backend = get_queue_backend()
+    conn = backend.connect()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(sql, params or {})
+        result = cursor.fetchall() if fetch else cursor.rowcount
+        conn.commit()
+        return result
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        backend.release(conn)
+
+
+def ensure_queue():
+    for ddl in QUEUE_DDL:
+        execute(ddl)
+
+
+# =====================================================
+# FILA
+# =====================================================
+
+def insert_sql(force: bool = False) -> str:
+    """INSERT de um job; já enfileirados são ignorados (force: done/failed voltam para pending)"""
+    conflict = (
+        "DO UPDATE SET status = 'pending', attempts = 0, run_after = NOW(), last_error = NULL, "
+        "priority = EXCLUDED.priority, "
+        f"updated_at = NOW() WHERE {QUEUE_TABLE}.status IN ('done', 'failed')"
+        if force else "DO NOTHING"
+    )
+    return (f"INSERT INTO {QUEUE_TABLE} (source, unit, report_date, priority) "
+            "VALUES (%(source)s, %(unit)s, %(date)s, %(priority)s) "
+            f"ON CONFLICT (source, unit, report_date) {conflict}")
+
+
+def enqueue(names: Sequence[str], start: date, end: date, force: bool = False,
+            priority: str = "backfill") -> int:
+    """
+    Um job por (fonte, unidade, dia). Já enfileirados são ignorados;
+    force=True devolve à fila os que já terminaram (done/failed).
+    priority: classe de leader.PRIORITIES (padrão: backfill histórico)
+    """
+    import engine
+    from leader import PRIORITIES
+
+    if priority not in PRIORITIES:
+        raise ValueError(f"Prioridade inválida: {priority} (use {', '.join(PRIORITIES)})")
+
+    ensure_queue()
+    sql = insert_sql(force)
+
+    added = 0
+    for name in names:
+        units = list(engine.get_source(name).job_units())
+        day = start
+        while day <= end:
+            for unit in units:
+                added += execute(sql, {"source": name, "unit": unit, "date": day,
+                                       "priority": PRIORITIES[priority]})
+            day += timedelta(days=1)
+        logger.info(f"📥 {name}: {len(units)} unidade(s) x {(end - start).days + 1} dia(s)")
+    return added
+
+
+def enqueue_units(jobs: Sequence[Tuple[str, str, date]], priority: str = "backfill") -> int:
+    """Jobs avulsos (fonte, chave do job, dia), ex.: buracos achados pelo gaps.py"""
+    from leader import PRIORITIES
+
+    ensure_queue()
+    sql = insert_sql()
+    return sum(execute(sql, {"source": source, "unit": unit, "date": day, "priority": PRIORITIES[priority]})
+               for source, unit, day in jobs)
+
+
+def queued(names: Sequence[str], start: date, end: date) -> Set[Tuple[str, str, date]]:
+    """(fonte, unidade, dia) já na fila em qualquer status (done inclusive: dia vazio não volta)"""
+    ensure_queue()
+    rows = execute(
+        f"SELECT source, unit, report_date FROM {QUEUE_TABLE} "
+        "WHERE source = ANY(%(names)s) AND report_date BETWEEN %(start)s AND %(end)s",
+        {"names": list(names), "start": start, "end": end}, fetch=True,
+    )
+    return {(source, unit, day) for source, unit, day in rows}
+
+
+def claim(worker: str, max_priority: int = 2) -> Optional[Job]:
+    """Próximo job (mais urgente, depois mais antigo) com prioridade <= max_priority"""
+    execute(EXPIRE_SQL, {"max_attempts": settings.QUEUE_MAX_ATTEMPTS})
+    rows = execute(CLAIM_SQL, {
+        "worker": worker,
+        "visibility": settings.QUEUE_VISIBILITY_SECONDS,
+        "max_attempts": settings.QUEUE_MAX_ATTEMPTS,
+        "max_priority": max_priority,
+    }, fetch=True)
+    return Job(*rows[0]) if rows else None
+
+
+def extend(job: Job, worker: str) -> bool:
+    """Renova a reserva; False se o job já não é deste worker"""
+    return execute(
+        f"UPDATE {QUEUE_TABLE} SET locked_until = NOW() + make_interval(secs => %(visibility)s) "
+        "WHERE id = %(id)s AND worker = %(worker)s AND status = 'running'",
+        {"id": job.id, "worker": worker, "visibility": settings.QUEUE_VISIBILITY_SECONDS},
+    ) > 0
+
+
+def complete(job: Job, worker: str, rows: int) -> bool:
+    """Idempotente: só o dono da reserva marca; se outro worker já concluiu, nada muda"""
+    return execute(
+        f"UPDATE {QUEUE_TABLE} SET status = 'done', rows_loaded = %(rows)s, last_error = NULL, "
+        "locked_until = NULL, updated_at = NOW() "
+        "WHERE id = %(id)s AND worker = %(worker)s AND status = 'running'",
+        {"id": job.id, "worker": worker, "rows": rows},
+    ) > 0
+
+
+def fail(job: Job, worker: str, error: str) -> bool:
+    """Volta para a fila com espera exponencial, ou failed se esgotou as tentativas"""
+    delay = min(settings.QUEUE_RETRY_SECONDS * 2 ** (job.attempts - 1), 3600)
+    return execute(
+        f"UPDATE {QUEUE_TABLE} SET "
+        "status = CASE WHEN attempts >= %(max_attempts)s THEN 'failed' ELSE 'pending' END, "
+        "run_after = NOW() + make_interval(secs => %(delay)s), locked_until = NULL, "
+        "last_error = %(error)s, updated_at = NOW() "
+        "WHERE id = %(id)s AND worker = %(worker)s AND status = 'running'",
+        {"id": job.id, "worker": worker, "error": error[:2000], "delay": delay,
+         "max_attempts": settings.QUEUE_MAX_ATTEMPTS},
+    ) > 0
+
+
+def retry_failed() -> int:
+    return execute(
+        f"UPDATE {QUEUE_TABLE} SET status = 'pending', attempts = 0, run_after = NOW(), updated_at = NOW() "
+        "WHERE status = 'failed'"
+    )
+
+
+def counts() -> Dict[str, Dict[str, int]]:
+    """Fonte -> status -> jobs"""
+    result: Dict[str, Dict[str, int]] = {}
+    for source, status, total in execute(
+        f"SELECT source, status, COUNT(*) FROM {QUEUE_TABLE} GROUP BY source, status ORDER BY source",
+        fetch=True,
+    ):
+        result.setdefault(source, {})[status] = total
+    return result
+
+
+def remaining() -> int:
+    """Jobs que ainda podem rodar (pendentes ou em andamento)"""
+    rows = execute(f"SELECT COUNT(*) FROM {QUEUE_TABLE} WHERE status IN ('pending', 'running')", fetch=True)
+    return rows[0][0]
+
+
+# =====================================================
+# WORKER
+# =====================================================
+
+def run_job(job: Job) -> Dict[str, Any]:
+    """
+    Extrai as unidades do job para *_history (mesmo caminho do engine.extract_date).
+    O worker vive mais que os tokens: relê do .env os que o auto_extract renovou desde o último job.
+    """
+    import engine
+
+    settings.reload(*TOKENS)
+    return engine.extract_job(engine.get_source(job.source), job.unit, job.report_date,
+                              title=f"JOB {job.id} | {job.unit}")
+
+
+def heartbeat(job: Job, worker: str, stop: threading.Event):
+    """Renova a reserva a cada 1/3 do prazo enquanto o job roda"""
+    interval = max(1.0, settings.QUEUE_VISIBILITY_SECONDS / 3)
+    while not stop.wait(interval):
+        try:
+            if not extend(job, worker):
+                logger.warning(f"⚠️ Job {job.id}: reserva perdida (outro worker pode repetir o job)")
+                return
+        except Exception as e:
+            logger.warning(f"⚠️ Job {job.id}: falha ao renovar reserva ({e})")
+
+
+def work(drain: bool = False, max_jobs: Optional[int] = None) -> Dict[str, int]:
+    """
+    Loop do worker: reserva, roda, conclui. drain=True sai quando a fila não tem mais o que rodar;
+    senão espera novos jobs (QUEUE_POLL_SECONDS).
+    """
+    import leader
+
+    worker = worker_name()
+    stats = {"done": 0, "failed": 0}
+    ensure_queue()
+    logger.info(f"👷 Worker {worker} consumindo {QUEUE_TABLE}")
+    paused = False
+
+    while max_jobs is None or stats["done"] + stats["failed"] < max_jobs:
+        # Ciclo today/yesterday em andamento: só jobs da mesma classe ou mais urgentes
+        ceiling = leader.priority_ceiling()
+        if ceiling < leader.PRIORITIES["backfill"] and not paused:
+            logger.info(f"⏸️ Worker {worker}: backfill pausado ({', '.join(leader.higher_in_flight('backfill'))} em andamento)")
+        elif ceiling == leader.PRIORITIES["backfill"] and paused:
+            logger.info(f"▶️ Worker {worker}: backfill retomado")
+        paused = ceiling < leader.PRIORITIES["backfill"]
+
+        job = claim(worker, ceiling)
+        if job is None:
+            if drain and not paused and remaining() == 0:
+                break
+            time.sleep(settings.QUEUE_POLL_SECONDS)
+            continue
+
+        logger.info(f"▶️ Job {job.id}: {job.source} | {job.unit} | {job.report_date} (tentativa {job.attempts})")
+        stop = threading.Event()
+        beat = threading.Thread(target=heartbeat, args=(job, worker, stop), daemon=True)
+        beat.start()
+        try:
+            result = run_job(job)
+        except Exception as e:
+            result = {"ok": False, "rows": 0, "error": f"{type(e).__name__}: {e}"}
+        finally:
+            stop.set()
+            beat.join()
+
+        if result["ok"]:
+            stats["done"] += 1
+            if not complete(job, worker, result.get("rows", 0)):
+                logger.warning(f"⚠️ Job {job.id}: já concluído/reservado por outro worker")
+            logger.info(f"✅ Job {job.id}: {result.get('rows', 0)} registros")
+        else:
+            stats["failed"] += 1
+            fail(job, worker, result.get("error") or "falha sem detalhe")
+            logger.error(f"❌ Job {job.id}: {result.get('error')}")
+
+    logger.info(f"🏁 Worker {worker}: {stats['done']} ok, {stats['failed']} com falha")
+    return stats
+
+
+def work_processes(workers: int, drain: bool) -> bool:
+    """N processos consumindo a mesma fila (um por núcleo); em outros hosts, rode work lá também"""
+    import subprocess
+
+    args = [sys.executable, os.path.abspath(__file__), "work"] + (["--drain"] if drain else [])
+    procs = [subprocess.Popen(args) for _ in range(workers)]
+    return all(p.wait() == 0 for p in procs)
+
+
+# =====================================================
+# MAIN
+# =====================================================
+
+def print_status():
+    table = counts()
+    if not table:
+        print("📭 Fila vazia")
+        return
+    columns = ["pending", "running", "done", "failed"]
+    print(f"{'fonte':<12}" + "".join(f"{c:>10}" for c in columns))
+    for source, by_status in table.items():
+        print(f"{source:<12}" + "".join(f"{by_status.get(c, 0):>10}" for c in columns))
+    for job_id, source, unit, day, error in execute(
+        f"SELECT id, source, unit, report_date, last_error FROM {QUEUE_TABLE} "
+        "WHERE status = 'failed' ORDER BY report_date LIMIT 10", fetch=True,
+    ):
+        print(f"❌ {job_id} {source} {unit} {day}: {error}")
+
+
+def print_usage():
+    print("Uso: python3 work_queue.py [enqueue|work|status|retry]")
+    print("")
+    print("Comandos:")
+    print("  enqueue FONTE[,FONTE] INÍCIO [FIM] [--force] [--priority today|yesterday|backfill]")
+    print("                                               - Um job por unidade e dia (--force refaz os concluídos)")
+    print("  work [--workers N] [--drain]                 - Consome a fila (--drain sai quando acabar)")
+    print("  status                                       - Jobs por fonte e status")
+    print("  retry                                        - Devolve os jobs com falha à fila")
+
+
+def pop_option(argv: list, name: str, default: Optional[str] = None) -> Optional[str]:
+    """Remove --nome VALOR de argv e devolve VALOR"""
+    if name not in argv:
+        return default
+    i = argv.index(name)
+    if i + 1 >= len(argv):
+        raise ValueError(f"Informe um valor para {name}")
+    value = argv[i + 1]
+    del argv[i:i + 2]
+    return value
+
+
+if __name__ == "__main__":
+    from engine import parse_date
+
+    argv = sys.argv[1:]
+    try:
+        priority = pop_option(argv, "--priority", "backfill")
+        workers = int(pop_option(argv, "--workers", "1"))
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    args = [a for a in argv if not a.startswith("--")]
+    flags = [a for a in argv if a.startswith("--")]
+    if not args or args[0] not in ("enqueue", "work", "status", "retry"):
+        print_usage()
+        sys.exit(1)
+
+    try:
+        if args[0] == "enqueue":
+            if len(args) < 3:
+                print_usage()
+                sys.exit(1)
+            start = parse_date(args[2])
+            end = parse_date(args[3]) if len(args) > 3 else start
+            if end < start:
+                raise ValueError("A data final é anterior à inicial")
+            added = enqueue(args[1].lower().split(","), start, end, force="--force" in flags, priority=priority)
+            print(f"✅ {added} job(s) enfileirados")
+        elif args[0] == "work":
+            drain = "--drain" in flags
+            if workers > 1:
+                sys.exit(0 if work_processes(workers, drain) else 1)
+            stats = work(drain=drain)
+            sys.exit(0 if stats["failed"] == 0 else 1)
+        elif args[0] == "status":
+            print_status()
+        else:
+            print(f"✅ {retry_failed()} job(s) devolvidos à fila")
+    except (ValueError, RuntimeError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\n⏹️ Worker finalizado (jobs em andamento voltam à fila quando a reserva vencer).")